@@ -1,49 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import PlainTextResponse, FileResponse, JSONResponse
 import io
 import os
 import tempfile
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime
+from sqlalchemy.orm import Session, undefer
+from sqlalchemy import tuple_
+from datetime import datetime, timedelta
 from typing import List, Optional
 import uuid
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.agent import Agent
 from app.models.lead import Lead
+from app.db.models import AgentRunLog
+from app.core.spans import slowest_stages
+from app.db.rollups import agent_lead_stats, agent_counters_ready
+from app.db.lead_cards import lead_cards
+from app.core.response_cache import cached_response
+from app.utils.cursors import encode_cursor, decode_cursor
 from app.schemas.lead import LeadResponse
 from app.schemas.agent import AgentCreate, AgentResponse
 
 router = APIRouter()
 
+# Serve agent lead counters from the cached agents columns instead of a
+# grouped count over leads (needs scripts/migrate_agent_counters.py).
+AGENT_CACHED_COUNTERS = os.getenv("AGENT_CACHED_COUNTERS", "false").lower() == "true"
+AGENT_COUNTER_COLUMNS = (Agent.leads_count, Agent.high_intent_count, Agent.last_lead_at)
+
+def _use_cached_counters(db: Session) -> bool:
+    return AGENT_CACHED_COUNTERS and agent_counters_ready(db.connection())
+
+def _agent_query(db: Session, cached: bool):
+    query = db.query(Agent)
+    return query.options(*[undefer(col) for col in AGENT_COUNTER_COLUMNS]) if cached else query
+
+def enrich_agents(agents: List[Agent], db: Session, cached: Optional[bool] = None) -> List[dict]:
+    """
+    Attach leads_count, high_intent_count (ranked_score >= 0.7) and last_run
+    (latest lead creation) to a page of agents in a constant number of
+    queries: one GROUP BY agent_id over leads, or none with cached counters.
+    """
+    cached = _use_cached_counters(db) if cached is None else cached
+    stats = {} if cached else agent_lead_stats(db, [agent.id for agent in agents])
+
+    results = []
+    for agent in agents:
+        if cached:
+            counts = {
+                "leads_count": agent.leads_count or 0,
+                "high_intent_count": agent.high_intent_count or 0,
+                "last_run": agent.last_lead_at,
+            }
+        else:
+            counts = stats.get(agent.id, {})
+
+        # Create response object manually to inject extra fields
+        # Since AgentResponse is a Pydantic model, we can instantiate it with the dict from agent + extra fields
+        agent_dict = agent.to_dict()
+        agent_dict['id'] = uuid.UUID(agent_dict['id']) # Convert string back to UUID for Pydantic
+        agent_dict['leads_count'] = counts.get("leads_count", 0)
+        agent_dict['high_intent_count'] = counts.get("high_intent_count", 0)
+        agent_dict['last_run'] = counts.get("last_run")
+        results.append(agent_dict)
+    return results
+
 def enrich_agent_data(agent: Agent, db: Session) -> AgentResponse:
-    # Get total leads
-    leads_count = db.query(Lead).filter(Lead.agent_id == agent.id).count()
-    
-    # Get high intent leads (ranked_score >= 0.7)
-    high_intent_count = db.query(Lead).filter(
-        Lead.agent_id == agent.id, 
-        Lead.ranked_score >= 0.7
-    ).count()
-    
-    # Get last run time (latest lead creation)
-    last_run = db.query(func.max(Lead.created_at)).filter(Lead.agent_id == agent.id).scalar()
-    
-    # Create response object manually to inject extra fields
-    # Since AgentResponse is a Pydantic model, we can instantiate it with the dict from agent + extra fields
-    agent_dict = agent.to_dict()
-    agent_dict['id'] = uuid.UUID(agent_dict['id']) # Convert string back to UUID for Pydantic
-    agent_dict['leads_count'] = leads_count
-    agent_dict['high_intent_count'] = high_intent_count
-    agent_dict['last_run'] = last_run
-    
-    return agent_dict
+    return enrich_agents([agent], db)[0]
 
 @router.get("/", response_model=List[AgentResponse])
-def list_agents(db: Session = Depends(get_db)):
-    """List all agents with stats."""
-    agents = db.query(Agent).order_by(Agent.created_at.desc()).all()
-    return [enrich_agent_data(agent, db) for agent in agents]
+@cached_response("agents", "leads", ttl=300, model=List[AgentResponse])
+def list_agents(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    List agents with stats, newest first. With `limit`, pages are keyset
+    cursors on (created_at, id); the next one is in the X-Next-Cursor header.
+    """
+    cached = _use_cached_counters(db)
+    query = _agent_query(db, cached)
+
+    state = decode_cursor(cursor)
+    if state and state.get("c") and state.get("id"):
+        try:
+            key = (datetime.fromisoformat(state["c"]), uuid.UUID(state["id"]))
+            query = query.filter(tuple_(Agent.created_at, Agent.id) < key)
+        except (ValueError, TypeError):
+            pass
+
+    query = query.order_by(Agent.created_at.desc(), Agent.id.desc())
+    if limit is None:
+        return enrich_agents(query.all(), db, cached=cached)
+
+    agents = query.limit(limit + 1).all()
+    if len(agents) > limit and agents[limit - 1].created_at:
+        last = agents[limit - 1]
+        response.headers["X-Next-Cursor"] = encode_cursor({"c": last.created_at.isoformat(), "id": last.id.hex})
+    return enrich_agents(agents[:limit], db, cached=cached)
 
 @router.post("/", response_model=AgentResponse)
 def create_agent(agent_in: AgentCreate, db: Session = Depends(get_db)):
@@ -65,29 +120,47 @@ def create_agent(agent_in: AgentCreate, db: Session = Depends(get_db)):
 
     return enrich_agent_data(agent, db)
 
+@router.get("/runs/slowest-stages")
+def fleet_slowest_stages(hours: int = 24, limit: int = 10, status: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """Fleet-wide stage breakdown: where agent runs spent their time over the last `hours`."""
+    since = datetime.utcnow() - timedelta(hours=hours)
+    query = db.query(AgentRunLog.profile).filter(AgentRunLog.run_time >= since, AgentRunLog.profile.isnot(None))
+    if status:
+        query = query.filter(AgentRunLog.status == status)
+    profiles = [row.profile for row in query.all()]
+
+    return {
+        "status": "success",
+        "window_hours": hours,
+        "runs": len(profiles),
+        "stages": slowest_stages(profiles, limit=limit)
+    }
+
 @router.get("/{agent_id}", response_model=AgentResponse)
-def get_agent(agent_id: str, db: Session = Depends(get_db)):
+def get_agent(agent_id: str, db: Session = Depends(get_read_db)):
     """Get agent details."""
     try:
         agent_uuid = uuid.UUID(agent_id)
     except ValueError:
         return JSONResponse(status_code=200, content={"status": "error", "message": "Invalid agent ID format"})
 
-    agent = db.query(Agent).filter(Agent.id == agent_uuid).first()
+    cached = _use_cached_counters(db)
+    agent = _agent_query(db, cached).filter(Agent.id == agent_uuid).first()
 
     if not agent:
         return JSONResponse(status_code=200, content={"status": "error", "message": "Agent not found"})
 
-    return enrich_agent_data(agent, db)
+    return enrich_agents([agent], db, cached=cached)[0]
 
 @router.get("/{agent_id}/leads", response_model=List[LeadResponse])
+@cached_response("leads", ttl=300)
 def get_agent_leads(
     agent_id: str,
     min_score: Optional[float] = None,
     from_date: Optional[datetime] = None,
     limit: int = 50,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     try:
         agent_uuid = uuid.UUID(agent_id)
@@ -110,18 +183,64 @@ def get_agent_leads(
         .all()
     )
 
-    return leads
+    # Cached lead cards are a superset of LeadResponse; skip per-row model validation
+    return Response(content=b"[" + b",".join(lead_cards(db, leads)) + b"]", media_type="application/json")
+
+
+@router.get("/{agent_id}/runs")
+def list_agent_runs(agent_id: str, limit: int = 20, db: Session = Depends(get_read_db)):
+    """Recent runs for an agent (newest first), without the stage breakdown."""
+    try:
+        agent_uuid = uuid.UUID(agent_id)
+    except ValueError:
+        return JSONResponse(status_code=200, content={"status": "error", "message": "Invalid agent ID format"})
+
+    runs = (
+        db.query(AgentRunLog)
+        .filter(AgentRunLog.agent_id == agent_uuid)
+        .order_by(AgentRunLog.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return {"status": "success", "runs": [r.to_dict() for r in runs]}
+
+
+@router.get("/{agent_id}/runs/{run_id}/profile")
+def get_agent_run_profile(agent_id: str, run_id: int, db: Session = Depends(get_read_db)):
+    """Stage-level timing breakdown for one agent run, slowest stage first."""
+    try:
+        agent_uuid = uuid.UUID(agent_id)
+    except ValueError:
+        return JSONResponse(status_code=200, content={"status": "error", "message": "Invalid agent ID format"})
+
+    run = db.query(AgentRunLog).filter(AgentRunLog.id == run_id, AgentRunLog.agent_id == agent_uuid).first()
+    if not run:
+        return JSONResponse(status_code=200, content={"status": "error", "message": "Run not found"})
+
+    profile = run.profile or {"total_ms": run.duration_ms, "stages": {}}
+    stages = sorted(
+        ({"stage": name, **s} for name, s in profile.get("stages", {}).items()),
+        key=lambda s: s.get("ms", 0.0),
+        reverse=True
+    )
+    return {
+        "status": "success",
+        "run": run.to_dict(),
+        "total_ms": profile.get("total_ms"),
+        "stages": stages
+    }
 
 
 @router.post("/{agent_id}/export")
-def export_agent_leads(agent_id: str, db: Session = Depends(get_db)):
+def export_agent_leads(agent_id: str, db: Session = Depends(get_read_db)):
     """Export leads for an agent as a text file (POST method)."""
     try:
         agent_uuid = uuid.UUID(agent_id)
     except ValueError:
         return PlainTextResponse("Invalid agent ID format", media_type="text/plain")
 
-    leads = db.query(Lead).filter(Lead.agent_id == agent_uuid).all()
+    # Streamed in batches; the file is written as rows arrive
+    leads = db.query(Lead).filter(Lead.agent_id == agent_uuid).yield_per(500)
     
     # Create a temp file
     fd, filepath = tempfile.mkstemp(suffix=".txt", prefix=f"{agent_id}_leads_")
@@ -156,7 +275,7 @@ def stop_agent(agent_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{agent_id}/export")
-def export_agent_leads_get(agent_id: str, db: Session = Depends(get_db)):
+def export_agent_leads_get(agent_id: str, db: Session = Depends(get_read_db)):
     """Export leads found by this agent as a .txt file download (GET method)."""
     # Reuse the same logic as POST for consistency
     return export_agent_leads(agent_id, db)
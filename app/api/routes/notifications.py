@@ -1,25 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from typing import List
 import uuid
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
+from app.db.async_database import AsyncSession, get_async_read_db
 from app.models.notification import Notification
 from app.schemas.notification import NotificationResponse
+from app.core.response_cache import cached_response
 
 router = APIRouter()
 
 
 @router.get("/count")
-def count_notifications(unread_only: bool = False, db: Session = Depends(get_db)):
+@cached_response("notifications", ttl=300)
+async def count_notifications(unread_only: bool = False, db: AsyncSession = Depends(get_async_read_db)):
     """Get count of notifications."""
-    query = db.query(Notification)
+    query = select(func.count()).select_from(Notification)
     if unread_only:
-        query = query.filter(Notification.read == False)
-    return {"count": query.count()}
+        query = query.where(Notification.read == False)
+    return {"count": await db.scalar(query)}
 
 @router.get("/", response_model=List[NotificationResponse])
-def list_notifications(db: Session = Depends(get_db)):
+@cached_response("notifications", ttl=300, model=List[NotificationResponse])
+def list_notifications(db: Session = Depends(get_read_db)):
     try:
         return (
             db.query(Notification)
@@ -1,16 +1,25 @@
-from celery import Celery
+from celery import Celery, Task
 import os
 import sys
+import uuid
 import logging
-import hashlib
 from datetime import datetime, timedelta, timezone
 
 # Add project root to sys.path for absolute imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from celery.schedules import crontab
+from celery.signals import worker_process_init
 from app.db.database import SessionLocal
 from app.db import models
+from app.models.agent_raw_lead import AgentRawLead
+from app.core.local_queue import LocalTaskQueue, LOCAL_QUEUE_CONCURRENCY, LOCAL_QUEUE_POOL
+from app.core.lanes import BACKGROUND, use_lane
+from app.db.rollups import rollups_ready, reconcile_rollups, refresh_agent_counters
+from app.db.retention import apply_retention, RAW_LEADS_RETENTION_DAYS
+from app.core.raw_capture import store as raw_capture, item_hash
+from app.core.delivery import DELIVERY_INTERVAL_SECONDS, deliver_due
+from app.core.network_health import network_health
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
@@ -23,10 +32,48 @@ BROKER_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
 FALLBACK_BROKER_URL = "sqla+sqlite:///celery_broker.db"
 RESULT_BACKEND = os.getenv("REDIS_URL", "db+sqlite:///celery_results.db")
 
+# Embedded durable queue used instead of eager execution when Redis is down.
+# Set by the connection check below; None means tasks go through Celery's broker.
+local_queue = None
+LOCAL_QUEUE_AUTOSTART = os.getenv("LOCAL_QUEUE_AUTOSTART", "true").lower() == "true"
+# How far back the hourly stats reconcile recounts buckets
+STATS_ROLLUP_RECONCILE_HOURS = int(os.getenv("STATS_ROLLUP_RECONCILE_HOURS", "48"))
+
+class LocalQueueTask(Task):
+    """
+    Task base that routes delay()/apply_async() to the local SQLite queue
+    when no Redis broker is available. Call sites keep the Celery API.
+    """
+    def apply_async(self, args=None, kwargs=None, **options):
+        if local_queue is None:
+            return super().apply_async(args, kwargs, **options)
+        if LOCAL_QUEUE_AUTOSTART and not local_queue.running:
+            start_local_queue()
+        return local_queue.enqueue(
+            self.name,
+            args=args,
+            kwargs=kwargs,
+            priority=options.get("priority") or 0,
+            countdown=options.get("countdown"),
+            max_retries=options.get("max_retries"),
+        )
+
+def _resolve_local_task(name: str):
+    """Local-queue tasks share the API process, so run them in the background lane."""
+    task = celery_app.tasks.get(name)
+    if task is None:
+        return None
+
+    def run(*args, **kwargs):
+        with use_lane(BACKGROUND):
+            return task(*args, **kwargs)
+    return run
+
 celery_app = Celery(
     "intent_radar",
     broker=BROKER_URL,
-    backend=RESULT_BACKEND
+    backend=RESULT_BACKEND,
+    task_cls=LocalQueueTask
 )
 
 # Test connection and fallback if needed
@@ -35,10 +82,9 @@ try:
     r = redis.from_url(BROKER_URL)
     r.ping()
 except Exception:
-    logger.warning("Redis not found. Falling back to SQLite broker.")
+    logger.warning("Redis not found. Falling back to local SQLite task queue.")
     celery_app.conf.broker_url = FALLBACK_BROKER_URL
-    celery_app.conf.task_always_eager = True
-    celery_app.conf.task_eager_propagates = True
+    local_queue = LocalTaskQueue(resolve_task=lambda name: _resolve_local_task(name))
 
 celery_app.conf.update(
     task_serializer="json",
@@ -55,6 +101,14 @@ celery_app.conf.update(
             "task": "cleanup_old_leads",
             "schedule": 43200.0,
         },
+        "reconcile-stats-rollups-hourly": {
+            "task": "reconcile_stats_rollups",
+            "schedule": 3600.0,
+        },
+        "deliver-outbox": {
+            "task": "deliver_outbox",
+            "schedule": DELIVERY_INTERVAL_SECONDS,
+        },
     },
 )
 
@@ -259,6 +313,8 @@ def scrape_platform_task(platform: str, query: str, location: str = "Kenya", age
     high_value_leads = []
     
     try:
+        # Celery passes the agent id as a string; the UUID columns bind uuid.UUID values
+        agent_id = uuid.UUID(str(agent_id)) if agent_id else None
         # Fetch agent if id provided
         agent = None
         if agent_id:
@@ -284,18 +340,19 @@ def scrape_platform_task(platform: str, query: str, location: str = "Kenya", age
                     raw_text = raw.get("body") or raw.get("text") or raw.get("data", {}).get("raw_text", "") or "N/A"
                     phone = raw.get("phone") or raw.get("contact", {}).get("phone")
                     
-                    # 2. Compute Hash (Normalized)
-                    # We use MD5 for speed/size. Collisions are rare enough for this text data.
-                    content_hash = hashlib.md5(raw_text.strip().lower().encode('utf-8')).hexdigest()
+                    # 2. Hash: the one the raw-capture store files the full payload under,
+                    # so raw leads and capture segments join on it
+                    captured = raw_capture.capture(raw["source"], [raw])
+                    content_hash = captured[0] if captured else item_hash(raw)
                     
                     # 3. Deduplication Check (Per Agent)
                     # "Avoid storing same signal twice per agent"
                     is_duplicate = False
                     if agent_id:
                         # Check content hash
-                        existing_hash = db.query(models.AgentRawLead).filter(
-                            models.AgentRawLead.agent_id == agent_id,
-                            models.AgentRawLead.content_hash == content_hash
+                        existing_hash = db.query(AgentRawLead).filter(
+                            AgentRawLead.agent_id == agent_id,
+                            AgentRawLead.content_hash == content_hash
                         ).first()
                         
                         if existing_hash:
@@ -304,9 +361,9 @@ def scrape_platform_task(platform: str, query: str, location: str = "Kenya", age
                             
                         # Check phone (if valid)
                         elif phone and len(str(phone)) > 5:
-                             existing_phone = db.query(models.AgentRawLead).filter(
-                                models.AgentRawLead.agent_id == agent_id,
-                                models.AgentRawLead.phone == str(phone)
+                             existing_phone = db.query(AgentRawLead).filter(
+                                AgentRawLead.agent_id == agent_id,
+                                AgentRawLead.phone == str(phone)
                             ).first()
                              if existing_phone:
                                 is_duplicate = True
@@ -315,14 +372,13 @@ def scrape_platform_task(platform: str, query: str, location: str = "Kenya", age
                     if is_duplicate:
                          continue
 
-                    raw_lead = models.AgentRawLead(
+                    raw_lead = AgentRawLead(
                         agent_id=agent_id,
                         raw_text=raw_text,
                         content_hash=content_hash,
                         phone=phone,
                         source=raw["source"],
                         source_url=raw.get("href") or raw.get("url") or raw.get("post_link"),
-                        processed=0
                     )
                     db.add(raw_lead)
                     # We commit raw leads immediately to ensure they are captured even if processing fails later
@@ -644,18 +700,45 @@ def run_agent_task(agent_id: str):
 
 @celery_app.task(name="cleanup_old_leads")
 def cleanup_old_leads():
-    """Remove leads older than 4 days to maintain freshness."""
+    """Expire old leads, raw leads, raw-capture segments and change-log rows (per-table retention in app/db/retention.py)."""
+    results = apply_retention()
+    if RAW_LEADS_RETENTION_DAYS > 0:
+        results["raw_capture_segments"] = {"files_removed": raw_capture.prune_segments(
+            datetime.utcnow() - timedelta(days=RAW_LEADS_RETENTION_DAYS))}
+    removed = sum(run.get("rows_removed", 0) for run in results.values())
+    logger.info(f"Cleaned up {removed} old rows: {results}")
+    return results
+
+@celery_app.task(name="reconcile_stats_rollups")
+def reconcile_stats_rollups(hours: int = STATS_ROLLUP_RECONCILE_HOURS):
+    """Recount recent lead_stats_rollups buckets and the cached agent counters from leads (repairs drift from raw SQL writes)."""
     db = SessionLocal()
     try:
-        four_days_ago = datetime.now() - timedelta(days=4)
-        deleted = db.query(models.Lead).filter(models.Lead.created_at < four_days_ago).delete()
+        if not rollups_ready(db.connection()):
+            return "lead_stats_rollups missing; run scripts/rebuild_stats_rollups.py"
+        since = datetime.utcnow() - timedelta(hours=hours)
+        result = reconcile_rollups(db, since=since)
+        result["agents"] = refresh_agent_counters(db)
         db.commit()
-        logger.info(f"Cleaned up {deleted} old leads.")
+        logger.info(f"Reconciled stats rollups since {since.isoformat()}: {result}")
+        return result
     except Exception as e:
-        logger.error(f"Cleanup failed: {e}")
+        db.rollback()
+        logger.error(f"Stats rollup reconcile failed: {e}")
     finally:
         db.close()
 
+@celery_app.task(name="deliver_outbox")
+def deliver_outbox():
+    """Send due notifications, emails and webhook calls from the delivery outbox (grouped, with retries)."""
+    try:
+        result = deliver_due()
+        if result.get("claimed"):
+            logger.info(f"Outbox delivery: {result}")
+        return result
+    except Exception as e:
+        logger.error(f"Outbox delivery failed: {e}")
+
 @celery_app.task(name="update_lead_availability")
 def update_lead_availability():
     """Update availability status based on time passed."""
@@ -679,4 +762,48 @@ def setup_periodic_tasks(sender, **kwargs):
     # Run cleanup every 12 hours
     sender.add_periodic_task(43200.0, cleanup_old_leads.s(), name='cleanup-every-12-hours')
     # Update availability every hour
-    sender.add_periodic_task(3600.0, update_lead_availability.s(), name='update-availability-hourly')
\ No newline at end of file
+    sender.add_periodic_task(3600.0, update_lead_availability.s(), name='update-availability-hourly')
+
+@worker_process_init.connect
+def start_network_health(**kwargs):
+    # Each Celery worker process probes the scraper upstreams for itself
+    network_health.start()
+
+def start_local_queue(concurrency: int = LOCAL_QUEUE_CONCURRENCY, pool: str = LOCAL_QUEUE_POOL, beat: bool = True):
+    """
+    Start the embedded queue workers (and beat) for no-Redis deployments.
+    No-op when Celery is running against Redis.
+    """
+    if local_queue is None:
+        return
+    for entry, spec in celery_app.conf.beat_schedule.items():
+        sig = spec["task"]
+        task_name = sig if isinstance(sig, str) else sig["task"]
+        args = spec.get("args") or ([] if isinstance(sig, str) else list(sig.get("args") or []))
+        kwargs = spec.get("kwargs") or ({} if isinstance(sig, str) else dict(sig.get("kwargs") or {}))
+        local_queue.add_periodic(entry, task_name, spec["schedule"], args=args, kwargs=kwargs)
+    local_queue.start(
+        concurrency=concurrency,
+        pool=pool,
+        beat=beat,
+        bootstrap="app.core.celery_worker:local_queue"
+    )
+    network_health.start()
+
+def stop_local_queue():
+    if local_queue is not None:
+        local_queue.stop()
+
+if __name__ == "__main__":
+    # Foreground worker + beat for the local queue:
+    #   python -m app.core.celery_worker
+    import time
+    if local_queue is None:
+        logger.info("Redis is available. Use `celery -A app.core.celery_worker worker -B` instead.")
+        sys.exit(0)
+    start_local_queue()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stop_local_queue()
\ No newline at end of file
@@ -1,6 +1,7 @@
 from urllib.robotparser import RobotFileParser
 from datetime import datetime, timedelta, timezone
 import time
+from app.core.lanes import SOURCE_RATE_LIMITS, acquire_rate_limit
 
 class ComplianceManager:
     def __init__(self):
@@ -21,6 +22,11 @@ class ComplianceManager:
 
     def wait_for_rate_limit(self, platform):
         """Implement platform-specific throttling."""
+        # Shared per-source budgets, split between interactive and background lanes
+        if platform in SOURCE_RATE_LIMITS:
+            acquire_rate_limit(platform)
+            return
+
         if platform in self.last_request_time:
             elapsed = (datetime.now(timezone.utc) - self.last_request_time[platform]).total_seconds()
             wait_time = self.rate_limits.get(platform, 10) - elapsed
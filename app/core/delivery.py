@@ -0,0 +1,322 @@
+import os
+import uuid
+import logging
+import threading
+import weakref
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+from sqlalchemy import and_, func, inspect, or_, select, update
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal, write_later
+from app.db.models import OutboxMessage
+from app.core.http_clients import fetch
+from app.models.notification import Notification
+from app.utils.email import deliver_email
+
+logger = logging.getLogger(__name__)
+
+# Outbound notifications (in-app rows, emails, webhook calls) go through the
+# delivery_outbox table instead of being sent from the discovery code path.
+# enqueue() only inserts a row. deliver_due(), run by the deliver_outbox
+# task, claims due rows and merges the pending messages of one
+# (channel, destination) into a single delivery. A message becomes due
+# DELIVERY_GROUP_SECONDS after it is queued, so a burst of agent runs
+# produces one email per recipient. Network sends run on a small long-lived
+# pool with pooled SMTP connections and a keep-alive HTTP session, at most
+# DELIVERY_ENDPOINT_CONCURRENCY at a time per host. Failures back off
+# exponentially; after DELIVERY_MAX_ATTEMPTS a message is dead-lettered
+# (status "dead", retried only by hand). A claimed row is "sending" until its
+# outcome is recorded; its next_attempt_at is then the lease expiry, after
+# which another worker may take it over.
+DELIVERY_GROUP_SECONDS = float(os.getenv("DELIVERY_GROUP_SECONDS", "30"))
+DELIVERY_INTERVAL_SECONDS = float(os.getenv("DELIVERY_INTERVAL_SECONDS", "15"))
+DELIVERY_BATCH = int(os.getenv("DELIVERY_BATCH", "500"))
+DELIVERY_WORKERS = int(os.getenv("DELIVERY_WORKERS", "4"))
+DELIVERY_ENDPOINT_CONCURRENCY = int(os.getenv("DELIVERY_ENDPOINT_CONCURRENCY", "2"))
+DELIVERY_MAX_ATTEMPTS = int(os.getenv("DELIVERY_MAX_ATTEMPTS", "8"))
+DELIVERY_RETRY_BASE_SECONDS = float(os.getenv("DELIVERY_RETRY_BASE_SECONDS", "30"))
+DELIVERY_RETRY_MAX_SECONDS = float(os.getenv("DELIVERY_RETRY_MAX_SECONDS", "3600"))
+DELIVERY_LEASE_SECONDS = float(os.getenv("DELIVERY_LEASE_SECONDS", "300"))
+DELIVERY_WEBHOOK_TIMEOUT = float(os.getenv("DELIVERY_WEBHOOK_TIMEOUT", "10"))
+DELIVERY_RETENTION_DAYS = int(os.getenv("DELIVERY_RETENTION_DAYS", "7"))
+
+# Where new-lead alerts go besides the in-app notification (comma-separated)
+NOTIFY_EMAILS = [e.strip() for e in os.getenv("NOTIFY_EMAILS", "").split(",") if e.strip()]
+NOTIFY_WEBHOOK_URLS = [u.strip() for u in os.getenv("NOTIFY_WEBHOOK_URLS", "").split(",") if u.strip()]
+
+NOTIFICATION, EMAIL, WEBHOOK = "notification", "email", "webhook"
+
+_ready = weakref.WeakSet()
+
+
+def outbox_ready(connection) -> bool:
+    """True once delivery_outbox exists on this engine (positive result cached)."""
+    engine = connection.engine
+    if engine in _ready:
+        return True
+    if inspect(connection).has_table(OutboxMessage.__tablename__):
+        _ready.add(engine)
+        return True
+    return False
+
+
+# --- Enqueue --------------------------------------------------------------
+
+def _outbox_row(channel: str, destination: str, payload: dict, subject: Optional[str], now: datetime) -> dict:
+    return {"channel": channel, "destination": destination, "subject": subject, "payload": payload,
+            "status": "pending", "attempts": 0, "created_at": now,
+            "next_attempt_at": now + timedelta(seconds=DELIVERY_GROUP_SECONDS)}
+
+
+def _insert_rows(db: Session, rows: List[dict]):
+    if not outbox_ready(db.connection()):
+        _without_outbox(db, rows)
+        return
+    db.execute(OutboxMessage.__table__.insert(), rows)
+
+
+def _without_outbox(db: Session, rows: List[dict]):
+    # Before scripts/migrate_delivery_outbox.py has run: in-app notifications are
+    # written directly as before the outbox existed, network sends are dropped
+    for row in rows:
+        if row["channel"] == NOTIFICATION:
+            _store_notification(db, row["destination"], [row])
+        else:
+            logger.error(f"delivery_outbox missing, dropping {row['channel']} to {row['destination']}; "
+                         f"run scripts/migrate_delivery_outbox.py")
+
+
+def enqueue(channel: str, destination: str, payload: dict, subject: Optional[str] = None,
+            db: Optional[Session] = None):
+    """
+    Queue one outbound message. With `db` the row joins the caller's
+    transaction (sent only if it commits); without, it is written in the
+    background and the caller does not wait.
+    """
+    row = _outbox_row(channel, destination, payload, subject, datetime.utcnow())
+    if db is not None:
+        _insert_rows(db, [row])
+    else:
+        write_later(_insert_rows, [row])
+
+
+def _lead_summary(lead) -> dict:
+    get = lead.get if isinstance(lead, dict) else lambda key: getattr(lead, key, None)
+    return {"title": get("title") or get("buyer_request_snippet"), "url": get("url") or get("source_url"),
+            "location": get("location_raw") or get("location")}
+
+
+def enqueue_new_leads(agent_name: str, leads: list, agent_id=None, db: Optional[Session] = None):
+    """New-lead alerts of an agent run: the in-app notification, plus NOTIFY_EMAILS / NOTIFY_WEBHOOK_URLS."""
+    count = len(leads)
+    destination = str(agent_id) if agent_id else ""
+    now = datetime.utcnow()
+    rows = [_outbox_row(NOTIFICATION, destination, {"agent_name": agent_name, "lead_count": count}, None, now)]
+    summaries = [_lead_summary(lead) for lead in leads[:20]]
+    subject = f"{count} new leads from {agent_name}"
+    for recipient in NOTIFY_EMAILS:
+        items = "".join(f"<li><a href='{s['url']}'>{s['title']}</a></li>" for s in summaries)
+        rows.append(_outbox_row(EMAIL, recipient, {"html": f"<h3>{subject}</h3><ul>{items}</ul>"}, subject, now))
+    for url in NOTIFY_WEBHOOK_URLS:
+        rows.append(_outbox_row(WEBHOOK, url, {"event": "leads.new", "agent_id": destination or None,
+                                               "agent_name": agent_name, "lead_count": count,
+                                               "leads": summaries}, subject, now))
+    if db is not None:
+        _insert_rows(db, rows)
+    else:
+        write_later(_insert_rows, rows)
+
+
+# --- Transports -----------------------------------------------------------
+
+def _send_email(destination: str, messages: List[dict]):
+    subject = messages[0]["subject"] or "Delta-9 update"
+    if len(messages) > 1:
+        subject = f"{subject} (+{len(messages) - 1} more)"
+    deliver_email(destination, subject, "<hr>".join(m["payload"].get("html", "") for m in messages))
+
+
+def _send_webhook(destination: str, messages: List[dict]):
+    # No in-call retry: a timed-out POST may have landed, the outbox decides when to resend
+    response = fetch("POST", destination, json={"events": [m["payload"] for m in messages], "count": len(messages)},
+                     timeout=DELIVERY_WEBHOOK_TIMEOUT, retries=0)
+    response.raise_for_status()
+
+
+# channel -> fn(destination, messages); messages are claimed rows (subject, payload, ...); raises on failure
+TRANSPORTS: Dict[str, Callable] = {EMAIL: _send_email, WEBHOOK: _send_webhook}
+
+
+def _store_notification(db: Session, destination: str, messages: List[dict]):
+    # In-app notifications are rows: merged and written in the same transaction that marks them sent
+    count = sum(m["payload"].get("lead_count", 0) for m in messages)
+    agent_name = messages[-1]["payload"].get("agent_name", "agent")
+    db.add(Notification(agent_id=uuid.UUID(destination) if destination else None,
+                        message=f"{count} new leads from {agent_name}", lead_count=count, read=False))
+
+
+_pool = ThreadPoolExecutor(max_workers=DELIVERY_WORKERS, thread_name_prefix="delivery")
+_endpoint_slots: Dict[str, threading.Semaphore] = {}
+_slots_lock = threading.Lock()
+
+
+def _endpoint(channel: str, destination: str) -> str:
+    if channel == WEBHOOK:
+        return urlsplit(destination).netloc
+    return channel  # one SMTP relay for every recipient
+
+
+def _send(channel: str, destination: str, messages: List[dict]) -> Optional[str]:
+    endpoint = _endpoint(channel, destination)
+    with _slots_lock:
+        slots = _endpoint_slots.setdefault(endpoint, threading.Semaphore(DELIVERY_ENDPOINT_CONCURRENCY))
+    with slots:
+        try:
+            TRANSPORTS[channel](destination, messages)
+            return None
+        except Exception as e:
+            return str(e)[:1000] or type(e).__name__
+
+
+# --- Worker ---------------------------------------------------------------
+
+_stats = {"runs": 0, "claimed": 0, "deliveries": 0, "delivered": 0, "failed_deliveries": 0, "dead_lettered": 0}
+_stats_lock = threading.Lock()
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff after the `attempts`-th failed try: base, 2x, 4x ... capped at DELIVERY_RETRY_MAX_SECONDS."""
+    return timedelta(seconds=min(DELIVERY_RETRY_BASE_SECONDS * 2 ** (attempts - 1), DELIVERY_RETRY_MAX_SECONDS))
+
+
+_COLUMNS = (OutboxMessage.id, OutboxMessage.channel, OutboxMessage.destination, OutboxMessage.subject,
+            OutboxMessage.payload, OutboxMessage.attempts)
+
+
+def _claim(db: Session, now: datetime, limit: int) -> List[dict]:
+    expired = and_(OutboxMessage.status == "sending", OutboxMessage.next_attempt_at <= now)
+    due = db.execute(
+        select(OutboxMessage.channel, OutboxMessage.destination)
+        .where(or_(and_(OutboxMessage.status == "pending", OutboxMessage.next_attempt_at <= now), expired))
+        .group_by(OutboxMessage.channel, OutboxMessage.destination)
+        .order_by(func.min(OutboxMessage.next_attempt_at))
+        .limit(limit)
+    ).all()
+    if not due:
+        return []
+    # Everything pending for a due destination rides along, unless it is waiting out a retry.
+    # Claiming moves rows to "sending" with a lease; the WHERE re-check on status keeps
+    # two workers from claiming the same row, and only an expired lease is taken over.
+    claimed = db.execute(
+        update(OutboxMessage)
+        .where(or_(*[and_(OutboxMessage.channel == c, OutboxMessage.destination == d) for c, d in due]),
+               or_(and_(OutboxMessage.status == "pending",
+                        or_(OutboxMessage.next_attempt_at <= now, OutboxMessage.attempts == 0)),
+                   expired))
+        .values(status="sending", next_attempt_at=now + timedelta(seconds=DELIVERY_LEASE_SECONDS))
+        .returning(*_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).mappings().all()
+    # Commit before sending: no write lock is held while the network is slow
+    db.commit()
+    return sorted((dict(m) for m in claimed), key=lambda m: m["id"])
+
+
+def _record(db: Session, messages: List[dict], error: Optional[str], now: datetime) -> int:
+    """Mark one delivery's messages sent, or schedule their retry; returns how many were dead-lettered."""
+    table = OutboxMessage.__table__
+    if error is None:
+        db.execute(update(table).where(table.c.id.in_([m["id"] for m in messages]))
+                   .values(status="sent", sent_at=now, attempts=table.c.attempts + 1, last_error=None))
+        return 0
+    dead = 0
+    by_attempts = defaultdict(list)
+    for message in messages:
+        by_attempts[message["attempts"] + 1].append(message["id"])
+    for attempts, ids in by_attempts.items():
+        values = {"attempts": attempts, "last_error": error}
+        if attempts >= DELIVERY_MAX_ATTEMPTS:
+            values["status"] = "dead"
+            dead += len(ids)
+        else:
+            values["status"] = "pending"
+            values["next_attempt_at"] = now + retry_delay(attempts)
+        db.execute(update(table).where(table.c.id.in_(ids)).values(**values))
+    return dead
+
+
+def deliver_due(session_factory=SessionLocal, now: Optional[datetime] = None, limit: int = DELIVERY_BATCH) -> dict:
+    """Claim due outbox messages, deliver them grouped per destination and record the outcome."""
+    now = now or datetime.utcnow()
+    run = {"claimed": 0, "deliveries": 0, "delivered": 0, "failed_deliveries": 0, "dead_lettered": 0}
+    db = session_factory()
+    try:
+        if not outbox_ready(db.connection()):
+            return {"status": "error", "message": "delivery_outbox missing; run scripts/migrate_delivery_outbox.py"}
+        messages = _claim(db, now, limit)
+        groups: Dict[tuple, List[dict]] = defaultdict(list)
+        for message in messages:
+            groups[(message["channel"], message["destination"])].append(message)
+
+        futures = {}
+        outcomes = {}
+        for (channel, destination), group in groups.items():
+            if channel == NOTIFICATION:
+                _store_notification(db, destination, group)
+                outcomes[(channel, destination)] = None
+            elif channel in TRANSPORTS:
+                futures[(channel, destination)] = _pool.submit(_send, channel, destination, group)
+            else:
+                outcomes[(channel, destination)] = f"Unknown channel {channel}"
+        for key, future in futures.items():
+            outcomes[key] = future.result()
+
+        for key, group in groups.items():
+            error = outcomes[key]
+            run["dead_lettered"] += _record(db, group, error, now)
+            if error is None:
+                run["delivered"] += len(group)
+            else:
+                run["failed_deliveries"] += 1
+                logger.warning(f"Delivery to {key[0]}:{key[1]} failed ({len(group)} messages): {error}")
+        db.commit()
+        run["claimed"] = len(messages)
+        run["deliveries"] = len(groups)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    with _stats_lock:
+        _stats["runs"] += 1
+        for key, value in run.items():
+            _stats[key] += value
+    return run
+
+
+def delivery_stats(db: Session) -> dict:
+    """Outbox backlog by channel and status, recent dead letters, and this process's delivery counters."""
+    counts = defaultdict(dict)
+    for channel, status, count in db.execute(
+        select(OutboxMessage.channel, OutboxMessage.status, func.count()).group_by(OutboxMessage.channel, OutboxMessage.status)
+    ):
+        counts[channel][status] = count
+    dead = db.scalars(select(OutboxMessage).where(OutboxMessage.status == "dead")
+                      .order_by(OutboxMessage.id.desc()).limit(20)).all()
+    with _stats_lock:
+        process = dict(_stats)
+    return {"outbox": dict(counts), "dead_letters": [m.to_dict() for m in dead], "process": process}
+
+
+def requeue(db: Session, message_id: int) -> Optional[OutboxMessage]:
+    """Send a dead-lettered message again on the next run (attempts start over)."""
+    message = db.get(OutboxMessage, message_id)
+    if message is None or message.status != "dead":
+        return None
+    message.status, message.attempts, message.next_attempt_at = "pending", 0, datetime.utcnow()
+    db.commit()
+    return message
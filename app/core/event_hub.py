@@ -0,0 +1,194 @@
+import os
+import json
+import queue
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional, Set
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+from app.core.redis_link import RedisLink
+
+logger = logging.getLogger(__name__)
+
+# Server push for the dashboard. Committed writes publish small events
+# ("leads", "stats", "notifications", "agents"; see app/db/live_events.py)
+# and every browser holds one multiplexed SSE stream (GET /events/stream)
+# instead of each widget polling on its own timer. Events are hints ("this
+# changed, refetch"), so the refetch goes through the ETag/response cache.
+# Delivery is in-process; when REDIS_URL answers, events are also published
+# on a pub/sub channel so streams served by other API workers see writes
+# made by Celery or by another worker. Committing threads only queue the
+# Redis publish; a publisher thread sends it, and reconnects are probed in
+# the background (app/core/redis_link.py).
+LIVE_EVENTS = os.getenv("LIVE_EVENTS", "true").lower() == "true"
+LIVE_EVENTS_QUEUE = int(os.getenv("LIVE_EVENTS_QUEUE", "256"))
+LIVE_EVENTS_HEARTBEAT = float(os.getenv("LIVE_EVENTS_HEARTBEAT", "15"))
+# Events waiting for the Redis publisher thread; beyond this they are dropped (other workers miss a hint)
+LIVE_EVENTS_PUBLISH_QUEUE = int(os.getenv("LIVE_EVENTS_PUBLISH_QUEUE", "1024"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+REDIS_RETRY_SECONDS = 60
+CHANNEL = "delta9:events"
+
+TOPICS = ("leads", "stats", "notifications", "agents")
+# Sent instead of the events a slow client missed; it should refetch everything
+RESYNC = "resync"
+
+
+class Subscription:
+    """One SSE client: a bounded queue fed from any thread, drained on its own event loop."""
+
+    def __init__(self, topics: Iterable[str], maxsize: int = LIVE_EVENTS_QUEUE):
+        self.topics: Set[str] = set(topics)
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def _put(self, event: Dict[str, Any]):
+        # Runs on self.loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def deliver(self, event: Dict[str, Any]):
+        if event["topic"] in self.topics:
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, a RESYNC marker after an overflow, or None on timeout."""
+        if self.overflowed and self.queue.empty():
+            self.overflowed = False
+            return {"topic": RESYNC, "data": {}}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    def __init__(self):
+        self.origin = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self._link = RedisLink(REDIS_URL, "Live events", "delivering in-process only", REDIS_RETRY_SECONDS,
+                               on_connect=self._ensure_listener)
+        self._listener: Optional[threading.Thread] = None
+        self._outgoing: "queue.Queue[str]" = queue.Queue(LIVE_EVENTS_PUBLISH_QUEUE)
+        self._publisher: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    # --- Redis -----------------------------------------------------------
+
+    def _redis(self):
+        """Shared Redis client, or None; reconnects are probed in the background."""
+        return self._link.client()
+
+    def _redis_failed(self, e: Exception):
+        self._link.failed(e)
+
+    def _ensure_listener(self):
+        """Start the pub/sub listener thread once a stream is open and Redis answers (also run on reconnect)."""
+        with self._lock:
+            if not self._subscribers or (self._listener is not None and self._listener.is_alive()):
+                return
+        if self._redis() is None:
+            return
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, name="live-events", daemon=True)
+            self._listener.start()
+
+    def _publish_loop(self):
+        while True:
+            message = self._outgoing.get()
+            client = self._redis()
+            if client is None:
+                continue
+            try:
+                client.publish(CHANNEL, message)
+            except Exception as e:
+                self._redis_failed(e)
+
+    def _listen(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._listener = None
+                    return
+            try:
+                # No socket timeout: the listener blocks until something is published
+                pubsub = redis.from_url(REDIS_URL, socket_connect_timeout=0.5).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                for message in pubsub.listen():
+                    event = json.loads(message["data"])
+                    if event.pop("origin", None) != self.origin:
+                        self._fan_out(event)
+            except Exception as e:
+                logger.warning(f"Live events: pub/sub listener error ({e}); retrying in {REDIS_RETRY_SECONDS}s.")
+                time.sleep(REDIS_RETRY_SECONDS)
+
+    # --- Publish / subscribe --------------------------------------------
+
+    def _fan_out(self, event: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # Event loop already closed; the stream's finally block removes it
+                pass
+
+    def publish(self, topic: str, data: Optional[Dict[str, Any]] = None):
+        """Send an event to every open stream (all workers when Redis is up). Safe from any thread."""
+        if not LIVE_EVENTS:
+            return
+        event = {"topic": topic, "data": data or {}, "ts": time.time()}
+        self._fan_out(event)
+        if self._redis() is None:
+            return
+        try:
+            self._outgoing.put_nowait(json.dumps({**event, "origin": self.origin}, default=str))
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._publisher is None:
+            with self._lock:
+                if self._publisher is None:
+                    self._publisher = threading.Thread(target=self._publish_loop, name="live-events-publish",
+                                                       daemon=True)
+                    self._publisher.start()
+
+    def subscribe(self, topics: Iterable[str] = TOPICS) -> Subscription:
+        """Register a stream; call from the event loop that will drain it."""
+        subscription = Subscription(topics)
+        with self._lock:
+            self._subscribers.add(subscription)
+        self._ensure_listener()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+hub = EventHub()
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['topic']}\ndata: {json.dumps(event.get('data') or {}, default=str)}\n\n"
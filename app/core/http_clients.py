@@ -0,0 +1,250 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from collections import defaultdict
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+from app.utils.resilience import retry_async, retry_sync
+
+try:
+    import h2  # noqa: F401  (httpx negotiates HTTP/2 through it)
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+try:
+    from ddgs import DDGS
+except ImportError:
+    try:
+        from duckduckgo_search import DDGS
+    except ImportError:
+        DDGS = None
+
+logger = logging.getLogger(__name__)
+
+# One place for outbound HTTP. Scrapers and services share a sync and an
+# async httpx client (one per event loop), so connections, DNS and TLS
+# sessions are reused across calls instead of being set up per request.
+# httpcore keeps one pool per origin (scheme, host, port) under the global
+# HTTP_POOL_MAX_CONNECTIONS cap; idle connections are kept for
+# HTTP_KEEPALIVE_SECONDS. HTTP/2 is negotiated when the optional `h2`
+# package is installed. fetch() / afetch() add the retry policy of
+# app/utils/resilience.py for connection-level failures.
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "40"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "true").lower() == "true"
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_RETRY_DELAY = float(os.getenv("HTTP_RETRY_DELAY", "1.0"))
+OUTBOUND_PROXY = os.getenv("OUTBOUND_PROXY") or None
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+]
+
+_DEFAULT_AGENT = f"python-httpx/{httpx.__version__}"
+
+
+def random_user_agent() -> str:
+    return random.choice(USER_AGENTS)
+
+
+# --- Per-host reuse stats ---------------------------------------------------
+
+_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+_stats_lock = threading.Lock()
+
+
+def _count(host: str, **amounts):
+    with _stats_lock:
+        entry = _stats[host]
+        for key, amount in amounts.items():
+            entry[key] += amount
+
+
+class _Trace:
+    """httpcore trace callback of one request: notes whether it had to open a connection."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.started = time.perf_counter()
+
+    def __call__(self, event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            _count(self.host, connections_opened=1)
+        elif event == "connection.start_tls.complete":
+            _count(self.host, tls_handshakes=1)
+
+
+class _AsyncTrace(_Trace):
+    async def __call__(self, event: str, info: dict):
+        _Trace.__call__(self, event, info)
+
+
+def _prepare(request: httpx.Request, trace_class) -> None:
+    if request.headers.get("user-agent") == _DEFAULT_AGENT:
+        request.headers["user-agent"] = random_user_agent()
+    request.extensions["trace"] = trace_class(request.url.host)
+
+
+def _record(response: httpx.Response) -> None:
+    trace = response.request.extensions.get("trace")
+    elapsed = time.perf_counter() - trace.started if isinstance(trace, _Trace) else 0.0
+    _count(response.request.url.host, requests=1, seconds=elapsed,
+           http2=1 if response.http_version == "HTTP/2" else 0,
+           server_errors=1 if response.status_code >= 500 else 0)
+
+
+async def _prepare_async(request: httpx.Request) -> None:
+    _prepare(request, _AsyncTrace)
+
+
+async def _record_async(response: httpx.Response) -> None:
+    _record(response)
+
+
+def http_stats() -> Dict[str, Any]:
+    """Per-host requests, connections opened and the share of requests that reused one."""
+    with _stats_lock:
+        hosts = {}
+        for host, entry in sorted(_stats.items()):
+            requests = int(entry["requests"])
+            opened = int(entry["connections_opened"])
+            hosts[host] = {
+                "requests": requests,
+                "connections_opened": opened,
+                "tls_handshakes": int(entry["tls_handshakes"]),
+                "reuse_ratio": round(max(requests - opened, 0) / requests, 3) if requests else None,
+                "http2_requests": int(entry["http2"]),
+                "server_errors": int(entry["server_errors"]),
+                "transport_errors": int(entry["transport_errors"]),
+                "avg_ms": round(entry["seconds"] * 1000 / requests, 1) if requests else None,
+            }
+    return {
+        "http2": HTTP_HTTP2 and HAS_H2,
+        "limits": {"max_connections": HTTP_POOL_MAX_CONNECTIONS, "max_keepalive": HTTP_POOL_MAX_KEEPALIVE,
+                   "keepalive_seconds": HTTP_KEEPALIVE_SECONDS},
+        "async_clients": len(_async_clients),
+        "ddgs_clients": _ddgs_created,
+        "hosts": hosts,
+    }
+
+
+def reset_http_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+# --- Clients ----------------------------------------------------------------
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "http2": HTTP_HTTP2 and HAS_H2,
+        "limits": httpx.Limits(max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                               max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+                               keepalive_expiry=HTTP_KEEPALIVE_SECONDS),
+        "timeout": httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        "proxy": OUTBOUND_PROXY,
+        # requests (which most call sites used before) follows redirects
+        "follow_redirects": True,
+    }
+
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_client() -> httpx.Client:
+    """The process-wide sync client (thread-safe)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(event_hooks={"request": [lambda r: _prepare(r, _Trace)],
+                                                    "response": [_record]}, **_client_options())
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """The async client of the running event loop (async connections cannot cross loops)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(event_hooks={"request": [_prepare_async], "response": [_record_async]},
+                                   **_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+def _host(url: str) -> str:
+    return urlsplit(str(url)).hostname or ""
+
+
+def fetch(method: str, url: str, retries: int = HTTP_RETRIES, **kwargs) -> httpx.Response:
+    """
+    Request through the shared client, retrying connection errors and
+    timeouts with backoff. HTTP error statuses are returned, not raised.
+    """
+    @retry_sync(retries=retries + 1, delay=HTTP_RETRY_DELAY, exceptions=(httpx.TransportError,))
+    def send():
+        try:
+            return get_client().request(method, url, **kwargs)
+        except httpx.TransportError:
+            _count(_host(url), transport_errors=1)
+            raise
+    return send()
+
+
+async def afetch(method: str, url: str, retries: int = HTTP_RETRIES, **kwargs) -> httpx.Response:
+    """Async fetch() through the event loop's shared client."""
+    @retry_async(retries=retries + 1, delay=HTTP_RETRY_DELAY, exceptions=(httpx.TransportError,))
+    async def send():
+        try:
+            return await get_async_client().request(method, url, **kwargs)
+        except httpx.TransportError:
+            _count(_host(url), transport_errors=1)
+            raise
+    return await send()
+
+
+# --- DuckDuckGo ---------------------------------------------------------------
+
+_ddgs_local = threading.local()
+_ddgs_created = 0
+
+
+def get_ddgs():
+    """
+    A DDGS search session for this thread. DDGS keeps its own HTTP client
+    (with cookies and a negotiated connection), so one per thread is reused
+    rather than building one per query. Usable in `with get_ddgs() as ddgs:`;
+    leaving the block does not close the session.
+    """
+    global _ddgs_created
+    if DDGS is None:
+        raise RuntimeError("duckduckgo_search (or ddgs) is not installed")
+    ddgs = getattr(_ddgs_local, "ddgs", None)
+    if ddgs is None:
+        ddgs = DDGS(proxy=OUTBOUND_PROXY, timeout=int(HTTP_READ_TIMEOUT))
+        _ddgs_local.ddgs = ddgs
+        _ddgs_created += 1
+    return ddgs
+
+
+def close_clients():
+    """Close the shared sync client (async clients close with their loops' lifetime)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -0,0 +1,364 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Execution lanes isolate user-facing work (/search, /leads) from background
+# work (agent runs, background discovery, Celery fan-out). Each lane owns its
+# thread pool, browser slots, DB connection budget and a share of every
+# source's rate limit, so a burst of agents cannot starve interactive requests.
+# Scraper calls fanned out by a discovery run on a second, per-lane scrape
+# pool: discovery jobs themselves occupy the lane pool, so if their scrapers
+# queued behind them a full lane would wait on itself until every job timed out.
+# A scraper call over its source's rate budget is not dropped: it waits on a
+# timer (holding no thread) and is dispatched once the lane's bucket refills.
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_current_lane: contextvars.ContextVar = contextvars.ContextVar("execution_lane", default=INTERACTIVE)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+LANE_CONFIG = {
+    INTERACTIVE: {
+        "threads": _env_int("LANE_INTERACTIVE_THREADS", 8),
+        "scrape_threads": _env_int("LANE_INTERACTIVE_SCRAPE_THREADS", 16),
+        "browser_slots": _env_int("LANE_INTERACTIVE_BROWSER_SLOTS", 2),
+        "db_connections": _env_int("LANE_INTERACTIVE_DB_CONNECTIONS", 6),
+        "rate_share": _env_float("LANE_INTERACTIVE_RATE_SHARE", 0.7),
+    },
+    BACKGROUND: {
+        "threads": _env_int("LANE_BACKGROUND_THREADS", 4),
+        "scrape_threads": _env_int("LANE_BACKGROUND_SCRAPE_THREADS", 8),
+        "browser_slots": _env_int("LANE_BACKGROUND_BROWSER_SLOTS", 1),
+        "db_connections": _env_int("LANE_BACKGROUND_DB_CONNECTIONS", 4),
+        "rate_share": _env_float("LANE_BACKGROUND_RATE_SHARE", 0.3),
+    },
+}
+
+# Background work yields while the interactive lane is at least this saturated
+# (active / threads), waiting at most LANE_BACKGROUND_MAX_YIELD seconds.
+LANE_BACKGROUND_YIELD_AT = _env_float("LANE_BACKGROUND_YIELD_AT", 0.75)
+LANE_BACKGROUND_MAX_YIELD = _env_float("LANE_BACKGROUND_MAX_YIELD", 30.0)
+
+# Requests per minute allowed per source, split between lanes by rate_share.
+SOURCE_RATE_LIMITS = {
+    "facebook": 1.0,
+    "linkedin": 0.5,
+    "tiktok": 2.0,
+    "google": 12.0,
+}
+
+
+class _TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = max(per_minute, 1.0)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def try_take(self) -> float:
+        """Take a token if available. Returns 0 on success, else seconds until one is due."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else 60.0
+
+
+class ExecutionLane:
+    """Resources and saturation metrics for one class of work."""
+
+    def __init__(self, name: str, threads: int, scrape_threads: int, browser_slots: int, db_connections: int,
+                 rate_share: float):
+        self.name = name
+        self.threads = threads
+        self.scrape_threads = scrape_threads
+        self.browser_slots = browser_slots
+        self.db_connections = db_connections
+        self.rate_share = rate_share
+
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f"lane-{name}")
+        self.scrape_executor = ThreadPoolExecutor(max_workers=scrape_threads, thread_name_prefix=f"lane-{name}-scrape")
+        self._browser_sem = threading.BoundedSemaphore(browser_slots)
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.active = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.browsers_in_use = 0
+        self.browser_waits = 0
+        self.rate_limit_waits = 0
+        self.rate_limited = 0
+        self.scrapes_submitted = 0
+        self.scrapes_active = 0
+        self.scrapes_deferred = 0
+        self.yielded_admissions = 0
+        self._queue_waits = deque(maxlen=500)
+
+    # --- Thread pool ---
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Submit to this lane's pool. The lane (and other contextvars) follow the task."""
+        ctx = contextvars.copy_context()
+        enqueued_at = time.monotonic()
+        with self._lock:
+            self.submitted += 1
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        def run():
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self._queue_waits.append(time.monotonic() - enqueued_at)
+            try:
+                result = ctx.run(_run_in_lane, self.name, fn, args, kwargs)
+                with self._lock:
+                    self.completed += 1
+                return result
+            except BaseException:
+                with self._lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+        return self.executor.submit(run)
+
+    def submit_scrape(self, fn: Callable, *args, **kwargs) -> Future:
+        """Submit one scraper call to this lane's scrape pool (never the pool running the discovery)."""
+        ctx = contextvars.copy_context()
+        with self._lock:
+            self.scrapes_submitted += 1
+
+        def run():
+            with self._lock:
+                self.scrapes_active += 1
+            try:
+                return ctx.run(_run_in_lane, self.name, fn, args, kwargs)
+            finally:
+                with self._lock:
+                    self.scrapes_active -= 1
+
+        return self.scrape_executor.submit(run)
+
+    def submit_rate_limited(self, source: str, fn: Callable, *args, **kwargs) -> Future:
+        """
+        submit_scrape() once `source` has a token in this lane's budget. Over
+        budget, the call is re-queued on a timer for when the bucket refills
+        instead of being skipped or holding a thread; a discovery that stops
+        waiting still gets the result into the scrape cache. Cancelling the
+        returned future drops a call that has not been dispatched yet.
+        """
+        outer = Future()
+        ctx = contextvars.copy_context()
+
+        def attempt():
+            if outer.cancelled():
+                return
+            wait = rate_limit_wait(source, self.name)
+            if wait:
+                with self._lock:
+                    self.scrapes_deferred += 1
+                timer = threading.Timer(wait, attempt)
+                timer.daemon = True
+                timer.start()
+                return
+            if not outer.set_running_or_notify_cancel():
+                return
+            inner = ctx.run(self.submit_scrape, fn, *args, **kwargs)
+            inner.add_done_callback(lambda f: outer.set_exception(f.exception()) if f.exception()
+                                    else outer.set_result(f.result()))
+
+        attempt()
+        return outer
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Async counterpart of asyncio.to_thread() bound to this lane's pool."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    @property
+    def saturation(self) -> float:
+        return (self.active + self.queued) / self.threads if self.threads else 0.0
+
+    # --- Browser slots ---
+
+    @contextmanager
+    def browser_slot(self):
+        if not self._browser_sem.acquire(blocking=False):
+            with self._lock:
+                self.browser_waits += 1
+            self._browser_sem.acquire()
+        with self._lock:
+            self.browsers_in_use += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.browsers_in_use -= 1
+            self._browser_sem.release()
+
+    # --- Metrics ---
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._queue_waits)
+        p95 = waits[int(len(waits) * 0.95) - 1] if waits else 0.0
+        from app.db.database import lane_pool_status
+        return {
+            "threads": self.threads,
+            "active": self.active,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "saturation": round(self.saturation, 3),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "scrape_threads": self.scrape_threads,
+            "scrapes_active": self.scrapes_active,
+            "scrapes_submitted": self.scrapes_submitted,
+            "scrapes_deferred": self.scrapes_deferred,
+            "avg_queue_wait_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            "p95_queue_wait_ms": round(p95 * 1000, 1),
+            "browser_slots": self.browser_slots,
+            "browsers_in_use": self.browsers_in_use,
+            "browser_waits": self.browser_waits,
+            "db_connections": self.db_connections,
+            "db_pool": lane_pool_status(self.name),
+            "rate_share": self.rate_share,
+            "rate_limit_waits": self.rate_limit_waits,
+            "rate_limited": self.rate_limited,
+            "yielded_admissions": self.yielded_admissions,
+        }
+
+
+LANES: Dict[str, ExecutionLane] = {name: ExecutionLane(name, **cfg) for name, cfg in LANE_CONFIG.items()}
+
+_rate_lock = threading.Lock()
+_rate_buckets: Dict[tuple, _TokenBucket] = {}
+
+
+def _run_in_lane(lane_name: str, fn: Callable, args: tuple, kwargs: dict):
+    token = _current_lane.set(lane_name)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane_name() -> str:
+    return _current_lane.get()
+
+
+def get_lane(name: Optional[str] = None) -> ExecutionLane:
+    return LANES.get(name or current_lane_name(), LANES[INTERACTIVE])
+
+
+@contextmanager
+def use_lane(name: str):
+    """Run the enclosed block (and anything it submits) in the given lane."""
+    token = _current_lane.set(name)
+    try:
+        yield LANES[name]
+    finally:
+        _current_lane.reset(token)
+
+
+def admit_background(max_wait: float = LANE_BACKGROUND_MAX_YIELD) -> float:
+    """
+    Priority admission: background work waits while the interactive lane is
+    saturated. Returns the seconds spent yielding.
+    """
+    interactive = LANES[INTERACTIVE]
+    start = time.monotonic()
+    yielded = False
+    while interactive.saturation >= LANE_BACKGROUND_YIELD_AT and time.monotonic() - start < max_wait:
+        yielded = True
+        time.sleep(0.25)
+    waited = time.monotonic() - start
+    if yielded:
+        lane = LANES[BACKGROUND]
+        with lane._lock:
+            lane.yielded_admissions += 1
+        logger.info(f"LANES: Background admission yielded {waited:.1f}s to interactive traffic")
+    return waited
+
+
+def rate_limit_wait(source: str, lane_name: Optional[str] = None) -> float:
+    """
+    Take one request token for `source` from the lane's share of its budget.
+    Returns 0 when taken, else the seconds until the lane's bucket has one.
+    Interactive requests may borrow idle background tokens; background never
+    borrows from interactive. Sources without a configured limit are free.
+    """
+    per_minute = SOURCE_RATE_LIMITS.get(source)
+    if per_minute is None:
+        return 0.0
+    lane = get_lane(lane_name)
+
+    def bucket(name):
+        key = (source, name)
+        if key not in _rate_buckets:
+            _rate_buckets[key] = _TokenBucket(per_minute * LANES[name].rate_share)
+        return _rate_buckets[key]
+
+    with _rate_lock:
+        wait = bucket(lane.name).try_take()
+        if wait and lane.name == INTERACTIVE and bucket(BACKGROUND).try_take() == 0:
+            wait = 0.0
+    return wait
+
+
+def acquire_rate_limit(source: str, lane_name: Optional[str] = None, block: bool = True) -> bool:
+    """
+    rate_limit_wait(), sleeping on the caller's thread until a token is free.
+    With block=False an exhausted budget returns False (counted as rate_limited).
+    """
+    lane = get_lane(lane_name)
+    waited = False
+    while True:
+        wait = rate_limit_wait(source, lane.name)
+        if wait == 0:
+            return True
+        if not block:
+            with lane._lock:
+                lane.rate_limited += 1
+            return False
+        if not waited:
+            waited = True
+            with lane._lock:
+                lane.rate_limit_waits += 1
+        time.sleep(min(wait, 1.0))
+
+
+@contextmanager
+def browser_slot():
+    """Acquire a headless-browser slot from the current lane."""
+    with get_lane().browser_slot():
+        yield
+
+
+def lane_stats() -> Dict[str, Any]:
+    return {name: lane.stats() for name, lane in LANES.items()}
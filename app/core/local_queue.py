@@ -0,0 +1,372 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+import importlib
+import multiprocessing
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Embedded broker used when Redis is unreachable (single-box deployments).
+# Tasks live in a WAL-mode SQLite file so API processes, worker threads and
+# worker processes can all enqueue/claim concurrently without a server.
+LOCAL_QUEUE_PATH = os.getenv("LOCAL_QUEUE_PATH", "local_queue.db")
+LOCAL_QUEUE_CONCURRENCY = int(os.getenv("LOCAL_QUEUE_CONCURRENCY", "4"))
+LOCAL_QUEUE_POOL = os.getenv("LOCAL_QUEUE_POOL", "threads")  # threads | processes
+LOCAL_QUEUE_VISIBILITY_TIMEOUT = float(os.getenv("LOCAL_QUEUE_VISIBILITY_TIMEOUT", "900"))
+LOCAL_QUEUE_MAX_RETRIES = int(os.getenv("LOCAL_QUEUE_MAX_RETRIES", "3"))
+LOCAL_QUEUE_RETRY_BACKOFF = float(os.getenv("LOCAL_QUEUE_RETRY_BACKOFF", "5"))
+LOCAL_QUEUE_POLL_INTERVAL = float(os.getenv("LOCAL_QUEUE_POLL_INTERVAL", "0.5"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    args TEXT NOT NULL DEFAULT '[]',
+    kwargs TEXT NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_retries INTEGER NOT NULL DEFAULT 3,
+    eta REAL NOT NULL,
+    visible_at REAL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_tasks_claim ON tasks (status, priority DESC, eta);
+CREATE TABLE IF NOT EXISTS periodic_runs (
+    entry TEXT PRIMARY KEY,
+    last_run REAL NOT NULL
+);
+"""
+
+
+class LocalAsyncResult:
+    """Minimal stand-in for celery.result.AsyncResult returned by delay()."""
+
+    def __init__(self, task_id: str, queue: "LocalTaskQueue"):
+        self.id = task_id
+        self.task_id = task_id
+        self._queue = queue
+
+    @property
+    def status(self) -> str:
+        row = self._queue.get_task(self.id)
+        if not row:
+            return "UNKNOWN"
+        return {
+            "queued": "PENDING",
+            "running": "STARTED",
+            "done": "SUCCESS",
+            "dead": "FAILURE",
+        }.get(row["status"], row["status"].upper())
+
+    def __repr__(self):
+        return f"<LocalAsyncResult: {self.id}>"
+
+
+class LocalTaskQueue:
+    """
+    Durable SQLite-backed task queue.
+
+    - Priorities: higher `priority` is claimed first, then FIFO.
+    - Visibility timeout: a claimed task that is not acked within the timeout
+      (worker crash, killed process) becomes claimable again.
+    - Retries: failed tasks are re-queued with exponential backoff and moved
+      to the `dead` state after `max_retries` attempts.
+    """
+
+    def __init__(
+        self,
+        path: str = LOCAL_QUEUE_PATH,
+        resolve_task: Optional[Callable[[str], Callable]] = None,
+        visibility_timeout: float = LOCAL_QUEUE_VISIBILITY_TIMEOUT,
+        max_retries: int = LOCAL_QUEUE_MAX_RETRIES,
+        retry_backoff: float = LOCAL_QUEUE_RETRY_BACKOFF,
+        poll_interval: float = LOCAL_QUEUE_POLL_INTERVAL,
+    ):
+        self.path = path
+        self.resolve_task = resolve_task
+        self.visibility_timeout = visibility_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._processes: List[multiprocessing.Process] = []
+        self._periodic: Dict[str, Dict[str, Any]] = {}
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+
+    # --- Connection handling ---
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    # --- Producer API ---
+
+    def enqueue(
+        self,
+        name: str,
+        args: Optional[list] = None,
+        kwargs: Optional[dict] = None,
+        priority: int = 0,
+        countdown: Optional[float] = None,
+        max_retries: Optional[int] = None,
+    ) -> LocalAsyncResult:
+        """Persist a task invocation. Returns immediately."""
+        task_id = str(uuid.uuid4())
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO tasks (id, name, args, kwargs, priority, max_retries, eta, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                task_id,
+                name,
+                json.dumps(list(args or [])),
+                json.dumps(kwargs or {}),
+                int(priority or 0),
+                self.max_retries if max_retries is None else int(max_retries),
+                now + (countdown or 0),
+                now,
+            ),
+        )
+        return LocalAsyncResult(task_id, self)
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return dict(row) if row else None
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._connect().execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    # --- Consumer API ---
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the next runnable task.
+        Expired 'running' tasks (visibility timeout elapsed) are eligible again.
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM tasks "
+                "WHERE (status = 'queued' AND eta <= ?) OR (status = 'running' AND visible_at <= ?) "
+                "ORDER BY priority DESC, eta, created_at LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row["status"] == "running":
+                logger.warning(f"LOCAL QUEUE: Task {row['id']} ({row['name']}) exceeded visibility timeout. Redelivering.")
+            conn.execute(
+                "UPDATE tasks SET status = 'running', attempts = attempts + 1, visible_at = ? WHERE id = ?",
+                (now + self.visibility_timeout, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        task = dict(row)
+        task["attempts"] += 1
+        task["args"] = json.loads(task["args"])
+        task["kwargs"] = json.loads(task["kwargs"])
+        return task
+
+    def ack(self, task_id: str):
+        self._connect().execute(
+            "UPDATE tasks SET status = 'done', finished_at = ?, last_error = NULL WHERE id = ?",
+            (time.time(), task_id),
+        )
+
+    def fail(self, task: Dict[str, Any], error: str):
+        """Re-queue with exponential backoff, or dead-letter once retries are exhausted."""
+        conn = self._connect()
+        if task["attempts"] > task["max_retries"]:
+            logger.error(f"LOCAL QUEUE: Task {task['id']} ({task['name']}) dead-lettered after {task['attempts']} attempts: {error}")
+            conn.execute(
+                "UPDATE tasks SET status = 'dead', finished_at = ?, last_error = ? WHERE id = ?",
+                (time.time(), error, task["id"]),
+            )
+            return
+        delay = self.retry_backoff * (2 ** (task["attempts"] - 1))
+        logger.warning(f"LOCAL QUEUE: Task {task['id']} ({task['name']}) failed (attempt {task['attempts']}). Retrying in {delay:.1f}s: {error}")
+        conn.execute(
+            "UPDATE tasks SET status = 'queued', eta = ?, visible_at = NULL, last_error = ? WHERE id = ?",
+            (time.time() + delay, error, task["id"]),
+        )
+
+    def purge_finished(self, older_than_seconds: float = 86400) -> int:
+        cur = self._connect().execute(
+            "DELETE FROM tasks WHERE status = 'done' AND finished_at < ?",
+            (time.time() - older_than_seconds,),
+        )
+        return cur.rowcount
+
+    def run_next(self) -> bool:
+        """Claim and execute a single task. Returns False when the queue is idle."""
+        task = self.claim()
+        if task is None:
+            return False
+        try:
+            func = self.resolve_task(task["name"])
+            if func is None:
+                raise LookupError(f"Unknown task '{task['name']}'")
+            func(*task["args"], **task["kwargs"])
+        except Exception as e:
+            self.fail(task, f"{type(e).__name__}: {e}")
+        else:
+            self.ack(task["id"])
+        return True
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                if not self.run_next():
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:
+                logger.error(f"LOCAL QUEUE: Worker loop error: {e}")
+                self._stop.wait(self.poll_interval)
+
+    # --- Periodic tasks (beat) ---
+
+    def add_periodic(self, entry: str, task_name: str, schedule: Any, args: Optional[list] = None, kwargs: Optional[dict] = None):
+        """Register a beat-style entry. `schedule` may be seconds, a timedelta, or a celery schedule object."""
+        self._periodic[entry] = {"task": task_name, "schedule": schedule, "args": args or [], "kwargs": kwargs or {}}
+
+    def _interval_seconds(self, schedule: Any) -> Optional[float]:
+        if isinstance(schedule, (int, float)):
+            return float(schedule)
+        if isinstance(schedule, timedelta):
+            return schedule.total_seconds()
+        run_every = getattr(schedule, "run_every", None)
+        if isinstance(run_every, timedelta):
+            return run_every.total_seconds()
+        return None
+
+    def _is_due(self, schedule: Any, last_run: float, now: float) -> bool:
+        interval = self._interval_seconds(schedule)
+        if interval is not None:
+            return now - last_run >= interval
+        if hasattr(schedule, "is_due"):
+            from datetime import datetime, timezone
+            return bool(schedule.is_due(datetime.fromtimestamp(last_run, tz=timezone.utc))[0])
+        return False
+
+    def tick_periodic(self) -> int:
+        """
+        Enqueue due periodic entries. The `periodic_runs` row acts as a lock so
+        several beat threads/processes sharing the file fire each entry once.
+        """
+        conn = self._connect()
+        now = time.time()
+        fired = 0
+        for entry, spec in self._periodic.items():
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT last_run FROM periodic_runs WHERE entry = ?", (entry,)).fetchone()
+                if row is None:
+                    # First sighting: start the clock instead of firing on boot.
+                    conn.execute("INSERT INTO periodic_runs (entry, last_run) VALUES (?, ?)", (entry, now))
+                    conn.execute("COMMIT")
+                    continue
+                if not self._is_due(spec["schedule"], row["last_run"], now):
+                    conn.execute("COMMIT")
+                    continue
+                conn.execute("UPDATE periodic_runs SET last_run = ? WHERE entry = ?", (now, entry))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self.enqueue(spec["task"], spec["args"], spec["kwargs"])
+            fired += 1
+        return fired
+
+    def _beat_loop(self, interval: float = 1.0):
+        while not self._stop.is_set():
+            try:
+                self.tick_periodic()
+            except Exception as e:
+                logger.error(f"LOCAL QUEUE: Beat error: {e}")
+            self._stop.wait(interval)
+
+    # --- Pool management ---
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads) or any(p.is_alive() for p in self._processes)
+
+    def start(self, concurrency: int = LOCAL_QUEUE_CONCURRENCY, pool: str = LOCAL_QUEUE_POOL, beat: bool = True, bootstrap: Optional[str] = None):
+        """
+        Start workers in the background.
+
+        pool="threads" runs `concurrency` worker threads in this process.
+        pool="processes" spawns `concurrency` processes; each imports `bootstrap`
+        ("module:attribute" pointing at a LocalTaskQueue) and runs its worker loop.
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        if pool == "processes":
+            if not bootstrap:
+                raise ValueError("pool='processes' requires a bootstrap path like 'app.core.celery_worker:local_queue'")
+            ctx = multiprocessing.get_context("spawn")
+            for i in range(concurrency):
+                p = ctx.Process(target=_process_worker_main, args=(bootstrap,), name=f"local-queue-worker-{i}", daemon=True)
+                p.start()
+                self._processes.append(p)
+        else:
+            for i in range(concurrency):
+                t = threading.Thread(target=self._worker_loop, name=f"local-queue-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        if beat and self._periodic:
+            t = threading.Thread(target=self._beat_loop, name="local-queue-beat", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info(f"LOCAL QUEUE: Started {concurrency} {pool} worker(s) on {self.path} (beat={'on' if beat and self._periodic else 'off'})")
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        for p in self._processes:
+            p.terminate()
+            p.join(timeout)
+        self._threads = []
+        self._processes = []
+
+
+def load_queue(bootstrap: str) -> LocalTaskQueue:
+    module_name, _, attr = bootstrap.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr)
+
+
+def _process_worker_main(bootstrap: str):
+    # Child processes only consume; tasks they enqueue are picked up by the pool.
+    os.environ["LOCAL_QUEUE_AUTOSTART"] = "false"
+    queue = load_queue(bootstrap)
+    queue._worker_loop()
@@ -0,0 +1,145 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.core.http_clients import afetch
+
+logger = logging.getLogger(__name__)
+
+# Reachability of each scraper's upstream, probed off the request path.
+# A monitor thread sends a short HEAD to every source endpoint every
+# NETWORK_HEALTH_INTERVAL seconds and keeps the last NETWORK_HEALTH_WINDOW
+# results per source; discovery and decide_scrapers only read the verdict.
+# A source is skipped after NETWORK_HEALTH_FAILURES failed probes in a row
+# and comes back on its next successful probe. Sources not probed yet count
+# as reachable. State is per process: the scheduler loop, the local queue
+# and each Celery worker process call network_health.start() when they boot.
+# NETWORK_HEALTH_INTERVAL=0 disables probing (the default under tests).
+NETWORK_HEALTH_INTERVAL = float(os.getenv("NETWORK_HEALTH_INTERVAL", "60"))
+NETWORK_HEALTH_TIMEOUT = float(os.getenv("NETWORK_HEALTH_TIMEOUT", "3"))
+NETWORK_HEALTH_WINDOW = int(os.getenv("NETWORK_HEALTH_WINDOW", "5"))
+NETWORK_HEALTH_FAILURES = int(os.getenv("NETWORK_HEALTH_FAILURES", "2"))
+
+# Scraper class name -> the endpoint it depends on
+SOURCE_ENDPOINTS = {
+    "GoogleCSEScraper": "https://www.googleapis.com",
+    "SerpAPIScraper": "https://serpapi.com",
+    "DuckDuckGoScraper": "https://duckduckgo.com",
+    "GoogleScraper": "https://www.google.com",
+    "GoogleMapsScraper": "https://www.google.com",
+    "WhatsAppPublicGroupScraper": "https://www.google.com",
+    "ClassifiedsScraper": "https://jiji.co.ke",
+    "FacebookMarketplaceScraper": "https://www.facebook.com",
+    "TwitterScraper": "https://twitter.com",
+    "RedditScraper": "https://www.reddit.com",
+    "InstagramScraper": "https://www.instagram.com",
+}
+
+
+def _endpoints_from_env() -> Dict[str, str]:
+    # NETWORK_HEALTH_ENDPOINTS="RedditScraper=https://old.reddit.com,..." overrides single entries
+    endpoints = dict(SOURCE_ENDPOINTS)
+    for item in os.getenv("NETWORK_HEALTH_ENDPOINTS", "").split(","):
+        name, _, url = item.partition("=")
+        if name.strip() and url.strip():
+            endpoints[name.strip()] = url.strip()
+    return endpoints
+
+
+class NetworkHealth:
+    """Rolling reachability / latency per source, refreshed by a background monitor."""
+
+    def __init__(self, endpoints: Dict[str, str], interval: float = NETWORK_HEALTH_INTERVAL,
+                 timeout: float = NETWORK_HEALTH_TIMEOUT):
+        self.endpoints = dict(endpoints)
+        self.interval = interval
+        self.timeout = timeout
+        self._probes: Dict[str, deque] = {name: deque(maxlen=NETWORK_HEALTH_WINDOW) for name in self.endpoints}
+        self._failures: Dict[str, int] = {name: 0 for name in self.endpoints}
+        self._last: Dict[str, dict] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._monitor_thread = None
+
+    async def _probe(self, url: str, sources: List[str]):
+        started = time.perf_counter()
+        try:
+            response = await afetch("HEAD", url, timeout=self.timeout, retries=0)
+            # Any answer below 500 means the host is up (HEAD may well be refused with 4xx)
+            error = None if response.status_code < 500 else f"HTTP {response.status_code}"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        for source in sources:
+            self.record(source, error is None, (time.perf_counter() - started) * 1000, error)
+
+    def record(self, source: str, ok: bool, latency_ms: float, error: Optional[str] = None):
+        probes = self._probes.setdefault(source, deque(maxlen=NETWORK_HEALTH_WINDOW))
+        was_reachable = self._failures.get(source, 0) < NETWORK_HEALTH_FAILURES
+        probes.append((ok, latency_ms))
+        self._failures[source] = 0 if ok else self._failures.get(source, 0) + 1
+        self._last[source] = {"error": error, "checked_at": datetime.utcnow().isoformat()}
+        is_reachable = self._failures[source] < NETWORK_HEALTH_FAILURES
+        if was_reachable != is_reachable:
+            if is_reachable:
+                logger.info(f"NETWORK HEALTH: {source} reachable again")
+            else:
+                logger.warning(f"NETWORK HEALTH: {source} unreachable ({error}); skipping it until it recovers")
+
+    async def _probe_all(self, by_url: Dict[str, List[str]]):
+        await asyncio.gather(*(self._probe(url, sources) for url, sources in by_url.items()))
+
+    def check_all(self):
+        """Probe every endpoint once, concurrently (on the monitor's own event loop, so connections are reused)."""
+        by_url: Dict[str, List[str]] = {}
+        for source, url in self.endpoints.items():
+            by_url.setdefault(url, []).append(source)
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._probe_all(by_url))
+
+    def _monitor(self):
+        while True:
+            try:
+                self.check_all()
+            except Exception as e:
+                logger.error(f"NETWORK HEALTH: probe round failed: {e}")
+            time.sleep(self.interval)
+
+    def start(self):
+        """Start the probe thread once per process; no-op when the interval is 0."""
+        if self._monitor_thread is None and self.interval > 0:
+            with self._lock:
+                if self._monitor_thread is None:
+                    self._monitor_thread = threading.Thread(target=self._monitor, name="network-health", daemon=True)
+                    self._monitor_thread.start()
+
+    def reachable(self, source: str) -> bool:
+        """Last verdict for a source; unknown sources and sources not probed yet count as reachable."""
+        return self._failures.get(source, 0) < NETWORK_HEALTH_FAILURES
+
+    def any_reachable(self) -> bool:
+        return not self.endpoints or any(self.reachable(source) for source in self.endpoints)
+
+    def status(self) -> Dict[str, dict]:
+        result = {}
+        for source, url in self.endpoints.items():
+            probes = list(self._probes.get(source, ()))
+            latencies = [latency for ok, latency in probes if ok]
+            result[source] = {
+                "endpoint": url,
+                "reachable": self._failures.get(source, 0) < NETWORK_HEALTH_FAILURES,
+                "consecutive_failures": self._failures.get(source, 0),
+                "success_rate": round(sum(ok for ok, _ in probes) / len(probes), 2) if probes else None,
+                "latency_ms": round(sum(latencies) / len(latencies), 1) if latencies else None,
+                "probes": len(probes),
+                **self._last.get(source, {"error": None, "checked_at": None}),
+            }
+        return result
+
+
+network_health = NetworkHealth(_endpoints_from_env())
@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import zlib
+import atexit
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.db.database import SessionLocal, write_later
+from app.db.models import RawCapture
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+logger = logging.getLogger(__name__)
+
+# Raw scraper payloads, kept for debugging and replay. Records (JSON lines)
+# are buffered in memory and written as compressed frames to one long-lived
+# segment file per process, rotated at RAW_CAPTURE_SEGMENT_MB; the
+# raw_captures table maps content hash -> (segment, frame offset, line).
+# Frames are compressed independently, so reading one record decompresses
+# one frame. zstd when `zstandard` is installed, zlib otherwise (segments
+# carry the codec in their extension and stay readable either way).
+RAW_CAPTURE = os.getenv("RAW_CAPTURE", "true").lower() == "true"
+RAW_CAPTURE_DIR = os.getenv("RAW_CAPTURE_DIR", "logs/raw_capture")
+RAW_CAPTURE_SEGMENT_MB = float(os.getenv("RAW_CAPTURE_SEGMENT_MB", "64"))
+RAW_CAPTURE_FRAME_KB = int(os.getenv("RAW_CAPTURE_FRAME_KB", "256"))
+RAW_CAPTURE_FLUSH_SECONDS = float(os.getenv("RAW_CAPTURE_FLUSH_SECONDS", "5"))
+RAW_CAPTURE_ZSTD_LEVEL = int(os.getenv("RAW_CAPTURE_ZSTD_LEVEL", "3"))
+
+_FRAME_HEADER = 4  # big-endian length of the compressed frame
+_SEEN_HASHES = 100_000
+
+
+def content_hash(text: str) -> str:
+    """The AgentRawLead.content_hash of a text: md5 of its normalized form."""
+    return hashlib.md5(text.strip().lower().encode("utf-8")).hexdigest()
+
+
+def _item_text(item: Dict[str, Any]) -> str:
+    data = item.get("data") if isinstance(item.get("data"), dict) else {}
+    text = item.get("body") or item.get("text") or data.get("raw_text") or item.get("snippet") or item.get("content")
+    return text if isinstance(text, str) and text.strip() else json.dumps(item, sort_keys=True, default=str)
+
+
+def item_hash(item: Dict[str, Any]) -> str:
+    """The hash capture() files a raw scraper item under (also with capture disabled)."""
+    return content_hash(_item_text(item))
+
+
+class _Codec:
+    def __init__(self, extension: str):
+        self.extension = extension
+        if extension == ".zst":
+            if not HAS_ZSTD:
+                raise RuntimeError("zstandard is not installed; cannot read .zst raw-capture segments")
+            self._compressor = zstandard.ZstdCompressor(level=RAW_CAPTURE_ZSTD_LEVEL)
+            self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        if self.extension == ".zst":
+            return self._compressor.compress(data)
+        return zlib.compress(data, 6)
+
+    def decompress(self, data: bytes) -> bytes:
+        if self.extension == ".zst":
+            return self._decompressor.decompress(data)
+        return zlib.decompress(data)
+
+
+class RawCaptureStore:
+    """Buffered, size-rotated, compressed segment writer plus the read/replay side."""
+
+    def __init__(self, directory: str = RAW_CAPTURE_DIR, segment_mb: float = RAW_CAPTURE_SEGMENT_MB,
+                 frame_kb: int = RAW_CAPTURE_FRAME_KB, flush_seconds: float = RAW_CAPTURE_FLUSH_SECONDS,
+                 index: bool = True):
+        self.directory = directory
+        self.segment_bytes = int(segment_mb * 1024 * 1024)
+        self.frame_bytes = frame_kb * 1024
+        self.flush_seconds = flush_seconds
+        self.index = index
+        self.codec = _Codec(".zst" if HAS_ZSTD else ".zz")
+        self._codecs = {self.codec.extension: self.codec}
+        self._lock = threading.Lock()
+        self._lines: List[bytes] = []
+        self._rows: List[dict] = []
+        self._buffered = 0
+        self._handle = None
+        self._segment: Optional[str] = None
+        self._segment_size = 0
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._flusher: Optional[threading.Thread] = None
+        self._index_ready = None
+        self._stats = {"records": 0, "duplicates": 0, "frames": 0, "segments": 0,
+                       "bytes_in": 0, "bytes_written": 0, "write_seconds": 0.0}
+
+    # --- Write side -------------------------------------------------------
+
+    def capture(self, source: str, items: List[Dict[str, Any]], query: Optional[str] = None) -> List[str]:
+        """Buffer raw payloads; returns their content hashes (duplicates are not stored twice)."""
+        hashes = []
+        if not RAW_CAPTURE or not items:
+            return hashes
+        now = datetime.utcnow()
+        with self._lock:
+            for item in items:
+                digest = item_hash(item)
+                hashes.append(digest)
+                if digest in self._seen:
+                    self._stats["duplicates"] += 1
+                    continue
+                self._seen[digest] = None
+                if len(self._seen) > _SEEN_HASHES:
+                    self._seen.popitem(last=False)
+                record = {"hash": digest, "source": source, "query": query, "captured_at": now.isoformat(),
+                          "payload": item}
+                line = json.dumps(record, default=str, ensure_ascii=False).encode("utf-8") + b"\n"
+                self._lines.append(line)
+                self._rows.append({"content_hash": digest, "source": source, "url": item.get("url") or item.get("href"),
+                                   "captured_at": now})
+                self._buffered += len(line)
+                self._stats["records"] += 1
+                if self._buffered >= self.frame_bytes:
+                    self._flush_locked()
+        self._ensure_flusher()
+        return hashes
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._lines:
+            return
+        started = time.perf_counter()
+        raw = b"".join(self._lines)
+        frame = self.codec.compress(raw)
+        if self._handle is None or self._segment_size + len(frame) + _FRAME_HEADER > self.segment_bytes:
+            self._rotate_locked()
+        offset = self._segment_size
+        self._handle.write(len(frame).to_bytes(_FRAME_HEADER, "big") + frame)
+        self._handle.flush()
+        self._segment_size += len(frame) + _FRAME_HEADER
+        rows = self._rows
+        for line, row in enumerate(rows):
+            row.update(segment=self._segment, frame_offset=offset, line=line)
+        self._stats["frames"] += 1
+        self._stats["bytes_in"] += len(raw)
+        self._stats["bytes_written"] += len(frame) + _FRAME_HEADER
+        self._stats["write_seconds"] += time.perf_counter() - started
+        self._lines, self._rows, self._buffered = [], [], 0
+        if self.index:
+            write_later(self._store_index, rows)
+
+    def _rotate_locked(self):
+        if self._handle is not None:
+            self._handle.close()
+        os.makedirs(self.directory, exist_ok=True)
+        # Per-process segments: API and worker processes never interleave frames in one file
+        self._segment = f"raw-{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}{self.codec.extension}"
+        self._handle = open(os.path.join(self.directory, self._segment), "ab", buffering=1024 * 1024)
+        self._segment_size = 0
+        self._stats["segments"] += 1
+
+    def _store_index(self, db, rows: List[dict]):
+        connection = db.connection()
+        if self._index_ready is None:
+            self._index_ready = inspect(connection).has_table(RawCapture.__tablename__)
+        if not self._index_ready:
+            return
+        insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+        db.execute(insert(RawCapture).on_conflict_do_nothing(index_elements=["content_hash"]), rows)
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            with self._lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_periodically, name="raw-capture-flush", daemon=True)
+                    self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Raw capture flush failed: {e}")
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    # --- Read side --------------------------------------------------------
+
+    def _codec_for(self, segment: str) -> _Codec:
+        extension = os.path.splitext(segment)[1]
+        if extension not in self._codecs:
+            self._codecs[extension] = _Codec(extension)
+        return self._codecs[extension]
+
+    def read_frame(self, segment: str, offset: int) -> List[dict]:
+        with open(os.path.join(self.directory, segment), "rb") as f:
+            f.seek(offset)
+            size = int.from_bytes(f.read(_FRAME_HEADER), "big")
+            frame = f.read(size)
+        return [json.loads(line) for line in self._codec_for(segment).decompress(frame).splitlines()]
+
+    def read(self, digest: str) -> Optional[dict]:
+        """The captured record for a content hash, or None (unflushed records are found too)."""
+        with self._lock:
+            for line in self._lines:
+                if line.startswith(b'{"hash": "' + digest.encode() + b'"'):
+                    return json.loads(line)
+        with SessionLocal() as db:
+            entry = db.execute(select(RawCapture).where(RawCapture.content_hash == digest)).scalar_one_or_none()
+        if entry is None:
+            return None
+        records = self.read_frame(entry.segment, entry.frame_offset)
+        return records[entry.line] if entry.line < len(records) else None
+
+    def segments(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if name.startswith("raw-"))
+
+    def replay(self, source: Optional[str] = None, since: Optional[datetime] = None) -> Iterator[dict]:
+        """Every captured record in write order (per process), optionally filtered; for debugging and re-ingestion."""
+        self.flush()
+        for segment in self.segments():
+            with open(os.path.join(self.directory, segment), "rb") as f:
+                codec = self._codec_for(segment)
+                while True:
+                    header = f.read(_FRAME_HEADER)
+                    if len(header) < _FRAME_HEADER:
+                        break
+                    frame = f.read(int.from_bytes(header, "big"))
+                    for line in codec.decompress(frame).splitlines():
+                        record = json.loads(line)
+                        if source and record["source"] != source:
+                            continue
+                        if since and datetime.fromisoformat(record["captured_at"]) < since:
+                            continue
+                        yield record
+
+    def prune_segments(self, before: datetime) -> int:
+        """Delete closed segments last written before `before`; returns how many."""
+        removed = 0
+        cutoff = before.timestamp()
+        for segment in self.segments():
+            path = os.path.join(self.directory, segment)
+            if segment != self._segment and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["buffered_records"] = len(self._lines)
+        footprint = sum(os.path.getsize(os.path.join(self.directory, s)) for s in self.segments())
+        seconds = stats.pop("write_seconds")
+        stats.update(
+            codec=self.codec.extension.lstrip("."),
+            disk_bytes=footprint,
+            segment_files=len(self.segments()),
+            compression_ratio=round(stats["bytes_in"] / stats["bytes_written"], 2) if stats["bytes_written"] else None,
+            write_mb_per_sec=round(stats["bytes_in"] / seconds / 1e6, 1) if seconds else None,
+        )
+        return stats
+
+
+store = RawCaptureStore()
+atexit.register(store.close)
@@ -0,0 +1,71 @@
+import time
+import logging
+import threading
+from typing import Callable, Optional
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+
+class RedisLink:
+    """
+    Shared Redis client for optional cross-worker features (response cache,
+    live events). Callers only read the last good client, or None; while there
+    is none, a background thread re-probes the URL at most every
+    `retry_seconds`, so request and commit paths never wait on a connect.
+    """
+
+    def __init__(self, url: str, name: str, fallback: str, retry_seconds: float = 60,
+                 on_connect: Optional[Callable[[], None]] = None):
+        self.url = url
+        self.name = name
+        self.fallback = fallback
+        self.retry_seconds = retry_seconds
+        self.on_connect = on_connect
+        self._client = None
+        self._checked_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def client(self):
+        """The connected client, or None (a reconnect probe is started in the background when due)."""
+        if not HAS_REDIS:
+            return None
+        client = self._client
+        if client is None:
+            self._schedule_probe()
+        return client
+
+    def _schedule_probe(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._probing or (self._checked_at is not None and now - self._checked_at < self.retry_seconds):
+                return
+            self._probing, self._checked_at = True, now
+        threading.Thread(target=self.probe, name=f"{self.name.lower().replace(' ', '-')}-redis", daemon=True).start()
+
+    def probe(self):
+        """Connect and ping now, on the calling thread; returns the client or None."""
+        try:
+            client = redis.from_url(self.url, socket_connect_timeout=0.5, socket_timeout=0.5)
+            client.ping()
+            self._client = client
+        except Exception as e:
+            logger.info(f"{self.name}: Redis unavailable ({e}); {self.fallback}.")
+        finally:
+            with self._lock:
+                self._probing, self._checked_at = False, time.monotonic()
+        if self._client is not None and self.on_connect is not None:
+            self.on_connect()
+        return self._client
+
+    def failed(self, e: Exception):
+        """Drop the client after a command error; the next probe waits `retry_seconds`."""
+        logger.warning(f"{self.name}: Redis error ({e}); {self.fallback}.")
+        with self._lock:
+            self._client, self._checked_at = None, time.monotonic()
@@ -0,0 +1,257 @@
+import os
+import time
+import uuid
+import json
+import inspect
+import hashlib
+import logging
+import functools
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import Any, Dict, Iterable, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from app.core.redis_link import RedisLink
+
+logger = logging.getLogger(__name__)
+
+# Conditional GET + response cache for the dashboard's polled read endpoints.
+# Each cached route names the resources it reads ("leads", "agents",
+# "notifications"); every commit that writes one of them bumps its version
+# (app/db/resource_versions.py). The ETag is a hash of route, normalized
+# query string, those versions and a `ttl`-second time bucket (responses
+# also age on their own: time windows, "today" counters). A matching
+# If-None-Match gets a 304 and an unchanged ETag is served from the body
+# cache, both without opening a database connection.
+# Versions and bodies live in Redis when REDIS_URL answers, so every worker
+# (API and Celery) agrees; otherwise they are per-process, which is only
+# correct with a single API process that also runs the local task queue.
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "true").lower() == "true"
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "512"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+REDIS_RETRY_SECONDS = 60
+KEY_PREFIX = "delta9:rc:"
+
+
+class _LocalStore:
+    """Per-process versions + LRU body cache with expiry."""
+
+    def __init__(self, max_entries: int):
+        # Counters restart at 0 with the process; the epoch keeps old ETags from matching
+        self.epoch = uuid.uuid4().hex[:8]
+        self.versions: Dict[str, int] = {}
+        self.bodies: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+
+    def bump(self, resources: Iterable[str]):
+        with self.lock:
+            for name in resources:
+                self.versions[name] = self.versions.get(name, 0) + 1
+
+    def get_versions(self, resources: Iterable[str]) -> str:
+        with self.lock:
+            return self.epoch + ":" + ",".join(str(self.versions.get(name, 0)) for name in resources)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.bodies.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self.bodies[key]
+                return None
+            self.bodies.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, value: Any, ttl: int):
+        with self.lock:
+            self.bodies[key] = (time.time() + ttl, value)
+            self.bodies.move_to_end(key)
+            while len(self.bodies) > self.max_entries:
+                self.bodies.popitem(last=False)
+
+
+_local = _LocalStore(RESPONSE_CACHE_ENTRIES)
+_link = RedisLink(REDIS_URL, "Response cache", "using per-process cache", REDIS_RETRY_SECONDS)
+
+
+def _redis():
+    """Shared Redis client, or None; reconnects are probed off the request path."""
+    return _link.client()
+
+
+def _redis_failed(e: Exception):
+    _link.failed(e)
+
+
+def bump(resources: Iterable[str]):
+    """Invalidate every cached response that reads any of `resources`."""
+    resources = sorted(set(resources))
+    if not resources:
+        return
+    _local.bump(resources)
+    client = _redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline(transaction=False)
+            for name in resources:
+                pipe.incr(f"{KEY_PREFIX}v:{name}")
+            pipe.execute()
+        except Exception as e:
+            _redis_failed(e)
+
+
+def resource_versions(resources: Iterable[str]) -> str:
+    resources = list(resources)
+    client = _redis()
+    if client is not None:
+        try:
+            values = client.mget([f"{KEY_PREFIX}v:{name}" for name in resources])
+            return "r:" + ",".join((v or b"0").decode() for v in values)
+        except Exception as e:
+            _redis_failed(e)
+    return _local.get_versions(resources)
+
+
+def _get_body(key: str) -> Optional[Tuple[int, bytes, str, Dict[str, str]]]:
+    client = _redis()
+    if client is not None:
+        try:
+            entry = client.hgetall(f"{KEY_PREFIX}b:{key}")
+            if not entry:
+                return None
+            return int(entry[b"status"]), entry[b"body"], entry[b"media_type"].decode(), json.loads(entry[b"headers"])
+        except Exception as e:
+            _redis_failed(e)
+    return _local.get(key)
+
+
+def _put_body(key: str, entry: Tuple[int, bytes, str, Dict[str, str]], ttl: int):
+    client = _redis()
+    if client is not None:
+        try:
+            status, body, media_type, headers = entry
+            name = f"{KEY_PREFIX}b:{key}"
+            pipe = client.pipeline(transaction=True)
+            pipe.hset(name, mapping={"status": status, "body": body, "media_type": media_type,
+                                     "headers": json.dumps(headers)})
+            pipe.expire(name, ttl)
+            pipe.execute()
+            return
+        except Exception as e:
+            _redis_failed(e)
+    _local.put(key, entry, ttl)
+
+
+# --- Route decorator ----------------------------------------------------
+
+CACHED_HEADERS = ("x-next-cursor",)
+
+
+def _cache_key(request: Request) -> str:
+    params = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+    return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in params)
+
+
+def _etag(key: str, versions: str, ttl: int) -> str:
+    bucket = int(time.time() // ttl)
+    return 'W/"' + hashlib.sha1(f"{key}|{versions}|{bucket}".encode()).hexdigest()[:24] + '"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    return bool(header) and (header.strip() == "*" or etag in [t.strip() for t in header.split(",")])
+
+
+def _is_soft_failure(result: Any) -> bool:
+    """Soft-failure bodies (status 200 + error message) must not be cached."""
+    return isinstance(result, dict) and (
+        result.get("status") == "error" or str(result.get("message", "")).startswith("Error")
+    )
+
+
+def cached_response(*resources: str, ttl: int = 60, model: Any = None):
+    """
+    Make a GET endpoint (sync or async) answer If-None-Match with 304 and serve
+    repeated responses from cache until one of `resources` is written or `ttl` passes.
+    `model` is the route's response_model (applied here, since a Response is
+    returned). Direct calls without a request (tests, scripts) run uncached.
+    """
+    adapter = TypeAdapter(model) if model is not None else None
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        declares_request = "request" in signature.parameters
+        declares_response = "response" in signature.parameters
+
+        def render(result: Any, sub_response: Optional[Response]) -> Tuple[int, bytes, str, Dict[str, str]]:
+            if isinstance(result, Response):
+                headers = {k: v for k, v in result.headers.items() if k in CACHED_HEADERS}
+                return result.status_code, bytes(result.body), result.media_type or "application/json", headers
+            if adapter is not None:
+                body = adapter.dump_json(adapter.validate_python(result, from_attributes=True), by_alias=True)
+            else:
+                from app.db.lead_cards import dumps
+                body = dumps(jsonable_encoder(result))
+            headers = {}
+            if sub_response is not None:
+                headers = {k: v for k, v in sub_response.headers.items() if k in CACHED_HEADERS}
+            return 200, body, "application/json", headers
+
+        def lookup(request: Request):
+            """(etag, cache headers, response) — response is set when answered from cache."""
+            key = _cache_key(request)
+            etag = _etag(key, resource_versions(resources), ttl)
+            cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if _not_modified(request, etag):
+                return etag, cache_headers, Response(status_code=304, headers=cache_headers)
+            entry = _get_body(etag)
+            if entry is not None:
+                return etag, cache_headers, respond(entry, cache_headers)
+            return etag, cache_headers, None
+
+        def store(result: Any, kwargs, etag: str, cache_headers: Dict[str, str]):
+            if isinstance(result, Response) and not hasattr(result, "body"):
+                return result  # streaming: nothing to cache
+            status, body, media_type, headers = render(result, kwargs.get("response") if declares_response else None)
+            headers["last-modified"] = formatdate(usegmt=True)
+            entry = (status, body, media_type, headers)
+            if status == 200 and not _is_soft_failure(result):
+                _put_body(etag, entry, ttl)
+            return respond(entry, cache_headers)
+
+        def respond(entry, cache_headers: Dict[str, str]) -> Response:
+            status, body, media_type, headers = entry
+            return Response(content=body, status_code=status, media_type=media_type, headers={**headers, **cache_headers})
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                request = kwargs.get("request") if declares_request else kwargs.pop("request", None)
+                if request is None or not RESPONSE_CACHE:
+                    return await fn(*args, **kwargs)
+                etag, cache_headers, cached = lookup(request)
+                if cached is not None:
+                    return cached
+                return store(await fn(*args, **kwargs), kwargs, etag, cache_headers)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                request = kwargs.get("request") if declares_request else kwargs.pop("request", None)
+                if request is None or not RESPONSE_CACHE:
+                    return fn(*args, **kwargs)
+                etag, cache_headers, cached = lookup(request)
+                if cached is not None:
+                    return cached
+                return store(fn(*args, **kwargs), kwargs, etag, cache_headers)
+
+        if not declares_request:
+            params = list(signature.parameters.values())
+            params.append(inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+            wrapper.__signature__ = signature.replace(parameters=params)
+        return wrapper
+
+    return decorator
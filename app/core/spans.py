@@ -0,0 +1,123 @@
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lightweight stage timing for agent runs. A SpanRecorder is bound to the
+# current context; span() calls anywhere below it (including work submitted
+# to lane pools or gathered as asyncio tasks, which copy the context) add
+# their duration and item counts to the run's per-stage breakdown.
+_current_recorder: contextvars.ContextVar = contextvars.ContextVar("span_recorder", default=None)
+
+
+class SpanRecorder:
+    """Accumulates per-stage wall time, call counts and item counts."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, duration_ms: float, items: Optional[int] = None, error: bool = False):
+        with self._lock:
+            s = self.stages.setdefault(stage, {"ms": 0.0, "max_ms": 0.0, "calls": 0, "items": 0, "errors": 0})
+            s["ms"] += duration_ms
+            s["max_ms"] = max(s["max_ms"], duration_ms)
+            s["calls"] += 1
+            if items:
+                s["items"] += items
+            if error:
+                s["errors"] += 1
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact JSON form stored on AgentRunLog.profile."""
+        with self._lock:
+            stages = {
+                name: {k: (round(v, 1) if isinstance(v, float) else v) for k, v in s.items()}
+                for name, s in self.stages.items()
+            }
+        return {"total_ms": round(self.total_ms, 1), "stages": stages}
+
+
+class _Span:
+    __slots__ = ("items",)
+
+    def __init__(self):
+        self.items = None
+
+
+@contextmanager
+def recording(recorder: Optional[SpanRecorder] = None):
+    """Bind a recorder to the enclosed block (and any work it spawns)."""
+    recorder = recorder or SpanRecorder()
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+def current_recorder() -> Optional[SpanRecorder]:
+    return _current_recorder.get()
+
+
+@contextmanager
+def span(stage: str, items: Optional[int] = None):
+    """
+    Time a stage. A no-op when no recorder is bound.
+    Set `.items` on the yielded handle to record how many things the stage handled.
+    """
+    recorder = _current_recorder.get()
+    handle = _Span()
+    handle.items = items
+    if recorder is None:
+        yield handle
+        return
+    start = time.perf_counter()
+    error = False
+    try:
+        yield handle
+    except BaseException:
+        error = True
+        raise
+    finally:
+        recorder.add(stage, (time.perf_counter() - start) * 1000, handle.items, error)
+
+
+def add_span(stage: str, duration_ms: float, items: Optional[int] = None):
+    """Record an already-measured stage (for blocks too large to wrap in span())."""
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.add(stage, duration_ms, items)
+
+
+def slowest_stages(profiles, limit: int = 10) -> list:
+    """
+    Aggregate many run profiles into a fleet-wide "slowest stages" list:
+    total, average and worst time per stage, ordered by total time.
+    """
+    agg: Dict[str, Dict[str, Any]] = {}
+    for profile in profiles:
+        for name, s in ((profile or {}).get("stages") or {}).items():
+            a = agg.setdefault(name, {"stage": name, "runs": 0, "total_ms": 0.0, "max_ms": 0.0, "calls": 0, "items": 0, "errors": 0})
+            a["runs"] += 1
+            a["total_ms"] += s.get("ms", 0.0)
+            a["max_ms"] = max(a["max_ms"], s.get("max_ms", 0.0))
+            a["calls"] += s.get("calls", 0)
+            a["items"] += s.get("items", 0)
+            a["errors"] += s.get("errors", 0)
+
+    rows = sorted(agg.values(), key=lambda a: a["total_ms"], reverse=True)[:limit]
+    for a in rows:
+        a["avg_ms_per_run"] = round(a["total_ms"] / a["runs"], 1) if a["runs"] else 0.0
+        a["total_ms"] = round(a["total_ms"], 1)
+        a["max_ms"] = round(a["max_ms"], 1)
+    return rows
@@ -1,19 +1,20 @@
 import json
 import os
-import requests
 import time
+import random
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 from urllib.parse import quote
 from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright
-from duckduckgo_search import DDGS
 from googlesearch import search as google_search
 from scraper import LeadScraper
 
 from app.utils.normalization import LeadValidator
 from app.nlp.intent_service import BuyingIntentNLP
 from app.core.compliance import ComplianceManager
+from app.core.raw_capture import store as raw_capture
+from app.core.http_clients import fetch
 
 class SpecialOpsAgent:
     """
@@ -22,7 +23,6 @@ class SpecialOpsAgent:
     """
     
     def __init__(self):
-        self.ddgs = DDGS()
         self.scraper = LeadScraper()
         self.compliance = ComplianceManager()
         self.intent_service = BuyingIntentNLP()
@@ -417,7 +417,7 @@ class SpecialOpsAgent:
         print(f"📄 Static Crawl: {url}")
         try:
             headers = {"User-Agent": random.choice(self.user_agents)}
-            response = requests.get(url, headers=headers, timeout=15)
+            response = fetch("GET", url, headers=headers, timeout=15)
             if response.status_code == 200:
                 return response.text
             return None
@@ -509,7 +509,10 @@ class SpecialOpsAgent:
             "url": url,
             "confidence": round(confidence, 2),
             "text": text,
-            "raw_data": {**crawl_data, "url": url, "source": crawl_data.get("type", "general")},
+            # Full page HTML stays in the raw-capture store; results carry its hash
+            "raw_data": {**{k: v for k, v in crawl_data.items() if k != "content"}, "url": url,
+                         "source": crawl_data.get("type", "general"),
+                         "capture": (raw_capture.capture(crawl_data.get("type", "general"), [{**crawl_data, "url": url}]) or [None])[0]},
             "data": {
                 "title": crawl_data.get("title") or (soup.title.string if soup.title else "Untitled Lead"),
                 "summary": text[:200] + "...",
@@ -0,0 +1,188 @@
+import os
+import logging
+from typing import Any, AsyncIterator, Callable
+from sqlalchemy import event
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.lanes import LANE_CONFIG, INTERACTIVE, get_lane
+from app.db.database import DATABASE_URL, SessionLocal, ReadSessionLocal, READ_ONLY, replicas, replica_for
+
+logger = logging.getLogger(__name__)
+
+# Async session layer for hot read endpoints. A request awaiting the
+# database no longer holds a threadpool thread, so slow queries queue on the
+# connection pool instead of stalling unrelated requests. Routes migrate one
+# at a time: `db: AsyncSession = Depends(get_async_db)`, then
+# `await db.execute(select(...))` or `await db.run_sync(sync_helper)` for
+# helpers shared with the sync layer. Celery tasks, scripts and write paths
+# keep using app/db/database.py. With ASYNC_DB off or the async driver for
+# DATABASE_URL missing (asyncpg / aiosqlite) the dependency hands out
+# LaneSession, which runs a sync session on the interactive lane behind the
+# same awaitable API. SQLite defaults to LaneSession: its queries are CPU in
+# this process, and scripts/load_test_async_db.py measured aiosqlite's extra
+# thread hop as worse tail latency than the lane, not better.
+ASYNC_DB = os.getenv("ASYNC_DB", "false" if DATABASE_URL.startswith("sqlite") else "true").lower() == "true"
+ASYNC_DB_CONNECTIONS = int(os.getenv("ASYNC_DB_CONNECTIONS", str(LANE_CONFIG[INTERACTIVE]["db_connections"])))
+
+
+def async_url(url: str) -> str:
+    """The async-driver form of a sync DATABASE_URL."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    if url.startswith("postgresql+psycopg2:"):
+        return url.replace("postgresql+psycopg2:", "postgresql+asyncpg:", 1)
+    return url
+
+
+ASYNC_DATABASE_URL = async_url(DATABASE_URL)
+
+if "sqlite" in ASYNC_DATABASE_URL:
+    async_connect_args = {}
+    async_engine_args = {"pool_pre_ping": True, "pool_recycle": 1800}
+else:
+    # asyncpg takes server settings instead of libpq "options"
+    async_connect_args = {"server_settings": {"statement_timeout": "30000"}}
+    async_engine_args = {"pool_pre_ping": True, "pool_recycle": 1800, "max_overflow": 2}
+
+async_engine = None
+if ASYNC_DB:
+    try:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            connect_args=async_connect_args,
+            pool_size=ASYNC_DB_CONNECTIONS,
+            **async_engine_args
+        )
+    except (ImportError, ModuleNotFoundError) as e:
+        logger.warning(f"Async DB driver unavailable for {ASYNC_DATABASE_URL.split(':', 1)[0]} ({e}); "
+                       f"async routes run sync sessions on the interactive lane.")
+
+HAS_ASYNC_DB = async_engine is not None
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    if HAS_ASYNC_DB else None
+)
+
+# Async twins of the read replicas in app/db/database.py; health and lag come from the sync ReplicaSet
+ASYNC_REPLICA_ENGINES = []
+if HAS_ASYNC_DB:
+    for index, url in enumerate(replicas.urls):
+        replica = create_async_engine(async_url(url), connect_args=async_connect_args,
+                                      pool_size=ASYNC_DB_CONNECTIONS, **async_engine_args)
+        replicas.watch(replica.sync_engine, index)
+        ASYNC_REPLICA_ENGINES.append(replica)
+
+
+class AsyncReadRoutingSession(Session):
+    """Sync half of an async read session: replica while healthy and unwritten, else the primary."""
+    def get_bind(self, mapper=None, clause=None, **kw):
+        index = replica_for(self, clause)
+        if index is not None:
+            return ASYNC_REPLICA_ENGINES[index].sync_engine
+        return async_engine.sync_engine
+
+
+AsyncReadSessionLocal = (
+    async_sessionmaker(async_engine, class_=AsyncSession, sync_session_class=AsyncReadRoutingSession,
+                       autoflush=False, expire_on_commit=False, info={READ_ONLY: True})
+    if HAS_ASYNC_DB else None
+)
+
+
+_WROTE = "_lane_session_wrote"
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_writes(session: Session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WROTE, None)
+
+
+class LaneSession:
+    """
+    Awaitable stand-in for AsyncSession over a sync Session, used when the
+    async driver is not installed. Each call runs on the interactive lane;
+    results are buffered there so rows are never fetched from the event loop.
+    Between calls a read-only session gives its connection back (lane threads
+    must never wait on connections held by requests parked on the loop), so
+    consecutive reads do not share a transaction; loaded objects stay usable
+    but detached. A session that has written keeps its transaction until
+    commit()/rollback().
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+        self._lane = get_lane()
+
+    async def _call(self, fn: Callable, *args, **kwargs) -> Any:
+        def run():
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                session = self.sync_session
+                if not (session.info.get(_WROTE) or session.new or session.dirty or session.deleted):
+                    session.close()
+        return await self._lane.run(run)
+
+    async def execute(self, statement, params=None, **kwargs):
+        def run():
+            result = self.sync_session.execute(statement, params, **kwargs)
+            # DML without RETURNING has no rows to buffer (rowcount only)
+            return result if isinstance(result, CursorResult) and not result.returns_rows else result.freeze()
+        result = await self._call(run)
+        return result() if callable(result) else result
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return (await self.execute(statement, params, **kwargs)).scalar()
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return (await self.execute(statement, params, **kwargs)).scalars()
+
+    async def get(self, entity, ident, **kwargs):
+        return await self._call(self.sync_session.get, entity, ident, **kwargs)
+
+    async def run_sync(self, fn: Callable, *args, **kwargs):
+        return await self._call(fn, self.sync_session, *args, **kwargs)
+
+    async def commit(self):
+        await self._call(self.sync_session.commit)
+
+    async def rollback(self):
+        await self._call(self.sync_session.rollback)
+
+    async def close(self):
+        await self._call(self.sync_session.close)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    if HAS_ASYNC_DB:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = LaneSession(SessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession]:
+    """get_async_db for read endpoints: reads go to a healthy replica when configured."""
+    if HAS_ASYNC_DB:
+        async with AsyncReadSessionLocal() as db:
+            yield db
+    else:
+        db = LaneSession(ReadSessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
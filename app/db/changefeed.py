@@ -0,0 +1,249 @@
+import os
+import asyncio
+import weakref
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+from sqlalchemy import event, inspect, select, insert, literal, literal_column, func, tuple_, DDL
+from sqlalchemy.orm import Session
+from app.models.lead import Lead, LeadDetail, COLD_COLUMNS
+from app.utils.cursors import encode_cursor, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Change-data feed for downstream consumers (CRM sync, SDK).
+# Every flush that inserts, updates or deletes a Lead appends one row per
+# lead to lead_changes in the same transaction; `seq` is the cursor.
+# Core statements that bypass the ORM call record_changes() or
+# record_bulk_delete() instead. Consumers read with read_changes() and stay
+# in sync with O(changes) work; a commit wakes long-polling readers in this
+# process, other processes are picked up on the next poll.
+CHANGEFEED = os.getenv("CHANGEFEED", "true").lower() == "true"
+CHANGEFEED_RETENTION_DAYS = int(os.getenv("CHANGEFEED_RETENTION_DAYS", "7"))
+CHANGEFEED_MAX_WAIT = float(os.getenv("CHANGEFEED_MAX_WAIT", "30"))
+CHANGEFEED_POLL_INTERVAL = float(os.getenv("CHANGEFEED_POLL_INTERVAL", "1.0"))
+# Postgres can commit seq N+1 before seq N, however long the transaction
+# holding N stays open. There each row also records its writing transaction
+# (txid), the feed is ordered by (txid, seq) and only rows of transactions
+# older than every running one (pg_snapshot_xmin) are returned: no open
+# transaction can still add a row before the cursor. Postgres cursors carry
+# both values. SQLite has a single writer, so seq alone is the order there.
+_PG_XMIN = literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+TXID_DEFAULT_DDL = DDL("ALTER TABLE lead_changes ALTER COLUMN txid SET DEFAULT (pg_current_xact_id()::text::bigint)")
+
+Position = Union[int, Tuple[int, int]]  # seq, or (txid, seq) on Postgres
+
+_LEAD_COLUMNS = {c.key for c in Lead.__mapper__.column_attrs}
+_PENDING = "_lead_changes_pending"
+_ready = weakref.WeakSet()
+
+
+def _table():
+    from app.db.models import LeadChange
+    return LeadChange.__table__
+
+
+def changefeed_ready(connection) -> bool:
+    """True once lead_changes exists on this engine (positive result cached)."""
+    if not CHANGEFEED:
+        return False
+    engine = connection.engine
+    if engine in _ready:
+        return True
+    if inspect(connection).has_table(_table().name):
+        _ready.add(engine)
+        return True
+    return False
+
+
+class ChangeNotifier:
+    """Wakes long-polling readers (any event loop) when a change is committed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    def notify(self):
+        with self._lock:
+            waiters, self._waiters = self._waiters, set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_result(True))
+
+    async def wait(self, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            return await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+notifier = ChangeNotifier()
+
+
+# --- Write path ---------------------------------------------------------
+
+@event.listens_for(Session, "after_flush")
+def _log_lead_changes(session: Session, flush_context):
+    # Still pre-flush state here: new/dirty/deleted and attribute history
+    inserted = {o.id for o in session.new if isinstance(o, Lead)}
+    rows = [{"lead_id": lead_id, "op": "insert", "fields": None} for lead_id in inserted]
+    updated = {}
+    for obj in session.dirty:
+        if isinstance(obj, Lead):
+            updated.setdefault(obj.id, set()).update(k for k in inspect(obj).committed_state if k in _LEAD_COLUMNS)
+        elif isinstance(obj, LeadDetail):
+            updated.setdefault(obj.lead_id, set()).update(k for k in inspect(obj).committed_state if k in COLD_COLUMNS)
+    # A lead's first cold write creates its detail row
+    for obj in session.new:
+        if isinstance(obj, LeadDetail) and obj.lead_id not in inserted:
+            updated.setdefault(obj.lead_id, set()).update(c for c in COLD_COLUMNS if getattr(obj, c) is not None)
+    rows += [{"lead_id": lead_id, "op": "update", "fields": sorted(fields)} for lead_id, fields in updated.items() if fields]
+    rows += [{"lead_id": o.id, "op": "delete", "fields": None} for o in session.deleted if isinstance(o, Lead)]
+    if not rows:
+        return
+    connection = session.connection()
+    if not changefeed_ready(connection):
+        return
+    now = datetime.utcnow()
+    for row in rows:
+        row["changed_at"] = now
+    connection.execute(insert(_table()), rows)
+    session.info[_PENDING] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_readers(session: Session):
+    if session.info.pop(_PENDING, False):
+        notifier.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session):
+    session.info.pop(_PENDING, None)
+
+
+def record_changes(db: Session, lead_ids: Iterable, op: str = "upsert"):
+    """Log changes made by Core statements (atomic upserts, bulk imports). Does not commit."""
+    connection = db.connection()
+    rows = [{"lead_id": lead_id, "op": op, "fields": None, "changed_at": datetime.utcnow()} for lead_id in lead_ids]
+    if rows and changefeed_ready(connection):
+        connection.execute(insert(_table()), rows)
+        db.info[_PENDING] = True
+
+
+def record_bulk_delete(db: Session, *criteria) -> int:
+    """Log deletes for the leads matching `criteria`; call before the bulk DELETE itself."""
+    connection = db.connection()
+    if not changefeed_ready(connection):
+        return 0
+    table = _table()
+    result = connection.execute(insert(table).from_select(
+        ["lead_id", "op", "changed_at"],
+        select(Lead.id, literal("delete"), literal(datetime.utcnow())).where(*criteria),
+    ))
+    db.info[_PENDING] = True
+    return result.rowcount
+
+
+def prune_changes(db: Session, retention_days: int = CHANGEFEED_RETENTION_DAYS) -> int:
+    """Trim the log; consumers whose cursor is older get reset=True and must resync."""
+    connection = db.connection()
+    if not changefeed_ready(connection):
+        return 0
+    table = _table()
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    return connection.execute(table.delete().where(table.c.changed_at < cutoff)).rowcount
+
+
+# --- Read path ----------------------------------------------------------
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def resolve_since(db: Session, since: Optional[str]) -> Position:
+    """
+    Cursor -> position: a seq, or (txid, seq) on Postgres. None starts from
+    the oldest retained change, "latest" from now. Accepts the opaque cursor
+    returned by read_changes or a bare seq (on Postgres a bare seq resumes
+    from its row's transaction; changes may then be delivered twice).
+    """
+    table = _table()
+    if not since:
+        return (0, 0) if _is_postgres(db) else 0
+    if since == "latest":
+        if _is_postgres(db):
+            row = db.execute(select(table.c.txid, table.c.seq).where(table.c.txid < _PG_XMIN)
+                             .order_by(table.c.txid.desc(), table.c.seq.desc()).limit(1)).first()
+            return (row.txid, row.seq) if row else (0, 0)
+        return db.execute(select(func.max(table.c.seq))).scalar() or 0
+    if since.isdigit():
+        seq = int(since)
+    else:
+        state = decode_cursor(since)
+        if not state or not isinstance(state.get("seq"), int):
+            raise ValueError(f"Invalid changes cursor: {since}")
+        seq = state["seq"]
+        if isinstance(state.get("txid"), int) and _is_postgres(db):
+            return (state["txid"], seq)
+    if _is_postgres(db):
+        txid = db.execute(select(table.c.txid).where(table.c.seq == seq)).scalar()
+        return (txid or 0, seq)
+    return seq
+
+
+def changes_query(dialect: str, since: Position, limit: int):
+    """The page query: by seq, or on Postgres by (txid, seq) up to the oldest running transaction."""
+    table = _table()
+    columns = [table.c.seq, table.c.lead_id, table.c.op, table.c.fields, table.c.changed_at]
+    if dialect == "postgresql":
+        txid, seq = since if isinstance(since, tuple) else (0, since)
+        return (select(*columns, table.c.txid)
+                .where(tuple_(table.c.txid, table.c.seq) > tuple_(txid, seq), table.c.txid < _PG_XMIN)
+                .order_by(table.c.txid, table.c.seq).limit(limit + 1))
+    return select(*columns).where(table.c.seq > since).order_by(table.c.seq).limit(limit + 1)
+
+
+def read_changes(db: Session, since: Position = 0, limit: int = 100) -> Dict[str, Any]:
+    """
+    Ordered change events after `since` (see resolve_since), each with the
+    lead's current state (None once deleted): {"changes", "cursor", "has_more", "reset"}.
+    """
+    table = _table()
+    since_seq = since[1] if isinstance(since, tuple) else since
+    rows = db.execute(changes_query(db.get_bind().dialect.name, since, limit)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # The consumer fell behind the retention window: it missed trimmed changes
+    reset = False
+    if since_seq > 0:
+        oldest = db.execute(select(func.min(table.c.seq))).scalar()
+        reset = oldest is not None and oldest > since_seq + 1
+
+    live_ids = {r.lead_id for r in rows if r.op != "delete"}
+    leads = {l.id: l for l in db.query(Lead).filter(Lead.id.in_(live_ids))} if live_ids else {}
+    changes = []
+    for r in rows:
+        lead = leads.get(r.lead_id)
+        changes.append({
+            "seq": r.seq,
+            "op": r.op,
+            "lead_id": str(r.lead_id),
+            "fields": r.fields,
+            "changed_at": r.changed_at.isoformat() if r.changed_at else None,
+            "lead": lead.to_dict() if lead is not None else None,
+        })
+
+    if isinstance(since, tuple):
+        last = {"txid": rows[-1].txid, "seq": rows[-1].seq} if rows else {"txid": since[0], "seq": since[1]}
+    else:
+        last = {"seq": rows[-1].seq if rows else since}
+    return {"changes": changes, "cursor": encode_cursor(last), "has_more": has_more, "reset": reset}
@@ -1,6 +1,13 @@
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, text, exc, Engine
+from sqlalchemy.orm import sessionmaker, Session
+from contextlib import contextmanager
+from typing import Dict, List, Optional
 import os
+import time
+import logging
+import threading
+from app.core.lanes import LANE_CONFIG, INTERACTIVE, current_lane_name
+from app.db.sqlite_profile import SQLITE_SINGLE_WRITER, SQLiteWriter, apply_sqlite_profile, sqlite_connect_args
 
 # Use PostgreSQL exclusively for production, fallback to SQLite for local
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./intent_radar_v3.db").strip()
@@ -15,8 +22,8 @@ if DATABASE_URL.startswith("postgres://"):
 
 # Connection args
 if "sqlite" in DATABASE_URL:
-    # SQLite-specific config for local testing
-    connect_args = {"check_same_thread": False}
+    # SQLite-specific config for local testing (operating profile: app/db/sqlite_profile.py)
+    connect_args = sqlite_connect_args()
     engine_args = {
         "pool_pre_ping": True,
         "pool_recycle": 1800
@@ -27,19 +34,281 @@ else:
     engine_args = {
         "pool_pre_ping": True,
         "pool_recycle": 1800,  # Recycle every 30 mins
-        "pool_size": 10,       # Safe size for Railway
-        "max_overflow": 5
+        "max_overflow": 2
     }
 
-# Create Engine with Pool Settings
+# Create one Engine per execution lane so interactive requests and background
+# agents draw from separate connection budgets (see app/core/lanes.py).
 # pool_pre_ping=True handles "database has gone away" errors
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args=connect_args,
-    **engine_args
-)
+LANE_ENGINES = {
+    lane: create_engine(
+        DATABASE_URL,
+        connect_args=connect_args,
+        pool_size=cfg["db_connections"],
+        **engine_args
+    )
+    for lane, cfg in LANE_CONFIG.items()
+}
+for lane_engine in LANE_ENGINES.values():
+    apply_sqlite_profile(lane_engine)
+engine = LANE_ENGINES[INTERACTIVE]
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
+
+# Optional read replicas (comma-separated URLs). Sessions from
+# ReadSessionLocal / get_read_db, and statements marked with
+# .execution_options(replica=True), read from a healthy replica; anything
+# else, and every statement after the session's first write, goes to the
+# primary (read-your-writes). A replica that is unreachable, errors, or lags
+# more than REPLICA_MAX_LAG_SECONDS is skipped until its next check.
+# Like the primary, each replica has one engine per execution lane, so
+# background reads (exports, agent runs) draw from their own connection
+# budget rather than the interactive one.
+# Locally, point DATABASE_REPLICA_URLS at a copy of the SQLite file or a
+# second Postgres cluster.
+DATABASE_REPLICA_URLS = [
+    url.strip().replace("postgres://", "postgresql://", 1)
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+# Pool size per lane engine; defaults to the lane's own db_connections budget
+REPLICA_DB_CONNECTIONS = int(os.getenv("REPLICA_DB_CONNECTIONS", "0"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+REPLICA_CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "5"))
+
+READ_ONLY = "read_only"
+_WROTE = "_replica_wrote"
+_REPLICA = "_replica_index"
+_LANE = "_lane"
+
+
+def _postgres_lag(connection) -> float:
+    """Seconds the standby is behind; 0 when it has replayed everything it received."""
+    row = connection.execute(text(
+        "SELECT pg_is_in_recovery(), pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn(), "
+        "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+    )).one()
+    in_recovery, caught_up, lag = row
+    if not in_recovery or caught_up or lag is None:
+        return 0.0
+    return float(lag)
+
+
+def _reachable(connection) -> float:
+    connection.execute(text("SELECT 1"))
+    return 0.0
+
+
+# Dialects without replication metadata (SQLite copies) are only checked for reachability
+LAG_PROBES = {"postgresql": _postgres_lag}
+
+
+def _replica_engine(url: str, pool_size: int):
+    if "sqlite" in url:
+        replica = create_engine(url, connect_args=sqlite_connect_args(),
+                                pool_size=pool_size, pool_pre_ping=True, pool_recycle=1800)
+        apply_sqlite_profile(replica)
+        return replica
+    return create_engine(url, connect_args={"options": "-c statement_timeout=30000", "connect_timeout": 3},
+                         pool_size=pool_size, pool_pre_ping=True, pool_recycle=1800, max_overflow=2)
+
+
+class ReplicaSet:
+    """Replica engines (one per lane per replica) plus a cached health/lag verdict per replica."""
+
+    def __init__(self, urls: List[str]):
+        self.urls = list(urls)
+        self.lane_engines: List[Dict[str, Engine]] = []
+        for url in self.urls:
+            per_lane = {
+                lane: _replica_engine(url, REPLICA_DB_CONNECTIONS or cfg["db_connections"])
+                for lane, cfg in LANE_CONFIG.items()
+            }
+            for replica in per_lane.values():
+                self.watch(replica, len(self.lane_engines))
+            self.lane_engines.append(per_lane)
+        # Health probes use the interactive engine of each replica
+        self.engines = [per_lane[INTERACTIVE] for per_lane in self.lane_engines]
+        self._healthy = [False] * len(self.engines)
+        self._lag = [None] * len(self.engines)
+        self._next = 0
+        self._lock = threading.Lock()
+        self._monitor_thread = None
+
+    def watch(self, replica_engine, index: int):
+        """Mark replica `index` down when a connection error surfaces on `replica_engine`."""
+        def handle_error(context):
+            if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+                self.mark_down(index, context.original_exception)
+        event.listen(replica_engine, "handle_error", handle_error)
+
+    def mark_down(self, index: int, reason):
+        if self._healthy[index]:
+            logger.warning(f"Read replica {index} unavailable ({reason}); reading from the primary.")
+        self._healthy[index] = False
+
+    def _check(self, index: int):
+        replica = self.engines[index]
+        probe = LAG_PROBES.get(replica.dialect.name, _reachable)
+        try:
+            with replica.connect() as connection:
+                lag = probe(connection)
+        except Exception as e:
+            self.mark_down(index, e)
+            return
+        self._lag[index] = lag
+        healthy = lag <= REPLICA_MAX_LAG_SECONDS
+        if not healthy and self._healthy[index]:
+            logger.warning(f"Read replica {index} lags {lag:.1f}s; reading from the primary.")
+        self._healthy[index] = healthy
+
+    def check_all(self):
+        for index in range(len(self.engines)):
+            self._check(index)
+
+    def _monitor(self):
+        while True:
+            self.check_all()
+            time.sleep(REPLICA_CHECK_SECONDS)
+
+    def _ensure_monitor(self):
+        # Probes run off the request path (async sessions route from the event loop)
+        if self._monitor_thread is None:
+            with self._lock:
+                if self._monitor_thread is None:
+                    self._monitor_thread = threading.Thread(target=self._monitor, name="replica-health", daemon=True)
+                    self._monitor_thread.start()
+
+    def engine_for(self, index: int, lane: str) -> Engine:
+        return self.lane_engines[index].get(lane, self.engines[index])
+
+    def healthy(self, index: int) -> bool:
+        """Last verdict; replicas count as down until their first check has passed."""
+        self._ensure_monitor()
+        return self._healthy[index]
+
+    def pick(self, preferred: Optional[int] = None) -> Optional[int]:
+        """A healthy replica (`preferred` if it still is, else round-robin), or None for the primary."""
+        if preferred is not None and self.healthy(preferred):
+            return preferred
+        for _ in range(len(self.engines)):
+            index = self._next % len(self.engines)
+            self._next += 1
+            if self.healthy(index):
+                return index
+        return None
+
+    def status(self) -> List[dict]:
+        return [
+            {"replica": i, "healthy": self._healthy[i], "lag_seconds": self._lag[i]}
+            for i in range(len(self.engines))
+        ]
+
+
+replicas = ReplicaSet(DATABASE_REPLICA_URLS)
+
+
+def replica_for(session: Session, clause=None) -> Optional[int]:
+    """Index of the replica this session should read from now, or None for the primary."""
+    if not replicas.engines or session.info.get(_WROTE):
+        return None
+    marked = clause is not None and hasattr(clause, "get_execution_options") and clause.get_execution_options().get("replica")
+    if not (session.info.get(READ_ONLY) or marked):
+        return None
+    # Pinned per session so consecutive reads see one replica's snapshot
+    index = replicas.pick(session.info.get(_REPLICA))
+    session.info[_REPLICA] = index
+    return index
+
+
+@event.listens_for(Session, "before_flush")
+def _stick_after_flush(session: Session, flush_context, instances):
+    session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _stick_after_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WROTE] = True
+
+
+class LaneRoutingSession(Session):
+    """
+    Session that binds to the engine of the lane it is first used from, or to
+    a read replica for read-only sessions and statements marked replica=True.
+    The lane is pinned for the session's life, so one transaction never spans
+    two engines. An explicit bind= is used as given.
+    """
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.bind is not None:
+            return self.bind
+        lane = self.info.setdefault(_LANE, current_lane_name())
+        index = replica_for(self, clause)
+        if index is not None:
+            return replicas.engine_for(index, lane)
+        return LANE_ENGINES.get(lane, engine)
+
+SessionLocal = sessionmaker(class_=LaneRoutingSession, autocommit=False, autoflush=False)
+# Reads that tolerate replica lag (dashboard polling, feeds, exports); a write sticks the session to the primary
+ReadSessionLocal = sessionmaker(class_=LaneRoutingSession, autocommit=False, autoflush=False,
+                                info={READ_ONLY: True})
+
+
+@contextmanager
+def read_replica(session: Session):
+    """Route this session's reads to a replica inside the block (until it writes)."""
+    previous = session.info.get(READ_ONLY)
+    session.info[READ_ONLY] = True
+    try:
+        yield session
+    finally:
+        session.info[READ_ONLY] = previous
+
+# SQLite: hot write paths (scheduler lead saves, metrics) go through one
+# writer thread that commits many small writes per transaction
+sqlite_writer = SQLiteWriter(DATABASE_URL) if "sqlite" in DATABASE_URL and SQLITE_SINGLE_WRITER else None
+
+
+def write(fn, *args, **kwargs):
+    """
+    Run `fn(session, *args, **kwargs)` in a committed write transaction and
+    return its result. On SQLite the job joins the single writer's next batch;
+    elsewhere it runs here on a fresh session. `fn` must not commit, and
+    should return ids or plain values rather than ORM objects.
+    """
+    if sqlite_writer is not None:
+        return sqlite_writer.submit(fn, *args, **kwargs).result()
+    db = SessionLocal()
+    try:
+        result = fn(db, *args, **kwargs)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def write_later(fn, *args, **kwargs):
+    """Fire-and-forget `write`: on SQLite the caller does not wait for the batch; failures are logged."""
+    if sqlite_writer is not None:
+        future = sqlite_writer.submit(fn, *args, **kwargs)
+        future.add_done_callback(
+            lambda f: f.exception() and logger.error(f"Background write {getattr(fn, '__name__', fn)} failed: {f.exception()}")
+        )
+        return
+    try:
+        write(fn, *args, **kwargs)
+    except Exception as e:
+        logger.error(f"Write {getattr(fn, '__name__', fn)} failed: {e}")
+
+def lane_pool_status(lane: str) -> dict:
+    pool = LANE_ENGINES[lane].pool
+    status = {"size": LANE_CONFIG[lane]["db_connections"]}
+    for metric in ("checkedout", "checkedin", "overflow"):
+        if hasattr(pool, metric):
+            status[metric] = getattr(pool, metric)()
+    return status
 
 def get_db():
     db = SessionLocal()
@@ -47,3 +316,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """get_db for read endpoints: reads go to a replica when one is configured and healthy."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
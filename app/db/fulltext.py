@@ -0,0 +1,211 @@
+import os
+import re
+import logging
+from typing import List, Optional, Tuple
+from sqlalchemy import event, text, func, literal_column, column, or_
+from sqlalchemy.orm import Session, Query
+from app.models.lead import Lead
+
+logger = logging.getLogger(__name__)
+
+# Full-text index over the searchable lead text:
+#   title (product_category), buyer_request_snippet, location_raw
+# SQLite: FTS5 external-content table `leads_fts` kept in sync by triggers.
+#   It is keyed on leads.rowid, which is implicit (the primary key is a UUID),
+#   so VACUUM is free to renumber it: vacuum with vacuum_sqlite(), which
+#   rebuilds the index afterwards, not with a bare VACUUM.
+# Postgres: generated `search_vector` tsvector column with a GIN index.
+# Searches use prefix matching on every term and rank by bm25 / ts_rank_cd.
+FTS_TABLE = "leads_fts"
+FTS_WEIGHTS = (10.0, 4.0, 2.0)  # title matches outrank snippet, then location
+PG_TEXT_SEARCH_CONFIG = os.getenv("PG_TEXT_SEARCH_CONFIG", "simple")
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, buyer_request_snippet, location_raw,
+        content='leads', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS leads_fts_ai AFTER INSERT ON leads BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, buyer_request_snippet, location_raw)
+        VALUES (new.rowid, new.title, new.buyer_request_snippet, new.location_raw);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS leads_fts_ad AFTER DELETE ON leads BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, buyer_request_snippet, location_raw)
+        VALUES ('delete', old.rowid, old.title, old.buyer_request_snippet, old.location_raw);
+    END""",
+    # Only text changes touch the index; status/tap updates stay cheap
+    f"""CREATE TRIGGER IF NOT EXISTS leads_fts_au AFTER UPDATE OF title, buyer_request_snippet, location_raw ON leads BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, buyer_request_snippet, location_raw)
+        VALUES ('delete', old.rowid, old.title, old.buyer_request_snippet, old.location_raw);
+        INSERT INTO {FTS_TABLE}(rowid, title, buyer_request_snippet, location_raw)
+        VALUES (new.rowid, new.title, new.buyer_request_snippet, new.location_raw);
+    END""",
+]
+
+_PG_DDL = [
+    f"""ALTER TABLE leads ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{PG_TEXT_SEARCH_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{PG_TEXT_SEARCH_CONFIG}', coalesce(buyer_request_snippet, '')), 'B') ||
+        setweight(to_tsvector('{PG_TEXT_SEARCH_CONFIG}', coalesce(location_raw, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_leads_search_vector ON leads USING GIN (search_vector)",
+]
+
+_available = {}
+
+
+def ensure_fulltext_index(connection, rebuild: bool = False) -> bool:
+    """
+    Create the full-text index for the connection's dialect (idempotent).
+    rebuild=True re-populates the SQLite index from `leads` (needed once after
+    adding it to an existing table, or after a VACUUM; see vacuum_sqlite).
+    """
+    dialect = connection.dialect.name
+    try:
+        if dialect == "sqlite":
+            exists = connection.exec_driver_sql(
+                f"SELECT 1 FROM sqlite_master WHERE type='table' AND name='{FTS_TABLE}'"
+            ).first() is not None
+            for ddl in _SQLITE_DDL:
+                connection.exec_driver_sql(ddl)
+            if rebuild or not exists:
+                connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif dialect == "postgresql":
+            for ddl in _PG_DDL:
+                connection.exec_driver_sql(ddl)
+        else:
+            return False
+    except Exception as e:
+        logger.error(f"FULLTEXT: Could not create index on {dialect}: {e}")
+        return False
+    _available.pop(str(connection.engine.url), None)
+    return True
+
+
+def vacuum_sqlite(engine) -> bool:
+    """VACUUM a SQLite database, then re-sync leads_fts to the (possibly renumbered) rowids."""
+    if engine.dialect.name != "sqlite":
+        return False
+    # VACUUM cannot run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("VACUUM")
+    with engine.begin() as connection:
+        return ensure_fulltext_index(connection, rebuild=True)
+
+
+@event.listens_for(Lead.__table__, "after_create")
+def _create_fulltext_after_leads(target, connection, **kw):
+    ensure_fulltext_index(connection)
+
+
+def fulltext_available(db: Session) -> bool:
+    """Whether the index exists for this session's database (cached per engine)."""
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _available:
+        try:
+            if bind.dialect.name == "sqlite":
+                found = db.execute(text(
+                    f"SELECT 1 FROM sqlite_master WHERE type='table' AND name='{FTS_TABLE}'"
+                )).first()
+            elif bind.dialect.name == "postgresql":
+                found = db.execute(text(
+                    "SELECT 1 FROM information_schema.columns WHERE table_name='leads' AND column_name='search_vector'"
+                )).first()
+            else:
+                found = None
+            _available[key] = found is not None
+        except Exception as e:
+            logger.error(f"FULLTEXT: Availability check failed: {e}")
+            db.rollback()
+            return False
+        if not _available[key]:
+            logger.warning("FULLTEXT: Index missing, falling back to ILIKE scans (run scripts/apply_fulltext_index.py)")
+    return _available[key]
+
+
+def _terms(search: str) -> List[str]:
+    return re.findall(r"\w+", (search or "").lower())
+
+
+def build_match_query(search: str, dialect: str = "sqlite") -> Optional[str]:
+    """
+    Turn free user text into a safe prefix query: every term must match,
+    and each term also matches words it prefixes ("gen" -> "generator").
+    """
+    terms = _terms(search)
+    if not terms:
+        return None
+    if dialect == "postgresql":
+        return " & ".join(f"{t}:*" for t in terms)
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def _pg_vector():
+    return literal_column("leads.search_vector")
+
+
+def _pg_tsquery(match: str):
+    return func.to_tsquery(literal_column(f"'{PG_TEXT_SEARCH_CONFIG}'::regconfig"), match)
+
+
+def apply_fulltext_filter(db: Session, query: Query, search: str) -> Query:
+    """Restrict a Lead query to full-text matches (ILIKE fallback when no index)."""
+    dialect = db.get_bind().dialect.name
+    match = build_match_query(search, dialect)
+    if not match:
+        return query
+    if not fulltext_available(db):
+        return query.filter(or_(
+            Lead.title.ilike(f"%{search}%"),
+            Lead.buyer_request_snippet.ilike(f"%{search}%"),
+            Lead.location_raw.ilike(f"%{search}%")
+        ))
+    if dialect == "postgresql":
+        return query.filter(_pg_vector().op("@@")(_pg_tsquery(match)))
+    return query.filter(text(
+        f"leads.rowid IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_q)"
+    ).bindparams(fts_q=match))
+
+
+def search_leads(db: Session, search: str, limit: int = 50, offset: int = 0) -> List[Tuple[Lead, float]]:
+    """
+    Ranked full-text search. Returns (lead, score) pairs, best first;
+    higher score is better on both backends.
+    """
+    dialect = db.get_bind().dialect.name
+    match = build_match_query(search, dialect)
+    if not match:
+        return []
+
+    if not fulltext_available(db):
+        leads = apply_fulltext_filter(db, db.query(Lead), search)\
+            .order_by(Lead.created_at.desc()).offset(offset).limit(limit).all()
+        return [(lead, 0.0) for lead in leads]
+
+    if dialect == "postgresql":
+        rank = func.ts_rank_cd(_pg_vector(), _pg_tsquery(match)).label("rank")
+        rows = (
+            db.query(Lead, rank)
+            .filter(_pg_vector().op("@@")(_pg_tsquery(match)))
+            .order_by(rank.desc(), Lead.created_at.desc())
+            .offset(offset).limit(limit).all()
+        )
+        return [(lead, float(score or 0.0)) for lead, score in rows]
+
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    hits = text(
+        f"SELECT rowid AS fts_rowid, bm25({FTS_TABLE}, {weights}) AS rank FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH :fts_q ORDER BY rank LIMIT :fts_limit OFFSET :fts_offset"
+    ).bindparams(fts_q=match, fts_limit=limit, fts_offset=offset).columns(
+        column("fts_rowid"), column("rank")
+    ).subquery("fts_hits")
+    rows = (
+        db.query(Lead, hits.c.rank)
+        .join(hits, literal_column("leads.rowid") == hits.c.fts_rowid)
+        .order_by(hits.c.rank)
+        .all()
+    )
+    # bm25 is "lower is better" and negative; flip it so callers can sort descending
+    return [(lead, -float(score)) for lead, score in rows]
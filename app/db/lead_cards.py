@@ -0,0 +1,167 @@
+import os
+import json
+import weakref
+import logging
+from itertools import chain
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Sequence
+from sqlalchemy import event, inspect, select, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models.lead import Lead
+from app.intelligence_v2.thresholds import STRICT_PUBLIC
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger(__name__)
+
+# Lead cards: the JSON a list endpoint returns for one lead, rendered once.
+# Lead.to_dict() builds an outreach message and WhatsApp link per lead and
+# the response is then re-encoded by FastAPI; list endpoints instead read
+# these bytes (one IN query per page) and splice them into the response.
+# A card is dropped whenever its lead is flushed (status, taps, rescoring)
+# and is also ignored if leads.updated_at moved since it was rendered, so a
+# card stored by a read racing a write cannot outlive the next read.
+LEAD_CARDS = os.getenv("LEAD_CARDS", "true").lower() == "true"
+
+_ready = weakref.WeakSet()
+
+
+def _table():
+    from app.db.models import LeadCard
+    return LeadCard.__table__
+
+
+def cards_ready(connection) -> bool:
+    """True once lead_cards exists on this engine (positive result cached)."""
+    if not LEAD_CARDS:
+        return False
+    engine = connection.engine
+    if engine in _ready:
+        return True
+    if inspect(connection).has_table(_table().name):
+        _ready.add(engine)
+        return True
+    return False
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes (orjson when installed)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def render_card(lead: Lead) -> bytes:
+    card = lead.to_dict()
+    card["is_hot_lead"] = (lead.confidence_score or 0) >= STRICT_PUBLIC
+    # LeadResponse names used by /agents/{id}/leads
+    card["content"] = lead.buyer_request_snippet
+    card["contact_phone"] = lead.contact_phone
+    return dumps(card)
+
+
+def splice_json(envelope: Dict[str, Any], key: str, cards: Sequence[bytes]) -> bytes:
+    """`envelope` as JSON with `key` set to the array of pre-encoded `cards`, without re-encoding them."""
+    head = dumps({k: v for k, v in envelope.items() if k != key})
+    array = b"[" + b",".join(cards) + b"]"
+    if head == b"{}":
+        return b'{"' + key.encode() + b'":' + array + b"}"
+    return head[:-1] + b',"' + key.encode() + b'":' + array + b"}"
+
+
+# --- Invalidation -------------------------------------------------------
+
+@event.listens_for(Session, "after_flush")
+def _drop_stale_cards(session: Session, flush_context):
+    stale = [
+        o.id for o in chain(session.dirty, session.deleted)
+        if isinstance(o, Lead) and (o in session.deleted or session.is_modified(o, include_collections=False))
+    ]
+    if not stale:
+        return
+    connection = session.connection()
+    if cards_ready(connection):
+        table = _table()
+        connection.execute(delete(table).where(table.c.lead_id.in_(stale)))
+
+
+def invalidate_cards(db: Session, lead_ids: Iterable):
+    """Drop cards for leads changed by Core statements (atomic upserts, bulk updates). Does not commit."""
+    lead_ids = list(lead_ids)
+    connection = db.connection()
+    if lead_ids and cards_ready(connection):
+        table = _table()
+        connection.execute(delete(table).where(table.c.lead_id.in_(lead_ids)))
+
+
+def sweep_cards(db: Session, *criteria) -> int:
+    """Drop cards of the leads matching `criteria`; call before a bulk DELETE/UPDATE of leads."""
+    connection = db.connection()
+    if not cards_ready(connection):
+        return 0
+    table = _table()
+    return connection.execute(
+        delete(table).where(table.c.lead_id.in_(select(Lead.id).where(*criteria)))
+    ).rowcount
+
+
+# --- Read path ----------------------------------------------------------
+
+def _store(db: Session, leads: List[Lead], bodies: List[bytes]):
+    table = _table()
+    now = datetime.utcnow()
+    rows = [
+        {"lead_id": lead.id, "lead_updated_at": lead.updated_at, "body": body, "rendered_at": now}
+        for lead, body in zip(leads, bodies)
+    ]
+    dialect = db.get_bind().dialect.name
+    insert = pg_insert if dialect == "postgresql" else sqlite_insert
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.lead_id],
+        set_={"lead_updated_at": stmt.excluded.lead_updated_at, "body": stmt.excluded.body,
+              "rendered_at": stmt.excluded.rendered_at},
+    )
+    try:
+        db.execute(stmt, rows)
+        db.commit()
+    except Exception as e:
+        # A cache write must never fail the read (e.g. SQLite busy with another writer)
+        db.rollback()
+        logger.debug(f"Lead cards not stored: {e}")
+
+
+def lead_cards(db: Session, leads: Sequence[Lead], store: bool = True) -> List[bytes]:
+    """
+    Card bytes for `leads`, in order. Missing or outdated cards are rendered
+    and (store=True) written back in one statement; the write-back commits,
+    so call this from read-only sessions.
+    """
+    if not leads:
+        return []
+    if not cards_ready(db.connection()):
+        return [render_card(lead) for lead in leads]
+
+    table = _table()
+    rows = db.execute(
+        select(table.c.lead_id, table.c.lead_updated_at, table.c.body)
+        .where(table.c.lead_id.in_([lead.id for lead in leads]))
+    ).all()
+    cached = {row.lead_id: row for row in rows}
+    bodies, missing = [], []
+    for lead in leads:
+        row = cached.get(lead.id)
+        if row is not None and row.lead_updated_at == lead.updated_at:
+            bodies.append(row.body)
+        else:
+            bodies.append(render_card(lead))
+            missing.append(len(bodies) - 1)
+    if missing and store:
+        _store(db, [leads[i] for i in missing], [bodies[i] for i in missing])
+    return bodies
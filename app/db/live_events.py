@@ -0,0 +1,99 @@
+from itertools import chain
+from typing import Any, Dict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models.lead import Lead
+from app.models.agent import Agent
+from app.models.notification import Notification
+from app.core.event_hub import hub
+
+# Publishes dashboard events (app/core/event_hub.py) for committed writes:
+# lead inserts/updates/deletes (+ a "stats" delta), new or changed
+# notifications, and agent status changes. Collected per transaction in
+# session.info, sent after commit, dropped on rollback. Core statements run
+# through Session.execute are seen in do_orm_execute without row ids;
+# atomic upserts call queue_event() with theirs.
+AGENT_STATUS_FIELDS = {"active", "is_running", "name", "query", "location", "end_time"}
+_PENDING = "_live_events_pending"
+
+
+def _pending(session: Session) -> Dict[str, Dict[str, Any]]:
+    return session.info.setdefault(_PENDING, {})
+
+
+def queue_event(session: Session, topic: str, **data):
+    """Queue `topic` for publishing when `session` commits; list values are merged, counts added."""
+    events = _pending(session)
+    current = events.setdefault(topic, {})
+    for key, value in data.items():
+        if isinstance(value, list):
+            current.setdefault(key, []).extend(value)
+        elif isinstance(value, int) and not isinstance(value, bool):
+            current[key] = current.get(key, 0) + value
+        else:
+            current[key] = value
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_events(session: Session, flush_context):
+    inserted = [o for o in session.new if isinstance(o, Lead)]
+    updated = [
+        o for o in session.dirty
+        if isinstance(o, Lead) and session.is_modified(o, include_collections=False)
+    ]
+    deleted = [o for o in session.deleted if isinstance(o, Lead)]
+    if inserted or updated or deleted:
+        queue_event(session, "leads",
+                    inserted=[str(o.id) for o in inserted],
+                    updated=[str(o.id) for o in updated],
+                    deleted=[str(o.id) for o in deleted])
+        queue_event(session, "stats", new_leads=len(inserted), removed_leads=len(deleted))
+
+    notifications = [o for o in chain(session.new, session.dirty, session.deleted) if isinstance(o, Notification)]
+    if notifications:
+        queue_event(session, "notifications", created=sum(1 for o in notifications if o in session.new))
+
+    agents = [
+        str(o.id) for o in chain(session.new, session.dirty, session.deleted)
+        if isinstance(o, Agent) and (
+            o in session.new or o in session.deleted
+            or AGENT_STATUS_FIELDS & set(inspect(o).committed_state)
+        )
+    ]
+    if agents:
+        queue_event(session, "agents", ids=agents)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statements(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    statement = orm_execute_state.statement
+    table = getattr(statement, "table", None)
+    if table is None:
+        return
+    session = orm_execute_state.session
+    if table.name in ("leads", "lead_details"):
+        queue_event(session, "leads", bulk=True)
+        queue_event(session, "stats", bulk=True)
+    elif table.name == "notifications":
+        queue_event(session, "notifications", bulk=True)
+    elif table.name == "agents":
+        # Heartbeats are Core UPDATEs too; only status changes reach the dashboard
+        if orm_execute_state.is_update and not AGENT_STATUS_FIELDS & set(statement.compile().params):
+            return
+        queue_event(session, "agents", bulk=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session):
+    events = session.info.pop(_PENDING, None)
+    if not events:
+        return
+    for topic, data in events.items():
+        hub.publish(topic, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session):
+    session.info.pop(_PENDING, None)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, JSON, ForeignKey, Enum, Integer, Text, UniqueConstraint
+from sqlalchemy import event, Column, String, Float, DateTime, JSON, ForeignKey, Enum, Integer, Text, UniqueConstraint, LargeBinary, BigInteger, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -8,7 +8,8 @@ import hashlib
 from app.db.base_class import Base
 
 # Imported definitions
-from app.models.lead import Lead, ContactStatus, CRMStatus
+from app.models.lead import Lead, LeadDetail, ContactStatus, CRMStatus
+from app.models.agent import Agent
 
 class BuyerLead(Base):
     """
@@ -36,6 +37,8 @@ class AgentRunLog(Base):
     leads_found = Column(Integer, default=0)
     errors = Column(Text, nullable=True)
     duration_ms = Column(Integer, default=0)
+    status = Column(String, default="success") # success, timeout, error
+    profile = Column(JSON, nullable=True) # {"total_ms": .., "stages": {stage: {ms, max_ms, calls, items, errors}}}
 
     agent = relationship("Agent", backref="run_logs")
 
@@ -46,7 +49,36 @@ class AgentRunLog(Base):
             "run_time": self.run_time.isoformat() if self.run_time else None,
             "leads_found": self.leads_found,
             "errors": self.errors,
-            "duration_ms": self.duration_ms
+            "duration_ms": self.duration_ms,
+            "status": self.status
+        }
+
+class AgentSourceCursor(Base):
+    """
+    Per-(agent, source) high-water mark for incremental agent runs.
+    Each run only asks a source for content newer than this mark (plus a small
+    overlap) and drops already-seen URLs before scoring.
+    """
+    __tablename__ = "agent_source_cursors"
+    __table_args__ = (UniqueConstraint("agent_id", "source", name="uq_agent_source_cursor"),)
+
+    id = Column(Integer, primary_key=True)
+    agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.id", ondelete="CASCADE"), index=True, nullable=False)
+    source = Column(String, nullable=False)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)   # last successful run that queried this source
+    last_post_at = Column(DateTime(timezone=True), nullable=True)  # newest post timestamp observed
+    seen_urls = Column(JSON, default=list)                         # bounded, most recent last
+    cursor = Column(JSON, nullable=True)                           # engine-specific resume token, when available
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def to_dict(self):
+        return {
+            "agent_id": str(self.agent_id),
+            "source": self.source,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_post_at": self.last_post_at.isoformat() if self.last_post_at else None,
+            "seen_urls": len(self.seen_urls or []),
+            "cursor": self.cursor,
         }
 
 class BuyerIntent(Base):
@@ -122,6 +154,127 @@ class CategoryMetric(Base):
     verified_rate = Column(Float, default=0.0)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+class LeadStatsRollup(Base):
+    """
+    Pre-aggregated lead counters per (grain, bucket, category) for the stats
+    endpoints. Kept current by app.db.rollups on every flush and reconciled
+    from `leads` by the reconcile_stats_rollups task.
+    """
+    __tablename__ = "lead_stats_rollups"
+    __table_args__ = (UniqueConstraint("grain", "bucket", "category", name="uq_lead_stats_rollup"),)
+
+    id = Column(Integer, primary_key=True)
+    grain = Column(String, nullable=False)      # hour, day
+    bucket = Column(DateTime, nullable=False)   # bucket start (UTC, naive like leads.created_at)
+    category = Column(String, nullable=False)   # leads.title
+    leads = Column(Integer, default=0, nullable=False)
+    strict_public = Column(Integer, default=0, nullable=False)  # confidence_score >= STRICT_PUBLIC
+    high_intent = Column(Integer, default=0, nullable=False)    # confidence_score >= HIGH_INTENT
+    urgent = Column(Integer, default=0, nullable=False)         # urgency_level == "high"
+    urgent_any = Column(Integer, default=0, nullable=False)     # ... or urgency_score > 0.7
+    intent_high = Column(Integer, default=0, nullable=False)    # intent_score > 0.8
+    whatsapp = Column(Integer, default=0, nullable=False)       # whatsapp_link set
+    taps = Column(Integer, default=0, nullable=False)           # sum(tap_count)
+    contacted = Column(Integer, default=0, nullable=False)      # status past NEW
+    converted = Column(Integer, default=0, nullable=False)      # status CONVERTED
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class LeadChange(Base):
+    """
+    Append-only change log of the leads table. `seq` only ever grows, so
+    downstream consumers sync with GET /leads/changes?since=<cursor>.
+    Written by app.db.changefeed; trimmed after CHANGEFEED_RETENTION_DAYS.
+    """
+    __tablename__ = "lead_changes"
+    __table_args__ = (
+        Index("ix_lead_changes_txid_seq", "txid", "seq"),
+        {"sqlite_autoincrement": True},  # never reuse a trimmed seq
+    )
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    lead_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # no FK: deletes are logged too
+    op = Column(String, nullable=False)  # insert, update, upsert, delete
+    fields = Column(JSON, nullable=True)  # changed columns for ORM updates
+    changed_at = Column(DateTime, nullable=False, index=True)
+    # Writing transaction on Postgres (defaulted by the database); readers order by (txid, seq)
+    txid = Column(BigInteger, nullable=True)
+
+    def to_dict(self):
+        return {
+            "seq": self.seq,
+            "lead_id": str(self.lead_id),
+            "op": self.op,
+            "fields": self.fields,
+            "changed_at": self.changed_at.isoformat() if self.changed_at else None,
+        }
+
+class LeadCard(Base):
+    """
+    Pre-serialized list-endpoint JSON of a lead (Lead.to_dict() plus list
+    extras), rendered on first read and dropped whenever the lead is
+    flushed. Maintained by app.db.lead_cards.
+    """
+    __tablename__ = "lead_cards"
+
+    lead_id = Column(UUID(as_uuid=True), primary_key=True)  # no FK: bulk deletes sweep separately
+    lead_updated_at = Column(DateTime, nullable=True)  # leads.updated_at the card was rendered from
+    body = Column(LargeBinary, nullable=False)
+    rendered_at = Column(DateTime, nullable=False)
+
+class RawCapture(Base):
+    """
+    Index of the raw-capture segment files: where the raw scraper payload
+    with this content hash lives. The payload itself is only on disk,
+    zstd-compressed (app.core.raw_capture). `content_hash` uses the
+    AgentRawLead scheme (md5 of the normalized text), so raw leads find
+    their payload here.
+    """
+    __tablename__ = "raw_captures"
+
+    content_hash = Column(String(32), primary_key=True)
+    segment = Column(String, nullable=False)
+    frame_offset = Column(Integer, nullable=False)  # byte offset of the compressed frame in the segment
+    line = Column(Integer, nullable=False)  # record position inside the frame
+    source = Column(String, nullable=True, index=True)
+    url = Column(String, nullable=True)
+    captured_at = Column(DateTime, nullable=False, index=True)
+
+class OutboxMessage(Base):
+    """
+    Pending outbound delivery (in-app notification, email or webhook call).
+    Discovery code only inserts rows; app.core.delivery claims due rows,
+    groups them per destination and sends them. While a row is "sending",
+    `next_attempt_at` is its claim lease, so a worker that dies mid-send
+    does not lose rows.
+    """
+    __tablename__ = "delivery_outbox"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    channel = Column(String, nullable=False)  # notification, email, webhook
+    destination = Column(String, nullable=False)  # agent id, email address or URL
+    subject = Column(String, nullable=True)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, sending, sent, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, index=True)
+    sent_at = Column(DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "channel": self.channel,
+            "destination": self.destination,
+            "subject": self.subject,
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
 class SystemSetting(Base):
     __tablename__ = "system_settings"
     
@@ -129,3 +282,19 @@ class SystemSetting(Base):
     key = Column(String, unique=True, index=True)
     value = Column(JSON)
     updated_at = Column(DateTime, onupdate=func.now())
+
+# Registers the full-text index DDL on the leads table (FTS5 / tsvector)
+from app.db import fulltext  # noqa: E402,F401
+# Keeps lead_stats_rollups current as leads are flushed
+from app.db import rollups  # noqa: E402,F401
+event.listen(LeadStatsRollup.__table__, "after_create", rollups.rollups_table_created)
+event.listen(Agent.__table__, "after_create", rollups.agents_table_created)
+# Appends lead_changes rows as leads are flushed
+from app.db import changefeed  # noqa: E402,F401
+event.listen(LeadChange.__table__, "after_create", changefeed.TXID_DEFAULT_DDL.execute_if(dialect="postgresql"))
+# Drops cached lead cards as leads are flushed
+from app.db import lead_cards  # noqa: E402,F401
+# Bumps response-cache versions of the resources a commit wrote
+from app.db import resource_versions  # noqa: E402,F401
+# Publishes dashboard push events for committed writes
+from app.db import live_events  # noqa: E402,F401
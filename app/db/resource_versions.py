@@ -0,0 +1,51 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.response_cache import bump
+
+# Bumps the response-cache version of every resource a committed
+# transaction wrote (app/core/response_cache.py). ORM flushes are seen in
+# after_flush; Core/bulk statements run through Session.execute (atomic
+# upserts, query.update()/delete()) in do_orm_execute. Raw SQL outside a
+# Session is only picked up when the cache entry's ttl runs out.
+TABLE_RESOURCES = {
+    "leads": "leads",
+    "lead_details": "leads",
+    "agents": "agents",
+    "notifications": "notifications",
+}
+_PENDING = "_resource_versions_pending"
+
+
+def _mark(session: Session, tables):
+    resources = {TABLE_RESOURCES[t] for t in tables if t in TABLE_RESOURCES}
+    if resources:
+        session.info.setdefault(_PENDING, set()).update(resources)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed(session: Session, flush_context):
+    _mark(session, {
+        obj.__table__.name
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if hasattr(obj, "__table__")
+    })
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statements(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _mark(orm_execute_state.session, {table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session: Session):
+    resources = session.info.pop(_PENDING, None)
+    if resources:
+        bump(resources)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session):
+    session.info.pop(_PENDING, None)
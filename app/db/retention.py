@@ -0,0 +1,244 @@
+import os
+import re
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, date
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import and_, delete, inspect, select, text
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.db.models import Lead, LeadDetail, LeadChange, RawCapture, OutboxMessage
+from app.models.agent_raw_lead import AgentRawLead
+from app.db.changefeed import CHANGEFEED_RETENTION_DAYS, record_bulk_delete
+from app.db.lead_cards import sweep_cards
+from app.db.rollups import rollups_ready, prune_rollups, refresh_agent_counters
+from app.core.delivery import DELIVERY_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Retention for the append-heavy tables, run by the cleanup_old_leads task.
+# A single `DELETE ... WHERE created_at < cutoff` is one huge transaction
+# (WAL bloat, the write lock held against ingestion, index maintenance on
+# every index at once). Instead, per table:
+#   * Postgres, table partitioned by day (scripts/partition_tables.py):
+#     expired daily partitions are detached and dropped, and the next
+#     RETENTION_PARTITIONS_AHEAD days are created ahead of the writes;
+#   * otherwise: bounded chunks of RETENTION_CHUNK_SIZE rows in keyset order
+#     on the retention column's index, one short transaction each, with
+#     RETENTION_CHUNK_PAUSE_MS between chunks so queued writers get in.
+# A run stops after RETENTION_MAX_SECONDS per table; the rest goes next run.
+# Retention of 0 days keeps a table forever.
+LEADS_RETENTION_DAYS = int(os.getenv("LEADS_RETENTION_DAYS", "4"))
+RAW_LEADS_RETENTION_DAYS = int(os.getenv("RAW_LEADS_RETENTION_DAYS", "7"))
+RETENTION_CHUNK_SIZE = int(os.getenv("RETENTION_CHUNK_SIZE", "500"))
+RETENTION_CHUNK_PAUSE_MS = float(os.getenv("RETENTION_CHUNK_PAUSE_MS", "100"))
+RETENTION_MAX_SECONDS = float(os.getenv("RETENTION_MAX_SECONDS", "600"))
+RETENTION_PARTITIONS_AHEAD = int(os.getenv("RETENTION_PARTITIONS_AHEAD", "3"))
+
+
+class RetentionPolicy:
+    """
+    Rows of `table` whose `column` is older than `days` expire. `before_delete`
+    (db, criterion) cleans up dependents of the rows about to go;
+    `after_run` (db, cutoff) fixes derived data once a run removed rows.
+    """
+
+    def __init__(self, table, column: str, days: int, before_delete: Optional[Callable] = None,
+                 after_run: Optional[Callable] = None):
+        self.table = table
+        self.column = table.c[column]
+        self.pk = list(table.primary_key.columns)[0]
+        self.days = days
+        self.before_delete = before_delete
+        self.after_run = after_run
+
+    @property
+    def name(self) -> str:
+        return self.table.name
+
+
+def _lead_dependents(db: Session, criterion):
+    record_bulk_delete(db, criterion)
+    sweep_cards(db, criterion)
+    # No FK cascade on SQLite: drop the cold halves first
+    db.execute(delete(LeadDetail).where(LeadDetail.lead_id.in_(select(Lead.id).where(criterion))))
+
+
+def _lead_aggregates(db: Session, cutoff: datetime):
+    # Bulk deletes skip the flush hook; drop the matching stats buckets
+    if rollups_ready(db.connection()):
+        prune_rollups(db, cutoff)
+    refresh_agent_counters(db)
+
+
+POLICIES: List[RetentionPolicy] = [
+    RetentionPolicy(Lead.__table__, "created_at", LEADS_RETENTION_DAYS,
+                    before_delete=_lead_dependents, after_run=_lead_aggregates),
+    RetentionPolicy(AgentRawLead.__table__, "discovered_at", RAW_LEADS_RETENTION_DAYS),
+    RetentionPolicy(LeadChange.__table__, "changed_at", CHANGEFEED_RETENTION_DAYS),
+    RetentionPolicy(RawCapture.__table__, "captured_at", RAW_LEADS_RETENTION_DAYS),
+    RetentionPolicy(OutboxMessage.__table__, "created_at", DELIVERY_RETENTION_DAYS),
+]
+
+_stats: Dict[str, dict] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(name: str, run: dict):
+    with _stats_lock:
+        totals = _stats.setdefault(name, {"runs": 0, "rows_removed": 0, "partitions_dropped": 0, "seconds": 0.0})
+        totals["runs"] += 1
+        totals["rows_removed"] += run["rows_removed"]
+        totals["partitions_dropped"] += run["partitions_dropped"]
+        totals["seconds"] = round(totals["seconds"] + run["seconds"], 3)
+        totals["last_run"] = run
+
+
+def retention_stats() -> Dict[str, dict]:
+    """Rows removed, partitions dropped and time spent per table since process start, plus the last run."""
+    with _stats_lock:
+        return {name: dict(totals) for name, totals in _stats.items()}
+
+
+# --- Postgres daily partitions ------------------------------------------
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{8})$")
+
+
+def partition_name(table_name: str, day: date) -> str:
+    return f"{table_name}_p{day:%Y%m%d}"
+
+
+def is_partitioned(connection, table_name: str) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :name AND c.relnamespace = to_regnamespace(current_schema())::oid"
+    ), {"name": table_name}).first() is not None
+
+
+def daily_partitions(connection, table_name: str) -> Dict[date, str]:
+    """Daily partitions of `table_name` by day (the default partition is not listed)."""
+    rows = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :name"
+    ), {"name": table_name}).scalars()
+    partitions = {}
+    for relname in rows:
+        match = _PARTITION_SUFFIX.search(relname)
+        if match:
+            partitions[datetime.strptime(match.group(1), "%Y%m%d").date()] = relname
+    return partitions
+
+
+def ensure_partitions(connection, policy: RetentionPolicy, start: date, days: int) -> int:
+    """Create the daily partitions for [start, start + days) that do not exist yet."""
+    existing = daily_partitions(connection, policy.name)
+    created = 0
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if day in existing:
+            continue
+        connection.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{partition_name(policy.name, day)}" PARTITION OF "{policy.name}" '
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        ))
+        created += 1
+    return created
+
+
+def _drop_expired_partitions(db: Session, policy: RetentionPolicy, cutoff: datetime) -> int:
+    dropped = 0
+    for day, relname in sorted(daily_partitions(db.connection(), policy.name).items()):
+        if datetime.combine(day + timedelta(days=1), datetime.min.time()) > cutoff:
+            break
+        if policy.before_delete:
+            start = datetime.combine(day, datetime.min.time())
+            policy.before_delete(db, and_(policy.column >= start, policy.column < start + timedelta(days=1)))
+        # Metadata-only: no row deletes, no WAL for the rows, no index maintenance
+        db.execute(text(f'ALTER TABLE "{policy.name}" DETACH PARTITION "{relname}"'))
+        db.execute(text(f'DROP TABLE "{relname}"'))
+        db.commit()
+        dropped += 1
+    return dropped
+
+
+# --- Chunked deletes ------------------------------------------------------
+
+def _delete_in_chunks(db: Session, policy: RetentionPolicy, cutoff: datetime, deadline: float,
+                      chunk_size: int, pause: float) -> Dict[str, int]:
+    removed = chunks = 0
+    last = None
+    while time.monotonic() < deadline:
+        # Seek on the retention column's index from the last chunk's position;
+        # deleted rows are gone, so ties at the boundary come back exactly once
+        query = select(policy.pk, policy.column).where(policy.column < cutoff)
+        if last is not None:
+            query = query.where(policy.column >= last)
+        rows = db.execute(query.order_by(policy.column).limit(chunk_size)).all()
+        if not rows:
+            break
+        last = rows[-1][1]
+        criterion = policy.pk.in_([row[0] for row in rows])
+        if policy.before_delete:
+            policy.before_delete(db, criterion)
+        removed += db.execute(delete(policy.table).where(criterion)).rowcount
+        db.commit()
+        chunks += 1
+        if len(rows) < chunk_size:
+            break
+        time.sleep(pause)
+    return {"rows_removed": removed, "chunks": chunks}
+
+
+def apply_policy(db: Session, policy: RetentionPolicy, now: Optional[datetime] = None,
+                 chunk_size: int = RETENTION_CHUNK_SIZE, pause_ms: float = RETENTION_CHUNK_PAUSE_MS,
+                 max_seconds: float = RETENTION_MAX_SECONDS) -> dict:
+    """Expire one table's old rows; commits as it goes. Returns this run's counts."""
+    started = time.monotonic()
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=policy.days)
+    run = {"cutoff": cutoff.isoformat(), "rows_removed": 0, "partitions_dropped": 0, "chunks": 0,
+           "partitions_created": 0, "complete": True}
+
+    connection = db.connection()
+    if is_partitioned(connection, policy.name):
+        run["partitions_created"] = ensure_partitions(connection, policy, now.date(), RETENTION_PARTITIONS_AHEAD + 1)
+        db.commit()
+        run["partitions_dropped"] = _drop_expired_partitions(db, policy, cutoff)
+    # Non-partitioned tables, plus whatever a partitioned table keeps in its default partition
+    deadline = started + max_seconds
+    run.update(_delete_in_chunks(db, policy, cutoff, deadline, chunk_size, pause_ms / 1000))
+    run["complete"] = time.monotonic() < deadline
+    if policy.after_run and (run["rows_removed"] or run["partitions_dropped"]):
+        policy.after_run(db, cutoff)
+        db.commit()
+    run["seconds"] = round(time.monotonic() - started, 3)
+    return run
+
+
+def apply_retention(policies: Optional[List[RetentionPolicy]] = None, session_factory=SessionLocal,
+                    now: Optional[datetime] = None) -> Dict[str, dict]:
+    """Run every policy (tables missing on this database are skipped); one table failing does not stop the rest."""
+    results = {}
+    for policy in POLICIES if policies is None else policies:
+        if policy.days <= 0:
+            continue
+        db = session_factory()
+        try:
+            if not inspect(db.connection()).has_table(policy.name):
+                continue
+            run = apply_policy(db, policy, now=now)
+            _record(policy.name, run)
+            results[policy.name] = run
+            logger.info(f"Retention {policy.name}: removed {run['rows_removed']} rows, "
+                        f"dropped {run['partitions_dropped']} partitions in {run['seconds']}s")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Retention failed for {policy.name}: {e}")
+            results[policy.name] = {"error": str(e)}
+        finally:
+            db.close()
+    return results
@@ -0,0 +1,537 @@
+import os
+import time
+import weakref
+import logging
+from contextlib import contextmanager
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+from sqlalchemy import event, inspect, select, func, case, or_, and_
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.lead import Lead, CRMStatus
+from app.models.agent import Agent
+from app.intelligence_v2.thresholds import STRICT_PUBLIC, HIGH_INTENT
+
+logger = logging.getLogger(__name__)
+
+# Incrementally maintained lead counters for the stats endpoints.
+# Every flush that inserts, updates or deletes a Lead adds its delta to
+# lead_stats_rollups (hour and day buckets of created_at, per title) in the
+# same transaction, so /success/stats reads O(buckets) rows instead of
+# running COUNT(*) scans over `leads`. Core upserts of leads wrap their
+# statements in core_lead_deltas(), which applies the same deltas. Bulk
+# statements (query.delete(), raw SQL imports) bypass both, so they call
+# prune_rollups() or rely on the reconcile_stats_rollups task to rebuild
+# recent buckets from `leads`.
+# The same hook keeps the optional per-agent counters on `agents` current.
+STATS_ROLLUPS = os.getenv("STATS_ROLLUPS", "true").lower() == "true"
+# A missing table or counter column is re-probed at most this often (creating it clears the cache)
+ROLLUPS_PROBE_SECONDS = float(os.getenv("ROLLUPS_PROBE_SECONDS", "60"))
+GRAINS = ("hour", "day")
+METRICS = (
+    "leads", "strict_public", "high_intent", "urgent", "urgent_any",
+    "intent_high", "whatsapp", "taps", "contacted", "converted",
+)
+TRACKED = (
+    "created_at", "title", "confidence_score", "urgency_level", "urgency_score",
+    "intent_score", "whatsapp_link", "tap_count", "status", "agent_id", "ranked_score",
+)
+# Agents list "high intent" badge; also kept on agents.high_intent_count
+AGENT_HIGH_INTENT_SCORE = 0.7
+
+_ready = weakref.WeakSet()
+_agent_ready = weakref.WeakSet()
+_not_ready: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()  # engine -> monotonic time of the miss
+_agent_not_ready: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _table():
+    from app.db.models import LeadStatsRollup
+    return LeadStatsRollup.__table__
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def floor_bucket(dt: datetime, grain: str) -> datetime:
+    dt = _naive_utc(dt).replace(minute=0, second=0, microsecond=0)
+    return dt.replace(hour=0) if grain == "day" else dt
+
+
+def _status_value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+def lead_metrics(values: Dict) -> Dict[str, int]:
+    """Counter contributions of one lead (mirrors _metric_columns below)."""
+    conf = values.get("confidence_score")
+    urgent = values.get("urgency_level") == "high"
+    status = _status_value(values.get("status"))
+    return {
+        "leads": 1,
+        "strict_public": int(conf is not None and conf >= STRICT_PUBLIC),
+        "high_intent": int(conf is not None and conf >= HIGH_INTENT),
+        "urgent": int(urgent),
+        "urgent_any": int(urgent or (values.get("urgency_score") or 0) > 0.7),
+        "intent_high": int((values.get("intent_score") or 0) > 0.8),
+        "whatsapp": int(values.get("whatsapp_link") is not None),
+        "taps": int(values.get("tap_count") or 0),
+        "contacted": int(status is not None and status != CRMStatus.NEW.value),
+        "converted": int(status == CRMStatus.CONVERTED.value),
+    }
+
+
+def _metric_columns():
+    def flag(condition):
+        return func.sum(case((condition, 1), else_=0))
+
+    return [
+        func.count(Lead.id).label("leads"),
+        flag(Lead.confidence_score >= STRICT_PUBLIC).label("strict_public"),
+        flag(Lead.confidence_score >= HIGH_INTENT).label("high_intent"),
+        flag(Lead.urgency_level == "high").label("urgent"),
+        flag(or_(Lead.urgency_level == "high", Lead.urgency_score > 0.7)).label("urgent_any"),
+        flag(Lead.intent_score > 0.8).label("intent_high"),
+        flag(Lead.whatsapp_link.isnot(None)).label("whatsapp"),
+        func.sum(func.coalesce(Lead.tap_count, 0)).label("taps"),
+        flag(Lead.status != CRMStatus.NEW).label("contacted"),
+        flag(Lead.status == CRMStatus.CONVERTED).label("converted"),
+    ]
+
+
+def rollups_ready(connection) -> bool:
+    """
+    True once lead_stats_rollups exists on this engine. A hit is cached for
+    good, a miss for ROLLUPS_PROBE_SECONDS, so stats reads on a database
+    without the table do not inspect the schema every time.
+    """
+    if not STATS_ROLLUPS:
+        return False
+    engine = connection.engine
+    if engine in _ready:
+        return True
+    missed_at = _not_ready.get(engine)
+    if missed_at is not None and time.monotonic() - missed_at < ROLLUPS_PROBE_SECONDS:
+        return False
+    if inspect(connection).has_table(_table().name):
+        _ready.add(engine)
+        _not_ready.pop(engine, None)
+        return True
+    _not_ready[engine] = time.monotonic()
+    return False
+
+
+def rollups_table_created(target, connection, **kw):
+    """after_create hook of lead_stats_rollups (registered in app.db.models): forget the cached miss."""
+    _not_ready.pop(connection.engine, None)
+
+
+def agent_counters_ready(connection) -> bool:
+    """
+    True once the optional agents.leads_count/high_intent_count/last_lead_at
+    columns exist (scripts/migrate_agent_counters.py). Cached like rollups_ready.
+    """
+    engine = connection.engine
+    if engine in _agent_ready:
+        return True
+    missed_at = _agent_not_ready.get(engine)
+    if missed_at is not None and time.monotonic() - missed_at < ROLLUPS_PROBE_SECONDS:
+        return False
+    insp = inspect(connection)
+    if insp.has_table(Agent.__tablename__) and "leads_count" in {c["name"] for c in insp.get_columns(Agent.__tablename__)}:
+        _agent_ready.add(engine)
+        _agent_not_ready.pop(engine, None)
+        return True
+    _agent_not_ready[engine] = time.monotonic()
+    return False
+
+
+def agents_table_created(target, connection, **kw):
+    """after_create hook of agents (registered in app.db.models): the new table has the counter columns."""
+    _agent_not_ready.pop(connection.engine, None)
+
+
+# --- Write path ---------------------------------------------------------
+
+def _current_values(lead: Lead) -> Dict:
+    if lead.created_at is None and inspect(lead).pending:
+        # Stamp it here so the stored row and its bucket agree exactly
+        lead.created_at = datetime.utcnow()
+    return {key: getattr(lead, key) for key in TRACKED}
+
+
+def _committed_values(session: Session, lead: Lead) -> Optional[Dict]:
+    """Values as last written to the database, before this flush's changes."""
+    state = inspect(lead)
+    values = {}
+    for key in TRACKED:
+        if key in state.committed_state:
+            old = state.committed_state[key]
+            if old is NO_VALUE:
+                break
+            values[key] = old
+        elif key in state.unloaded:
+            break
+        else:
+            values[key] = state.dict.get(key)
+    else:
+        return values
+
+    # Attribute was set without being loaded first: read the stored row
+    cols = [getattr(Lead, key) for key in TRACKED]
+    row = session.connection().execute(select(*cols).where(Lead.id == lead.id)).first()
+    return dict(zip(TRACKED, row)) if row is not None else None
+
+
+def _add(deltas, values: Optional[Dict], sign: int):
+    if not values or values.get("created_at") is None or values.get("title") is None:
+        return
+    counts = lead_metrics(values)
+    for grain in GRAINS:
+        bucket = (grain, floor_bucket(values["created_at"], grain), values["title"])
+        for metric, value in counts.items():
+            deltas[bucket][metric] += sign * value
+
+
+def _agent_delta():
+    return {"leads_count": 0, "high_intent_count": 0, "last_lead_at": None}
+
+
+def _add_agent(agent_deltas, values: Optional[Dict], sign: int, inserted: bool = False):
+    if not values or values.get("agent_id") is None:
+        return
+    delta = agent_deltas[values["agent_id"]]
+    delta["leads_count"] += sign
+    delta["high_intent_count"] += sign * int((values.get("ranked_score") or 0) >= AGENT_HIGH_INTENT_SCORE)
+    created_at = values.get("created_at")
+    if inserted and created_at is not None:
+        created_at = _naive_utc(created_at)
+        delta["last_lead_at"] = max(delta["last_lead_at"] or created_at, created_at)
+
+
+def apply_agent_deltas(connection, agent_deltas: Dict):
+    """Bump the cached agent counters; last_lead_at only ever moves forward here."""
+    agents = Agent.__table__
+    for agent_id, delta in agent_deltas.items():
+        values = {}
+        if delta["leads_count"]:
+            values["leads_count"] = func.coalesce(agents.c.leads_count, 0) + delta["leads_count"]
+        if delta["high_intent_count"]:
+            values["high_intent_count"] = func.coalesce(agents.c.high_intent_count, 0) + delta["high_intent_count"]
+        if delta["last_lead_at"] is not None:
+            newest = delta["last_lead_at"]
+            values["last_lead_at"] = case(
+                (or_(agents.c.last_lead_at.is_(None), agents.c.last_lead_at < newest), newest),
+                else_=agents.c.last_lead_at,
+            )
+        if values:
+            connection.execute(agents.update().where(agents.c.id == agent_id).values(values))
+
+
+def apply_deltas(connection, deltas: Dict[tuple, Counter]):
+    """Upsert counter deltas keyed by (grain, bucket, category) in one statement."""
+    rows = [
+        {"grain": grain, "bucket": bucket, "category": category, **{m: counts.get(m, 0) for m in METRICS}}
+        for (grain, bucket, category), counts in deltas.items()
+        if any(counts.values())
+    ]
+    if not rows:
+        return
+    table = _table()
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite_insert if dialect == "sqlite" else pg_insert)(table)
+        set_ = {m: table.c[m] + stmt.excluded[m] for m in METRICS}
+        set_["updated_at"] = func.now()
+        connection.execute(
+            stmt.on_conflict_do_update(index_elements=["grain", "bucket", "category"], set_=set_),
+            rows,
+        )
+        return
+    for row in rows:
+        key = and_(table.c.grain == row["grain"], table.c.bucket == row["bucket"], table.c.category == row["category"])
+        result = connection.execute(
+            table.update().where(key).values({m: table.c[m] + row[m] for m in METRICS})
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(**row))
+
+
+@event.listens_for(Session, "before_flush")
+def _track_lead_changes(session: Session, flush_context, instances):
+    leads_new = [o for o in session.new if isinstance(o, Lead)]
+    leads_deleted = [o for o in session.deleted if isinstance(o, Lead)]
+    leads_dirty = [
+        o for o in session.dirty
+        if isinstance(o, Lead) and any(key in inspect(o).committed_state for key in TRACKED)
+    ]
+    if not (leads_new or leads_deleted or leads_dirty):
+        return
+    connection = session.connection()
+    stats_ready, agents_ready = rollups_ready(connection), agent_counters_ready(connection)
+    if not (stats_ready or agents_ready):
+        return
+
+    deltas = defaultdict(Counter)
+    agent_deltas = defaultdict(_agent_delta)
+    changes = [(_current_values(lead), +1, True) for lead in leads_new]
+    changes += [(_committed_values(session, lead), -1, False) for lead in leads_deleted]
+    for lead in leads_dirty:
+        changes += [(_committed_values(session, lead), -1, False), (_current_values(lead), +1, False)]
+    for values, sign, inserted in changes:
+        _add(deltas, values, sign)
+        _add_agent(agent_deltas, values, sign, inserted)
+
+    if stats_ready:
+        apply_deltas(connection, deltas)
+    if agents_ready and agent_deltas:
+        # Applied after the flush: an agent and its first leads may be inserted together
+        session.info.setdefault("_agent_counter_deltas", []).append(agent_deltas)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_agent_counters(session: Session, flush_context):
+    for agent_deltas in session.info.pop("_agent_counter_deltas", []):
+        apply_agent_deltas(session.connection(), agent_deltas)
+
+
+def _tracked_by_url(connection, urls) -> Dict[str, Dict]:
+    cols = [Lead.url] + [getattr(Lead, key) for key in TRACKED]
+    found = {}
+    for i in range(0, len(urls), 900):
+        for row in connection.execute(select(*cols).where(Lead.url.in_(urls[i:i + 900]))):
+            found[row[0]] = dict(zip(TRACKED, row[1:]))
+    return found
+
+
+@contextmanager
+def core_lead_deltas(db: Session, urls: Iterable[str]):
+    """
+    Wrap a Core insert / upsert of leads keyed by url, which the flush hook
+    never sees: the rows' tracked values are read before and after the
+    statement and the difference is applied to the rollups and agent
+    counters, as a flush would. Nothing is applied if the block raises.
+    """
+    connection = db.connection()
+    stats_ready, agents_ready = rollups_ready(connection), agent_counters_ready(connection)
+    urls = list(dict.fromkeys(url for url in urls if url))
+    if not urls or not (stats_ready or agents_ready):
+        yield
+        return
+
+    before = _tracked_by_url(connection, urls)
+    yield
+    after = _tracked_by_url(connection, urls)
+
+    deltas = defaultdict(Counter)
+    agent_deltas = defaultdict(_agent_delta)
+    for url, values in after.items():
+        old = before.get(url)
+        if old == values:
+            continue
+        _add(deltas, old, -1)
+        _add_agent(agent_deltas, old, -1)
+        _add(deltas, values, +1)
+        _add_agent(agent_deltas, values, +1, inserted=old is None)
+    if stats_ready:
+        apply_deltas(connection, deltas)
+    if agents_ready and agent_deltas:
+        apply_agent_deltas(connection, agent_deltas)
+
+
+# --- Read path ----------------------------------------------------------
+
+def _lead_totals(db: Session, since=None, until=None, category: Optional[str] = None) -> Dict[str, int]:
+    query = db.query(*_metric_columns())
+    if since is not None:
+        query = query.filter(Lead.created_at >= since)
+    if until is not None:
+        query = query.filter(Lead.created_at < until)
+    if category:
+        query = query.filter(Lead.title == category)
+    row = query.one()
+    return {m: int(getattr(row, m) or 0) for m in METRICS}
+
+
+def _rollup_totals(db: Session, grain: str, since=None, category: Optional[str] = None) -> Dict[str, int]:
+    table = _table()
+    query = db.query(*[func.sum(table.c[m]).label(m) for m in METRICS]).filter(table.c.grain == grain)
+    if since is not None:
+        query = query.filter(table.c.bucket >= since)
+    if category:
+        query = query.filter(table.c.category == category)
+    row = query.one()
+    return {m: int(getattr(row, m) or 0) for m in METRICS}
+
+
+def stats_totals(db: Session, since: Optional[datetime] = None, category: Optional[str] = None) -> Dict[str, int]:
+    """
+    Counter totals for leads created at or after `since` (all leads when None).
+    Whole hours come from the rollup table; the partial hour at the start of
+    the range is counted from `leads` on the created_at index, so results
+    match a COUNT(*) over `leads`. Falls back to one aggregate over `leads`
+    until lead_stats_rollups exists.
+    """
+    if not rollups_ready(db.connection()):
+        return _lead_totals(db, since=_naive_utc(since) if since else None, category=category)
+    if since is None:
+        return _rollup_totals(db, "day", category=category)
+
+    since = _naive_utc(since)
+    first_full_hour = floor_bucket(since, "hour")
+    if first_full_hour < since:
+        first_full_hour += timedelta(hours=1)
+    totals = Counter(_rollup_totals(db, "hour", since=first_full_hour, category=category))
+    if since < first_full_hour:
+        totals.update(_lead_totals(db, since=since, until=first_full_hour, category=category))
+    return {m: totals.get(m, 0) for m in METRICS}
+
+
+def agent_lead_stats(db: Session, agent_ids: Optional[Iterable] = None) -> Dict:
+    """
+    {agent_id: {"leads_count", "high_intent_count", "last_run"}} from one
+    GROUP BY agent_id over leads (agents without leads are absent).
+    """
+    query = db.query(
+        Lead.agent_id,
+        func.count(Lead.id).label("leads_count"),
+        func.sum(case((Lead.ranked_score >= AGENT_HIGH_INTENT_SCORE, 1), else_=0)).label("high_intent_count"),
+        func.max(Lead.created_at).label("last_run"),
+    ).filter(Lead.agent_id.isnot(None))
+    if agent_ids is not None:
+        agent_ids = list(agent_ids)
+        if not agent_ids:
+            return {}
+        query = query.filter(Lead.agent_id.in_(agent_ids))
+    return {
+        row.agent_id: {
+            "leads_count": int(row.leads_count or 0),
+            "high_intent_count": int(row.high_intent_count or 0),
+            "last_run": _as_datetime(row.last_run) if row.last_run is not None else None,
+        }
+        for row in query.group_by(Lead.agent_id).all()
+    }
+
+
+# --- Reconciliation -----------------------------------------------------
+
+def _hour_expression(dialect: str):
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m-%d %H:00:00", Lead.created_at)
+    return func.date_trunc("hour", Lead.created_at)
+
+
+def _as_datetime(value) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else _naive_utc(value)
+
+
+def _refresh_days(db: Session, days: Iterable[datetime]):
+    """Re-derive day buckets from the hour buckets they contain."""
+    table = _table()
+    connection = db.connection()
+    for day in sorted(set(days)):
+        connection.execute(table.delete().where(table.c.grain == "day", table.c.bucket == day))
+        rows = connection.execute(
+            select(table.c.category, *[func.sum(table.c[m]).label(m) for m in METRICS])
+            .where(table.c.grain == "hour", table.c.bucket >= day, table.c.bucket < day + timedelta(days=1))
+            .group_by(table.c.category)
+        ).all()
+        if rows:
+            connection.execute(table.insert(), [
+                {"grain": "day", "bucket": day, "category": r.category, **{m: int(getattr(r, m) or 0) for m in METRICS}}
+                for r in rows
+            ])
+
+
+def reconcile_rollups(db: Session, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Rebuild hour buckets in [since, until) from `leads` (everything when both
+    are None), then the day buckets they touch. Does not commit.
+    The delete runs first so that on SQLite the write lock is held while the
+    buckets are recounted and no concurrent delta is lost.
+    """
+    table = _table()
+    connection = db.connection()
+    hour_from = floor_bucket(since, "hour") if since else None
+    hour_to = floor_bucket(until, "hour") + timedelta(hours=1) if until else None
+
+    if since is None and until is None:
+        delete = table.delete()
+    else:
+        delete = table.delete().where(table.c.grain == "hour")
+        if hour_from is not None:
+            delete = delete.where(table.c.bucket >= hour_from)
+        if hour_to is not None:
+            delete = delete.where(table.c.bucket < hour_to)
+    connection.execute(delete)
+
+    hour = _hour_expression(connection.dialect.name).label("bucket")
+    query = select(hour, Lead.title.label("category"), *_metric_columns()).where(Lead.created_at.isnot(None))
+    if hour_from is not None:
+        query = query.where(Lead.created_at >= hour_from)
+    if hour_to is not None:
+        query = query.where(Lead.created_at < hour_to)
+    rows = connection.execute(query.group_by(hour, Lead.title)).all()
+
+    buckets = [
+        {"grain": "hour", "bucket": _as_datetime(r.bucket), "category": r.category,
+         **{m: int(getattr(r, m) or 0) for m in METRICS}}
+        for r in rows
+    ]
+    if buckets:
+        connection.execute(table.insert(), buckets)
+
+    days = {floor_bucket(b["bucket"], "day") for b in buckets}
+    if hour_from is not None:
+        # Days whose hours all disappeared still need their day row cleared
+        day = floor_bucket(hour_from, "day")
+        end = hour_to or datetime.utcnow()
+        while day < end:
+            days.add(day)
+            day += timedelta(days=1)
+    _refresh_days(db, days)
+    return {"hour_buckets": len(buckets), "day_buckets": len(days)}
+
+
+def refresh_agent_counters(db: Session, agent_ids: Optional[Iterable] = None) -> int:
+    """
+    Recount the cached agent counters from leads (all agents when agent_ids
+    is None). Used after Core upserts and bulk deletes, which skip the flush
+    hook. Does not commit; returns the number of agents updated.
+    """
+    connection = db.connection()
+    if not agent_counters_ready(connection):
+        return 0
+    agents = Agent.__table__
+    if agent_ids is None:
+        agent_ids = [row.id for row in connection.execute(select(agents.c.id))]
+    agent_ids = list(agent_ids)
+    stats = agent_lead_stats(db, agent_ids)
+    empty = {"leads_count": 0, "high_intent_count": 0, "last_run": None}
+    for agent_id in agent_ids:
+        counts = stats.get(agent_id, empty)
+        connection.execute(agents.update().where(agents.c.id == agent_id).values(
+            leads_count=counts["leads_count"],
+            high_intent_count=counts["high_intent_count"],
+            last_lead_at=counts["last_run"],
+        ))
+    return len(agent_ids)
+
+
+def prune_rollups(db: Session, cutoff: datetime) -> Dict[str, int]:
+    """
+    Follow a bulk `DELETE FROM leads WHERE created_at < cutoff` (which skips
+    the flush hook): drop older buckets and recount the boundary hour/day.
+    """
+    table = _table()
+    cutoff = _naive_utc(cutoff)
+    connection = db.connection()
+    for grain in GRAINS:
+        connection.execute(table.delete().where(table.c.grain == grain, table.c.bucket < floor_bucket(cutoff, grain)))
+    return reconcile_rollups(db, since=cutoff, until=cutoff)
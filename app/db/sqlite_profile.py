@@ -0,0 +1,248 @@
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Operating profile for single-box SQLite deployments, where the scraper
+# pool, the scheduler's to_thread sessions, metrics and the API all write to
+# one file:
+#   * connect pragmas: WAL (readers and the writer never block each other),
+#     busy_timeout, synchronous=NORMAL (fsync per checkpoint, not per commit;
+#     safe in WAL), mmap and page-cache sizing;
+#   * a process-wide writer gate: a connection takes it at its first write
+#     and holds it to commit/rollback, so writers queue in Python instead of
+#     spinning in SQLite's busy handler and timing out as "database is locked";
+#   * SQLiteWriter: one thread that runs submitted write jobs, many per
+#     transaction (group commit), each in its own SAVEPOINT.
+# Postgres engines are untouched.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "true").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_MMAP_MB = int(os.getenv("SQLITE_MMAP_MB", "256"))
+SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", "64"))
+SQLITE_SINGLE_WRITER = os.getenv("SQLITE_SINGLE_WRITER", "true").lower() == "true"
+SQLITE_WRITE_BATCH = int(os.getenv("SQLITE_WRITE_BATCH", "256"))
+SQLITE_WRITE_LINGER_MS = float(os.getenv("SQLITE_WRITE_LINGER_MS", "5"))
+
+
+def sqlite_connect_args() -> dict:
+    """pysqlite connect args: busy timeout in seconds on top of the pragma."""
+    args = {"check_same_thread": False}
+    if SQLITE_PROFILE:
+        args["timeout"] = SQLITE_BUSY_TIMEOUT_MS / 1000
+    return args
+
+
+def apply_sqlite_profile(engine):
+    """Set the profile pragmas on every new connection of a SQLite `engine`."""
+    if not SQLITE_PROFILE or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        # Persistent per file; in-memory databases answer "memory" and stay that way
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_MB * 1024 * 1024}")
+        cursor.execute(f"PRAGMA cache_size={-SQLITE_CACHE_MB * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    _gate_engine(engine)
+
+
+# --- Writer gate ----------------------------------------------------------
+
+class _WriterGate:
+    """
+    One writing transaction per process at a time. Re-entrant per thread
+    (nested sessions on one thread fall through to SQLite's own locking, as
+    before) and releasable from another thread (LaneSession hops threads).
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._owner: Optional[int] = None
+        self._holders = 0
+        self.waits = 0
+        self.timeouts = 0
+
+    def acquire(self, timeout: float) -> bool:
+        me = threading.get_ident()
+        with self._cond:
+            if self._holders and self._owner == me:
+                self._holders += 1
+                return True
+            if self._holders:
+                self.waits += 1
+                if not self._cond.wait_for(lambda: self._holders == 0, timeout):
+                    self.timeouts += 1
+                    return False
+            self._owner, self._holders = me, 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self._holders = max(0, self._holders - 1)
+            if self._holders == 0:
+                self._owner = None
+                self._cond.notify()
+
+
+writer_gate = _WriterGate()
+_HOLDS_GATE = "_sqlite_writer_gate"
+_DML = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+def _gate_engine(engine):
+    """
+    Take the gate at a connection's first DML statement and hold it to the
+    end of the transaction. Hooked on the cursor rather than the Session so
+    Core writes through db.connection() (change feed, cards, rollups) are
+    gated too: a transaction that already holds SQLite's lock must never
+    wait for the gate.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _take_gate(connection, cursor, statement, parameters, context, executemany):
+        if not SQLITE_SINGLE_WRITER or connection.info.get(_HOLDS_GATE):
+            return
+        if statement.lstrip()[:7].upper().startswith(_DML):
+            if writer_gate.acquire(SQLITE_BUSY_TIMEOUT_MS / 1000):
+                connection.info[_HOLDS_GATE] = True
+            else:
+                # Fall back to SQLite's busy handling rather than fail here
+                logger.warning("SQLite writer gate wait timed out; continuing without it.")
+
+    def _release_gate(connection):
+        if connection.info.pop(_HOLDS_GATE, False):
+            writer_gate.release()
+
+    event.listen(engine, "commit", _release_gate)
+    event.listen(engine, "rollback", _release_gate)
+
+    @event.listens_for(engine, "checkin")
+    def _release_on_checkin(dbapi_connection, connection_record):
+        # Transaction ended without a commit/rollback event (connection invalidated, reset on return)
+        if connection_record.info.pop(_HOLDS_GATE, False):
+            writer_gate.release()
+
+
+# --- Single writer --------------------------------------------------------
+
+class SQLiteWriter:
+    """
+    Runs write jobs `fn(session, *args)` on one thread, batching whatever is
+    queued (up to SQLITE_WRITE_BATCH, waiting SQLITE_WRITE_LINGER_MS for more)
+    into one BEGIN IMMEDIATE transaction. A job that raises is rolled back to
+    its SAVEPOINT and only its future fails. Jobs must not commit.
+    """
+
+    def __init__(self, url: str, batch_size: int = SQLITE_WRITE_BATCH, linger_ms: float = SQLITE_WRITE_LINGER_MS):
+        self.url = url
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000
+        self._queue: "queue.Queue[Tuple[Future, Callable, tuple, dict]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._factory = None
+        self.jobs = 0
+        self.batches = 0
+        self.failed = 0
+
+    def _session_factory(self):
+        if self._factory is None:
+            # Own connection with explicit transactions so SAVEPOINTs work and
+            # the write lock is taken at BEGIN (no deferred lock upgrade)
+            engine = create_engine(self.url, connect_args={**sqlite_connect_args(), "isolation_level": None},
+                                   pool_size=1, max_overflow=0)
+            apply_sqlite_profile(engine)
+
+            @event.listens_for(engine, "begin")
+            def _begin_immediate(connection):
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+            self._factory = sessionmaker(bind=engine, autoflush=False)
+        return self._factory
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                    self._thread.start()
+
+    def in_writer_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if self.in_writer_thread():
+            raise RuntimeError("SQLiteWriter.submit() called from a write job; use the job's session instead")
+        future: Future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        self._ensure_thread()
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch: List[Tuple[Future, Callable, tuple, dict]]):
+        outcomes = []
+        db = self._session_factory()()
+        # Gate before BEGIN IMMEDIATE, never after: a session holding the gate
+        # may be waiting on SQLite for the lock this transaction would take
+        gated = SQLITE_SINGLE_WRITER and writer_gate.acquire(SQLITE_BUSY_TIMEOUT_MS / 1000)
+        try:
+            for future, fn, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db.begin_nested():
+                        outcomes.append((future, fn(db, *args, **kwargs), None))
+                except Exception as e:
+                    outcomes.append((future, None, e))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"SQLite writer: batch of {len(batch)} failed to commit: {e}")
+            outcomes = [(future, None, e) for future, _, _ in outcomes]
+        finally:
+            db.close()
+            if gated:
+                writer_gate.release()
+        self.batches += 1
+        for future, result, error in outcomes:
+            self.jobs += 1
+            if error is not None:
+                self.failed += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "jobs": self.jobs,
+            "batches": self.batches,
+            "failed": self.failed,
+            "queued": self._queue.qsize(),
+            "avg_batch": round(self.jobs / self.batches, 1) if self.batches else 0.0,
+            "gate_waits": writer_gate.waits,
+            "gate_timeouts": writer_gate.timeouts,
+        }
@@ -3,11 +3,11 @@ import uuid
 import time
 import random
 import logging
-import requests
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from .utils.logging import get_logger
+from .core.network_health import network_health
 from sqlalchemy.orm import Session
 from .scrapers.base_scraper import BaseScraper
 from .scrapers.google_scraper import GoogleScraper
@@ -36,9 +36,14 @@ from .utils.geo_bias import apply_geo_bias
 from .intelligence.query_expander import get_expanded_queries
 from .nlp.dedupe import dedupe_leads
 
-# 🚀 GLOBAL THREAD POOL: Reuse threads to prevent resource exhaustion (Playwright is heavy!)
-# Limit to 5 concurrent scrapers to keep the server stable.
-SCRAPER_EXECUTOR = ThreadPoolExecutor(max_workers=5)
+from .core.lanes import LANES, INTERACTIVE, get_lane
+from .core.spans import span, add_span
+from .core.raw_capture import store as raw_capture
+
+# 🚀 LANE THREAD POOLS: Scrapers run on the scrape pool of the caller's execution lane
+# (interactive /search vs background agents) so the two never starve each other.
+# SCRAPER_EXECUTOR is kept as an alias of the interactive scrape pool for legacy imports.
+SCRAPER_EXECUTOR = LANES[INTERACTIVE].scrape_executor
 
 def ingest_leads(raw_results: List[Dict[str, Any]]) -> List[Any]:
     """
@@ -52,7 +57,8 @@ def ingest_leads(raw_results: List[Dict[str, Any]]) -> List[Any]:
 
     # 1. NLP Deduplication
     # Group similar leads to avoid duplicates
-    unique_results, rejected = dedupe_leads(raw_results)
+    with span("dedupe", items=len(raw_results)):
+        unique_results, rejected = dedupe_leads(raw_results)
     logger.info(f"INGEST: Deduplicated to {len(unique_results)} unique signals")
 
     # 2. Strict Filtering & Metadata (using Pipeline logic if possible, or reimplementing)
@@ -73,17 +79,18 @@ def ingest_leads(raw_results: List[Dict[str, Any]]) -> List[Any]:
     verified_leads = []
     db = SessionLocal()
     try:
-        pipeline = LeadPipeline(db)
-        for res in unique_results:
-            # Pipeline's process_raw_lead handles:
-            # - Intent Validation
-            # - Scoring & Readiness
-            # - Extraction (Phone, Name)
-            # - Normalization
-            # - Existence Check (against DB)
-            lead = pipeline.process_raw_lead(res)
-            if lead:
-                verified_leads.append(lead)
+        with span("scoring", items=len(unique_results)):
+            pipeline = LeadPipeline(db)
+            for res in unique_results:
+                # Pipeline's process_raw_lead handles:
+                # - Intent Validation
+                # - Scoring & Readiness
+                # - Extraction (Phone, Name)
+                # - Normalization
+                # - Existence Check (against DB)
+                lead = pipeline.process_raw_lead(res)
+                if lead:
+                    verified_leads.append(lead)
     finally:
         db.close()
 
@@ -110,6 +117,9 @@ ALL_SCRAPERS = [
 # ABSOLUTE RULE: PROD STRICT ENFORCEMENT
 logger = get_logger("Ingestion")
 
+# ⏱️ Discovery window tiers (hours), narrowest first
+DISCOVERY_WINDOWS = [2, 6, 24]
+
 # ⚡ TIER 1: FAST (API / Lightweight) - 5 sec max return
 TIER_1_SCRAPERS = [
     "GoogleCSEScraper", 
@@ -136,43 +146,9 @@ class LiveLeadIngestor:
         if not PROD_STRICT:
             logger.warning("--- WARNING: Delta9 running in DEVELOPMENT mode. Auto-downgrading to bootstrap. ---")
 
-    async def check_network_health(self) -> bool:
-        """Verify network connectivity and proxy health before ingestion."""
-        import asyncio
-        logger.info("NETWORK CHECK: Verifying outbound connectivity...")
-        try:
-            # Check multiple reliable endpoints with significantly longer timeout for high-latency environments
-            endpoints = [
-                "https://www.google.com", 
-                "https://8.8.8.8", 
-                "https://duckduckgo.com",
-                "https://www.facebook.com"
-            ]
-            
-            # Run checks in PARALLEL to avoid blocking async loop for too long
-            # Using asyncio.gather to check all at once
-            async def check_url(url):
-                try:
-                    # Increase timeout to 20s to handle Kenyan mobile network latency
-                    response = await asyncio.to_thread(requests.get, url, timeout=20)
-                    if response.status_code == 200 or response.status_code == 301 or response.status_code == 302:
-                        logger.info(f"NETWORK CHECK: Connectivity verified via {url} (HTTP {response.status_code})")
-                        return True
-                except Exception as e:
-                    logger.warning(f"NETWORK CHECK: {url} unreachable: {str(e)}")
-                    return False
-                return False
-
-            results = await asyncio.gather(*(check_url(url) for url in endpoints))
-            
-            if any(results):
-                return True
-            
-            logger.error("NETWORK CHECK FAILED: All endpoints timed out or failed.")
-            return False
-        except Exception as e:
-            logger.error(f"NETWORK CHECK FAILED: {str(e)}")
-            return False
+    def check_network_health(self) -> bool:
+        """Whether any source is reachable, as last probed by the background network-health monitor."""
+        return network_health.any_reachable()
 
     def _generate_whatsapp_link(self, phone: str, product: str) -> str:
         """Generate a pre-filled WhatsApp link for the lead."""
@@ -307,41 +283,76 @@ class LiveLeadIngestor:
         tier=1: Fast (API-based) - 5 sec max return
         tier=2: Full (API + Playwright)
         """
-        # ⏱️ ESCALATION STRATEGY: 2h -> 6h -> 24h
-        # If strict mode returns 0 leads, we automatically expand the search window.
-        windows = [2, 6, 24]
-        
+        # ⏱️ WINDOW TIERS: 2h -> 6h -> 24h, bucketed locally from one fetch.
+        # Results keep their post age, so the first non-empty tier is picked
+        # without scraping again. Only sources whose upstream parameter changes
+        # with the window (window_param) start at the narrowest tier and are
+        # re-fetched wider, and only when the narrower tiers came back empty.
+        windows = list(DISCOVERY_WINDOWS)
+        widest = windows[-1]
+
+        scrapers = self._select_scrapers(query, location, widest, category, last_result_count, tier)
+        fetched = {
+            s.__class__.__name__: windows[0] if s.window_param(windows[0]) != s.window_param(widest) else widest
+            for s in scrapers
+        }
+        logger.info(f"FETCH: '{query}' in {location} (Tier {tier}), windows {fetched}")
+        with span(f"discovery.{widest}h") as sp:
+            found = self._execute_discovery(query, location, widest, category, last_result_count, early_return=early_return,
+                                            tier=tier, scrapers=scrapers, fetch_windows=fetched, exit_window=windows[0])
+            sp.items = len(found)
+
         all_found_leads = []
         for current_window in windows:
-            logger.info(f"FETCH: Trying window {current_window}h for '{query}' in {location} (Tier {tier})")
-            leads = self._execute_discovery(query, location, current_window, category, last_result_count, early_return=early_return, tier=tier)
-            
+            widen = [s for s in scrapers if fetched[s.__class__.__name__] < current_window
+                     and s.window_param(current_window) != s.window_param(fetched[s.__class__.__name__])]
+            if widen:
+                fetched.update({s.__class__.__name__: current_window for s in widen})
+                logger.info(f"ESCALATION: Re-fetching {[s.__class__.__name__ for s in widen]} with the {current_window}h window")
+                with span(f"discovery.{current_window}h") as sp:
+                    more = self._execute_discovery(query, location, widest, category, last_result_count, early_return=early_return,
+                                                   tier=tier, scrapers=widen, fetch_windows=fetched, exit_window=current_window)
+                    sp.items = len(more)
+                found.extend(more)
+
+            leads = [l for l in found if self._within_window(l, current_window)]
             if leads:
                 # Tag leads with the window they were found in
                 for l in leads:
                     l["discovery_window"] = f"{current_window}h"
-                
+
                 all_found_leads.extend(leads)
-                
+
                 # 🎯 ESCALATION RULE: If we found signals, we stop expanding.
                 # This prevents "No Signals Detected" by escalating only when empty.
                 logger.info(f"ESCALATION SUCCESS: Found {len(leads)} signals in {current_window}h window.")
                 break
-            
+
             logger.warning(f"ESCALATION: No signals in {current_window}h. Expanding search...")
 
         # Final de-duplication across all passes (though we broke early, we still dedupe)
         if not all_found_leads:
-            logger.error(f"ESCALATION FAILED: Zero signals found even after 24h search for '{query}'")
+            logger.error(f"ESCALATION FAILED: Zero signals found even after {widest}h search for '{query}'")
             return []
 
         # Use deduplicator to clean up any overlap
         deduper = get_deduplicator()
         return deduper.deduplicate(all_found_leads)
 
-    def _execute_discovery(self, query: str, location: str, time_window_hours: int, category: Optional[str] = "general", last_result_count: int = 0, early_return: bool = True, tier: int = 2) -> List[Dict[str, Any]]:
-        """Internal discovery execution with PARALLEL scraping and early return."""
-        # ABSOLUTE RULE: Mandatory health check
+    @staticmethod
+    def _within_window(lead: Dict[str, Any], hours: int) -> bool:
+        """Whether a scored lead's post age fits a window (undated posts fit every window)."""
+        age = lead.get("_age_minutes")
+        if age is None:
+            return True
+        # 🇰🇪 Escalation: allow 4h for high geo relevance
+        if lead.get("geo_score", 0.0) >= 0.8:
+            hours = max(hours, 4)
+        return age <= hours * 60
+
+    def _select_scrapers(self, query: str, location: str, time_window_hours: int, category: Optional[str] = "general", last_result_count: int = 0, tier: int = 2) -> List[BaseScraper]:
+        """Scrapers to run for a discovery, highest priority first."""
+        # Reachability comes from the background monitor: reading it costs nothing on this path
         if not self.check_network_health():
             if PROD_STRICT:
                 logger.error("NETWORK CHECK FAILED: Ingestion proceeding cautiously despite network issues (Soft Fail).")
@@ -349,10 +360,6 @@ class LiveLeadIngestor:
             else:
                 logger.warning("NETWORK CHECK FAILED: Continuing anyway because PROD_STRICT=False")
 
-        # 🧠 AI QUERY EXPANSION: Expand product query into related terms
-        expanded_queries = get_expanded_queries(query)
-        logger.info(f"AI EXPANSION: Discovery broadened to {expanded_queries}")
-
         # --- Adaptive Scraper Control ---
         enabled_sources = decide_scrapers(
             query=query, 
@@ -370,6 +377,10 @@ class LiveLeadIngestor:
             s for s in ALL_SCRAPERS 
             if s.__class__.__name__ in enabled_sources and not s.auto_disabled
         ]
+        unreachable = [s.__class__.__name__ for s in enabled_scrapers if not network_health.reachable(s.__class__.__name__)]
+        if unreachable:
+            logger.warning(f"NETWORK HEALTH: skipping unreachable sources {unreachable}")
+            enabled_scrapers = [s for s in enabled_scrapers if s.__class__.__name__ not in unreachable]
         logger.info(f"DEBUG: enabled_scrapers after filtering: {[s.__class__.__name__ for s in enabled_scrapers]}")
         
         # ⚡ TIER FILTERING
@@ -386,6 +397,22 @@ class LiveLeadIngestor:
         )
         
         logger.info(f"AI Decision (Ranked): {[(s.__class__.__name__, round(s.priority_score, 2)) for s in active_scrapers]}")
+        return active_scrapers
+
+    def _execute_discovery(self, query: str, location: str, time_window_hours: int, category: Optional[str] = "general", last_result_count: int = 0, early_return: bool = True, tier: int = 2,
+                           scrapers: Optional[List[BaseScraper]] = None, fetch_windows: Optional[Dict[str, int]] = None, exit_window: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Internal discovery execution with PARALLEL scraping and early return.
+        Keeps posts up to time_window_hours old; fetch_windows overrides the
+        window sent to individual scrapers, and only leads within exit_window
+        count towards the early exit.
+        """
+        # 🧠 AI QUERY EXPANSION: Expand product query into related terms
+        expanded_queries = get_expanded_queries(query)
+        logger.info(f"AI EXPANSION: Discovery broadened to {expanded_queries}")
+
+        active_scrapers = scrapers if scrapers is not None else self._select_scrapers(
+            query, location, time_window_hours, category, last_result_count, tier)
 
         # Check specifically for MockScraper
         # mock_in_active = any(isinstance(s, MockScraper) for s in active_scrapers)
@@ -430,7 +457,8 @@ class LiveLeadIngestor:
                 logger.info(f"DISPATCH: Running {scraper_name} (Ranked) for Pass {pass_idx+1}...")
                 
                 # Run this scraper for the current pass queries
-                scraper_leads = self._run_parallel_scrapers([scraper], pass_queries, time_window_hours, query, location, early_return=early_return, tier=tier)
+                scraper_leads = self._run_parallel_scrapers([scraper], pass_queries, time_window_hours, query, location, early_return=early_return, tier=tier,
+                                                            fetch_window=(fetch_windows or {}).get(scraper_name))
                 
                 logger.info(f"DEBUG: {scraper_name} returned {len(scraper_leads)} raw leads")
                 
@@ -442,7 +470,7 @@ class LiveLeadIngestor:
                 # 🚀 EARLY TERMINATION: Check for high-confidence leads (>= 0.85)
                 high_quality = [ 
                     l for l in scraper_leads 
-                    if l.get("intent_score", 0) >= 0.85 
+                    if l.get("intent_score", 0) >= 0.85 and self._within_window(l, exit_window or time_window_hours)
                 ]
                 collected_high_confidence += len(high_quality)
                 
@@ -473,13 +501,18 @@ class LiveLeadIngestor:
         logger.info(f"STORAGE: Returning {len(sorted_leads)} leads for processing (Save Everything mode).")
         return sorted_leads
 
-    def _run_parallel_scrapers(self, scrapers: List[BaseScraper], queries: List[str], time_window_hours: int, original_query: str, location: str, early_return: bool = False, tier: int = 2) -> List[Dict[str, Any]]:
-        """Helper to run a set of scrapers in parallel with hard timeout and early return."""
+    def _run_parallel_scrapers(self, scrapers: List[BaseScraper], queries: List[str], time_window_hours: int, original_query: str, location: str, early_return: bool = False, tier: int = 2,
+                               fetch_window: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Helper to run a set of scrapers in parallel with hard timeout and early return.
+        Scrapers are asked for fetch_window hours (default time_window_hours);
+        posts older than time_window_hours are dropped.
+        """
         import time
         import uuid
         import random
         from datetime import datetime, timedelta, timezone
-        from concurrent.futures import as_completed
+        from concurrent.futures import Future, as_completed
         
         results_leads = []
         verified_count = 0
@@ -491,35 +524,24 @@ class LiveLeadIngestor:
         
         EARLY_RETURN_THRESHOLD = 2 # 🚀 Speed Guard: Return if >= 2 high-confidence signals found
         
-        # 🚀 Use GLOBAL EXECUTOR to prevent resource exhaustion
-        global SCRAPER_EXECUTOR
+        # 🚀 Use the current lane's pool to prevent resource exhaustion
+        lane = get_lane()
         
         future_to_query = {}
-        
-        def scrape_with_cache(s, q, w):
+
+        def scrape_with_cache(s, q, w, cache_key):
             scraper_name = s.__class__.__name__
-            cache_key = f"{scraper_name}:{q}:{w}"
-            cached = get_cached(cache_key)
-            if cached is not None:
-                logger.info(f"CACHE: Hit for {cache_key}")
-                return cached
-            
             start_time = time.time()
             try:
                 # Apply 10s timeout to the scraper.scrape call
                 res = s.scrape(q, time_window_hours=w)
 
-                # 🛠️ RAW CAPTURE LOGGING (Phase 3)
+                # 🛠️ RAW CAPTURE (Phase 3): full payloads, buffered into compressed segments
                 if res:
                     try:
-                        os.makedirs("logs", exist_ok=True)
-                        with open("logs/raw_capture.log", "a", encoding="utf-8") as f:
-                            for item in res:
-                                url_log = item.get('url', 'no-url')
-                                title_log = (item.get('text') or item.get('snippet') or '')[:100].replace('\n', ' ')
-                                f.write(f"{url_log} | {title_log}\n")
+                        raw_capture.capture(scraper_name, res, query=q)
                     except Exception as e:
-                        logger.error(f"Raw capture logging failed: {e}")
+                        logger.error(f"Raw capture failed: {e}")
 
                 latency = time.time() - start_time
                 
@@ -550,7 +572,7 @@ class LiveLeadIngestor:
                 # Record run metrics with performance data
                 record_run(scraper_name, leads_count=len(res) if res else 0, latency=latency, 
                            avg_confidence=avg_conf, avg_freshness=avg_fresh, avg_geo_score=avg_geo)
-                
+
                 if res:
                     # Tag leads with scraper name for later verification tracking
                     for r in res:
@@ -567,10 +589,28 @@ class LiveLeadIngestor:
                 check_scraper_health(scraper_name)
                 return []
 
+        def timed_scrape(s, q, w, cache_key):
+            with span(f"scraper.{s.__class__.__name__}") as sp:
+                res = scrape_with_cache(s, q, w, cache_key)
+                sp.items = len(res or [])
+                return res
+
         for sq in queries:
             for scraper in scrapers:
-                future = SCRAPER_EXECUTOR.submit(scrape_with_cache, scraper, sq, time_window_hours)
-                future_to_query[future] = (sq, scraper.__class__.__name__)
+                scraper_name = scraper.__class__.__name__
+                w = fetch_window or time_window_hours
+                cache_key = f"{scraper_name}:{sq}:{w}"
+                cached = get_cached(cache_key)
+                if cached is not None:
+                    logger.info(f"CACHE: Hit for {cache_key}")
+                    future = Future()
+                    future.set_result(cached)
+                else:
+                    # Scrape pool, not the lane pool this discovery may itself be running on;
+                    # a source over the lane's rate budget is dispatched when its bucket refills
+                    future = lane.submit_rate_limited(getattr(scraper, "source", scraper_name),
+                                                      timed_scrape, scraper, sq, w, cache_key)
+                future_to_query[future] = (sq, scraper_name)
         
         raw_results = []
         # Wait for results with HARD_TIMEOUT
@@ -601,12 +641,14 @@ class LiveLeadIngestor:
             logger.warning(f"PARALLEL TIMEOUT: Some scrapers did not finish within {HARD_TIMEOUT}s")
 
         # 🧠 NLP Deduplication BEFORE strict filtering
-        raw_results, rejected_nlp = dedupe_leads(raw_results)
+        with span("dedupe", items=len(raw_results)):
+            raw_results, rejected_nlp = dedupe_leads(raw_results)
         
         # Capture rejected leads from NLP deduplication
         if hasattr(self, 'rejected_leads'):
             self.rejected_leads.extend(rejected_nlp)
 
+        scoring_started = time.perf_counter()
         for r in raw_results:
             scraper_name = r.get("_scraper_name")
             snippet = r.get('text', '')
@@ -694,7 +736,8 @@ class LiveLeadIngestor:
                 "geo_region": geo_data.get("geo_region", "Global"),
                 "buyer_request_snippet": snippet[:500],
                 "urgency_level": urgency,
-                "is_verified_signal": 1
+                "is_verified_signal": 1,
+                "_age_minutes": minutes_ago if is_verified_time else None,
             }
             
             # 🎯 Confidence Layer
@@ -708,7 +751,8 @@ class LiveLeadIngestor:
             )
             
             results_leads.append(lead_data)
-        
+
+        add_span("scoring", (time.perf_counter() - scoring_started) * 1000, items=len(raw_results))
         return results_leads
 
     def save_leads_to_db(self, leads: List[Dict[str, Any]]):
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 from sqlalchemy import Column, String, Integer, Boolean, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.db.base_class import Base
 
 class Agent(Base):
@@ -28,6 +28,13 @@ class Agent(Base):
 
     created_at = Column(DateTime, server_default=func.now())
 
+    # Optional cached lead counters, maintained at write time by app.db.rollups.
+    # Deferred with no default so databases without the columns keep working
+    # until scripts/migrate_agent_counters.py has run.
+    leads_count = deferred(Column(Integer, nullable=True))
+    high_intent_count = deferred(Column(Integer, nullable=True))
+    last_lead_at = deferred(Column(DateTime, nullable=True))
+
     raw_leads = relationship("AgentRawLead", back_populates="agent")
 
     def initialize_schedule(self):
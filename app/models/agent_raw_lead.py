@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Float, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -8,12 +8,15 @@ from app.db.base_class import Base
 
 class AgentRawLead(Base):
     __tablename__ = "agent_raw_leads"
+    __table_args__ = (Index("ix_agent_raw_leads_agent_hash", "agent_id", "content_hash"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.id"))
 
     raw_text = Column(Text)
+    # Hash the raw-capture store files the full payload under (app.core.raw_capture)
+    content_hash = Column(String(32), nullable=True)
     phone = Column(String, nullable=True)
     source = Column(String, nullable=True)
     source_url = Column(String, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, JSON, ForeignKey, Enum, Integer, Text, UniqueConstraint
+from sqlalchemy import Column, String, Float, DateTime, JSON, ForeignKey, Enum, Integer, Text, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -21,6 +21,11 @@ class CRMStatus(enum.Enum):
     DEAD = "DEAD"
 
 class Lead(Base):
+    """
+    Hot half of a lead: everything list, feed, count and cleanup queries read.
+    Analysis blobs and enrichment text are in LeadDetail (lead_details) and
+    are still readable/writable as lead.<name> via the proxies below.
+    """
     __tablename__ = "leads"
 
     # --- Core Fields (User Requested) ---
@@ -83,24 +88,16 @@ class Lead(Base):
     # Hyper-Specific Intent
     readiness_level = Column(String)
     urgency_score = Column(Float)
-    budget_info = Column(String)
-    product_specs = Column(JSON)
     deal_probability = Column(Float)
     intent_type = Column(String)
     
     # Smart Matching
     match_score = Column(Float, default=0.0)
-    compatibility_status = Column(String)
-    match_details = Column(JSON)
-    
-    # Intent Analysis
-    payment_method_preference = Column(String)
     
     # Local Advantage
     delivery_range_score = Column(Float, default=0.0)
     neighborhood = Column(String)
     local_pickup_preference = Column(Integer, default=0)
-    delivery_constraints = Column(String)
     
     # Deal Readiness
     decision_authority = Column(Integer, default=0)
@@ -112,36 +109,25 @@ class Lead(Base):
     availability_status = Column(String)
     competition_count = Column(Integer)
     is_unique_request = Column(Integer)
-    optimal_response_window = Column(String)
-    peak_response_time = Column(String)
     
     # Contact Verification
     is_contact_verified = Column(Integer, default=0)
     contact_reliability_score = Column(Float, default=0.0)
     preferred_contact_method = Column(String)
     disposable_email_flag = Column(Integer, default=0)
-    contact_metadata = Column(JSON)
     
     # Response Tracking (Extended)
     average_response_time_mins = Column(Float)
     conversion_rate = Column(Float, default=0.0)
     
-    # Comprehensive Lead Intelligence
-    buyer_history = Column(JSON)
-    platform_activity_level = Column(String)
+    # Comprehensive Lead Intelligence (blobs and enrichment text live in LeadDetail)
     past_response_rate = Column(Float, default=0.0)
-    market_price_range = Column(String)
-    seasonal_demand = Column(String)
-    supply_status = Column(String)
-    conversion_signals = Column(JSON)
-    talking_points = Column(JSON)
-    competitive_advantages = Column(JSON)
-    pricing_strategy = Column(String)
-    
-    verification_badges = Column(JSON)
     is_genuine_buyer = Column(Integer, default=1)
     last_activity = Column(DateTime)
 
+    # Cold half, loaded only when a cold attribute is touched (see COLD_COLUMNS)
+    detail = relationship("LeadDetail", uselist=False, lazy="select", cascade="all, delete-orphan")
+
     tap_count = Column(Integer, default=0)
     
     # Deduplication
@@ -149,6 +135,9 @@ class Lead(Base):
 
     __table_args__ = (
         UniqueConstraint("url", name="uix_source_url"),
+        # Feed indexes: category/status filtered feed, and the keyset order (created_at, id)
+        Index("ix_leads_feed", status, title, created_at.desc(), id.desc()),
+        Index("ix_leads_created_id", created_at, id),
         {'extend_existing': True}
     )
 
@@ -276,3 +265,63 @@ class Lead(Base):
             "contact_email": self.contact_email,
             "is_verified_signal": self.is_verified_signal
         }
+
+
+class LeadDetail(Base):
+    """Cold half of a lead (one row per lead, created on the first non-null write)."""
+    __tablename__ = "lead_details"
+
+    lead_id = Column(UUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True)
+
+    # Hyper-Specific Intent
+    budget_info = Column(String)
+    product_specs = Column(JSON)
+    payment_method_preference = Column(String)
+
+    # Smart Matching
+    compatibility_status = Column(String)
+    match_details = Column(JSON)
+
+    # Local Advantage
+    delivery_constraints = Column(String)
+
+    # Real-Time & Competitive
+    optimal_response_window = Column(String)
+    peak_response_time = Column(String)
+
+    # Contact Verification
+    contact_metadata = Column(JSON)
+
+    # Comprehensive Lead Intelligence
+    buyer_history = Column(JSON)
+    platform_activity_level = Column(String)
+    market_price_range = Column(String)
+    seasonal_demand = Column(String)
+    supply_status = Column(String)
+    conversion_signals = Column(JSON)
+    talking_points = Column(JSON)
+    competitive_advantages = Column(JSON)
+    pricing_strategy = Column(String)
+    verification_badges = Column(JSON)
+
+
+COLD_COLUMNS = [c.name for c in LeadDetail.__table__.columns if c.name != "lead_id"]
+
+
+def _cold_attribute(name):
+    def get(self):
+        return getattr(self.detail, name) if self.detail is not None else None
+
+    def set(self, value):
+        if self.detail is None:
+            if value is None:
+                return
+            self.detail = LeadDetail()
+        setattr(self.detail, name, value)
+
+    return property(get, set)
+
+
+# lead.product_specs etc. keep working (constructor kwargs included)
+for _name in COLD_COLUMNS:
+    setattr(Lead, _name, _cold_attribute(_name))
@@ -6,6 +6,14 @@ from ..intelligence.intent import BUYER_PATTERNS
 
 logger = logging.getLogger(__name__)
 
+HIGH_INTENT = [
+    "looking for", "want to buy", "buying", "need to purchase", 
+    "searching for", "where can i find", "anyone selling", 
+    "recommend", "where can i buy", "need urgently", "dm me", 
+    "inbox me", "wtb", "ready to buy", "trying to find", "trying to get",
+    "want to get", "looking to find", "in search of", "natafuta", "nahitaji"
+]
+
 class BuyingIntentNLP:
     def __init__(self):
         try:
@@ -18,6 +26,8 @@ class BuyingIntentNLP:
             self.nlp = None
         
         self.intent_patterns = BUYER_PATTERNS
+        # Add imported BUYER_PATTERNS to the strong intent signals
+        self.high_intent = HIGH_INTENT + [p for p in self.intent_patterns if p not in HIGH_INTENT]
 
     def extract_entities(self, text, category_config=None):
         """Extract products, locations, names, and prices."""
@@ -333,18 +343,8 @@ class BuyingIntentNLP:
         score = 0.0
         text_lower = text.lower()
         
-        # 1. Keyword match (Strong intent signals)
-        high_intent = [
-            "looking for", "want to buy", "buying", "need to purchase", 
-            "searching for", "where can i find", "anyone selling", 
-            "recommend", "where can i buy", "need urgently", "dm me", 
-            "inbox me", "wtb", "ready to buy", "trying to find", "trying to get",
-            "want to get", "looking to find", "in search of", "natafuta", "nahitaji"
-        ]
-        # Add imported BUYER_PATTERNS to high_intent
-        for p in self.intent_patterns:
-            if p not in high_intent:
-                high_intent.append(p)
+        # 1. Keyword match (Strong intent signals, merged with BUYER_PATTERNS once in __init__)
+        high_intent = self.high_intent
 
         medium_intent = [
             "price for", "how much is", "cost of", "recommendations for", 
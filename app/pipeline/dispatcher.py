@@ -8,6 +8,7 @@ from app.db.database import SessionLocal
 from app.ingestion import LiveLeadIngestor
 from app.intelligence.expand import expand_query
 from app.config import PIPELINE_MODE
+from app.core.lanes import BACKGROUND, use_lane, admit_background, get_lane
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +18,11 @@ def run_background_discovery(query: str, location: str, tier: int = 2):
     to populate cache and metrics after an early return.
     Default to Tier 2 (Full) to ensure deep data is captured eventually.
     """
+    with use_lane(BACKGROUND):
+        admit_background()
+        _run_background_discovery(query, location, tier)
+
+def _run_background_discovery(query: str, location: str, tier: int):
     logger.info(f"BACKGROUND DISCOVERY: Starting full pass (Tier {tier}) for '{query}' in {location}")
     db = SessionLocal()
     try:
@@ -54,7 +60,7 @@ async def run_pipeline(query: str, location: str, headers: Dict[str, Any] = None
         # 2. Run enabled scrapers for the primary query first (Speed Optimized)
         # We use early_return=True to return as soon as we have >= 2 signals
         # CRITICAL: Run blocking ingestion in thread to avoid blocking async loop
-        primary_leads = await asyncio.to_thread(
+        primary_leads = await get_lane().run(
             ingestor.fetch_from_external_sources, 
             query, 
             location, 
@@ -79,7 +85,7 @@ async def run_pipeline(query: str, location: str, headers: Dict[str, Any] = None
             for q in expanded_queries:
                 if q == query: continue # Already did this
                 normalized_query = q.strip()
-                leads = await asyncio.to_thread(
+                leads = await get_lane().run(
                     ingestor.fetch_from_external_sources, 
                     normalized_query, 
                     location, 
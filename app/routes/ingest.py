@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Query, Request
+from app.middleware.auth import require_admin
+from app.core.lanes import BACKGROUND, get_lane
+from app.services.bulk_ingest import (
+    BULK_INGEST_SYNC_MAX, BulkIngestError, get_job, ingest_signals, parse_signals, submit_job
+)
+
+router = APIRouter(tags=["Ingest"])
+
+
+@router.post("/ingest/bulk")
+async def ingest_bulk(request: Request, run_async: bool = Query(False, alias="async"),
+                      role: str = Depends(require_admin)):
+    """
+    Bulk-ingest raw signals: NDJSON (one signal per line) or a JSON array,
+    optionally gzipped (Content-Encoding: gzip or a gzip body). Each signal
+    needs `url` and `text` (or `snippet`); `source`, `location`, `name`,
+    `phone`, `email`, `product_category` and `contact` are optional.
+
+    Returns a summary and a status per record (line), or a job id to poll
+    at GET /ingest/bulk/{job_id} with ?async=true or above
+    BULK_INGEST_SYNC_MAX records.
+    """
+    body = await request.body()
+    # Parsing and scoring are CPU work: keep them off the event loop and out of the interactive lane
+    lane = get_lane(BACKGROUND)
+    try:
+        signals, invalid = await lane.run(parse_signals, body)
+    except BulkIngestError as e:
+        return {"status": "error", "message": str(e)}
+
+    if run_async or len(signals) + len(invalid) > BULK_INGEST_SYNC_MAX:
+        return {"status": "accepted", "job_id": submit_job(signals, invalid)}
+    result = await lane.run(ingest_signals, signals, invalid)
+    return {"status": "success", **result}
+
+
+@router.get("/ingest/bulk/{job_id}")
+def get_bulk_ingest_job(job_id: str, role: str = Depends(require_admin)):
+    """Status of a bulk-ingest job; once done, its summary and per-record results."""
+    job = get_job(job_id)
+    if job is None:
+        return {"status": "error", "message": "Bulk ingest job not found"}
+    return job
@@ -1,14 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from typing import Optional, List
 from datetime import datetime, timezone, timedelta
+import time
 import logging
 
 from app.db import models
-from app.db.database import get_db
-from app.routes.admin import verify_api_key
+from app.db.database import get_db, get_read_db, ReadSessionLocal
+from app.db.async_database import AsyncSession, get_async_read_db
+from app.routes.admin import verify_api_key, API_KEY
+from app.db.fulltext import apply_fulltext_filter, search_leads
+from app.services.feed_service import fetch_feed_page
+from app.db.rollups import stats_totals
+from app.db.lead_cards import lead_cards, splice_json
+from app.core.response_cache import cached_response
+from app.db.changefeed import CHANGEFEED_MAX_WAIT, CHANGEFEED_POLL_INTERVAL, notifier, resolve_since, read_changes
+from app.core.lanes import get_lane
+from app.core.event_hub import hub, format_sse, TOPICS, LIVE_EVENTS_HEARTBEAT
+from app.services.export_service import (
+    FORMATS as EXPORT_FORMATS, resolve_columns, check_format, stream_export, export_filename,
+    start_export_job, export_job_status, export_job_file,
+)
 
 from pydantic import BaseModel
 import io
@@ -18,29 +32,58 @@ from app.intelligence_v2.thresholds import FLOOR, HIGH_INTENT, STRICT_PUBLIC
 
 class ExportRequest(BaseModel):
     ids: List[str]
+    format: str = "txt" # txt, csv, ndjson, parquet
+    columns: Optional[List[str]] = None
+
+class ExportJobRequest(BaseModel):
+    type: Optional[str] = None # active, high_intent, bootstrap (all leads when omitted)
+    ids: Optional[List[str]] = None
+    format: str = "csv"
+    columns: Optional[List[str]] = None
 
 router = APIRouter(tags=["Leads"])
 logger = logging.getLogger(__name__)
 
+def _export_query(db: Session, type: Optional[str] = None, ids: Optional[List[str]] = None):
+    """Leads selected for export: an intelligence tier and/or explicit IDs."""
+    query = db.query(models.Lead)
+    if type == "active":
+        query = query.filter(models.Lead.confidence_score >= STRICT_PUBLIC)
+    elif type == "high_intent":
+        query = query.filter(models.Lead.confidence_score >= HIGH_INTENT, models.Lead.confidence_score < STRICT_PUBLIC)
+    elif type == "bootstrap":
+        query = query.filter(models.Lead.confidence_score < HIGH_INTENT)
+    if ids is not None:
+        query = query.filter(models.Lead.id.in_(ids))
+    return query
+
+def _streamed_export(fmt: str, columns, prefix: str, **selection):
+    """StreamingResponse for csv/ndjson/parquet; raises ExportError on a bad request."""
+    columns = resolve_columns(columns)
+    check_format(fmt)
+    return StreamingResponse(
+        stream_export(lambda db: _export_query(db, **selection), fmt, columns),
+        media_type=EXPORT_FORMATS[fmt][0],
+        headers={"Content-Disposition": f"attachment; filename={export_filename(prefix, fmt)}"}
+    )
+
 @router.get("/export", dependencies=[Depends(verify_api_key)])
 async def export_leads_by_type(
     type: str = Query(..., pattern="^(active|high_intent|bootstrap)$"),
-    format: str = Query("txt", pattern="^txt$"),
-    db: Session = Depends(get_db)
+    format: str = Query("txt", pattern="^(txt|csv|ndjson|parquet)$"),
+    columns: Optional[str] = Query(None, description="Comma-separated leads columns (csv/ndjson/parquet)"),
+    db: Session = Depends(get_read_db)
 ):
-    """Export leads by intelligence tier as a .txt file."""
+    """Export leads by intelligence tier as .txt, CSV, NDJSON or Parquet (streamed)."""
     try:
+        if format != "txt":
+            return _streamed_export(format, columns, f"delta9-{type}", type=type)
+
         def iter_leads():
             yield f"--- DELTA-9 LEAD EXPORT ({type.upper()}) ---\n"
             yield f"Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n"
             
-            query = db.query(models.Lead)
-            if type == "active":
-                query = query.filter(models.Lead.confidence_score >= STRICT_PUBLIC)
-            elif type == "high_intent":
-                query = query.filter(models.Lead.confidence_score >= HIGH_INTENT, models.Lead.confidence_score < STRICT_PUBLIC)
-            elif type == "bootstrap":
-                query = query.filter(models.Lead.confidence_score < HIGH_INTENT)
+            query = _export_query(db, type=type)
 
             # Stream results to avoid memory spikes
             for lead in query.yield_per(100):
@@ -69,11 +112,39 @@ async def export_leads_by_type(
             headers={"Content-Disposition": f"attachment; filename=error_log.txt"}
         )
 
+@router.post("/export/jobs", dependencies=[Depends(verify_api_key)])
+def create_export_job(request: ExportJobRequest):
+    """Run a large export in the background to a local file; poll /export/jobs/{job_id} for progress."""
+    try:
+        if request.type not in (None, "active", "high_intent", "bootstrap"):
+            return JSONResponse(status_code=200, content={"status": "error", "message": f"Invalid type: {request.type}"})
+        selection = {"type": request.type, "ids": request.ids}
+        status = start_export_job(lambda db: _export_query(db, **selection), request.format, request.columns)
+        return {"status": "success", "job": status}
+    except Exception as e:
+        logger.error(f"Export job failed to start: {str(e)}")
+        return JSONResponse(status_code=200, content={"status": "error", "message": str(e)})
+
+@router.get("/export/jobs/{job_id}", dependencies=[Depends(verify_api_key)])
+def get_export_job(job_id: str):
+    status = export_job_status(job_id)
+    if not status:
+        return JSONResponse(status_code=200, content={"status": "error", "message": "Export job not found"})
+    return {"status": "success", "job": status}
+
+@router.get("/export/jobs/{job_id}/download", dependencies=[Depends(verify_api_key)])
+def download_export_job(job_id: str):
+    path = export_job_file(job_id)
+    if not path:
+        return JSONResponse(status_code=200, content={"status": "error", "message": "Export not ready"})
+    fmt = export_job_status(job_id)["format"]
+    return FileResponse(path, media_type=EXPORT_FORMATS[fmt][0], filename=export_filename("delta9-export", fmt))
+
 @router.get("/events", dependencies=[Depends(verify_api_key)])
 def get_events(
     type: str = Query(..., pattern="^(whatsapp|all)$"),
     limit: int = 50,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Fetch tracked events (e.g. WhatsApp taps)."""
     try:
@@ -100,13 +171,14 @@ def get_events(
 @router.post("/leads/export", dependencies=[Depends(verify_api_key)])
 async def export_leads(
     request: ExportRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Export selected leads as a clean .txt file stream."""
+    """Export selected leads as a .txt file stream, or as CSV / NDJSON / Parquet."""
     try:
-        leads = db.query(models.Lead).filter(models.Lead.id.in_(request.ids)).all()
-        
-        if not leads:
+        if request.format != "txt":
+            return _streamed_export(request.format, request.columns, "delta9-export", ids=request.ids)
+
+        if not db.query(models.Lead.id).filter(models.Lead.id.in_(request.ids)).first():
             # Soft failure: Return empty file
             logger.warning("No leads found for export")
             return StreamingResponse(
@@ -114,24 +186,24 @@ async def export_leads(
                 media_type="text/plain",
                 headers={"Content-Disposition": "attachment; filename=empty_export.txt"}
             )
-            
-        output = io.StringIO()
-        for l in leads:
-            l_dict = l.to_dict()
-            output.write(f"Source: {l_dict.get('source', 'N/A')}\n")
-            output.write(f"Product: {l_dict.get('product', 'N/A')}\n")
-            output.write(f"Text: {l_dict.get('text', 'N/A')}\n")
-            output.write(f"Phone: {l_dict.get('phone', 'N/A')}\n")
-            output.write(f"Intent Score: {l_dict.get('intent_score', 0)}\n")
-            output.write(f"WhatsApp: {l_dict.get('whatsapp_url', 'N/A')}\n")
-            output.write("---\n\n")
-            
-        output.seek(0)
+
+        def iter_leads():
+            for l in _export_query(db, ids=request.ids).yield_per(100):
+                l_dict = l.to_dict()
+                yield (
+                    f"Source: {l_dict.get('source', 'N/A')}\n"
+                    f"Product: {l_dict.get('product', 'N/A')}\n"
+                    f"Text: {l_dict.get('text', 'N/A')}\n"
+                    f"Phone: {l_dict.get('phone', 'N/A')}\n"
+                    f"Intent Score: {l_dict.get('intent_score', 0)}\n"
+                    f"WhatsApp: {l_dict.get('whatsapp_url', 'N/A')}\n"
+                    "---\n\n"
+                )
         
         filename = f"delta9-export-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
         
         return StreamingResponse(
-            io.BytesIO(output.getvalue().encode('utf-8')),
+            iter_leads(),
             media_type="text/plain",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -146,6 +218,7 @@ async def export_leads(
         )
 
 @router.get("/leads", dependencies=[Depends(verify_api_key)])
+@cached_response("leads", ttl=60)
 def get_leads(
     location: Optional[str] = None,
     query: Optional[str] = None,
@@ -154,13 +227,18 @@ def get_leads(
     time_range: Optional[str] = "2h",
     high_intent: Optional[bool] = False,
     has_whatsapp: Optional[bool] = False,
-    limit: int = 50,
-    db: Session = Depends(get_db)
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    sort: str = Query("ranked", pattern="^(ranked|recent)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db)
 ):
-    """Generic leads feed with universal filtering aligned with Intelligence tiers."""
+    """
+    Generic leads feed with universal filtering aligned with Intelligence tiers.
+    Pages are keyset-based: pass back `next_cursor` as `cursor` for the next page.
+    """
     try:
-        now = datetime.now(timezone.utc)
-        
         # Base query: Prioritize leads with source URLs but allow verified signals without them
         db_query = db.query(models.Lead)
 
@@ -183,13 +261,15 @@ def get_leads(
         if has_whatsapp:
             db_query = db_query.filter(models.Lead.whatsapp_link.isnot(None))
 
-        # 3. Search Query
+        # Exact filters served by the (status, title, created_at) feed index
+        if status:
+            db_query = db_query.filter(models.Lead.status == models.CRMStatus(status.upper()))
+        if category:
+            db_query = db_query.filter(models.Lead.title == category)
+
+        # 3. Search Query (full-text index with prefix matching)
         if query:
-            db_query = db_query.filter(or_(
-                models.Lead.product_category.ilike(f"%{query}%"),
-                models.Lead.buyer_request_snippet.ilike(f"%{query}%"),
-                models.Lead.buyer_name.ilike(f"%{query}%")
-            ))
+            db_query = apply_fulltext_filter(db, db_query, query)
         
         # 4. Location Filter (Generic)
         if location and location.lower() != "all":
@@ -198,44 +278,21 @@ def get_leads(
                 models.Lead.property_country.ilike(f"%{location}%")
             ))
 
-        # 5. Time Window Sequence: 2h -> 6h -> 12h -> 24h -> 7d
-        windows = {
-            "2h": now - timedelta(hours=2),
-            "6h": now - timedelta(hours=6),
-            "12h": now - timedelta(hours=12),
-            "24h": now - timedelta(days=1),
-            "7d": now - timedelta(days=7)
-        }
-
-        target_range = time_range if time_range in windows else "2h"
-        window_sequence = ["2h", "6h", "12h", "24h", "7d"]
-        start_idx = window_sequence.index(target_range)
-        
-        leads = []
-        final_window = target_range
+        # 5. Time Window Escalation: 2h -> 6h -> 12h -> 24h -> 7d, resolved in one pass
+        # Intelligent Ranking (default): ranked_score first (includes freshness), then timestamp
+        page = fetch_feed_page(db_query, limit=limit, time_range=time_range, sort=sort, cursor=cursor)
+        final_window = page["window"]
         
-        for label in window_sequence[start_idx:]:
-            final_window = label
-            # Intelligent Ranking: Sort by ranked_score first (which includes freshness), then timestamp
-            temp_leads = db_query.filter(models.Lead.created_at >= windows[label])\
-                                 .order_by(models.Lead.ranked_score.desc(), models.Lead.created_at.desc())\
-                                 .limit(limit).all()
-            if temp_leads:
-                leads = temp_leads
-                break
-        
-        results = [l.to_dict() for l in leads]
-        
-        # Ensure is_hot_lead is set in results
-        for r in results:
-            r["is_hot_lead"] = r.get("confidence", 0) >= STRICT_PUBLIC
-            
-        return {
-            "count": len(results),
-            "leads": results,
+        # Pre-rendered lead cards (is_hot_lead included), spliced in without re-encoding
+        cards = lead_cards(db, page["leads"])
+        envelope = {
+            "count": len(cards),
+            "leads": None,
             "message": f"Showing {tier or 'live'} signals from last {final_window}",
-            "window": final_window
+            "window": final_window,
+            "next_cursor": page["next_cursor"]
         }
+        return Response(content=splice_json(envelope, "leads", cards), media_type="application/json")
     except Exception as e:
         logger.error(f"API ERROR: Failed to fetch leads: {str(e)}")
         # Soft failure: Return empty list instead of 500 crash
@@ -243,43 +300,110 @@ def get_leads(
             "count": 0,
             "leads": [],
             "message": f"Error fetching leads: {str(e)}",
-            "window": time_range
+            "window": time_range,
+            "next_cursor": None
         }
 
+@router.get("/leads/search", dependencies=[Depends(verify_api_key)])
+def search_leads_ranked(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db)
+):
+    """Ranked full-text search over title, request snippet and location (prefix matching)."""
+    try:
+        hits = search_leads(db, q, limit=limit, offset=offset)
+        results = []
+        for lead, score in hits:
+            r = lead.to_dict()
+            r["search_rank"] = round(score, 4)
+            results.append(r)
+        return {"count": len(results), "leads": results, "query": q}
+    except Exception as e:
+        logger.error(f"API ERROR: Search failed for '{q}': {str(e)}")
+        return {"count": 0, "leads": [], "query": q, "message": f"Error searching leads: {str(e)}"}
+
+def _read_change_page(since, limit: int):
+    with ReadSessionLocal() as db:
+        since_seq = since if isinstance(since, int) else resolve_since(db, since)
+        return since_seq, read_changes(db, since_seq, limit)
+
+@router.get("/leads/changes", dependencies=[Depends(verify_api_key)])
+async def get_lead_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous page, or 'latest'"),
+    limit: int = Query(100, ge=1, le=1000),
+    wait: float = Query(0, ge=0, le=CHANGEFEED_MAX_WAIT, description="Long-poll up to this many seconds"),
+):
+    """Lead inserts/updates/deletes after `since`, oldest first. Pass back `cursor` to continue."""
+    try:
+        lane = get_lane()
+        deadline = time.monotonic() + wait
+        since_seq, page = await lane.run(_read_change_page, since, limit)
+        # Nothing new yet: park until a local commit (or the poll interval) and re-read
+        while not page["changes"] and time.monotonic() < deadline:
+            await notifier.wait(min(deadline - time.monotonic(), CHANGEFEED_POLL_INTERVAL))
+            _, page = await lane.run(_read_change_page, since_seq, limit)
+        return page
+    except Exception as e:
+        logger.error(f"API ERROR: Change feed failed for cursor {since}: {str(e)}")
+        return {"changes": [], "cursor": since, "has_more": False, "reset": False, "message": f"Error reading changes: {str(e)}"}
+
+@router.get("/events/stream")
+async def stream_events(
+    request: Request,
+    topics: Optional[str] = Query(None, description="Comma-separated subset of: " + ", ".join(TOPICS)),
+    api_key: Optional[str] = Query(None, description="EventSource cannot send headers, so the key comes as a query param"),
+):
+    """
+    One Server-Sent Events stream per dashboard tab: "leads", "stats",
+    "notifications" and "agents" events as writes commit, a comment line
+    every LIVE_EVENTS_HEARTBEAT seconds, and "resync" if the client fell behind.
+    """
+    if api_key != API_KEY:
+        # Same soft check as verify_api_key
+        logger.warning(f"Invalid API key on event stream: {api_key}")
+    wanted = [t for t in (topics or "").split(",") if t in TOPICS] or list(TOPICS)
+    subscription = hub.subscribe(wanted)
+
+    async def events():
+        try:
+            # Reconnect delay for the browser, then an immediate event so the client knows it is live
+            yield "retry: 5000\n\n"
+            yield format_sse({"topic": "ready", "data": {"topics": wanted}})
+            while not await request.is_disconnected():
+                event = await subscription.next(LIVE_EVENTS_HEARTBEAT)
+                yield format_sse(event) if event is not None else ": ping\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @router.get("/success/stats", dependencies=[Depends(verify_api_key)])
-def get_success_stats(db: Session = Depends(get_db)):
+@cached_response("leads", ttl=60)
+async def get_success_stats(db: AsyncSession = Depends(get_async_read_db)):
     """Fetch live market metrics for the dashboard aligned with Intelligence tiers."""
     try:
         now = datetime.now(timezone.utc)
         last_24h = now - timedelta(days=1)
-        
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # Counters come from lead_stats_rollups (O(buckets)), not COUNT(*) over leads
+        last_day_totals = await db.run_sync(stats_totals, since=last_24h)
+        all_totals = await db.run_sync(stats_totals)
+
         # 1. ACTIVE LEADS (STRICT_PUBLIC >= 0.8) in last 24h
-        active_count = db.query(models.Lead).filter(
-            models.Lead.confidence_score >= STRICT_PUBLIC,
-            models.Lead.created_at >= last_24h
-        ).count()
+        active_count = last_day_totals["strict_public"]
         
         # 2. HIGH INTENT (0.6 <= score < 0.8)
-        high_intent_count = db.query(models.Lead).filter(
-            models.Lead.confidence_score >= HIGH_INTENT
-        ).count()
+        high_intent_count = all_totals["high_intent"]
         
         # 3. URGENT BUYERS (High urgency level)
-        urgent_count = db.query(models.Lead).filter(
-            models.Lead.urgency_level == "high",
-            models.Lead.created_at >= last_24h
-        ).count()
+        urgent_count = last_day_totals["urgent"]
         
         # 4. WHATSAPP TAPS (Total tracked events today)
-        from sqlalchemy import func
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        # Use try/except for tap_count column existence if schema migration pending
-        try:
-            whatsapp_taps = db.query(func.sum(models.Lead.tap_count)).filter(
-                models.Lead.created_at >= start_of_day
-            ).scalar() or 0
-        except Exception:
-            whatsapp_taps = 0
+        whatsapp_taps = (await db.run_sync(stats_totals, since=start_of_day))["taps"]
         
         return {
             "active_listings_24h": active_count,
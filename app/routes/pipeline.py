@@ -1,6 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
 from app.middleware.auth import require_admin
+from sqlalchemy.orm import Session
 from app.config import PROD_STRICT
+from app.core.lanes import lane_stats
+from app.db.database import replicas, get_db
+from app.db.retention import retention_stats
+from app.core.raw_capture import store as raw_capture
+from app.core.delivery import delivery_stats, requeue
+from app.core.http_clients import http_stats
+from app.core.network_health import network_health
 
 router = APIRouter(tags=["Pipeline"])
 
@@ -18,3 +26,63 @@ def override_pipeline(role: str = Depends(require_admin)):
         "current_mode": "override_active",
         "role": role
     }
+
+
+@router.get("/pipeline/lanes")
+def get_lane_metrics(role: str = Depends(require_admin)):
+    """Per-lane saturation metrics (threads, browser slots, DB pool, rate-limit waits)."""
+    return lane_stats()
+
+
+@router.get("/pipeline/http")
+def get_http_client_stats(role: str = Depends(require_admin)):
+    """Outbound HTTP per host: requests, connections opened, reuse ratio and errors since process start."""
+    return http_stats()
+
+
+@router.get("/pipeline/network")
+def get_network_health(role: str = Depends(require_admin)):
+    """Per-source reachability and probe latency from the background network-health monitor."""
+    return network_health.status()
+
+
+@router.get("/pipeline/replicas")
+def get_replica_status(role: str = Depends(require_admin)):
+    """Read-replica health and lag as last checked (empty without DATABASE_REPLICA_URLS)."""
+    return replicas.status()
+
+
+@router.get("/pipeline/retention")
+def get_retention_metrics(role: str = Depends(require_admin)):
+    """Rows removed, partitions dropped and seconds spent by retention, per table, since process start."""
+    return retention_stats()
+
+
+@router.get("/pipeline/raw-captures")
+def get_raw_capture_stats(role: str = Depends(require_admin)):
+    """Raw-capture store: records, compression ratio, disk footprint and write throughput of this process."""
+    return raw_capture.stats()
+
+
+@router.get("/pipeline/raw-captures/{content_hash}")
+def get_raw_capture(content_hash: str, role: str = Depends(require_admin)):
+    """The raw scraper payload captured under a content hash (AgentRawLead.content_hash)."""
+    record = raw_capture.read(content_hash)
+    if record is None:
+        return {"status": "error", "message": "Raw capture not found"}
+    return record
+
+
+@router.get("/pipeline/outbox")
+def get_outbox_status(db: Session = Depends(get_db), role: str = Depends(require_admin)):
+    """Delivery outbox backlog per channel and status, recent dead letters and delivery counters."""
+    return delivery_stats(db)
+
+
+@router.post("/pipeline/outbox/{message_id}/retry")
+def retry_outbox_message(message_id: int, db: Session = Depends(get_db), role: str = Depends(require_admin)):
+    """Re-queue a dead-lettered delivery."""
+    message = requeue(db, message_id)
+    if message is None:
+        return {"status": "error", "message": "Dead-lettered message not found"}
+    return {"status": "success", "message": message.to_dict()}
@@ -1,17 +1,27 @@
 import asyncio
+import inspect
 import logging
 from typing import List, Dict, Any
-from .registry import get_active_scrapers, SCRAPER_REGISTRY
+from app.core.spans import span
+from .registry import get_active_scrapers, get_scraper_name, SCRAPER_REGISTRY
 from .base_scraper import BaseScraper
 from .facebook_marketplace import FacebookMarketplaceScraper
 from .reddit import RedditScraper
 
 logger = logging.getLogger(__name__)
 
-async def run_scrapers(query: str, location: str = "Kenya") -> List[Dict[str, Any]]:
+async def _timed_search(name: str, coro):
+    with span(f"scraper.{name}") as sp:
+        result = await coro
+        sp.items = len(result or [])
+        return result
+
+async def run_scrapers(query: str, location: str = "Kenya", incremental=None) -> List[Dict[str, Any]]:
     """
     Orchestrates all active scrapers to run in parallel.
-    Returns aggregated results.
+    Returns aggregated results, each tagged with its registry name.
+    With an IncrementalState, scrapers that accept a time window are only asked
+    for content since that source's high-water mark.
     """
     scrapers = get_active_scrapers()
     if not scrapers:
@@ -19,9 +29,16 @@ async def run_scrapers(query: str, location: str = "Kenya") -> List[Dict[str, An
         return []
 
     tasks = []
+    names = []
     for scraper in scrapers:
         if hasattr(scraper, 'search'):
-            tasks.append(scraper.search(query, location))
+            name = get_scraper_name(scraper) or scraper.__class__.__name__
+            kwargs = {}
+            if incremental is not None and incremental.has_mark(name) \
+                    and "time_window_hours" in inspect.signature(scraper.search).parameters:
+                kwargs["time_window_hours"] = incremental.window_hours(name)
+            tasks.append(_timed_search(name, scraper.search(query, location, **kwargs)))
+            names.append(name)
         else:
             logger.warning(f"Scraper {scraper.__class__.__name__} does not have a search method.")
 
@@ -32,12 +49,16 @@ async def run_scrapers(query: str, location: str = "Kenya") -> List[Dict[str, An
     results_list = await asyncio.gather(*tasks, return_exceptions=True)
     
     all_leads = []
-    for i, result in enumerate(results_list):
-        scraper_name = scrapers[i].__class__.__name__
+    for scraper_name, result in zip(names, results_list):
         if isinstance(result, Exception):
             logger.error(f"Scraper {scraper_name} failed: {result}")
-        elif result:
+            continue
+        if incremental is not None:
+            incremental.mark_queried(scraper_name)
+        if result:
             logger.info(f"Scraper {scraper_name} returned {len(result)} leads.")
+            for r in result:
+                r.setdefault("_scraper_name", scraper_name)
             all_leads.extend(result)
         else:
             logger.info(f"Scraper {scraper_name} returned 0 leads.")
@@ -5,6 +5,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 from playwright.sync_api import sync_playwright 
+from app.core.lanes import browser_slot
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +66,16 @@ class BaseScraper(ABC):
         """ 
         pass 
 
-    async def search(self, query: str, location: str) -> List[Dict[str, Any]]:
+    def window_param(self, time_window_hours: int) -> Optional[str]:
+        """
+        The upstream request parameter a time window turns into, or None when
+        the window is not sent upstream (posts are then filtered by age after
+        the fetch). Discovery only re-fetches a source with a wider window
+        when this value changes.
+        """
+        return None
+
+    async def search(self, query: str, location: str, time_window_hours: int = 24) -> List[Dict[str, Any]]:
         """
         New Standard Interface for Search Service.
         Wraps the legacy 'scrape' method and ensures async execution.
@@ -80,10 +90,11 @@ class BaseScraper(ABC):
             # But BaseScraper implementation is a fallback for legacy scrapers
             # Legacy scrapers use 'scrape(query, time_window)'
             full_query = f"{query} {location}"
-            signals = await self.scrape(full_query, time_window_hours=24)
+            signals = await self.scrape(full_query, time_window_hours=time_window_hours)
         else:
             full_query = f"{query} {location}"
-            signals = await asyncio.to_thread(self.scrape, full_query, time_window_hours=24)
+            from app.core.lanes import get_lane
+            signals = await get_lane().run(self.scrape, full_query, time_window_hours=time_window_hours)
             
         results = []
         for s in signals:
@@ -105,7 +116,7 @@ class BaseScraper(ABC):
         print("Navigating to:", url)
         logger.info(f"PLAYWRIGHT: Fetching {url} with hardened stealth")
         try:
-            with sync_playwright() as p: 
+            with browser_slot(), sync_playwright() as p: 
                 browser = p.chromium.launch( 
                     headless=True, 
                     args=[ 
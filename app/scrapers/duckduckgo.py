@@ -1,11 +1,7 @@
 import logging
 import re
 from datetime import datetime, timezone
-try:
-    from ddgs import DDGS
-except ImportError:
-    from duckduckgo_search import DDGS
-
+from app.core.http_clients import get_ddgs
 from .base_scraper import BaseScraper, ScraperSignal
 
 logger = logging.getLogger(__name__)
@@ -22,7 +18,7 @@ class DuckDuckGoScraper(BaseScraper):
         timelimit = None
         
         try:
-            with DDGS() as ddgs:
+            with get_ddgs() as ddgs:
                 # region='ke-en' for Kenya
                 # Using default backend (auto-selects best available: api/html/etc)
                 logger.info("DDG: Scraping with default backend...")
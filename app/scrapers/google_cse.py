@@ -1,10 +1,9 @@
 import logging
 import os
 import re
-import requests
 from datetime import datetime, timezone
 from .base_scraper import BaseScraper, ScraperSignal
-from app.utils.resilience import retry_sync
+from app.core.http_clients import fetch
 
 logger = logging.getLogger(__name__)
 
@@ -25,9 +24,16 @@ class GoogleCSEScraper(BaseScraper):
         self.current_key_index = 0
         self.cx = cx or os.getenv("GOOGLE_CSE_ID", "b19c2ccb43df84d2e")
 
-    @retry_sync(retries=2, delay=2.0, backoff=2.0, exceptions=(requests.RequestException,))
     def _call_api(self, params):
-        return requests.get("https://www.googleapis.com/customsearch/v1", params=params, timeout=20)
+        return fetch("GET", "https://www.googleapis.com/customsearch/v1", params=params, timeout=20, retries=1)
+
+    def window_param(self, time_window_hours: int) -> str:
+        # dateRestrict granularity is a day: 2h, 6h and 24h are the same request
+        if time_window_hours <= 24:
+            return "d1"
+        if time_window_hours <= 168:
+            return "w1"
+        return "m1"
 
     def scrape(self, query: str, time_window_hours: int):
         # --- Advanced Query Builder ---
@@ -50,13 +56,7 @@ class GoogleCSEScraper(BaseScraper):
         
         logger.info(f"OUTBOUND CALL: Google CSE Scrape for {expanded_query} (Window: {time_window_hours}h)")
         
-        date_restrict = "d1"
-        if time_window_hours <= 24:
-            date_restrict = "d1"
-        elif time_window_hours <= 168:
-            date_restrict = "w1"
-        else:
-            date_restrict = "m1"
+        date_restrict = self.window_param(time_window_hours)
             
         results = []
         max_retries = len(self.api_keys)
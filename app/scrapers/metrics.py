@@ -2,7 +2,7 @@ from collections import defaultdict, deque
 from datetime import datetime 
 from typing import Optional, Dict, Any
 import logging
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, write_later
 from app.db import models
 
 logger = logging.getLogger(__name__)
@@ -142,34 +142,29 @@ def record_run(name: str, leads_count: int, latency: float = 0.0, avg_confidence
     metrics["priority_score"] = calculate_priority(metrics)
     logger.info(f"METRICS: Updated priority score for {name} to {metrics['priority_score']}")
 
-    # Persist to DB
-    db = SessionLocal()
-    try:
-        db_metric = db.query(models.ScraperMetric).filter_by(scraper_name=name).first()
-        if not db_metric:
-            db_metric = models.ScraperMetric(scraper_name=name)
-            db.add(db_metric)
-        
-        db_metric.runs = metrics["runs"]
-        db_metric.leads_found = metrics["leads"]
-        db_metric.verified_leads = metrics["verified"]
-        db_metric.failures = metrics["failures"]
-        db_metric.consecutive_failures = metrics["consecutive_failures"]
-        db_metric.avg_latency = metrics["avg_latency"]
-        db_metric.avg_confidence = metrics["avg_confidence"]
-        db_metric.avg_freshness = metrics["avg_freshness"]
-        db_metric.avg_geo_score = metrics.get("avg_geo_score", 0.0)
-        db_metric.priority_score = metrics["priority_score"]
-        db_metric.priority_boost = metrics["priority_boost"]
-        db_metric.auto_disabled = 1 if metrics["auto_disabled"] else 0
-        db_metric.last_success = metrics["last_success"]
-        db_metric.history = list(metrics["history"])
-        db.commit()
-    except Exception as e:
-        logger.error(f"Failed to persist run metrics for {name}: {e}")
-        db.rollback()
-    finally:
-        db.close()
+    # Persist to DB (on SQLite batched by the single writer; the in-memory copy is authoritative)
+    write_later(_persist_run_metrics, name, {**metrics, "history": [dict(h) for h in metrics["history"]]})
+
+def _persist_run_metrics(db, name: str, metrics: Dict[str, Any]):
+    db_metric = db.query(models.ScraperMetric).filter_by(scraper_name=name).first()
+    if not db_metric:
+        db_metric = models.ScraperMetric(scraper_name=name)
+        db.add(db_metric)
+
+    db_metric.runs = metrics["runs"]
+    db_metric.leads_found = metrics["leads"]
+    db_metric.verified_leads = metrics["verified"]
+    db_metric.failures = metrics["failures"]
+    db_metric.consecutive_failures = metrics["consecutive_failures"]
+    db_metric.avg_latency = metrics["avg_latency"]
+    db_metric.avg_confidence = metrics["avg_confidence"]
+    db_metric.avg_freshness = metrics["avg_freshness"]
+    db_metric.avg_geo_score = metrics.get("avg_geo_score", 0.0)
+    db_metric.priority_score = metrics["priority_score"]
+    db_metric.priority_boost = metrics["priority_boost"]
+    db_metric.auto_disabled = 1 if metrics["auto_disabled"] else 0
+    db_metric.last_success = metrics["last_success"]
+    db_metric.history = metrics["history"]
 
 def calculate_priority(scraper: Any) -> float:
     """
@@ -249,18 +244,13 @@ def record_verified(name: str, verified_count: int = 1):
     if metrics["history"] and metrics["history"][-1]["success"]:
         metrics["history"][-1]["verified"] += verified_count
 
-    db = SessionLocal()
-    try:
-        db_metric = db.query(models.ScraperMetric).filter_by(scraper_name=name).first()
-        if db_metric:
-            db_metric.verified_leads = metrics["verified"]
-            db_metric.history = list(metrics["history"])
-            db.commit()
-    except Exception as e:
-        logger.error(f"Failed to persist verified metrics for {name}: {e}")
-        db.rollback()
-    finally:
-        db.close()
+    write_later(_persist_verified, name, metrics["verified"], [dict(h) for h in metrics["history"]])
+
+def _persist_verified(db, name: str, verified: int, history: list):
+    db_metric = db.query(models.ScraperMetric).filter_by(scraper_name=name).first()
+    if db_metric:
+        db_metric.verified_leads = verified
+        db_metric.history = history
 
 def record_category_lead(category: str, is_verified: bool):
     """Track lead success rate per category and persist to DB."""
@@ -277,22 +267,17 @@ def record_category_lead(category: str, is_verified: bool):
     if stats["leads"] > 0:
         stats["verified_rate"] = stats["verified"] / stats["leads"]
 
-    db = SessionLocal()
-    try:
-        db_cat = db.query(models.CategoryMetric).filter_by(category_name=category).first()
-        if not db_cat:
-            db_cat = models.CategoryMetric(category_name=category)
-            db.add(db_cat)
-        
-        db_cat.total_leads = stats["leads"]
-        db_cat.verified_leads = stats["verified"]
-        db_cat.verified_rate = stats["verified_rate"]
-        db.commit()
-    except Exception as e:
-        logger.error(f"Failed to persist category metrics for {category}: {e}")
-        db.rollback()
-    finally:
-        db.close()
+    write_later(_persist_category, category, dict(stats))
+
+def _persist_category(db, category: str, stats: Dict[str, Any]):
+    db_cat = db.query(models.CategoryMetric).filter_by(category_name=category).first()
+    if not db_cat:
+        db_cat = models.CategoryMetric(category_name=category)
+        db.add(db_cat)
+
+    db_cat.total_leads = stats["leads"]
+    db_cat.verified_leads = stats["verified"]
+    db_cat.verified_rate = stats["verified_rate"]
 
 def get_metrics(name: Optional[str] = None):
     """Return metrics for one or all scrapers."""
@@ -1,5 +1,6 @@
 import logging
 from typing import Dict, Any, Optional, List
+from app.core.network_health import network_health
 from .registry import SCRAPER_REGISTRY, ACTIVE_SCRAPERS, refresh_scraper_states, update_scraper_state
 
 logger = logging.getLogger("ScraperSelector")
@@ -41,6 +42,11 @@ def decide_scrapers(
             logger.info(f"DEBUG: Skipping {source} because auto_disabled is True")
             continue
 
+        # 🌐 Upstream down as last probed by the network-health monitor
+        if not network_health.reachable(type(scraper).__name__):
+            reasoning.append(f"NETWORK: {source} unreachable, skipped.")
+            continue
+
         # Check enabled status
         is_enabled = source in ACTIVE_SCRAPERS
         
@@ -1,9 +1,9 @@
 
 import logging
-import httpx
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.core.config import settings
+from app.core.http_clients import afetch
 from app.services.query_rewriter import build_buyer_query
 from app.services.market_classifier import classify_market_side
 from app.services.intent_engine import calculate_intent_score
@@ -38,7 +38,10 @@ class SerpAPIScraper(BaseScraper):
         """
         return []
 
-    async def search(self, query: str, location: str = "Kenya"):
+    def window_param(self, time_window_hours: int) -> Optional[str]:
+        return f"qdr:h{time_window_hours}" if time_window_hours else None
+
+    async def search(self, query: str, location: str = "Kenya", time_window_hours: Optional[int] = None):
         if not settings.SERPAPI_KEY:
             logger.warning("SERPAPI_KEY is not set. Skipping SerpAPI search.")
             return []
@@ -56,16 +59,14 @@ class SerpAPIScraper(BaseScraper):
             "hl": settings.SERPAPI_LANGUAGE,
             "num": 30, # Fetch more results to increase chance of finding buyers
         }
+        if time_window_hours:
+            # Google "past N hours" filter; incremental agent runs only need what's new
+            params["tbs"] = self.window_param(time_window_hours)
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://serpapi.com/search",
-                    params=params,
-                    timeout=30
-                )
-                response.raise_for_status()
-                data = response.json()
+            response = await afetch("GET", "https://serpapi.com/search", params=params, timeout=30)
+            response.raise_for_status()
+            data = response.json()
         except Exception as e:
             logger.error(f"SerpAPI request failed: {e}")
             return []
@@ -1,11 +1,13 @@
 import os
+import time
 import logging
-from typing import List, Dict, Optional, Union, Any
+from typing import List, Dict, Optional, Union, Any, Iterator
 from sqlalchemy.orm import Session
 from app.db.database import SessionLocal
 from app.ingestion import LiveLeadIngestor
 from app.services.pipeline import LeadPipeline
 from app.models.lead import Lead
+from app.db.changefeed import resolve_since, read_changes
 from app.scrapers.registry import update_scraper_state, get_active_scrapers, SCRAPER_REGISTRY
 
 # Configure logging to be less verbose for SDK users by default
@@ -89,6 +91,38 @@ class Delta9:
             
         return query.limit(limit).all()
 
+    def changes(self, since: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """
+        Read lead changes (insert/update/upsert/delete) after a cursor.
+        
+        Args:
+            since (str, optional): Cursor from the previous call, "latest", or None for the oldest retained change.
+            limit (int): Max events to return.
+            
+        Returns:
+            Dict: {"changes", "cursor", "has_more", "reset"}. Store `cursor` and pass it back next time;
+            `reset` means the cursor fell out of retention and a full resync is needed.
+        """
+        self._db.expire_all()
+        page = read_changes(self._db, resolve_since(self._db, since), limit)
+        self._db.rollback()  # Release the read snapshot so the next call sees new commits
+        return page
+
+    def follow_changes(self, since: Optional[str] = None, poll_interval: float = 1.0, limit: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Yield change events forever, starting after `since` (e.g. a cursor saved by a CRM sync).
+        Each event carries its own seq; resume later with since=str(event["seq"]).
+        """
+        cursor = since
+        while True:
+            page = self.changes(since=cursor, limit=limit)
+            if page["reset"]:
+                logger.warning("SDK: change cursor expired; some changes were trimmed before they were read.")
+            yield from page["changes"]
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                time.sleep(poll_interval)
+
     def get_scrapers(self) -> Dict[str, Any]:
         """
         Get the status of all registered scrapers.
@@ -6,11 +6,16 @@ from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 from sqlalchemy import update
 from sqlalchemy.sql import func
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, write
 from app.models.agent import Agent
 from app.services.pipeline import run_pipeline_for_query
 from app.utils.notifications import notify_new_leads
-from app.services.deduplication_service import upsert_lead_atomic
+from app.services.deduplication_service import upsert_leads
+from app.services.incremental_service import load_incremental_state
+from app.core.lanes import LANES, BACKGROUND, use_lane, admit_background
+from app.core.network_health import network_health
+from app.core.spans import recording, span, current_recorder
+from app.db.models import AgentRunLog
 
 logger = logging.getLogger(__name__)
 
@@ -118,8 +123,41 @@ def _heartbeat_sync(agent_id_str):
     finally:
         db.close()
 
-def _save_results_and_unlock_sync(agent_id_str, leads, agent_data):
-    """Save leads, notify, and update next run time."""
+def _load_incremental_sync(agent_id_str):
+    """Load the agent's per-source high-water marks."""
+    db = SessionLocal()
+    try:
+        return load_incremental_state(db, agent_id_str)
+    finally:
+        db.close()
+
+def _write_run_log(db: Session, agent_uuid, leads_found: int, status: str, errors: str = None):
+    """Persist an AgentRunLog with the stage breakdown from the current span recorder."""
+    recorder = current_recorder()
+    profile = recorder.to_dict() if recorder else None
+    db.add(AgentRunLog(
+        agent_id=agent_uuid,
+        leads_found=leads_found,
+        errors=errors,
+        status=status,
+        duration_ms=int(profile["total_ms"]) if profile else 0,
+        profile=profile
+    ))
+    db.commit()
+
+def _record_failed_run_sync(agent_id_str, status, error):
+    """Log a timed-out or failed run so its profile shows where the time went."""
+    db = SessionLocal()
+    try:
+        _write_run_log(db, uuid.UUID(agent_id_str), 0, status, str(error)[:1000])
+    except Exception as e:
+        logger.error(f"Could not record run log for {agent_id_str}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def _save_results_and_unlock_sync(agent_id_str, leads, agent_data, incremental=None):
+    """Save leads, notify, advance high-water marks and update next run time."""
     db = SessionLocal()
     try:
         agent_uuid = uuid.UUID(agent_id_str)
@@ -128,14 +166,12 @@ def _save_results_and_unlock_sync(agent_id_str, leads, agent_data):
         if not agent:
             return
             
-        # Save leads ATOMICALLY
+        # Save leads ATOMICALLY, in one transaction (on SQLite via the single writer)
         saved_count = 0
-        if leads:
-            for lead in leads:
-                # Use Atomic Upsert
-                saved_lead = upsert_lead_atomic(db, lead)
-                if saved_lead:
-                    saved_count += 1
+        with span("db.upsert") as sp:
+            if leads:
+                saved_count = len(write(upsert_leads, leads))
+            sp.items = saved_count
                 
         # Update Agent Schedule
         # Handle next_run_at being None or offset-naive
@@ -154,14 +190,31 @@ def _save_results_and_unlock_sync(agent_id_str, leads, agent_data):
         agent.next_run_at = next_run
         agent.is_running = False
         
-        db.commit()
+        with span("db.schedule"):
+            db.commit()
+
+        # Advance high-water marks only once the leads are safely stored
+        if incremental is not None:
+            try:
+                with span("incremental.save"):
+                    incremental.save(db)
+            except Exception as c_err:
+                logger.error(f"[INCREMENTAL ERROR] Could not advance marks: {c_err}")
+                db.rollback()
         
         # Notify (Sync but fast usually)
         if saved_count > 0:
             try:
-                notify_new_leads(agent.name, leads, agent_id=agent.id)
+                with span("notify", items=saved_count):
+                    notify_new_leads(agent.name, leads, agent_id=agent.id)
             except Exception as n_err:
                 logger.error(f"[NOTIFY ERROR] {n_err}")
+
+        try:
+            _write_run_log(db, agent_uuid, saved_count, "success")
+        except Exception as l_err:
+            logger.error(f"[RUN LOG ERROR] {l_err}")
+            db.rollback()
                 
         logger.info(f"[AGENT DONE] {agent.name} -> {saved_count} leads saved. Next run: {next_run}")
         
@@ -205,7 +258,7 @@ async def heartbeat_loop(agent_id: str, stop_event: asyncio.Event):
     """Keep the agent alive in DB."""
     while not stop_event.is_set():
         try:
-            await asyncio.to_thread(_heartbeat_sync, agent_id)
+            await LANES[BACKGROUND].run(_heartbeat_sync, agent_id)
         except Exception as e:
             logger.error(f"Heartbeat loop error: {e}")
         
@@ -219,9 +272,20 @@ async def heartbeat_loop(agent_id: str, stop_event: asyncio.Event):
 async def execute_agent(agent_id: str):
     """
     Execute a single agent cycle with timeout protection.
+    Runs entirely in the background lane (threads, DB pool, browser slots).
+    Stage timings are recorded and stored on the run's AgentRunLog.profile.
     """
+    with use_lane(BACKGROUND), recording():
+        await _execute_agent(agent_id)
+
+async def _execute_agent(agent_id: str):
+    # Yield to interactive traffic before taking background resources
+    with span("admission"):
+        await LANES[BACKGROUND].run(admit_background)
+
     # 1. Atomic Lock (Thread)
-    agent_data = await asyncio.to_thread(_lock_agent_atomic_sync, agent_id)
+    with span("lock"):
+        agent_data = await LANES[BACKGROUND].run(_lock_agent_atomic_sync, agent_id)
     if not agent_data:
         # Could not lock (already running), skip
         return
@@ -236,32 +300,40 @@ async def execute_agent(agent_id: str):
         # 2. Run Pipeline (Async) with TIMEOUT
         # agent_data['location'] might be None
         location = agent_data['location'] or "Kenya"
+
+        # Only fetch what is new since the last successful run
+        with span("incremental.load"):
+            incremental = await LANES[BACKGROUND].run(_load_incremental_sync, agent_id)
         
         # Enforce timeout (e.g., 10 minutes max per agent)
-        results = await asyncio.wait_for(
-            run_pipeline_for_query(agent_data['query'], location=location),
-            timeout=600 # 10 minutes
-        )
+        with span("pipeline") as sp:
+            results = await asyncio.wait_for(
+                run_pipeline_for_query(agent_data['query'], location=location, incremental=incremental),
+                timeout=600 # 10 minutes
+            )
+            sp.items = len(results or [])
         
         # Stop heartbeat before saving
         stop_heartbeat.set()
         await heartbeat_task
 
         # 3. Save & Unlock (Thread)
-        await asyncio.to_thread(_save_results_and_unlock_sync, agent_id, results, agent_data)
+        await LANES[BACKGROUND].run(_save_results_and_unlock_sync, agent_id, results, agent_data, incremental)
 
     except asyncio.TimeoutError:
         logger.error(f"[AGENT TIMEOUT] Agent {agent_data['name']} timed out after 600s")
         stop_heartbeat.set()
         await heartbeat_task
-        await asyncio.to_thread(_unlock_on_error_sync, agent_id)
+        await LANES[BACKGROUND].run(_unlock_on_error_sync, agent_id)
+        await LANES[BACKGROUND].run(_record_failed_run_sync, agent_id, "timeout", "Timed out after 600s")
         
     except Exception as e:
         logger.error(f"[AGENT ERROR] {e}")
         stop_heartbeat.set()
         await heartbeat_task
         # Unlock (Thread)
-        await asyncio.to_thread(_unlock_on_error_sync, agent_id)
+        await LANES[BACKGROUND].run(_unlock_on_error_sync, agent_id)
+        await LANES[BACKGROUND].run(_record_failed_run_sync, agent_id, "error", e)
 
 async def scheduler_loop():
     """
@@ -271,12 +343,13 @@ async def scheduler_loop():
     logger.info("--- Agent Scheduler Engine Started ---")
     
     # Reset stale agents on startup
-    await asyncio.to_thread(reset_agents_on_startup)
+    await LANES[BACKGROUND].run(reset_agents_on_startup)
+    network_health.start()
     
     while not STOP_SCHEDULER:
         try:
             # Fetch due agents (Thread)
-            agent_ids = await asyncio.to_thread(_get_due_agents_sync)
+            agent_ids = await LANES[BACKGROUND].run(_get_due_agents_sync)
             
             if agent_ids:
                 logger.info(f"Found {len(agent_ids)} agents due for execution.")
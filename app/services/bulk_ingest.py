@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import uuid
+import zlib
+import logging
+import threading
+import multiprocessing
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+from sqlalchemy import select
+from app.db.database import SessionLocal, write
+from app.db.models import Lead
+from app.nlp.dedupe import dedupe_leads
+from app.services.deduplication_service import bulk_upsert_leads
+from app.services.pipeline import LeadPipeline
+from app.core.lanes import BACKGROUND, get_lane
+
+logger = logging.getLogger(__name__)
+
+# POST /ingest/bulk: NDJSON (or a JSON array), optionally gzipped, of raw
+# signals from partners and side scrapers. Per batch of BULK_INGEST_BATCH:
+# schema validation (pydantic-core, straight from the JSON bytes), dedupe
+# (dedupe_leads: exact url, semantic when the model is available), scoring
+# fanned out over BULK_INGEST_PROCESSES worker processes, one IN query for
+# the urls already stored, and one bulk upsert through the DB writer.
+# Bodies of more than BULK_INGEST_SYNC_MAX signals run as a background job.
+BULK_INGEST_MAX_RECORDS = int(os.getenv("BULK_INGEST_MAX_RECORDS", "50000"))
+BULK_INGEST_MAX_MB = float(os.getenv("BULK_INGEST_MAX_MB", "64"))
+BULK_INGEST_BATCH = int(os.getenv("BULK_INGEST_BATCH", "2000"))
+BULK_INGEST_SYNC_MAX = int(os.getenv("BULK_INGEST_SYNC_MAX", "5000"))
+BULK_INGEST_PROCESSES = int(os.getenv("BULK_INGEST_PROCESSES", str(min(4, os.cpu_count() or 1))))
+BULK_INGEST_JOBS_KEPT = 200
+
+_URL_QUERY_CHUNK = 900  # stays under SQLite's bound-parameter limit
+
+
+class RawSignal(BaseModel):
+    """One raw signal as pushed to /ingest/bulk (the ScraperSignal fields LeadPipeline reads)."""
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    url: str = Field(min_length=1, max_length=2048)
+    text: Optional[str] = Field(default=None, max_length=20000)
+    snippet: Optional[str] = Field(default=None, max_length=20000)
+    source: str = "Partner"
+    location: Optional[str] = None
+    name: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    product_category: Optional[str] = None
+    contact: Optional[Dict[str, Optional[str]]] = None
+
+
+_signal = TypeAdapter(RawSignal)
+
+
+class BulkIngestError(ValueError):
+    """The body as a whole is unusable (too large, bad gzip)."""
+
+
+# --- Parsing --------------------------------------------------------------
+
+def _decompress(body: bytes) -> bytes:
+    limit = int(BULK_INGEST_MAX_MB * 1024 * 1024)
+    if body[:2] == b"\x1f\x8b":
+        try:
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            body = inflater.decompress(body, limit + 1)
+        except zlib.error as e:
+            raise BulkIngestError(f"Invalid gzip body: {e}")
+    if len(body) > limit:
+        raise BulkIngestError(f"Body larger than {BULK_INGEST_MAX_MB:g} MB")
+    return body
+
+
+def _invalid(line: int, error: str) -> dict:
+    return {"line": line, "status": "invalid", "error": error}
+
+
+def _validation_message(e: ValidationError) -> str:
+    first = e.errors()[0]
+    where = ".".join(str(part) for part in first.get("loc", ())) or "record"
+    return f"{where}: {first.get('msg')}"
+
+
+def parse_signals(body: bytes) -> Tuple[List[dict], List[dict]]:
+    """
+    Validate every record of the body. Returns (signals, invalid results);
+    each signal dict carries its 1-based position as `_line`.
+    """
+    body = _decompress(body)
+    if body.lstrip()[:1] == b"[":
+        try:
+            items = [(n, item, _signal.validate_python) for n, item in enumerate(json.loads(body), 1)]
+        except ValueError as e:
+            raise BulkIngestError(f"Invalid JSON array: {e}")
+    else:
+        items = [(n, line, _signal.validate_json) for n, line in enumerate(body.splitlines(), 1) if line.strip()]
+    if len(items) > BULK_INGEST_MAX_RECORDS:
+        raise BulkIngestError(f"{len(items)} records; at most {BULK_INGEST_MAX_RECORDS} per request")
+
+    signals, invalid = [], []
+    for line, item, validate in items:
+        try:
+            signal = validate(item)
+        except ValidationError as e:
+            invalid.append(_invalid(line, _validation_message(e)))
+            continue
+        if not (signal.text or signal.snippet):
+            invalid.append(_invalid(line, "text: either text or snippet is required"))
+            continue
+        record = signal.model_dump(exclude_none=True)
+        record["_line"] = line
+        signals.append(record)
+    return signals, invalid
+
+
+# --- Scoring --------------------------------------------------------------
+
+_worker_pipeline = None
+
+
+def _score_chunk(signals: List[dict]) -> List[Optional[dict]]:
+    """Lead fields per signal (None when rejected); runs in the worker processes."""
+    global _worker_pipeline
+    if _worker_pipeline is None:
+        _worker_pipeline = LeadPipeline(db=None)
+    return [_worker_pipeline.build_lead_fields(signal) for signal in signals]
+
+
+_processes: Optional[ProcessPoolExecutor] = None
+_processes_lock = threading.Lock()
+
+
+def _score(signals: List[dict]) -> List[Optional[dict]]:
+    global _processes
+    if BULK_INGEST_PROCESSES <= 1 or len(signals) < 200:
+        return _score_chunk(signals)
+    with _processes_lock:
+        if _processes is None:
+            _processes = ProcessPoolExecutor(max_workers=BULK_INGEST_PROCESSES,
+                                             mp_context=multiprocessing.get_context("spawn"))
+    size = -(-len(signals) // BULK_INGEST_PROCESSES)
+    chunks = [signals[i:i + size] for i in range(0, len(signals), size)]
+    return [fields for chunk in _processes.map(_score_chunk, chunks) for fields in chunk]
+
+
+# --- Persistence ----------------------------------------------------------
+
+def _existing_urls(session_factory, urls: List[str]) -> set:
+    existing = set()
+    with session_factory() as db:
+        for i in range(0, len(urls), _URL_QUERY_CHUNK):
+            existing.update(db.scalars(select(Lead.url).where(Lead.url.in_(urls[i:i + _URL_QUERY_CHUNK]))))
+    return existing
+
+
+def ingest_signals(signals: List[dict], invalid: Optional[List[dict]] = None, session_factory=SessionLocal,
+                   writer=write) -> dict:
+    """
+    Dedupe, score and store validated signals batch by batch. Returns a
+    summary by status and one result per record, in body order:
+    created / updated (stored), duplicate (repeated in the body), rejected
+    (by the pipeline) or invalid (failed validation).
+    """
+    started = time.perf_counter()
+    results = list(invalid or [])
+    stored = 0
+    for start in range(0, len(signals), BULK_INGEST_BATCH):
+        batch = signals[start:start + BULK_INGEST_BATCH]
+        unique, repeated = dedupe_leads(batch)
+        results.extend({"line": r["_line"], "status": "duplicate", "error": r.get("rejection_reason")}
+                       for r in repeated)
+
+        rows, lines = [], []
+        for signal, fields in zip(unique, _score(unique)):
+            if fields is None:
+                results.append({"line": signal["_line"], "status": "rejected"})
+            else:
+                rows.append(fields)
+                lines.append(signal["_line"])
+        if not rows:
+            continue
+        existing = _existing_urls(session_factory, [row["url"] for row in rows])
+        lead_ids = writer(bulk_upsert_leads, rows)
+        stored += len(lead_ids)
+        results.extend({"line": line, "status": "updated" if row["url"] in existing else "created", "id": str(lead_id)}
+                       for line, row, lead_id in zip(lines, rows, lead_ids))
+
+    seconds = time.perf_counter() - started
+    results.sort(key=lambda r: r["line"])
+    summary = dict(Counter(r["status"] for r in results))
+    summary.update(total=len(results), seconds=round(seconds, 3),
+                   signals_per_sec=round(len(results) / seconds, 1) if seconds else None)
+    logger.info(f"BULK INGEST: {summary}")
+    return {"summary": summary, "records": results}
+
+
+# --- Background jobs ------------------------------------------------------
+
+_jobs: "OrderedDict[str, dict]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _run_job(job_id: str, signals: List[dict], invalid: List[dict]):
+    with _jobs_lock:
+        _jobs[job_id]["status"] = "running"
+    try:
+        result = ingest_signals(signals, invalid)
+        update = {"status": "done", **result}
+    except Exception as e:
+        logger.error(f"Bulk ingest job {job_id} failed: {e}")
+        update = {"status": "failed", "error": str(e)}
+    with _jobs_lock:
+        _jobs[job_id].update(update, finished_at=datetime.utcnow().isoformat())
+
+
+def submit_job(signals: List[dict], invalid: List[dict]) -> str:
+    """Ingest on the background lane; poll get_job(job_id). Jobs live in this process's memory."""
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _jobs[job_id] = {"job_id": job_id, "status": "queued", "records": None,
+                         "submitted": len(signals) + len(invalid), "submitted_at": datetime.utcnow().isoformat()}
+        while len(_jobs) > BULK_INGEST_JOBS_KEPT:
+            _jobs.popitem(last=False)
+    get_lane(BACKGROUND).submit(_run_job, job_id, signals, invalid)
+    return job_id
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
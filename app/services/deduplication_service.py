@@ -1,10 +1,17 @@
+import uuid
 import logging
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, List
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
-from app.db.models import Lead
+from app.db.models import Lead, LeadDetail
+from app.models.lead import COLD_COLUMNS
+from app.db.changefeed import record_changes
+from app.db.lead_cards import invalidate_cards
+from app.db.live_events import queue_event
+from app.db.rollups import core_lead_deltas
 
 logger = logging.getLogger(__name__)
 
@@ -15,80 +22,102 @@ def model_to_dict(obj: Lead) -> Dict[str, Any]:
         val = getattr(obj, column.name, None)
         if val is not None:
             data[column.name] = val
+    for name in COLD_COLUMNS:
+        val = getattr(obj, name, None)
+        if val is not None:
+            data[name] = val
     return data
 
+def _on_url_conflict(stmt, dialect: str):
+    """Update the existing row with the same url instead of failing on the unique index."""
+    # We don't want to overwrite everything (e.g. created_at)
+    # But we do want to update status, price, etc.
+    update_dict = {
+        'updated_at': stmt.excluded.updated_at,
+        'last_activity': stmt.excluded.last_activity,
+        'price': stmt.excluded.price,
+        'status': stmt.excluded.status,
+        'is_hot_lead': stmt.excluded.is_hot_lead,
+        'confidence_score': stmt.excluded.confidence_score,
+        'intent_score': stmt.excluded.intent_score
+    }
+    if dialect == 'postgresql':
+        update_dict['tap_count'] = Lead.tap_count + 1
+    return stmt.on_conflict_do_update(index_elements=['url'], set_=update_dict)
+
+def upsert_lead(db: Session, lead_obj: Union[Lead, Dict[str, Any]]):
+    """
+    Insert a lead, or update the existing row with the same url, without
+    committing. Returns the lead id; raises on failure. The conflict is
+    resolved by the unique index on `url` (uix_source_url), so concurrent
+    writers of the same listing converge on one row.
+    """
+    # 1. Convert to dict if needed
+    if isinstance(lead_obj, Lead):
+        lead_data = model_to_dict(lead_obj)
+    else:
+        lead_data = lead_obj.copy()
+        # `source_url` is the Python-side alias of the url column
+        if 'source_url' in lead_data:
+            lead_data.setdefault('url', lead_data.pop('source_url'))
+
+    # Ensure ID is present
+    if 'id' not in lead_data:
+        lead_data['id'] = uuid.uuid4()
+    # Cold columns live in lead_details, written after the lead row
+    cold_data = {name: lead_data.pop(name) for name in COLD_COLUMNS if name in lead_data}
+
+    # 2. Determine dialect
+    dialect = db.get_bind().dialect.name
+
+    # 3. Construct Upsert Statement
+    if dialect == 'postgresql':
+        stmt = _on_url_conflict(pg_insert(Lead).values(**lead_data), dialect)
+    elif dialect == 'sqlite':
+        stmt = _on_url_conflict(sqlite_insert(Lead).values(**lead_data), dialect)
+    else:
+        # Fallback for other DBs (MySQL etc) - explicit merge
+        logger.warning(f"⚠️ Unsupported dialect {dialect} for atomic upsert. Using merge.")
+        merged = db.merge(Lead(**lead_data, **cold_data))
+        db.flush()
+        return merged.id
+
+    # 4. Execute (Core bypasses the flush hook, so apply its rollup deltas and log the change feed row here)
+    with core_lead_deltas(db, [lead_data.get('url')]):
+        lead_id = db.execute(stmt.returning(Lead.id)).scalar()
+    if cold_data:
+        db.merge(LeadDetail(lead_id=lead_id, **cold_data))
+    record_changes(db, [lead_id], op="upsert")
+    invalidate_cards(db, [lead_id])
+    queue_event(db, "leads", upserted=[str(lead_id)])
+    return lead_id
+
+def upsert_leads(db: Session, leads: List[Union[Lead, Dict[str, Any]]]) -> List[Any]:
+    """
+    Upsert a batch of leads in the caller's transaction (no commit), one
+    SAVEPOINT each so a bad lead is logged and skipped without losing the
+    rest. Returns the ids that were stored.
+    """
+    lead_ids = []
+    for lead in leads:
+        try:
+            with db.begin_nested():
+                lead_ids.append(upsert_lead(db, lead))
+        except Exception as e:
+            logger.error(f"Upsert skipped for {getattr(lead, 'url', None) or lead}: {e}")
+    return lead_ids
+
 def upsert_lead_atomic(db: Session, lead_obj: Union[Lead, Dict[str, Any]]) -> Optional[Lead]:
     """
-    🛡️ ATOMIC UPSERT: Inserts lead if new, updates if exists (on source_url).
+    🛡️ ATOMIC UPSERT: Inserts lead if new, updates if exists (on url), and commits.
     Handles race conditions using DB-level locking/constraints.
     """
     try:
-        # 1. Convert to dict if needed
-        if isinstance(lead_obj, Lead):
-            lead_data = model_to_dict(lead_obj)
-        else:
-            lead_data = lead_obj.copy()
-
-        # Ensure ID is present
-        if 'id' not in lead_data:
-            import uuid
-            lead_data['id'] = uuid.uuid4()
-            
-        # 2. Determine dialect
-        dialect = db.bind.dialect.name
-        stmt = None
-        
-        # 3. Construct Upsert Statement
-        if dialect == 'postgresql':
-            stmt = pg_insert(Lead).values(**lead_data)
-            # Define what to update on conflict
-            # We don't want to overwrite everything (e.g. created_at)
-            # But we do want to update status, price, etc.
-            update_dict = {
-                'updated_at': stmt.excluded.updated_at,
-                'last_activity': stmt.excluded.last_activity,
-                'price': stmt.excluded.price,
-                'status': stmt.excluded.status,
-                'is_hot_lead': stmt.excluded.is_hot_lead,
-                'tap_count': Lead.tap_count + 1,
-                'confidence_score': stmt.excluded.confidence_score,
-                'intent_score': stmt.excluded.intent_score
-            }
-            stmt = stmt.on_conflict_do_update(
-                index_elements=['source_url'], # Assumes UniqueConstraint on source_url
-                set_=update_dict
-            )
-            
-        elif dialect == 'sqlite':
-            stmt = sqlite_insert(Lead).values(**lead_data)
-            update_dict = {
-                'updated_at': stmt.excluded.updated_at,
-                'last_activity': stmt.excluded.last_activity,
-                'price': stmt.excluded.price,
-                'status': stmt.excluded.status,
-                'is_hot_lead': stmt.excluded.is_hot_lead,
-                'confidence_score': stmt.excluded.confidence_score,
-                'intent_score': stmt.excluded.intent_score
-            }
-            stmt = stmt.on_conflict_do_update(
-                index_elements=['source_url'],
-                set_=update_dict
-            )
-        else:
-            # Fallback for other DBs (MySQL etc) - explicit merge
-            logger.warning(f"⚠️ Unsupported dialect {dialect} for atomic upsert. Using merge.")
-            merged = db.merge(Lead(**lead_data))
-            db.commit()
-            return merged
-
-        # 4. Execute
-        db.execute(stmt)
+        lead_id = upsert_lead(db, lead_obj)
         db.commit()
-        
         # 5. Return updated object
-        # Since we committed, we can query it back
-        return db.query(Lead).filter(Lead.source_url == lead_data['source_url']).first()
-            
+        return db.get(Lead, lead_id)
+
     except IntegrityError as e:
         db.rollback()
         logger.error(f"Integrity Error in upsert: {e}")
@@ -97,3 +126,49 @@ def upsert_lead_atomic(db: Session, lead_obj: Union[Lead, Dict[str, Any]]) -> Op
         db.rollback()
         logger.error(f"Atomic Upsert Failed: {e}")
         return None
+
+def bulk_upsert_leads(db: Session, leads: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Upsert many lead dicts with one executemany (batched into multi-row
+    INSERT ... ON CONFLICT by SQLAlchemy) instead of a statement and
+    savepoint per lead. The dicts must share the same keys and have
+    distinct urls. No commit; one bad row fails the whole call, so
+    validate first. Returns the stored lead ids in input order.
+    """
+    if not leads:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        return upsert_leads(db, leads)
+
+    hot_rows, cold_rows = [], []
+    for index, lead in enumerate(leads):
+        row = dict(lead)
+        if 'source_url' in row:
+            row.setdefault('url', row.pop('source_url'))
+        row.setdefault('id', uuid.uuid4())
+        cold = {name: row.pop(name) for name in COLD_COLUMNS if name in row}
+        if cold:
+            cold_rows.append((index, cold))
+        hot_rows.append(row)
+
+    insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+    urls = [row['url'] for row in hot_rows]
+    with core_lead_deltas(db, urls):
+        db.execute(_on_url_conflict(insert(Lead), dialect), hot_rows)
+    # An existing url keeps its own id: read the ids back by url rather than
+    # trusting RETURNING order across a multi-row upsert
+    ids_by_url = {}
+    for i in range(0, len(urls), 900):
+        ids_by_url.update(db.execute(select(Lead.url, Lead.id).where(Lead.url.in_(urls[i:i + 900]))).all())
+    lead_ids = [ids_by_url[url] for url in urls]
+    if cold_rows:
+        detail = insert(LeadDetail)
+        db.execute(detail.on_conflict_do_update(
+            index_elements=['lead_id'],
+            set_={name: getattr(detail.excluded, name) for name in cold_rows[0][1]}
+        ), [{"lead_id": lead_ids[index], **cold} for index, cold in cold_rows])
+    record_changes(db, lead_ids, op="upsert")
+    invalidate_cards(db, lead_ids)
+    queue_event(db, "leads", upserted=[str(i) for i in lead_ids])
+    return lead_ids
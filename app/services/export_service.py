@@ -0,0 +1,312 @@
+import io
+import os
+import csv
+import enum
+import json
+import uuid
+import logging
+from datetime import datetime, date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+from sqlalchemy import Integer, Float, Boolean, DateTime
+from sqlalchemy.orm import Session, Query
+from app.db.database import ReadSessionLocal
+from app.models.lead import Lead
+from app.core.lanes import BACKGROUND, get_lane
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+# Constant-memory lead exports.
+# Rows are read as plain column tuples in batches of EXPORT_BATCH_SIZE
+# (server-side cursor where the driver supports it) and encoded batch by
+# batch, so neither ORM objects nor the whole file are ever held in memory.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+
+DEFAULT_COLUMNS = [
+    "id", "created_at", "title", "source", "url", "location_raw", "buyer_request_snippet",
+    "contact_phone", "whatsapp_link", "intent_score", "confidence_score", "ranked_score",
+    "urgency_level", "status",
+]
+EXPORTABLE_COLUMNS = {c.name for c in Lead.__table__.columns}
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ExportError(ValueError):
+    """Invalid export request (unknown column or format, missing pyarrow)."""
+
+
+def resolve_columns(columns: Optional[Iterable[str]] = None) -> List[str]:
+    """Validate a column selection (list or comma-separated string) against the leads table."""
+    if isinstance(columns, str):
+        columns = [c.strip() for c in columns.split(",")]
+    selected = [c for c in (columns or []) if c] or list(DEFAULT_COLUMNS)
+    unknown = [c for c in selected if c not in EXPORTABLE_COLUMNS]
+    if unknown:
+        raise ExportError(f"Unknown export columns: {', '.join(unknown)}")
+    return selected
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ExportError(f"Unsupported export format: {fmt}")
+    if fmt == "parquet" and not HAS_PYARROW:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)")
+    return fmt
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _text(value: Any) -> Any:
+    """Scalar for text formats: ISO timestamps, JSON for structured columns."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def iter_batches(query: Query, columns: Sequence[str], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[tuple]]:
+    """Selected columns of `query` as lists of plain tuples, `batch_size` rows at a time."""
+    rows = (
+        query.with_entities(*[Lead.__table__.c[c] for c in columns])
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    batch = []
+    for row in rows:
+        batch.append(tuple(_plain(v) for v in row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- Encoders: each yields bytes per batch ---------------------------------
+
+def encode_csv(batches: Iterable[List[tuple]], columns: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([_text(v) for v in row] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def encode_ndjson(batches: Iterable[List[tuple]], columns: Sequence[str]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_text) + "\n" for row in batch
+        ).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _arrow_schema(columns: Sequence[str]):
+    types = {Integer: pa.int64(), Float: pa.float64(), Boolean: pa.bool_(), DateTime: pa.timestamp("us")}
+    fields = []
+    for name in columns:
+        col_type = Lead.__table__.c[name].type
+        arrow_type = next((t for sa_type, t in types.items() if isinstance(col_type, sa_type)), pa.string())
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def encode_parquet(batches: Iterable[List[tuple]], columns: Sequence[str]) -> Iterator[bytes]:
+    """One Parquet row group per batch, typed from the leads column types."""
+    schema = _arrow_schema(columns)
+    text_columns = {i for i, f in enumerate(schema) if pa.types.is_string(f.type)}
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    for batch in batches:
+        arrays = [
+            [(_text(row[i]) if i in text_columns and row[i] is not None else row[i]) for row in batch]
+            for i in range(len(columns))
+        ]
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(arrays, schema)], schema=schema
+        ))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson, "parquet": encode_parquet}
+
+
+def stream_export(
+    build_query: Callable[[Session], Query],
+    fmt: str = "csv",
+    columns: Optional[Iterable[str]] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    on_batch: Optional[Callable[[int], None]] = None,
+    session_factory: Callable[[], Session] = ReadSessionLocal,
+) -> Iterator[bytes]:
+    """
+    Encoded export as a byte-chunk generator (for StreamingResponse or a file).
+    Uses its own session so it outlives the request's dependency scope.
+    Validate `fmt` and `columns` up front with check_format/resolve_columns.
+    """
+    columns = resolve_columns(columns)
+    encoder = ENCODERS[check_format(fmt)]
+    db = session_factory()
+    try:
+        def counted(batches):
+            for batch in batches:
+                yield batch
+                if on_batch:
+                    on_batch(len(batch))
+
+        for chunk in encoder(counted(iter_batches(build_query(db), columns, batch_size)), columns):
+            if chunk:
+                yield chunk
+    finally:
+        db.close()
+
+
+def export_filename(prefix: str, fmt: str) -> str:
+    return f"{prefix}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{FORMATS[fmt][1]}"
+
+
+# --- Background export jobs --------------------------------------------------
+# Jobs run in the background lane and write to EXPORT_DIR/<job_id>.<ext>.
+# Progress lives in a <job_id>.json sidecar so any API worker can report it.
+
+def _job_paths(job_id: str, fmt: Optional[str] = None) -> Dict[str, str]:
+    paths = {"status": os.path.join(EXPORT_DIR, f"{job_id}.json")}
+    if fmt:
+        paths["file"] = os.path.join(EXPORT_DIR, f"{job_id}.{FORMATS[fmt][1]}")
+    return paths
+
+
+def _write_status(job_id: str, status: Dict[str, Any]):
+    path = _job_paths(job_id)["status"]
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f)
+    os.replace(tmp, path)
+
+
+def export_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        uuid.UUID(job_id)
+        with open(_job_paths(job_id)["status"], encoding="utf-8") as f:
+            return json.load(f)
+    except (ValueError, OSError):
+        return None
+
+
+def _run_export_job(job_id: str, build_query: Callable[[Session], Query], fmt: str, columns: List[str],
+                    session_factory: Callable[[], Session] = ReadSessionLocal):
+    paths = _job_paths(job_id, fmt)
+    status = export_job_status(job_id) or {}
+    status.update({"status": "running", "started_at": datetime.utcnow().isoformat()})
+
+    db = session_factory()
+    try:
+        status["total_rows"] = build_query(db).order_by(None).count()
+    except Exception as e:
+        logger.warning(f"Export job {job_id}: could not count rows: {e}")
+    finally:
+        db.close()
+    _write_status(job_id, status)
+
+    def progress(rows: int):
+        status["rows_written"] += rows
+        _write_status(job_id, status)
+
+    status["rows_written"] = 0
+    tmp_path = f"{paths['file']}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in stream_export(build_query, fmt, columns, on_batch=progress, session_factory=session_factory):
+                f.write(chunk)
+        os.replace(tmp_path, paths["file"])
+        status.update({
+            "status": "done",
+            "finished_at": datetime.utcnow().isoformat(),
+            "bytes": os.path.getsize(paths["file"]),
+        })
+        logger.info(f"Export job {job_id}: {status['rows_written']} rows -> {paths['file']}")
+    except Exception as e:
+        logger.error(f"Export job {job_id} failed: {e}")
+        status.update({"status": "error", "error": str(e), "finished_at": datetime.utcnow().isoformat()})
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _write_status(job_id, status)
+
+
+def start_export_job(
+    build_query: Callable[[Session], Query],
+    fmt: str = "csv",
+    columns: Optional[Iterable[str]] = None,
+    session_factory: Callable[[], Session] = ReadSessionLocal,
+) -> Dict[str, Any]:
+    """Queue an export to a local file in the background lane; returns the initial job status."""
+    columns = resolve_columns(columns)
+    check_format(fmt)
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    job_id = str(uuid.uuid4())
+    status = {
+        "job_id": job_id,
+        "status": "queued",
+        "format": fmt,
+        "columns": columns,
+        "rows_written": 0,
+        "total_rows": None,
+        "created_at": datetime.utcnow().isoformat(),
+        "filename": os.path.basename(_job_paths(job_id, fmt)["file"]),
+    }
+    _write_status(job_id, status)
+    get_lane(BACKGROUND).submit(_run_export_job, job_id, build_query, fmt, columns, session_factory)
+    return status
+
+
+def export_job_file(job_id: str) -> Optional[str]:
+    status = export_job_status(job_id)
+    if not status or status.get("status") != "done":
+        return None
+    path = _job_paths(job_id, status["format"])["file"]
+    return path if os.path.exists(path) else None
@@ -0,0 +1,125 @@
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Query
+from app.models.lead import Lead
+from app.utils.cursors import encode_cursor, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Feed query engine for GET /leads.
+# The old feed issued one full SELECT per window (2h -> 6h -> 12h -> 24h -> 7d)
+# until one returned rows, and paged with OFFSET. Here the window is picked in
+# a single pass and pages continue from an opaque keyset cursor, so the cost
+# of a page no longer depends on the window being sparse or on scroll depth.
+WINDOWS = [
+    ("2h", timedelta(hours=2)),
+    ("6h", timedelta(hours=6)),
+    ("12h", timedelta(hours=12)),
+    ("24h", timedelta(days=1)),
+    ("7d", timedelta(days=7)),
+]
+WINDOW_LABELS = [label for label, _ in WINDOWS]
+SORTS = ("ranked", "recent")
+
+
+def _cutoffs(now: datetime, start_label: str) -> List[tuple]:
+    start = WINDOW_LABELS.index(start_label) if start_label in WINDOW_LABELS else 0
+    return [(label, now - delta) for label, delta in WINDOWS[start:]]
+
+
+def _sort_columns(sort: str) -> list:
+    if sort == "recent":
+        return [Lead.created_at, Lead.id]
+    return [func.coalesce(Lead.ranked_score, 0.0), Lead.created_at, Lead.id]
+
+
+def _key_of(lead: Lead, sort: str) -> list:
+    key = [lead.created_at.isoformat() if lead.created_at else None, lead.id.hex]
+    return key if sort == "recent" else [lead.ranked_score or 0.0] + key
+
+
+def _key_values(key: list) -> list:
+    values = list(key)
+    values[-1] = uuid.UUID(values[-1])
+    values[-2] = datetime.fromisoformat(values[-2]) if values[-2] else None
+    return values
+
+
+def pick_window(query: Query, now: datetime, start_label: str = "2h") -> str:
+    """
+    Smallest window (from start_label upward) that contains any row.
+    The newest matching row decides it, so this is one MAX(created_at) seek
+    on the feed index instead of one SELECT per window.
+    """
+    cutoffs = _cutoffs(now, start_label)
+    newest = query.order_by(None).with_entities(func.max(Lead.created_at))\
+        .filter(Lead.created_at >= cutoffs[-1][1]).scalar()
+    if newest is None:
+        return cutoffs[-1][0]
+    if isinstance(newest, str):  # SQLite returns aggregates of DateTime as text
+        newest = datetime.fromisoformat(newest)
+    return next(label for label, cutoff in cutoffs if newest >= cutoff)
+
+
+def fetch_feed_page(
+    query: Query,
+    limit: int = 50,
+    time_range: str = "2h",
+    sort: str = "ranked",
+    cursor: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    One page of the feed: {"leads", "window", "next_cursor"}.
+
+    sort="recent": newest first on (created_at, id). The window comes from the
+    page query itself (the newest row decides it), so a first page is a
+    single `ORDER BY created_at DESC LIMIT` over the widest cutoff.
+    sort="ranked": the legacy ordering (ranked_score, then created_at); the
+    window is picked first by a MAX(created_at) seek.
+    Cursors pin the window and sort, so later pages are pure keyset seeks.
+    """
+    now = now or datetime.utcnow()
+    sort = sort if sort in SORTS else "ranked"
+    state = decode_cursor(cursor)
+    if state and state.get("w") not in WINDOW_LABELS:
+        state = None
+    cols = _sort_columns(sort)
+
+    if state and state.get("s") == sort and state.get("c"):
+        # The cutoff is pinned in the cursor so pages don't drift as time passes
+        window, cutoff = state["w"], datetime.fromisoformat(state["c"])
+        page_query = query.filter(Lead.created_at >= cutoff, tuple_(*cols) < tuple(_key_values(state["k"])))
+    elif sort == "recent":
+        cutoffs = _cutoffs(now, time_range)
+        rows = (
+            query.filter(Lead.created_at >= cutoffs[-1][1])
+            .order_by(*[c.desc() for c in cols])
+            .limit(limit + 1)
+            .all()
+        )
+        if not rows:
+            return {"leads": [], "window": cutoffs[-1][0], "next_cursor": None}
+        newest = rows[0].created_at
+        window, cutoff = next((l, c) for l, c in cutoffs if newest >= c)
+        in_window = [r for r in rows if r.created_at >= cutoff]
+        return _page(in_window, limit, window, cutoff, sort)
+    else:
+        window = pick_window(query, now, time_range)
+        cutoff = dict(_cutoffs(now, time_range))[window]
+        page_query = query.filter(Lead.created_at >= cutoff)
+
+    rows = page_query.order_by(*[c.desc() for c in cols]).limit(limit + 1).all()
+    return _page(rows, limit, window, cutoff, sort)
+
+
+def _page(rows: List[Lead], limit: int, window: str, cutoff: datetime, sort: str) -> Dict[str, Any]:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_cursor({"w": window, "c": cutoff.isoformat(), "s": sort, "k": _key_of(rows[-1], sort)})
+    return {"leads": rows, "window": window, "next_cursor": next_cursor}
@@ -0,0 +1,398 @@
+import io
+import os
+import csv
+import gzip
+import enum
+import json
+import time
+import uuid
+import logging
+from datetime import datetime, date
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy import Boolean, DateTime, Float, Integer, JSON, Table, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.types import Uuid
+from app.models.lead import Lead, LeadDetail, COLD_COLUMNS
+from app.models.agent import Agent
+from app.models.agent_raw_lead import AgentRawLead
+from app.db.fulltext import ensure_fulltext_index
+from app.db.rollups import rollups_ready, reconcile_rollups, refresh_agent_counters
+
+try:
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+# Offline bulk import of historical dumps (scripts/import_dump.py); the
+# counterpart of export_service. Rows stream from CSV / NDJSON (optionally
+# .gz) / Parquet in batches of IMPORT_BATCH_SIZE and are written one
+# transaction per batch, never as ORM objects:
+#   * Postgres: COPY FROM STDIN into a temp staging table, then
+#     INSERT ... SELECT ... ON CONFLICT DO NOTHING into the target;
+#   * SQLite: one executemany of INSERT ... ON CONFLICT DO NOTHING per batch,
+#     with the table's non-unique indexes (and the leads FTS trigger) dropped
+#     for the load and rebuilt once at the end.
+# Rows that already exist (same id, or same url for leads) are skipped, so a
+# rerun after a crash is safe; the checkpoint file next to the dump records
+# how many rows are committed and the rerun resumes there.
+# Session hooks do not run for Core writes: stats buckets, agent counters and
+# the full-text index are rebuilt after the load, and imported leads are not
+# written to the change feed.
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "20000"))
+
+TABLES: Dict[str, Table] = {
+    "agents": Agent.__table__,
+    "leads": Lead.__table__,
+    "lead_details": LeadDetail.__table__,
+    "agent_raw_leads": AgentRawLead.__table__,
+}
+FORMATS = ("csv", "ndjson", "parquet")
+
+# Legacy lead column names found in older dumps
+_ALIASES = {"product_category": "title", "source_platform": "source", "source_url": "url",
+            "content": "buyer_request_snippet", "confidence": "confidence_score"}
+
+
+class ImportDumpError(ValueError):
+    """Unusable import request (unknown table or format, missing pyarrow)."""
+
+
+def detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(name)[1].lstrip(".").lower()
+    fmt = {"jsonl": "ndjson", "json": "ndjson"}.get(ext, ext)
+    if fmt not in FORMATS:
+        raise ImportDumpError(f"Unsupported dump format: {path}")
+    if fmt == "parquet" and not HAS_PYARROW:
+        raise ImportDumpError("Parquet import needs pyarrow (pip install pyarrow)")
+    return fmt
+
+
+# --- Readers: dicts, batch by batch -----------------------------------------
+
+def _open_text(path: str):
+    return gzip.open(path, "rt", encoding="utf-8", newline="") if path.endswith(".gz") else \
+        open(path, "r", encoding="utf-8", newline="")
+
+
+def _records(path: str, fmt: str) -> Iterator[dict]:
+    if fmt == "parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=IMPORT_BATCH_SIZE):
+            yield from batch.to_pylist()
+        return
+    with _open_text(path) as f:
+        if fmt == "csv":
+            csv.field_size_limit(64 * 1024 * 1024)
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def read_batches(path: str, fmt: str, batch_size: int = IMPORT_BATCH_SIZE, skip: int = 0) -> Iterator[List[dict]]:
+    """Records of the dump, `batch_size` at a time, after the first `skip`."""
+    batch = []
+    for n, record in enumerate(_records(path, fmt)):
+        if n < skip:
+            continue
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- Row preparation ---------------------------------------------------------
+
+def _coerce(column, value: Any) -> Any:
+    """Dump value (text from CSV, JSON scalar, Arrow scalar) -> Python value for `column`."""
+    if value is None or value == "":
+        return None  # exports write NULL as an empty CSV field
+    kind = column.type
+    if isinstance(kind, Uuid):
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    if isinstance(kind, DateTime):
+        if isinstance(value, datetime):
+            return value
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        return parsed.replace(tzinfo=None) if not kind.timezone else parsed
+    if isinstance(kind, Boolean):
+        return value if isinstance(value, bool) else str(value).strip().lower() in ("1", "true", "t", "yes")
+    if isinstance(kind, Integer):
+        return int(float(value)) if isinstance(value, str) else int(value)
+    if isinstance(kind, Float):
+        return float(value)
+    if isinstance(kind, JSON):
+        return json.loads(value) if isinstance(value, str) and value[:1] in "[{\"" else value
+    if getattr(kind, "enum_class", None) is not None:
+        return kind.enum_class(value) if not isinstance(value, enum.Enum) else value
+    return value
+
+
+def _default(column) -> Any:
+    default = column.default
+    if default is not None and default.is_scalar:
+        return default.arg
+    if default is not None and default.is_callable:
+        return default.arg(None)
+    if isinstance(column.type, DateTime) and (default is not None or column.server_default is not None):
+        return datetime.utcnow()  # func.now() defaults
+    return None
+
+
+class _Prepared:
+    def __init__(self):
+        self.rows: List[dict] = []
+        self.details: List[dict] = []
+        self.invalid = 0
+
+
+def prepare_rows(table: Table, records: List[dict], score: Optional[Callable[[str], float]] = None,
+                 columns: Optional[set] = None) -> _Prepared:
+    """
+    Coerce records to `table`'s columns (those in `columns`, when given: the
+    ones the database actually has) and fill Python-side defaults, so every
+    row has the same keys (executemany / COPY need that). Lead records also
+    yield their lead_details rows. `score` fills a missing intent_score.
+    """
+    prepared = _Prepared()
+    columns = [c for c in table.columns if columns is None or c.name in columns]
+    is_leads = table is Lead.__table__
+    for record in records:
+        if is_leads:
+            record = {_ALIASES.get(k, k): v for k, v in record.items()}
+        try:
+            row = {}
+            for column in columns:
+                value = _coerce(column, record.get(column.name))
+                # intent_score stays missing until scored
+                row[column.name] = _default(column) if value is None and column.name != "intent_score" else value
+            if is_leads:
+                snippet = row.get("buyer_request_snippet") or row.get("title") or ""
+                if row["intent_score"] is None:
+                    row["intent_score"] = score(snippet) if score is not None else 0.0
+                    row["is_hot_lead"] = 1 if row["intent_score"] >= 0.8 else 0
+                row["location_raw"] = row.get("location_raw") or row.get("location")
+                if not (row.get("url") and row.get("title") and row.get("source")):
+                    raise ValueError("url, title and source are required")
+                detail = {name: _coerce(LeadDetail.__table__.c[name], record.get(name)) for name in COLD_COLUMNS}
+                if any(v is not None for v in detail.values()):
+                    prepared.details.append({"lead_id": row["id"], **detail})
+            elif "intent_score" in row and row["intent_score"] is None:
+                row["intent_score"] = score(row.get("raw_text") or "") if score is not None else 0.0
+        except (ValueError, TypeError) as e:
+            prepared.invalid += 1
+            logger.warning(f"IMPORT: skipped invalid {table.name} record: {e}")
+            continue
+        prepared.rows.append(row)
+    return prepared
+
+
+# --- Writers --------------------------------------------------------------
+
+def _copy_text(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, enum.Enum):
+        value = value.name
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_rows(db: Session, table: Table, rows: List[dict]) -> int:
+    """COPY into a staging copy of `table`, then move the rows that do not conflict."""
+    names = list(rows[0])
+    quoted = ", ".join(f'"{n}"' for n in names)
+    db.execute(text(f'CREATE TEMP TABLE IF NOT EXISTS "_import_{table.name}" '
+                    f'(LIKE "{table.name}" INCLUDING DEFAULTS) ON COMMIT DELETE ROWS'))
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_text(row[n]) for n in names) + "\n")
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    cursor.copy_expert(f'COPY "_import_{table.name}" ({quoted}) FROM STDIN', buffer)
+    return db.execute(text(
+        f'INSERT INTO "{table.name}" ({quoted}) SELECT {quoted} FROM "_import_{table.name}" ON CONFLICT DO NOTHING'
+    )).rowcount
+
+
+def _insert_rows(db: Session, table: Table, rows: List[dict]) -> int:
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return db.execute(insert(table).on_conflict_do_nothing(), rows).rowcount
+
+
+def write_rows(db: Session, table: Table, rows: List[dict]) -> int:
+    """Insert a batch, skipping rows that already exist; returns how many were inserted. No commit."""
+    if not rows:
+        return 0
+    if db.get_bind().dialect.name == "postgresql":
+        return _copy_rows(db, table, rows)
+    return _insert_rows(db, table, rows)
+
+
+# --- Deferred indexes (SQLite) ----------------------------------------------
+
+def _deferrable_indexes(table: Table) -> list:
+    # Unique indexes stay: they are what ON CONFLICT DO NOTHING checks against
+    return [index for index in table.indexes if not index.unique]
+
+
+def drop_indexes(connection, table: Table) -> List[str]:
+    dropped = [index.name for index in _deferrable_indexes(table)]
+    for name in dropped:
+        connection.exec_driver_sql(f'DROP INDEX IF EXISTS "{name}"')
+    if table is Lead.__table__:
+        connection.exec_driver_sql("DROP TRIGGER IF EXISTS leads_fts_ai")
+    return dropped
+
+
+def rebuild_indexes(connection, table: Table):
+    for index in _deferrable_indexes(table):
+        index.create(connection, checkfirst=True)
+    if table is Lead.__table__:
+        ensure_fulltext_index(connection, rebuild=True)
+
+
+# --- Checkpoints ------------------------------------------------------------
+
+def checkpoint_path(path: str, table: str) -> str:
+    return f"{path}.{table}.checkpoint.json"
+
+
+def load_checkpoint(path: str, table: str) -> dict:
+    """Committed progress of an earlier run on this dump, or a fresh one if the dump changed."""
+    stat = os.stat(path)
+    fresh = {"rows_done": 0, "size": stat.st_size, "mtime": stat.st_mtime, "complete": False}
+    try:
+        with open(checkpoint_path(path, table)) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return fresh
+    if saved.get("size") != stat.st_size or saved.get("mtime") != stat.st_mtime:
+        logger.warning(f"IMPORT: {path} changed since its checkpoint; starting over")
+        return fresh
+    return saved
+
+
+def save_checkpoint(path: str, table: str, checkpoint: dict):
+    target = checkpoint_path(path, table)
+    with open(target + ".tmp", "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(target + ".tmp", target)
+
+
+# --- Import ------------------------------------------------------------------
+
+def _report(name: str, counts: dict) -> dict:
+    seconds = counts["seconds"]
+    return {**counts, "table": name, "seconds": round(seconds, 2),
+            "rows_per_sec": round(counts["rows_read"] / seconds) if seconds else None}
+
+
+def import_dump(engine: Engine, table_name: str, path: str, fmt: Optional[str] = None,
+                batch_size: int = IMPORT_BATCH_SIZE, skip_scoring: bool = False, restart: bool = False,
+                defer_indexes: bool = True, progress: Optional[Callable[[dict], None]] = None) -> List[dict]:
+    """
+    Stream one dump into `table_name` (leads also fill lead_details).
+    Returns the throughput report: one entry per table written.
+    """
+    if table_name not in TABLES:
+        raise ImportDumpError(f"Unknown import table: {table_name} (one of {', '.join(TABLES)})")
+    fmt = fmt or detect_format(path)
+    table = TABLES[table_name]
+    checkpoint = {"rows_done": 0, **load_checkpoint(path, table_name)}
+    if restart:
+        checkpoint.update(rows_done=0, complete=False)
+    if checkpoint.get("complete"):
+        logger.info(f"IMPORT: {path} already imported into {table_name} (use --restart to load it again)")
+        return []
+
+    score = None
+    if not skip_scoring and table_name in ("leads", "agent_raw_leads"):
+        from app.utils.intent_scoring import IntentScorer
+        score = IntentScorer().calculate_intent_score
+
+    sqlite = engine.dialect.name == "sqlite"
+    present = {c["name"] for c in inspect(engine).get_columns(table.name)}
+    counts = {name: {"rows_read": 0, "inserted": 0, "skipped": 0, "invalid": 0, "seconds": 0.0}
+              for name in ([table_name, "lead_details"] if table_name == "leads" else [table_name])}
+    deferred = []
+    if sqlite and defer_indexes:
+        with engine.begin() as connection:
+            deferred = [t for t in (table, LeadDetail.__table__ if table_name == "leads" else None) if t is not None]
+            for t in deferred:
+                drop_indexes(connection, t)
+
+    started = time.perf_counter()
+    try:
+        with Session(bind=engine) as db:
+            if sqlite:
+                # Offline load: a crash loses at most the open batch, which the rerun redoes
+                db.execute(text("PRAGMA synchronous=OFF"))
+            for records in read_batches(path, fmt, batch_size, skip=checkpoint["rows_done"]):
+                batch_started = time.perf_counter()
+                prepared = prepare_rows(table, records, score, present)
+                inserted = write_rows(db, table, prepared.rows)
+                details = 0
+                if prepared.details:
+                    # Only for leads this batch actually inserted (a skipped url keeps its own id and details)
+                    ids = [d["lead_id"] for d in prepared.details]
+                    stored = set()
+                    for i in range(0, len(ids), 900):
+                        stored.update(db.scalars(select(Lead.id).where(Lead.id.in_(ids[i:i + 900]))))
+                    details = write_rows(db, LeadDetail.__table__, [d for d in prepared.details if d["lead_id"] in stored])
+                db.commit()
+
+                checkpoint["rows_done"] += len(records)
+                save_checkpoint(path, table_name, checkpoint)
+                spent = time.perf_counter() - batch_started
+                main = counts[table_name]
+                main["rows_read"] += len(records)
+                main["inserted"] += inserted
+                main["invalid"] += prepared.invalid
+                main["skipped"] += len(prepared.rows) - inserted
+                main["seconds"] += spent
+                if "lead_details" in counts:
+                    counts["lead_details"]["rows_read"] += len(prepared.details)
+                    counts["lead_details"]["inserted"] += details
+                    counts["lead_details"]["skipped"] += len(prepared.details) - details
+                if progress:
+                    progress({"table": table_name, "rows_done": checkpoint["rows_done"],
+                              "rows_per_sec": round(len(records) / spent) if spent else None})
+    finally:
+        if deferred:
+            rebuild_started = time.perf_counter()
+            with engine.begin() as connection:
+                for t in deferred:
+                    rebuild_indexes(connection, t)
+            counts[table_name]["index_rebuild_seconds"] = round(time.perf_counter() - rebuild_started, 2)
+
+    checkpoint["complete"] = True
+    save_checkpoint(path, table_name, checkpoint)
+    if table_name == "leads":
+        _refresh_derived(engine)
+    # End to end: index rebuild and derived-data refresh included
+    counts[table_name]["seconds"] = time.perf_counter() - started
+    return [_report(name, c) for name, c in counts.items()]
+
+
+def _refresh_derived(engine: Engine):
+    """Stats buckets and agent counters from scratch: the load bypassed the hooks that maintain them."""
+    with Session(bind=engine) as db:
+        if rollups_ready(db.connection()):
+            reconcile_rollups(db)
+        refresh_agent_counters(db)
+        db.commit()
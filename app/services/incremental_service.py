@@ -0,0 +1,195 @@
+import os
+import math
+import uuid
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from app.db.models import AgentSourceCursor
+
+logger = logging.getLogger(__name__)
+
+# Incremental agent runs: each (agent, source) keeps a high-water mark so a run
+# only asks for content published since the previous successful run, plus a
+# small overlap to absorb clock skew and late indexing.
+AGENT_INCREMENTAL_RUNS = os.getenv("AGENT_INCREMENTAL_RUNS", "true").lower() == "true"
+AGENT_INCREMENTAL_OVERLAP_MINUTES = int(os.getenv("AGENT_INCREMENTAL_OVERLAP_MINUTES", "15"))
+AGENT_SEEN_URL_LIMIT = int(os.getenv("AGENT_SEEN_URL_LIMIT", "500"))
+
+
+def _as_utc(value: Any) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    # SQLite hands back naive datetimes; everything we store is UTC.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class IncrementalState:
+    """
+    High-water marks for one agent run.
+    Loaded before the run, consulted by the scrapers and the pre-scoring filter,
+    and persisted only once the run's results are saved.
+    """
+
+    def __init__(self, agent_id: str, cursors: Optional[Dict[str, Dict[str, Any]]] = None, now: Optional[datetime] = None):
+        self.agent_id = agent_id
+        self.started_at = now or datetime.now(timezone.utc)
+        self.overlap = timedelta(minutes=AGENT_INCREMENTAL_OVERLAP_MINUTES)
+        self.cursors: Dict[str, Dict[str, Any]] = {}
+        self._seen = set()
+        for source, c in (cursors or {}).items():
+            self.cursors[source] = {
+                "last_run_at": _as_utc(c.get("last_run_at")),
+                "last_post_at": _as_utc(c.get("last_post_at")),
+                "seen_urls": list(c.get("seen_urls") or []),
+                "cursor": c.get("cursor"),
+            }
+            self._seen.update(self.cursors[source]["seen_urls"])
+
+        self._queried = set()
+        self._new_urls: Dict[str, List[str]] = {}
+        self._new_post_at: Dict[str, datetime] = {}
+        self._new_cursor: Dict[str, Any] = {}
+        self.kept = 0
+        self.skipped_seen = 0
+        self.skipped_stale = 0
+
+    @classmethod
+    def load(cls, db: Session, agent_id: str) -> "IncrementalState":
+        rows = db.query(AgentSourceCursor).filter(AgentSourceCursor.agent_id == uuid.UUID(str(agent_id))).all()
+        return cls(agent_id, {
+            r.source: {
+                "last_run_at": r.last_run_at,
+                "last_post_at": r.last_post_at,
+                "seen_urls": r.seen_urls,
+                "cursor": r.cursor,
+            } for r in rows
+        })
+
+    # --- Windows ---
+
+    def has_mark(self, source: str) -> bool:
+        return bool(self.cursors.get(source, {}).get("last_run_at"))
+
+    def window_hours(self, source: Optional[str] = None, default: int = 24) -> int:
+        """
+        Hours to request from `source` (or the widest window any known source
+        needs when source is None). Sources without a mark get `default`.
+        """
+        if source is None:
+            if not self.cursors:
+                return default
+            return max(self.window_hours(s, default) for s in self.cursors)
+
+        mark = self.cursors.get(source, {}).get("last_run_at")
+        if not mark:
+            return default
+        elapsed = (self.started_at - mark + self.overlap).total_seconds() / 3600
+        return max(1, min(default, math.ceil(elapsed)))
+
+    def get_cursor(self, source: str) -> Any:
+        return self.cursors.get(source, {}).get("cursor")
+
+    def set_cursor(self, source: str, cursor: Any):
+        self._new_cursor[source] = cursor
+
+    # --- Pre-scoring filter ---
+
+    def mark_queried(self, source: str):
+        """Record that `source` was searched successfully this run."""
+        self._queried.add(source)
+
+    def is_seen(self, url: Optional[str]) -> bool:
+        return bool(url) and url in self._seen
+
+    def filter_new(
+        self,
+        results: Iterable[Dict[str, Any]],
+        source_key: str = "_scraper_name",
+        posted_at: Optional[Callable[[Dict[str, Any]], Optional[datetime]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Drop results this agent has already seen (by URL) or that predate the
+        source's last post mark, and record the rest as seen.
+        """
+        kept = []
+        for r in results:
+            source = r.get(source_key) or r.get("source") or "unknown"
+            url = r.get("url")
+            if self.is_seen(url):
+                self.skipped_seen += 1
+                continue
+
+            post_time = _as_utc(posted_at(r) if posted_at else r.get("posted_at"))
+            mark = self.cursors.get(source, {}).get("last_post_at")
+            if post_time and mark and post_time < mark - self.overlap:
+                self.skipped_stale += 1
+                continue
+
+            if url:
+                self._seen.add(url)
+                self._new_urls.setdefault(source, []).append(url)
+            if post_time and (source not in self._new_post_at or post_time > self._new_post_at[source]):
+                self._new_post_at[source] = post_time
+            kept.append(r)
+
+        self.kept += len(kept)
+        return kept
+
+    # --- Persistence ---
+
+    def save(self, db: Session):
+        """Advance the marks. Call only after the run's leads are committed."""
+        sources = self._queried | set(self._new_urls) | set(self._new_post_at) | set(self._new_cursor)
+        if not sources:
+            return
+        agent_uuid = uuid.UUID(str(self.agent_id))
+        rows = {
+            r.source: r for r in db.query(AgentSourceCursor).filter(
+                AgentSourceCursor.agent_id == agent_uuid,
+                AgentSourceCursor.source.in_(sources)
+            ).all()
+        }
+        for source in sources:
+            row = rows.get(source)
+            if row is None:
+                row = AgentSourceCursor(agent_id=agent_uuid, source=source, seen_urls=[])
+                db.add(row)
+
+            if source in self._queried:
+                row.last_run_at = self.started_at
+            post_time = self._new_post_at.get(source)
+            if post_time and (not row.last_post_at or post_time > _as_utc(row.last_post_at)):
+                row.last_post_at = post_time
+            if source in self._new_urls:
+                row.seen_urls = ((row.seen_urls or []) + self._new_urls[source])[-AGENT_SEEN_URL_LIMIT:]
+            if source in self._new_cursor:
+                row.cursor = self._new_cursor[source]
+        db.commit()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "kept": self.kept,
+            "skipped_seen": self.skipped_seen,
+            "skipped_stale": self.skipped_stale,
+            "sources_queried": sorted(self._queried),
+        }
+
+
+def load_incremental_state(db: Session, agent_id: str) -> Optional[IncrementalState]:
+    """Load the agent's marks, or None when incremental runs are disabled or unavailable."""
+    if not AGENT_INCREMENTAL_RUNS:
+        return None
+    try:
+        return IncrementalState.load(db, agent_id)
+    except Exception as e:
+        logger.error(f"INCREMENTAL: Could not load marks for agent {agent_id}, running full window: {e}")
+        db.rollback()
+        return None
@@ -1,15 +1,10 @@
-from app.models.notification import Notification
+from app.core.delivery import NOTIFICATION, enqueue
 
 def create_notification(db, agent, lead_count):
 
     if lead_count == 0:
         return
 
-    notification = Notification(
-        agent_id=agent.id,
-        message=f"{lead_count} new leads found for '{agent.name}'",
-        lead_count=lead_count,
-    )
-
-    db.add(notification)
+    # Queued in the delivery outbox; merged per agent and written by the delivery worker
+    enqueue(NOTIFICATION, str(agent.id), {"agent_name": agent.name, "lead_count": lead_count}, db=db)
     db.commit()
@@ -15,22 +15,36 @@ from ..intelligence.verification import verify_leads as cross_source_verify
 from ..config import PIPELINE_MODE, PROD_STRICT, PIPELINE_CATEGORY
 from app.config.runtime import REQUIRE_VERIFICATION
 from app.scrapers.verifier import is_verified_signal
+from app.core.lanes import get_lane
+from app.core.spans import span
 
 logger = logging.getLogger(__name__)
 
-async def run_pipeline_for_query(query: str, location: str = "Kenya") -> List[models.Lead]:
+async def run_pipeline_for_query(query: str, location: str = "Kenya", incremental=None) -> List[models.Lead]:
     """
     Orchestrates the search pipeline:
     1. Executes search (async).
     2. Processes raw results into Lead objects.
     3. Returns list of new leads.
+
+    With an IncrementalState (agent runs), sources are only asked for content
+    since their high-water mark and already-seen URLs are dropped before scoring.
     """
     try:
         # 1️⃣ Run scrapers
-        raw_results = await run_scrapers(query, location)
+        raw_results = await run_scrapers(query, location, incremental=incremental)
+
+        # ⏩ Skip what this agent has already seen before paying for scoring
+        if incremental is not None:
+            with span("filter.incremental") as sp:
+                raw_results = incremental.filter_new(raw_results)
+                sp.items = len(raw_results)
+            logger.info(f"INCREMENTAL: {incremental.summary()}")
 
         # 2️⃣ Ingest & deduplicate (sync blocking call moved to thread)
-        verified_leads = await asyncio.to_thread(ingest_leads, raw_results)
+        with span("ingest") as sp:
+            verified_leads = await get_lane().run(ingest_leads, raw_results)
+            sp.items = len(verified_leads)
 
         # 3️⃣ Return for DB saving
         return verified_leads
@@ -81,10 +95,27 @@ class LeadPipeline:
         """
         text = raw_data.get('text') or raw_data.get('snippet', '')
         url = raw_data.get('url', '')
-        
+
         if not text or not url:
             return self._reject(raw_data, "Missing required fields (text or url)")
 
+        # Check if exists (Re-enabled with logging)
+        existing = self.db.query(models.Lead).filter(models.Lead.source_url == url).first()
+        if existing:
+            return self._reject(raw_data, "Duplicate lead (already in DB)")
+
+        fields = self.build_lead_fields(raw_data)
+        return models.Lead(**fields) if fields else None
+
+    def build_lead_fields(self, raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Score and extract one raw lead into Lead column values (column
+        names, not the legacy aliases), without touching the database (bulk ingestion checks existence per batch).
+        Returns None when the lead is rejected.
+        """
+        text = raw_data.get('text') or raw_data.get('snippet', '')
+        url = raw_data.get('url', '')
+
         # 1. Intent Validation (Smart Engine Decision)
         # We now FLAG instead of REJECT
         validation = self.scorer.validate_lead_debug(text)
@@ -105,13 +136,12 @@ class LeadPipeline:
         else:
             intent_status = "BUYER"
 
-        # 2. Scoring & Readiness (Smart Engine Logic)
-        intent_score = self.scorer.calculate_intent_score(text)
-        readiness_level, readiness_score = self.scorer.analyze_readiness(text)
+        # 2. Scoring (validation already computed the intent score)
+        intent_score = validation["score"]
 
         # 3. Extraction (Smart Engine Logic)
         # Handle nested contact info from ScraperSignal
-        contact_info = raw_data.get('contact', {})
+        contact_info = raw_data.get('contact') or {}
         
         phone = raw_data.get('phone') or contact_info.get('phone') or self._extract_phone(text)
         email = raw_data.get('email') or contact_info.get('email')
@@ -121,11 +151,6 @@ class LeadPipeline:
         
         # 4. Normalization
         lead_id = uuid.uuid5(uuid.NAMESPACE_URL, url)
-        
-        # Check if exists (Re-enabled with logging)
-        existing = self.db.query(models.Lead).filter(models.Lead.source_url == url).first()
-        if existing:
-            return self._reject(raw_data, "Duplicate lead (already in DB)")
 
         # Determine product category dynamically from raw_data or query
         product_category = raw_data.get('product_category') or PIPELINE_CATEGORY or "General"
@@ -146,21 +171,22 @@ class LeadPipeline:
             logger.info(f"Lead unverified under strict policy: {url} (Flagged as {verification_flag})")
             # We do NOT return None. We proceed.
 
-        lead = models.Lead(
+        return dict(
             id=lead_id,
             buyer_name=buyer_name,
             contact_phone=phone,
             contact_email=email,
-            product_category=product_category.capitalize(),
+            title=product_category.capitalize(),
             quantity_requirement="1",
             intent_score=intent_score,
-            location_raw=raw_data.get('location', 'Global'),
+            location_raw=raw_data.get('location') or 'Global',
+            location=raw_data.get('location') or 'Global',
             radius_km=0.0,
-            source_platform=raw_data.get('source', 'Web'),
+            source=raw_data.get('source', 'Web'),
             request_timestamp=datetime.now(timezone.utc),
             whatsapp_link=self._generate_whatsapp_link(phone, product_category),
             contact_method="WhatsApp" if phone else "Needs Outreach",
-            source_url=url,
+            url=url,
             http_status=200,
             created_at=datetime.now(timezone.utc),
             property_country="Global",
@@ -172,8 +198,6 @@ class LeadPipeline:
             is_hot_lead=1 if intent_score >= 0.8 else 0,
             intent_type=intent_status
         )
-        
-        return lead
 
     def save_leads(self, leads: List[models.Lead]):
         """Bulk save leads to database."""
@@ -1,4 +1,6 @@
 import os
+import time
+import queue
 import logging
 import smtplib
 from email.mime.text import MIMEText
@@ -6,38 +8,105 @@ from email.mime.multipart import MIMEMultipart
 
 logger = logging.getLogger(__name__)
 
-def send_email(recipient_email: str, subject: str, body_html: str):
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+
+
+def smtp_configured() -> bool:
+    return all(os.getenv(name) for name in ("SMTP_SERVER", "SMTP_USER", "SMTP_PASSWORD"))
+
+
+class SMTPPool:
     """
-    Sends a formatted HTML email to a recipient.
-    In development, it logs the email content instead of sending.
+    Logged-in SMTP connections kept open between sends. A connection idle
+    for more than SMTP_IDLE_SECONDS is checked with NOOP before reuse;
+    one that fails is dropped and the next send opens a fresh one.
     """
-    smtp_server = os.getenv("SMTP_SERVER")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    smtp_user = os.getenv("SMTP_USER")
-    smtp_password = os.getenv("SMTP_PASSWORD")
-    sender_email = os.getenv("SENDER_EMAIL", "digest@delta-9.io")
 
-    if not all([smtp_server, smtp_user, smtp_password]):
+    def __init__(self, size: int = SMTP_POOL_SIZE):
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(os.getenv("SMTP_SERVER"), int(os.getenv("SMTP_PORT", "587")), timeout=30)
+        server.starttls()
+        server.login(os.getenv("SMTP_USER"), os.getenv("SMTP_PASSWORD"))
+        return server
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - idle_since < SMTP_IDLE_SECONDS:
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(server)
+
+    def _discard(self, server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def sendmail(self, sender: str, recipient: str, message: str):
+        server = self._checkout()
+        try:
+            server.sendmail(sender, recipient, message)
+        except Exception:
+            self._discard(server)
+            raise
+        try:
+            self._idle.put_nowait((server, time.monotonic()))
+        except queue.Full:
+            self._discard(server)
+
+    def close(self):
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(server)
+
+
+smtp_pool = SMTPPool()
+
+
+def deliver_email(recipient_email: str, subject: str, body_html: str):
+    """
+    Sends a formatted HTML email over a pooled SMTP connection; raises on failure.
+    Without SMTP settings (development) it logs the email instead of sending.
+    """
+    if not smtp_configured():
         logger.info(f"--- MOCK EMAIL SENT TO {recipient_email} ---")
         logger.info(f"Subject: {subject}")
         logger.info(f"Body: {body_html[:200]}...")
-        return True
+        return
+
+    sender_email = os.getenv("SENDER_EMAIL", "digest@delta-9.io")
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = sender_email
+    msg["To"] = recipient_email
+    msg.attach(MIMEText(body_html, "html"))
 
+    smtp_pool.sendmail(sender_email, recipient_email, msg.as_string())
+    logger.info(f"✅ Email successfully sent to {recipient_email}")
+
+
+def send_email(recipient_email: str, subject: str, body_html: str):
+    """
+    Sends a formatted HTML email to a recipient.
+    In development, it logs the email content instead of sending.
+    Prefer app.core.delivery.enqueue() from request and agent code paths.
+    """
     try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = sender_email
-        msg["To"] = recipient_email
-
-        part = MIMEText(body_html, "html")
-        msg.attach(part)
-
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.sendmail(sender_email, recipient_email, msg.as_string())
-        
-        logger.info(f"✅ Email successfully sent to {recipient_email}")
+        deliver_email(recipient_email, subject, body_html)
         return True
     except Exception as e:
         logger.error(f"❌ Failed to send email to {recipient_email}: {str(e)}")
@@ -1,9 +1,52 @@
+import json
+import httpx
+from geopy.adapters import AdapterHTTPError, BaseSyncAdapter
+from geopy.exc import GeocoderParseError, GeocoderServiceError, GeocoderTimedOut, GeocoderUnavailable
 from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
+from app.core.http_clients import fetch
+
+
+class PooledAdapter(BaseSyncAdapter):
+    """geopy adapter over the shared HTTP client, so geocoding reuses its connections."""
+
+    def get_json(self, url, *, timeout, headers):
+        text = self.get_text(url, timeout=timeout, headers=headers)
+        try:
+            return json.loads(text)
+        except ValueError:
+            raise GeocoderParseError(f"Could not parse geocoder response: {text[:200]}")
+
+    def get_text(self, url, *, timeout, headers):
+        try:
+            response = fetch("GET", url, timeout=timeout, headers=headers, retries=0)
+        except httpx.TimeoutException:
+            raise GeocoderTimedOut("Service timed out")
+        except httpx.TransportError as e:
+            raise GeocoderUnavailable(str(e))
+        except httpx.HTTPError as e:
+            raise GeocoderServiceError(str(e))
+        if response.status_code >= 400:
+            raise AdapterHTTPError(f"Non-successful status code {response.status_code}",
+                                   status_code=response.status_code, headers=dict(response.headers),
+                                   text=response.text)
+        return response.text
+
+
+# One geocoder for every GeoService (they are created per validator / ranking engine)
+_geolocator = None
+
+
+def get_geolocator() -> Nominatim:
+    global _geolocator
+    if _geolocator is None:
+        _geolocator = Nominatim(user_agent="intent_radar", adapter_factory=PooledAdapter)
+    return _geolocator
+
 
 class GeoService:
     def __init__(self):
-        self.geolocator = Nominatim(user_agent="intent_radar")
+        self.geolocator = get_geolocator()
         # Cache for common locations to avoid timeouts
         self.cache = {
             "kenya": (1.2921, 36.8219),
@@ -1,5 +1,6 @@
 from playwright.sync_api import sync_playwright
 import logging
+from app.core.lanes import browser_slot
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +15,7 @@ def get_page_content(url, wait_selector=None, user_agent=None):
         
     logger.info(f"PLAYWRIGHT: Fetching {url}")
     try:
-        with sync_playwright() as p:
+        with browser_slot(), sync_playwright() as p:
             # Use a shorter launch timeout and specify chromium
             browser = p.chromium.launch(headless=True, timeout=30000)
             context = browser.new_context(
@@ -3,6 +3,7 @@ import { User, Search, X, Bell } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
 import NotificationDropdown from './NotificationDropdown';
 import { fetchNotifications, markNotificationAsRead, clearAllNotifications } from '../utils/api';
+import { useLiveRefresh } from '../utils/liveEvents';
 
 const Header = () => {
   const [showMobileSearch, setShowMobileSearch] = useState(false);
@@ -13,9 +14,9 @@ const Header = () => {
 
   useEffect(() => {
     loadNotifications();
-    const interval = setInterval(loadNotifications, 30000); // Refresh every 30s
-    return () => clearInterval(interval);
   }, []);
+  // Refetch when a notification is pushed; poll every 30s only while the event stream is down
+  useLiveRefresh(['notifications'], () => loadNotifications(), 30000);
 
   const loadNotifications = async () => {
     const data = await fetchNotifications();
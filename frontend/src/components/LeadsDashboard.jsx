@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import { fetchAgents, fetchAgentLeads, fetchNotifications, fetchNotificationCount, exportAgentLeads } from '../utils/api';
 import { Bell, Download, RefreshCw, ChevronDown, ChevronRight, ExternalLink } from 'lucide-react';
+import { useLiveRefresh } from '../utils/liveEvents';
 
 const LeadsDashboard = () => {
   const [agents, setAgents] = useState([]);
@@ -59,9 +60,9 @@ const LeadsDashboard = () => {
 
   useEffect(() => {
     loadData();
-    const interval = setInterval(() => loadData(true), 30000); // 30s refresh
-    return () => clearInterval(interval);
   }, []);
+  // Background refresh on pushed changes; the 30s poll only runs while the event stream is down
+  useLiveRefresh(['notifications', 'agents', 'leads'], () => loadData(true), 30000);
 
   const toggleAgent = async (agentId) => {
     if (expandedAgentId === agentId) {
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import { useNavigate } from 'react-router-dom';
 import getApiUrl, { getApiKey } from '../config';
+import { useLiveRefresh } from '../utils/liveEvents';
 
 const MoneyMetrics = ({ onMetricClick }) => {
   const navigate = useNavigate();
@@ -12,38 +13,38 @@ const MoneyMetrics = ({ onMetricClick }) => {
     high_intent_matches: 0
   });
 
-  useEffect(() => {
-    const fetchStats = async (retries = 3) => {
-      try {
-        const apiUrl = getApiUrl();
-        const apiKey = getApiKey();
-        const res = await fetch(`${apiUrl}/success/stats`, {
-          headers: { 
-            'X-API-Key': apiKey,
-            'Accept': 'application/json'
-          }
-        });
-        if (res.ok) {
-          const data = await res.json();
-          setStats(data);
-        } else {
-          throw new Error(`HTTP error! status: ${res.status}`);
-        }
-      } catch (err) {
-        if (retries > 0) {
-          const delay = Math.pow(2, 3 - retries) * 1000;
-          console.warn(`Failed to fetch money metrics, retrying in ${delay}ms...`, err);
-          setTimeout(() => fetchStats(retries - 1), delay);
-        } else {
-          console.error("Failed to fetch money metrics after 3 retries:", err);
+  const fetchStats = async (retries = 3) => {
+    try {
+      const apiUrl = getApiUrl();
+      const apiKey = getApiKey();
+      const res = await fetch(`${apiUrl}/success/stats`, {
+        headers: { 
+          'X-API-Key': apiKey,
+          'Accept': 'application/json'
         }
+      });
+      if (res.ok) {
+        const data = await res.json();
+        setStats(data);
+      } else {
+        throw new Error(`HTTP error! status: ${res.status}`);
+      }
+    } catch (err) {
+      if (retries > 0) {
+        const delay = Math.pow(2, 3 - retries) * 1000;
+        console.warn(`Failed to fetch money metrics, retrying in ${delay}ms...`, err);
+        setTimeout(() => fetchStats(retries - 1), delay);
+      } else {
+        console.error("Failed to fetch money metrics after 3 retries:", err);
       }
-    };
+    }
+  };
 
+  useEffect(() => {
     fetchStats();
-    const interval = setInterval(fetchStats, 30000); // Every 30s for freshness
-    return () => clearInterval(interval);
   }, []);
+  // Refetch on pushed stats changes; poll only while the event stream is down
+  useLiveRefresh(['stats'], fetchStats, 30000);
 
   const metrics = [
     { 
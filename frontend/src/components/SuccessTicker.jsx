@@ -1,42 +1,43 @@
 import React, { useState, useEffect } from 'react';
 import { Activity, Zap, MessageCircle, TrendingUp } from 'lucide-react';
 import getApiUrl, { getApiKey } from '../config';
+import { useLiveRefresh } from '../utils/liveEvents';
 
 const SuccessTicker = ({ onMetricClick }) => {
   const [stats, setStats] = useState(null);
 
-  useEffect(() => {
-    const fetchStats = async (retries = 3) => {
-      try {
-        const apiUrl = getApiUrl();
-        const apiKey = getApiKey();
-        const res = await fetch(`${apiUrl}/success/stats`, {
-          headers: { 
-            'X-API-Key': apiKey,
-            'Accept': 'application/json'
-          }
-        });
-        if (res.ok) {
-          const data = await res.json();
-          setStats(data);
-        } else {
-          throw new Error(`HTTP error! status: ${res.status}`);
-        }
-      } catch (err) {
-        if (retries > 0) {
-          const delay = Math.pow(2, 3 - retries) * 1000;
-          console.warn(`Failed to fetch success stats, retrying in ${delay}ms...`, err);
-          setTimeout(() => fetchStats(retries - 1), delay);
-        } else {
-          console.error("Failed to fetch success stats after 3 retries:", err);
+  const fetchStats = async (retries = 3) => {
+    try {
+      const apiUrl = getApiUrl();
+      const apiKey = getApiKey();
+      const res = await fetch(`${apiUrl}/success/stats`, {
+        headers: { 
+          'X-API-Key': apiKey,
+          'Accept': 'application/json'
         }
+      });
+      if (res.ok) {
+        const data = await res.json();
+        setStats(data);
+      } else {
+        throw new Error(`HTTP error! status: ${res.status}`);
       }
-    };
+    } catch (err) {
+      if (retries > 0) {
+        const delay = Math.pow(2, 3 - retries) * 1000;
+        console.warn(`Failed to fetch success stats, retrying in ${delay}ms...`, err);
+        setTimeout(() => fetchStats(retries - 1), delay);
+      } else {
+        console.error("Failed to fetch success stats after 3 retries:", err);
+      }
+    }
+  };
 
+  useEffect(() => {
     fetchStats();
-    const interval = setInterval(fetchStats, 60000); // Update every minute
-    return () => clearInterval(interval);
   }, []);
+  // Refetch on pushed stats changes; poll only while the event stream is down
+  useLiveRefresh(['stats'], fetchStats, 60000);
 
   if (!stats) return null;
 
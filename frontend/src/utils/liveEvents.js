@@ -0,0 +1,107 @@
+import { useEffect, useRef } from 'react';
+import { API_URL, API_KEY } from './api';
+
+// One Server-Sent Events stream per tab (GET /events/stream), shared by every
+// widget. Events only say "this changed" — subscribers refetch, and those
+// refetches hit the server's ETag/response cache. While the stream is down
+// widgets fall back to their old polling interval.
+const TOPICS = ['leads', 'stats', 'notifications', 'agents'];
+const listeners = new Set();       // { topics: Set, handler }
+const statusListeners = new Set(); // (isLive) => void
+let source = null;
+let live = false;
+
+const setLive = (value) => {
+  if (live === value) return;
+  live = value;
+  statusListeners.forEach((fn) => fn(live));
+};
+
+const dispatch = (topic, data) => {
+  listeners.forEach(({ topics, handler }) => {
+    // "resync" means events were dropped: everyone refetches
+    if (topic === 'resync' || topics.has(topic)) handler(topic, data);
+  });
+};
+
+const connect = () => {
+  if (source || typeof EventSource === 'undefined') return;
+  source = new EventSource(`${API_URL}/events/stream?api_key=${encodeURIComponent(API_KEY)}`);
+  source.addEventListener('ready', () => setLive(true));
+  [...TOPICS, 'resync'].forEach((topic) => {
+    source.addEventListener(topic, (e) => {
+      let data = {};
+      try { data = JSON.parse(e.data); } catch { /* hint only */ }
+      dispatch(topic, data);
+    });
+  });
+  // EventSource reconnects on its own (server sends retry: 5000); poll meanwhile
+  source.onerror = () => setLive(false);
+};
+
+const disconnect = () => {
+  if (source && listeners.size === 0) {
+    source.close();
+    source = null;
+    setLive(false);
+  }
+};
+
+export const isLive = () => live;
+
+export const subscribe = (topics, handler) => {
+  const entry = { topics: new Set(topics), handler };
+  listeners.add(entry);
+  connect();
+  return () => {
+    listeners.delete(entry);
+    disconnect();
+  };
+};
+
+export const onStatusChange = (fn) => {
+  statusListeners.add(fn);
+  return () => statusListeners.delete(fn);
+};
+
+/**
+ * Call `refresh` when any of `topics` changes (bursts coalesced into one call
+ * per `debounceMs`), and every `fallbackMs` only while the stream is down.
+ */
+export const useLiveRefresh = (topics, refresh, fallbackMs, debounceMs = 1000) => {
+  const refreshRef = useRef(refresh);
+  refreshRef.current = refresh;
+  const topicKey = topics.join(',');
+
+  useEffect(() => {
+    let timer = null;
+    let interval = null;
+    const run = () => refreshRef.current();
+    const schedule = () => {
+      if (!timer) timer = setTimeout(() => { timer = null; run(); }, debounceMs);
+    };
+    const setPolling = (isStreaming) => {
+      if (isStreaming && interval) {
+        clearInterval(interval);
+        interval = null;
+      } else if (!isStreaming && !interval) {
+        interval = setInterval(run, fallbackMs);
+      }
+    };
+
+    const unsubscribe = subscribe(topicKey.split(','), schedule);
+    const unwatch = onStatusChange((isStreaming) => {
+      // Catch up on anything missed while disconnected
+      if (isStreaming) schedule();
+      setPolling(isStreaming);
+    });
+    setPolling(isLive());
+
+    return () => {
+      unsubscribe();
+      unwatch();
+      clearTimeout(timer);
+      clearInterval(interval);
+    };
+  }, [topicKey, fallbackMs, debounceMs]);
+};
@@ -16,7 +16,7 @@ from app.scrapers.instagram import InstagramScraper
 from app.scrapers.google_maps import GoogleMapsScraper
 from app.scrapers.facebook_marketplace import FacebookMarketplaceScraper
 
-from duckduckgo_search import DDGS
+from app.core.http_clients import DDGS, fetch, get_ddgs
 
 class LeadScraper:
     def __init__(self, category_keywords=None):
@@ -77,7 +77,7 @@ class LeadScraper:
         all_results = []
         
         try:
-            with DDGS() as ddgs:
+            with get_ddgs() as ddgs:
                 for sq in search_queries:
                     print(f"Executing expanded query: {sq}")
                     
@@ -170,7 +170,7 @@ class LeadScraper:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = fetch("GET", url, params=params)
             data = response.json()
             results = []
             
@@ -465,13 +465,7 @@ class LeadScraper:
 
     def duckduckgo_search(self, query, location="Kenya", source="DuckDuckGo"):
         """Search DuckDuckGo with improved query handling and retry logic."""
-        try:
-            # Try the new package name first
-            try:
-                from ddgs import DDGS
-            except ImportError:
-                from duckduckgo_search import DDGS
-        except ImportError:
+        if DDGS is None:
             print("Error: duckduckgo_search/ddgs package not found. Please install with 'pip install duckduckgo_search'")
             return []
         
@@ -500,7 +494,7 @@ class LeadScraper:
                     parts = current_query.split()
                     current_query = " ".join([p for p in parts if not p.startswith("site:")])
                 
-                with DDGS() as ddgs:
+                with get_ddgs() as ddgs:
                     # Use region-specific search if possible
                     region = 'ke-en' if 'kenya' in location.lower() else 'wt-wt'
                     
@@ -0,0 +1,32 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.database import engine
+from app.models.lead import Lead
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FEED_INDEXES = ("ix_leads_feed", "ix_leads_created_id")
+
+def apply_feed_indexes():
+    """
+    Adds the GET /leads feed indexes to an existing database:
+    ix_leads_feed (status, title, created_at DESC, id DESC) and ix_leads_created_id (created_at, id).
+    New databases get them from the model definition.
+    """
+    for index in Lead.__table__.indexes:
+        if index.name not in FEED_INDEXES:
+            continue
+        try:
+            index.create(bind=engine, checkfirst=True)
+            logger.info(f"Index {index.name} ready.")
+        except Exception as e:
+            logger.error(f"Error creating {index.name}: {e}")
+
+if __name__ == "__main__":
+    apply_feed_indexes()
@@ -0,0 +1,29 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.database import engine
+from app.db.fulltext import ensure_fulltext_index
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def apply_fulltext_index(rebuild: bool = False):
+    """
+    Adds the full-text index to an existing database:
+    SQLite -> leads_fts (FTS5) + sync triggers, populated from leads.
+    Postgres -> leads.search_vector (generated tsvector) + GIN index.
+    New databases get it automatically when the leads table is created.
+    """
+    with engine.begin() as conn:
+        if ensure_fulltext_index(conn, rebuild=rebuild):
+            logger.info(f"Full-text index ready on {engine.dialect.name}.")
+        else:
+            logger.error("Full-text index could not be created (see errors above).")
+
+if __name__ == "__main__":
+    # --rebuild: re-sync the SQLite index (scripts/vacuum_db.py does this after its VACUUM)
+    apply_fulltext_index(rebuild="--rebuild" in sys.argv)
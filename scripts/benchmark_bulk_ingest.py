@@ -0,0 +1,107 @@
+"""
+Bulk ingest benchmark: POST /ingest/bulk's path (app/services/bulk_ingest.py)
+vs the one-lead-at-a-time path (LeadPipeline.process_raw_lead with its
+existence check, then upsert_lead_atomic's commit per lead).
+
+    python scripts/benchmark_bulk_ingest.py --signals 50000 --processes 4
+
+Generates synthetic signals as gzipped NDJSON (10% repeated urls), then
+reports sustained signals/s for each path against a fresh SQLite file
+with the operating profile applied.
+"""
+import os
+import sys
+import json
+import gzip
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail, LeadChange
+from app.db.sqlite_profile import apply_sqlite_profile, sqlite_connect_args
+from app.services import bulk_ingest
+from app.services.pipeline import LeadPipeline
+from app.services.deduplication_service import upsert_lead_atomic
+
+PRODUCTS = ["5kva generator", "10000 litre water tank", "300W solar panel", "HP laptop", "double door fridge",
+            "50 bags of cement", "4 tyres 195/65R15", "Boxer motorbike"]
+PHRASES = ["Looking for", "Need", "Anyone selling", "Where can I buy", "Urgently need", "WTB"]
+PLACES = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Thika"]
+
+
+def synthetic_body(n: int) -> bytes:
+    rnd = random.Random(7)
+    lines = []
+    for i in range(n):
+        key = rnd.randrange(n) if rnd.random() < 0.1 else i
+        text = (f"{rnd.choice(PHRASES)} {rnd.choice(PRODUCTS)} in {rnd.choice(PLACES)}, budget "
+                f"{rnd.randint(5, 500)}k. Call 07{rnd.randint(10**7, 10**8 - 1)} {'asap' if rnd.random() < 0.3 else ''}")
+        lines.append(json.dumps({"url": f"https://partner.example/signal/{key}", "text": text,
+                                 "source": "Partner", "location": rnd.choice(PLACES)}))
+    return gzip.compress("\n".join(lines).encode())
+
+
+def database(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args=sqlite_connect_args())
+    apply_sqlite_profile(engine)
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__, LeadChange.__table__])
+    Session = sessionmaker(bind=engine)
+
+    def writer(fn, *args):
+        with Session() as db:
+            result = fn(db, *args)
+            db.commit()
+            return result
+    return Session, writer
+
+
+def run_bulk(body: bytes, workdir: str) -> dict:
+    Session, writer = database(os.path.join(workdir, "bulk.db"))
+    started = time.perf_counter()
+    signals, invalid = bulk_ingest.parse_signals(body)
+    result = bulk_ingest.ingest_signals(signals, invalid, session_factory=Session, writer=writer)
+    seconds = time.perf_counter() - started
+    return {"signals": result["summary"]["total"], "seconds": seconds, "summary": result["summary"]}
+
+
+def run_per_record(body: bytes, workdir: str, limit: int) -> dict:
+    Session, _ = database(os.path.join(workdir, "single.db"))
+    signals = [json.loads(line) for line in gzip.decompress(body).splitlines()[:limit]]
+    started = time.perf_counter()
+    with Session() as db:
+        pipeline = LeadPipeline(db)
+        for signal in signals:
+            lead = pipeline.process_raw_lead(signal)
+            if lead is not None:
+                upsert_lead_atomic(db, lead)
+    return {"signals": len(signals), "seconds": time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--signals", type=int, default=20000)
+    parser.add_argument("--per-record", type=int, default=2000, help="signals pushed through the single-lead path")
+    parser.add_argument("--processes", type=int, default=bulk_ingest.BULK_INGEST_PROCESSES)
+    args = parser.parse_args()
+    bulk_ingest.BULK_INGEST_PROCESSES = args.processes
+    body = synthetic_body(args.signals)
+    print(f"{args.signals} signals, {len(body) / 1e6:.1f} MB gzipped NDJSON, {os.cpu_count()} CPUs, "
+          f"{args.processes} scoring processes")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        single = run_per_record(body, workdir, args.per_record)
+        print(f"per-record  {single['signals']:6} signals  {single['seconds']:6.2f}s  "
+              f"{single['signals'] / single['seconds']:8.0f} signals/s")
+        bulk = run_bulk(body, workdir)
+        print(f"bulk        {bulk['signals']:6} signals  {bulk['seconds']:6.2f}s  "
+              f"{bulk['signals'] / bulk['seconds']:8.0f} signals/s  {bulk['summary']}")
+
+
+if __name__ == "__main__":
+    main()
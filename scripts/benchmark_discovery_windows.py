@@ -0,0 +1,107 @@
+"""
+Discovery window benchmark: the old 2h -> 6h -> 24h escalation (a full
+_execute_discovery per window until one yields leads) vs the single fetch
+bucketed locally (LiveLeadIngestor.fetch_from_external_sources).
+
+    python scripts/benchmark_discovery_windows.py [--fixtures scripts/fixtures/discovery_recorded.json]
+
+Scrapers replay recorded results (fixtures/discovery_recorded.json), so
+only scraper calls are
+compared (with the window each picked); the scrape cache and metrics are
+bypassed. Rate limits are the real per-lane budgets of each recorded
+source; calls they deferred past the end of a discovery are reported.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import ingestion
+from app.ingestion import DISCOVERY_WINDOWS, LiveLeadIngestor
+from app.core.lanes import get_lane
+from app.scrapers.base_scraper import BaseScraper
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "discovery_recorded.json")
+
+
+class RecordedScraper(BaseScraper):
+    """Replays one source's recorded results and counts the calls."""
+    calls = 0
+
+    def __init__(self, recorded: dict):
+        super().__init__()
+        self.recorded = recorded
+        self.source = recorded["source"]
+
+    def window_param(self, time_window_hours):
+        template = self.recorded.get("window_param")
+        return template.format(hours=time_window_hours) if template else None
+
+    def scrape(self, query, time_window_hours):
+        type(self).calls += 1
+        by_window = self.recorded.get("records_by_window")
+        records = by_window[str(time_window_hours)] if by_window else self.recorded["records"]
+        return [dict(r) for r in records]
+
+
+def recorded_scrapers(scenario: dict):
+    return [type(name, (RecordedScraper,), {"calls": 0})(recorded) for name, recorded in scenario["sources"].items()]
+
+
+def replay_only(ingestor: LiveLeadIngestor, scrapers):
+    ingestion.get_cached = lambda key: None
+    ingestion.set_cached = lambda key, value: None
+    ingestion.record_run = lambda *args, **kwargs: None
+    ingestion.raw_capture.capture = lambda *args, **kwargs: None
+    ingestor._select_scrapers = lambda *args, **kwargs: list(scrapers)
+
+
+def run_escalation(scenario: dict) -> dict:
+    """The previous strategy: everything again per window until one is non-empty."""
+    scrapers = recorded_scrapers(scenario)
+    ingestor = LiveLeadIngestor(db_session=None)
+    replay_only(ingestor, scrapers)
+    deferred = get_lane().scrapes_deferred
+    started = time.perf_counter()
+    leads, window = [], None
+    for window in DISCOVERY_WINDOWS:
+        leads = ingestor._execute_discovery(scenario["query"], scenario["location"], window, early_return=False)
+        if leads:
+            break
+    return {"calls": sum(s.calls for s in scrapers), "leads": len(leads), "window": window if leads else None,
+            "seconds": time.perf_counter() - started, "deferred": get_lane().scrapes_deferred - deferred}
+
+
+def run_single_pass(scenario: dict) -> dict:
+    scrapers = recorded_scrapers(scenario)
+    ingestor = LiveLeadIngestor(db_session=None)
+    replay_only(ingestor, scrapers)
+    deferred = get_lane().scrapes_deferred
+    started = time.perf_counter()
+    leads = ingestor.fetch_from_external_sources(scenario["query"], scenario["location"], early_return=False)
+    window = leads[0]["discovery_window"].rstrip("h") if leads else None
+    return {"calls": sum(s.calls for s in scrapers), "leads": len(leads), "window": window,
+            "seconds": time.perf_counter() - started, "deferred": get_lane().scrapes_deferred - deferred}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    scenarios = json.load(open(args.fixtures))["scenarios"]
+
+    print(f"{'scenario':10} {'escalation calls':>17} {'single-pass calls':>18} {'ratio':>6} {'deferred':>9}   window picked")
+    for name, scenario in scenarios.items():
+        old, new = run_escalation(scenario), run_single_pass(scenario)
+        print(f"{name:10} {old['calls']:17} {new['calls']:18} {old['calls'] / max(new['calls'], 1):5.1f}x "
+              f"{old['deferred'] + new['deferred']:9}   "
+              f"{old['window'] or '-'}h -> {new['window'] or '-'}h")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+GET /leads feed benchmark: legacy window-by-window SELECT + OFFSET paging vs
+the single-pass window + keyset cursors in app/services/feed_service.py.
+
+    python scripts/benchmark_feed.py --rows 500000
+
+Prints EXPLAIN QUERY PLAN for both shapes, page latency at depth 1, 50 and
+500, and the cost of resolving the window for a sparse category.
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import sqlite3
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, tuple_
+from sqlalchemy.orm import sessionmaker
+from app.models.lead import Lead, CRMStatus
+from app.services.feed_service import fetch_feed_page, WINDOWS
+
+CATEGORIES = ["Generator", "Water Tank", "Solar Panel", "Laptop", "Fridge", "Cement", "Tyres", "Motorbike"]
+SPARSE = "Transformer"  # only rows older than 24h: the legacy loop runs all five windows
+PAGE = 50
+
+
+def load(path: str, rows: int, batch: int = 20000):
+    engine = create_engine(f"sqlite:///{path}")
+    Lead.__table__.create(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    now = datetime.utcnow()
+    rnd = random.Random(7)
+    for start in range(0, rows, batch):
+        data = []
+        for _ in range(min(batch, rows - start)):
+            if rnd.random() < 0.002:
+                title, minutes = SPARSE, rnd.randint(60 * 25, 60 * 24 * 6)
+            else:
+                title, minutes = rnd.choice(CATEGORIES), rnd.randint(0, 60 * 24 * 7)
+            data.append((
+                uuid.uuid4().hex, title, "benchmark", f"https://bench/{uuid.uuid4().hex}", rnd.random(),
+                rnd.random(), (now - timedelta(minutes=minutes)).isoformat(" "),
+                rnd.choice(["NEW", "NEW", "NEW", "CONTACTED"]),
+            ))
+        conn.executemany(
+            "INSERT INTO leads (id, title, source, url, intent_score, ranked_score, created_at, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", data
+        )
+        conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def feed_query(db, category):
+    return db.query(Lead).filter(Lead.status == CRMStatus.NEW, Lead.title == category)
+
+
+def legacy_page(db, category, depth, now, start="7d"):
+    """The old GET /leads loop: one full SELECT per window, then OFFSET."""
+    labels = [label for label, _ in WINDOWS]
+    for label, delta in WINDOWS[labels.index(start):]:
+        rows = (feed_query(db, category).filter(Lead.created_at >= now - delta)
+                .order_by(Lead.created_at.desc(), Lead.id.desc())
+                .offset((depth - 1) * PAGE).limit(PAGE).all())
+        if rows:
+            return rows
+    return []
+
+
+def ms(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--db", default=None, help="Scratch database path (default: temp file)")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="feed_bench_"), "bench.db")
+    if not os.path.exists(path):
+        load(path, args.rows)
+
+    engine = create_engine(f"sqlite:///{path}")
+    db = sessionmaker(bind=engine)()
+    now = datetime.utcnow()
+    category = CATEGORIES[0]
+
+    def explain(query):
+        sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+        with engine.connect() as conn:
+            return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+    offset_q = (feed_query(db, category).filter(Lead.created_at >= now - timedelta(days=7))
+                .order_by(Lead.created_at.desc(), Lead.id.desc()).offset(499 * PAGE).limit(PAGE))
+    keyset_q = (feed_query(db, category).filter(Lead.created_at >= now - timedelta(days=7),
+                                                tuple_(Lead.created_at, Lead.id) < (now - timedelta(days=3), uuid.uuid4()))
+                .order_by(Lead.created_at.desc(), Lead.id.desc()).limit(PAGE + 1))
+    print("EXPLAIN QUERY PLAN (legacy OFFSET page 500):")
+    for line in explain(offset_q):
+        print("  ", line)
+    print("EXPLAIN QUERY PLAN (keyset page):")
+    for line in explain(keyset_q):
+        print("  ", line)
+
+    # Walk the keyset feed, timing pages 1, 50 and 500
+    cursors = {1: None}
+    cursor = None
+    for depth in range(1, 501):
+        cursors[depth] = cursor
+        page = fetch_feed_page(feed_query(db, category), limit=PAGE, time_range="7d", sort="recent", cursor=cursor, now=now)
+        cursor = page["next_cursor"]
+        if not cursor:
+            print(f"Feed ran out at page {depth}; use more --rows for depth 500")
+            break
+
+    print(f"\n{'page depth':<12}{'OFFSET ms':>12}{'keyset ms':>12}")
+    for depth in (1, 50, 500):
+        if depth not in cursors:
+            continue
+        offset_ms = ms(lambda: legacy_page(db, category, depth, now))
+        keyset_ms = ms(lambda: fetch_feed_page(feed_query(db, category), limit=PAGE, time_range="7d",
+                                               sort="recent", cursor=cursors[depth], now=now))
+        print(f"{depth:<12}{offset_ms:>12.1f}{keyset_ms:>12.1f}")
+
+    legacy_ms = ms(lambda: legacy_page(db, SPARSE, 1, now, start="2h"))
+    ranked_ms = ms(lambda: fetch_feed_page(feed_query(db, SPARSE), limit=PAGE, time_range="2h", sort="ranked", now=now))
+    recent_ms = ms(lambda: fetch_feed_page(feed_query(db, SPARSE), limit=PAGE, time_range="2h", sort="recent", now=now))
+    print(f"\nSparse category window escalation (2h -> 7d): legacy 5 queries {legacy_ms:.1f}ms, "
+          f"max seek + page {ranked_ms:.1f}ms, single recent query {recent_ms:.1f}ms")
+
+    db.close()
+    print(f"\nScratch database kept at {path}")
+
+
+if __name__ == "__main__":
+    main()
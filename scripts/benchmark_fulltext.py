@@ -0,0 +1,125 @@
+"""
+Query-plan benchmark: ILIKE scans vs the FTS5 full-text index on a synthetic
+leads table (SQLite).
+
+    python scripts/benchmark_fulltext.py --rows 1000000
+
+Builds the real `leads` schema in a scratch database, bulk-loads synthetic
+leads, then prints EXPLAIN QUERY PLAN and median latency for each search.
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import sqlite3
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models.lead import Lead
+from app.db.fulltext import FTS_TABLE, build_match_query, search_leads, apply_fulltext_filter
+
+PRODUCTS = ["generator", "water tank", "solar panel", "toyota axio", "iphone 13", "laptop", "sofa set",
+            "fridge", "cement", "maize flour", "dairy cow", "motorbike", "printer", "office chair", "tyres"]
+LOCATIONS = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Thika", "Machakos", "Nyeri", "Kitale", "Garissa"]
+TEMPLATES = [
+    "Looking for a {p} in {l}, budget flexible, call me",
+    "Who is selling {p}? Need one urgently around {l}",
+    "WTB {p} second hand, {l} area only",
+    "Anyone with a good {p} deal near {l}? Cash ready",
+    "Need quotation for {p} delivered to {l} this week",
+]
+RARE_PRODUCT = "transformer"  # ~0.1% of rows: the worst case for a LIKE scan
+SEARCHES = ["generator", "gen", "solar panel", "toyota nakuru", "fridge mombasa", RARE_PRODUCT, "transf"]
+
+
+def load(path: str, rows: int, batch: int = 20000):
+    engine = create_engine(f"sqlite:///{path}")
+    Lead.__table__.create(engine)  # also creates leads_fts + triggers
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    now = datetime.utcnow()
+    rnd = random.Random(42)
+    started = time.perf_counter()
+    for start in range(0, rows, batch):
+        data = []
+        for _ in range(min(batch, rows - start)):
+            p = RARE_PRODUCT if rnd.random() < 0.001 else rnd.choice(PRODUCTS)
+            l = rnd.choice(LOCATIONS)
+            data.append((
+                uuid.uuid4().hex, p.title(), "benchmark", f"https://bench/{uuid.uuid4().hex}",
+                rnd.random(), (now - timedelta(minutes=rnd.randint(0, 60 * 24 * 30))).isoformat(" "),
+                rnd.choice(TEMPLATES).format(p=p, l=l), l, "NEW",
+            ))
+        conn.executemany(
+            "INSERT INTO leads (id, title, source, url, intent_score, created_at, buyer_request_snippet, location_raw, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", data
+        )
+        conn.commit()
+    print(f"Loaded {rows:,} leads in {time.perf_counter() - started:.1f}s "
+          f"({os.path.getsize(path) / 1e6:.0f} MB incl. index)")
+    conn.close()
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", default=None, help="Scratch database path (default: temp file)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="fts_bench_"), "bench.db")
+    if not os.path.exists(path):
+        load(path, args.rows)
+
+    conn = sqlite3.connect(path)
+    engine = create_engine(f"sqlite:///{path}")
+    db = sessionmaker(bind=engine)()
+
+    like_sql = ("SELECT id FROM leads WHERE title LIKE :q OR buyer_request_snippet LIKE :q OR location_raw LIKE :q "
+                "ORDER BY created_at DESC LIMIT 50")
+    fts_sql = (f"SELECT id FROM leads WHERE rowid IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :m) "
+               "ORDER BY created_at DESC LIMIT 50")
+
+    print("\nEXPLAIN QUERY PLAN (ILIKE):")
+    for row in conn.execute("EXPLAIN QUERY PLAN " + like_sql, {"q": "%generator%"}):
+        print("  ", row[-1])
+    print("EXPLAIN QUERY PLAN (FTS5):")
+    for row in conn.execute("EXPLAIN QUERY PLAN " + fts_sql, {"m": build_match_query("generator")}):
+        print("  ", row[-1])
+
+    print(f"\n{'search':<18}{'matches':>10}{'ilike ms':>12}{'fts ms':>10}{'ranked ms':>12}")
+    for term in SEARCHES:
+        match = build_match_query(term)
+        matches = conn.execute(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?", (match,)).fetchone()[0]
+        like_ms = timed(lambda: conn.execute(like_sql, {"q": f"%{term}%"}).fetchall(), args.repeat)
+        fts_ms = timed(lambda: apply_fulltext_filter(db, db.query(Lead.id), term)
+                       .order_by(Lead.created_at.desc()).limit(50).all(), args.repeat)
+        ranked_ms = timed(lambda: search_leads(db, term, limit=50), args.repeat)
+        print(f"{term:<18}{matches:>10,}{like_ms:>12.1f}{fts_ms:>10.1f}{ranked_ms:>12.1f}")
+
+    db.close()
+    conn.close()
+    print(f"\nScratch database kept at {path}")
+
+
+if __name__ == "__main__":
+    main()
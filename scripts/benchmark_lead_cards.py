@@ -0,0 +1,119 @@
+"""
+GET /leads serialization benchmark: to_dict() + FastAPI's JSON encoding per
+request vs pre-rendered lead cards (app/db/lead_cards.py).
+
+    python scripts/benchmark_lead_cards.py --rows 20000
+
+Reports CPU ms to serialize one page (50 and 200 leads) with cards cold
+(rendered and stored) and warm (read and spliced); the page query is
+timed separately.
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail, LeadCard
+from app.db.lead_cards import lead_cards, splice_json
+from app.intelligence_v2.thresholds import STRICT_PUBLIC
+from app.services.feed_service import fetch_feed_page
+
+CATEGORIES = ["Generator", "Water Tank", "Solar Panel", "Laptop", "Fridge", "Cement", "Tyres", "Motorbike"]
+
+
+def load(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__, LeadCard.__table__])
+    db = sessionmaker(bind=engine)()
+    rnd = random.Random(7)
+    now = datetime.utcnow()
+    for start in range(0, rows, 5000):
+        db.bulk_save_objects([
+            Lead(id=uuid.uuid4(), title=rnd.choice(CATEGORIES), source="benchmark", url=f"https://bench/{uuid.uuid4().hex}",
+                 intent_score=rnd.random(), confidence_score=rnd.random(), ranked_score=rnd.random(),
+                 buyer_name="Verified Market Signal", contact_phone=f"+2547{rnd.randint(10**7, 10**8 - 1)}",
+                 buyer_request_snippet="looking for a 20kva generator in Nairobi, urgent",
+                 created_at=now - timedelta(minutes=rnd.randint(0, 110)))
+            for _ in range(min(5000, rows - start))
+        ])
+        db.commit()
+    db.close()
+    return engine
+
+
+def page_of(db, limit):
+    return fetch_feed_page(db.query(Lead), limit=limit, time_range="2h", sort="ranked")
+
+
+def legacy_body(db, page):
+    results = [l.to_dict() for l in page["leads"]]
+    for r in results:
+        r["is_hot_lead"] = r.get("confidence", 0) >= STRICT_PUBLIC
+    payload = {"count": len(results), "leads": results, "window": page["window"], "next_cursor": page["next_cursor"]}
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def cards_body(db, page):
+    cards = lead_cards(db, page["leads"])
+    return splice_json({"count": len(cards), "window": page["window"], "next_cursor": page["next_cursor"]}, "leads", cards)
+
+
+def cpu_ms(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        t = time.process_time()
+        fn()
+        samples.append((time.process_time() - t) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    engine = load(os.path.join(tempfile.mkdtemp(prefix="cards_bench_"), "bench.db"), args.rows)
+    Session = sessionmaker(bind=engine)
+
+    def run(fn, limit, cold=False):
+        """CPU ms to turn an already-fetched page into response bytes (the page query itself is excluded)."""
+        samples = []
+        for _ in range(20):
+            db = Session()
+            if cold:
+                db.execute(delete(LeadCard.__table__))
+                db.commit()
+            page = page_of(db, limit)
+            t = time.process_time()
+            fn(db, page)
+            samples.append((time.process_time() - t) * 1000)
+            db.close()
+        return statistics.median(samples)
+
+    with Session() as db:
+        query_ms = cpu_ms(lambda: page_of(db, 50))
+    print(f"Page query alone (limit 50): {query_ms:.1f}ms CPU\n")
+    print(f"{'page':<6}{'to_dict ms':>12}{'cards cold ms':>15}{'cards warm ms':>15}{'bytes':>9}")
+    for limit in (50, 200):
+        legacy = run(legacy_body, limit)
+        cold = run(cards_body, limit, cold=True)
+        warm = run(cards_body, limit)
+        with Session() as db:
+            size = len(cards_body(db, page_of(db, limit)))
+        print(f"{limit:<6}{legacy:>12.1f}{cold:>15.1f}{warm:>15.1f}{size:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Hot/cold lead split benchmark: the old ~90-column leads row vs narrow leads
+plus lead_details (scripts/split_lead_details.py migrates one into the other).
+
+    python scripts/benchmark_lead_split.py --rows 200000
+
+Builds a wide database with filled-in analysis blobs, migrates a copy, then
+times the list/feed/count/update queries and the cleanup delete on both.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, JSON
+from app.models.lead import Lead, LeadDetail, COLD_COLUMNS
+from scripts.split_lead_details import split_lead_details
+
+CATEGORIES = ["Generator", "Water Tank", "Solar Panel", "Laptop", "Fridge", "Cement", "Tyres", "Motorbike"]
+PAGE = 50
+
+
+def cold_values(rnd):
+    """Roughly what the normalization/intelligence pipeline writes per lead (~2KB)."""
+    words = ["delivery", "warranty", "bulk", "installment", "genuine", "original", "urgent", "price", "Nairobi", "quote"]
+    sentence = lambda n: " ".join(rnd.choice(words) for _ in range(n))
+    values = {}
+    for name in COLD_COLUMNS:
+        if isinstance(LeadDetail.__table__.c[name].type, JSON):
+            values[name] = json.dumps({f"k{i}": sentence(8) for i in range(rnd.randint(3, 8))})
+        else:
+            values[name] = sentence(rnd.randint(4, 12))
+    return values
+
+
+def load_wide(path: str, rows: int, batch: int = 20000):
+    """leads as it was before the split: hot columns plus every cold column inline."""
+    engine = create_engine(f"sqlite:///{path}")
+    Lead.__table__.create(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    for name in COLD_COLUMNS:
+        col_type = "JSON" if isinstance(LeadDetail.__table__.c[name].type, JSON) else "VARCHAR"
+        conn.execute(f"ALTER TABLE leads ADD COLUMN {name} {col_type}")
+    now = datetime.utcnow()
+    rnd = random.Random(7)
+    columns = ["id", "title", "source", "url", "intent_score", "ranked_score", "geo_score", "tap_count",
+               "created_at", "status", "buyer_request_snippet"] + COLD_COLUMNS
+    sql = f"INSERT INTO leads ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    for start in range(0, rows, batch):
+        data = []
+        for _ in range(min(batch, rows - start)):
+            cold = cold_values(rnd)
+            data.append((
+                str(uuid.uuid4()), rnd.choice(CATEGORIES), "benchmark", f"https://bench/{uuid.uuid4().hex}",
+                rnd.random(), rnd.random(), rnd.random(), 0,
+                (now - timedelta(minutes=rnd.randint(0, 60 * 24 * 7))).isoformat(" "),
+                rnd.choice(["NEW", "NEW", "NEW", "CONTACTED"]), "looking for a generator asap",
+            ) + tuple(cold[name] for name in COLD_COLUMNS))
+        conn.executemany(sql, data)
+        conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def ms(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return statistics.median(samples)
+
+
+def timings(path: str, now: datetime):
+    conn = sqlite3.connect(path)
+    recent = (now - timedelta(hours=6)).isoformat(" ")
+    queries = {
+        # The ORM used to SELECT every column; after the split it selects every (hot) column
+        "list page (50)": lambda: conn.execute(
+            "SELECT * FROM leads ORDER BY created_at DESC LIMIT ?", (PAGE,)).fetchall(),
+        "feed page (50)": lambda: conn.execute(
+            "SELECT * FROM leads WHERE status = 'NEW' AND title = ? ORDER BY created_at DESC, id DESC LIMIT ?",
+            (CATEGORIES[0], PAGE)).fetchall(),
+        "unindexed count": lambda: conn.execute("SELECT count(*) FROM leads WHERE geo_score > 0.5").fetchone(),
+        "stats group by": lambda: conn.execute(
+            "SELECT title, count(*), avg(intent_score) FROM leads GROUP BY title").fetchall(),
+        "bulk update (6h)": lambda: (conn.execute(
+            "UPDATE leads SET tap_count = tap_count + 1 WHERE created_at >= ?", (recent,)), conn.commit()),
+    }
+    result = {name: ms(fn) for name, fn in queries.items()}
+    conn.close()
+    return result
+
+
+def cleanup_ms(path: str, cutoff: datetime, split: bool) -> float:
+    """celery cleanup_old_leads: one run on a throwaway copy."""
+    scratch = f"{path}.cleanup"
+    shutil.copyfile(path, scratch)
+    conn = sqlite3.connect(scratch)
+    t = time.perf_counter()
+    if split:
+        conn.execute("DELETE FROM lead_details WHERE lead_id IN (SELECT id FROM leads WHERE created_at < ?)",
+                     (cutoff.isoformat(" "),))
+    conn.execute("DELETE FROM leads WHERE created_at < ?", (cutoff.isoformat(" "),))
+    conn.commit()
+    elapsed = (time.perf_counter() - t) * 1000
+    conn.close()
+    os.remove(scratch)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dir", default=None, help="Scratch directory (default: temp dir)")
+    args = parser.parse_args()
+
+    workdir = args.dir or tempfile.mkdtemp(prefix="lead_split_bench_")
+    wide, split = os.path.join(workdir, "wide.db"), os.path.join(workdir, "split.db")
+    if not os.path.exists(wide):
+        load_wide(wide, args.rows)
+    if not os.path.exists(split):
+        shutil.copyfile(wide, split)
+        engine = create_engine(f"sqlite:///{split}")
+        t = time.perf_counter()
+        split_lead_details(engine)
+        print(f"Migration (copy + drop columns): {time.perf_counter() - t:.1f}s")
+        engine.dispose()
+        conn = sqlite3.connect(split)
+        conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+        conn.close()
+
+    now = datetime.utcnow()
+    before, after = timings(wide, now), timings(split, now)
+    before["cleanup delete (4d)"] = cleanup_ms(wide, now - timedelta(days=4), split=False)
+    after["cleanup delete (4d)"] = cleanup_ms(split, now - timedelta(days=4), split=True)
+
+    def leads_mb(path):
+        with sqlite3.connect(path) as conn:
+            pages = conn.execute("SELECT count(*) FROM dbstat WHERE name = 'leads'").fetchone()[0]
+            return pages * conn.execute("PRAGMA page_size").fetchone()[0] / 1e6
+
+    print(f"\nleads table: {leads_mb(wide):.0f}MB wide -> {leads_mb(split):.0f}MB hot")
+    print(f"{'query':<24}{'wide ms':>10}{'split ms':>10}")
+    for name in before:
+        print(f"{name:<24}{before[name]:>10.1f}{after[name]:>10.1f}")
+    print(f"\nScratch databases kept in {workdir}")
+
+
+if __name__ == "__main__":
+    main()
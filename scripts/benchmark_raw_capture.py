@@ -0,0 +1,111 @@
+"""
+Raw capture storage benchmark: what the pipeline did before (per-call
+open/append of logs/raw_capture.log plus full payloads kept as JSON/HTML
+in database rows) vs compressed segments with a hash index
+(app/core/raw_capture.py).
+
+    python scripts/benchmark_raw_capture.py --batches 400
+
+Writes synthetic scraper batches (20 posts each) and crawler pages (~40KB
+of HTML) and reports disk footprint and write throughput for each.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import Column, MetaData, String, Table, Text, create_engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.db.models import RawCapture
+from app.core.raw_capture import RawCaptureStore, content_hash, _item_text
+
+WORDS = ("looking for buying need urgent generator solar tank laptop fridge cement tyres nairobi mombasa "
+         "kisumu budget price delivery today whatsapp call inbox kva litres bags").split()
+
+
+def batches(n: int, rnd: random.Random):
+    for b in range(n):
+        posts = [{"url": f"https://www.reddit.com/r/Kenya/comments/{rnd.getrandbits(40):x}",
+                  "text": " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(40, 160))),
+                  "author": f"user{rnd.randint(1, 10**6)}", "timestamp": datetime.utcnow().isoformat(),
+                  "source": "Reddit"} for _ in range(20)]
+        body = "".join(f"<div class='post'><p>{' '.join(rnd.choice(WORDS) for _ in range(30))}</p></div>"
+                       for _ in range(160))
+        page = {"url": f"https://jiji.co.ke/listing/{b}", "title": "Listing", "type": "marketplace",
+                "content": f"<html><head><script>var x={b};</script></head><body>{body}</body></html>"}
+        yield posts, page
+
+
+def dir_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def legacy(workdir: str, data) -> float:
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'legacy.db')}")
+    table = Table("raw_rows", MetaData(), Column("content_hash", String(32), primary_key=True),
+                  Column("raw", Text))
+    table.metadata.create_all(engine)
+    started = time.perf_counter()
+    for posts, page in data:
+        # ingestion: reopen the log for every scraper call
+        os.makedirs(os.path.join(workdir, "logs"), exist_ok=True)
+        with open(os.path.join(workdir, "logs", "raw_capture.log"), "a", encoding="utf-8") as f:
+            for item in posts:
+                f.write(f"{item['url']} | {item['text'][:100]}\n")
+        # raw text / raw_data rows, crawler HTML included
+        rows = [{"content_hash": content_hash(_item_text(i)), "raw": json.dumps(i)} for i in posts + [page]]
+        with engine.begin() as conn:
+            conn.execute(sqlite_insert(table).on_conflict_do_nothing(index_elements=["content_hash"]), rows)
+    seconds = time.perf_counter() - started
+    engine.dispose()
+    return seconds
+
+
+def segmented(workdir: str, data) -> float:
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'index.db')}")
+    RawCapture.__table__.create(engine)
+
+    class Store(RawCaptureStore):
+        def _flush_locked(self):
+            # index rows synchronously so the timing includes them
+            rows = self._rows
+            super()._flush_locked()
+            if rows:
+                with engine.begin() as conn:
+                    conn.execute(sqlite_insert(RawCapture).on_conflict_do_nothing(index_elements=["content_hash"]), rows)
+
+    store = Store(directory=os.path.join(workdir, "segments"), index=False)
+    started = time.perf_counter()
+    for posts, page in data:
+        store.capture("Reddit", posts, query="generator")
+        store.capture("marketplace", [page])
+    store.close()
+    seconds = time.perf_counter() - started
+    engine.dispose()
+    print(f"  codec={store.stats()['codec']} compression_ratio={store.stats()['compression_ratio']}")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batches", type=int, default=400)
+    args = parser.parse_args()
+    data = list(batches(args.batches, random.Random(7)))
+    payload_mb = sum(len(json.dumps(i)) for posts, page in data for i in posts + [page]) / 1e6
+    print(f"{args.batches} batches, {payload_mb:.1f} MB of raw payloads")
+
+    for name, run in (("legacy", legacy), ("segments", segmented)):
+        with tempfile.TemporaryDirectory() as workdir:
+            seconds = run(workdir, data)
+            footprint = dir_bytes(workdir) / 1e6
+            print(f"{name:9} disk {footprint:7.1f} MB   {seconds:6.2f}s   {payload_mb / seconds:6.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ def clear_db():
     try:
         # Delete all records from tables
         db.query(models.Notification).delete()
+        db.query(models.LeadDetail).delete()
         db.query(models.Lead).delete()
         db.query(models.Agent).delete()
         db.query(models.SystemSetting).delete()
@@ -0,0 +1,50 @@
+"""
+Offline bulk import of a historical dump (app/services/import_service.py).
+
+    python scripts/import_dump.py agents dumps/agents.csv
+    python scripts/import_dump.py leads dumps/leads-2024.ndjson.gz --skip-scoring
+    python scripts/import_dump.py agent_raw_leads dumps/raw.parquet --batch 50000
+
+Import agents before the leads and raw leads that reference them. Rows that
+already exist are skipped; an interrupted run picks up from the dump's
+checkpoint file when rerun (--restart ignores it). Run it with the API and
+workers stopped on SQLite: the leads indexes are dropped during the load.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.database import engine
+from app.services.import_service import FORMATS, IMPORT_BATCH_SIZE, TABLES, ImportDumpError, import_dump
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import a CSV / NDJSON / Parquet dump")
+    parser.add_argument("table", choices=list(TABLES))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--batch", type=int, default=IMPORT_BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--skip-scoring", action="store_true", help="missing intent scores become 0.0")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start from row 1")
+    args = parser.parse_args()
+
+    try:
+        report = import_dump(engine, args.table, args.path, fmt=args.format, batch_size=args.batch,
+                             skip_scoring=args.skip_scoring, restart=args.restart,
+                             progress=lambda p: logger.info(f"IMPORT: {p['rows_done']} rows "
+                                                            f"({p['rows_per_sec']} rows/s)"))
+    except ImportDumpError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Load test: sync vs async database sessions under concurrent clients.
+
+    python scripts/load_test_async_db.py --rows 50000 --clients 200 --seconds 15
+
+Starts uvicorn (one worker, this module's `app`) on a seeded SQLite file, or
+on --database-url, and drives the same aggregate query through three handlers:
+
+  loop        async def + sync Session: the query blocks the event loop
+  threadpool  def + get_db: the query holds one of FastAPI's threadpool threads
+  async       async def + get_async_db: the query awaits an async connection
+
+For each it reports throughput, p50/p99 latency and errors under --clients
+concurrent clients, plus p99 of a DB-free /ping probe sent meanwhile (how
+much the DB load stalls unrelated requests). On SQLite `async` is the
+LaneSession fallback unless ASYNC_DB=true (aiosqlite) is exported.
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail
+from app.db.database import SessionLocal, get_db
+from app.db.async_database import AsyncSession, HAS_ASYNC_DB, get_async_db
+
+MODES = ("loop", "threadpool", "async")
+CATEGORIES = ["Generator", "Water Tank", "Solar Panel", "Laptop", "Fridge", "Cement", "Tyres", "Motorbike"]
+
+
+def bench_query():
+    """Per-category counts for the last 24h: a dashboard-sized aggregate."""
+    since = datetime.utcnow() - timedelta(days=1)
+    return (
+        select(Lead.title, func.count(Lead.id), func.avg(Lead.intent_score))
+        .where(Lead.created_at >= since)
+        .group_by(Lead.title)
+    )
+
+
+app = FastAPI()
+
+
+@app.get("/ping")
+async def ping():
+    return {"ok": True}
+
+
+@app.get("/loop")
+async def loop_handler():
+    with SessionLocal() as db:
+        return {"rows": len(db.execute(bench_query()).all())}
+
+
+@app.get("/threadpool")
+def threadpool_handler(db: Session = Depends(get_db)):
+    return {"rows": len(db.execute(bench_query()).all())}
+
+
+@app.get("/async")
+async def async_handler(db: AsyncSession = Depends(get_async_db)):
+    return {"rows": len((await db.execute(bench_query())).all())}
+
+
+# --- Harness ----------------------------------------------------------------
+
+def seed(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__])
+    db = sessionmaker(bind=engine)()
+    rnd = random.Random(7)
+    now = datetime.utcnow()
+    for start in range(0, rows, 5000):
+        db.bulk_save_objects([
+            Lead(id=uuid.uuid4(), title=rnd.choice(CATEGORIES), source="loadtest", url=f"https://load/{uuid.uuid4().hex}",
+                 intent_score=rnd.random(), created_at=now - timedelta(minutes=rnd.randint(0, 60 * 72)))
+            for _ in range(min(5000, rows - start))
+        ])
+        db.commit()
+    db.close()
+    engine.dispose()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(database_url: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "load_test_async_db:app", "--app-dir", os.path.dirname(__file__),
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/ping", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def pct(samples, q):
+    if not samples:
+        return float("nan")
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+
+
+async def drive(base: str, path: str, clients: int, seconds: float):
+    latencies, probe, errors = [], [], Counter()
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+        deadline = time.monotonic() + seconds
+
+        async def worker():
+            while time.monotonic() < deadline:
+                t = time.monotonic()
+                try:
+                    response = await client.get(path)
+                    response.raise_for_status()
+                    latencies.append(time.monotonic() - t)
+                except httpx.HTTPStatusError as e:
+                    errors[str(e.response.status_code)] += 1
+                except httpx.HTTPError as e:
+                    errors[type(e).__name__] += 1
+
+        async def prober():
+            while time.monotonic() < deadline:
+                t = time.monotonic()
+                try:
+                    await client.get("/ping")
+                    probe.append(time.monotonic() - t)
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.05)
+
+        await asyncio.gather(prober(), *(worker() for _ in range(clients)))
+    return latencies, probe, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--database-url", help="Existing database (default: seed a temporary SQLite file)")
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(prefix="async_db_load_"), "load.db")
+        seed(path, args.rows)
+        database_url = f"sqlite:///{path}"
+    if not HAS_ASYNC_DB:
+        print("ASYNC_DB is off or its driver is missing: the async mode measures LaneSession.\n")
+
+    port = free_port()
+    server = start_server(database_url, port)
+    try:
+        print(f"{args.clients} clients x {args.seconds:.0f}s per mode against {database_url.split('://')[0]}\n")
+        print(f"{'mode':<12}{'req/s':>9}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}{'ping p99 ms':>13}")
+        for mode in args.modes.split(","):
+            latencies, probe, errors = asyncio.run(drive(f"http://127.0.0.1:{port}", f"/{mode}", args.clients, args.seconds))
+            print(f"{mode:<12}{len(latencies) / args.seconds:>9.0f}{pct(latencies, 0.5):>10.1f}"
+                  f"{pct(latencies, 0.99):>10.1f}{sum(errors.values()):>8}{pct(probe, 0.99):>13.1f}")
+            if errors:
+                print(f"{'':<12}errors: {dict(errors)}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import sqlite3
+import os
+
+DB_PATH = "intent_radar_v3.db"
+
+def migrate():
+    """
+    Add the cached lead counters to agents and backfill them from leads
+    (new databases get the columns from create_all). Enable reads from them
+    with AGENT_CACHED_COUNTERS=true.
+    """
+    print(f"Applying agent counters migration to {DB_PATH}...")
+    if not os.path.exists(DB_PATH):
+        print(f"Database {DB_PATH} not found. Skipping migration (tables will be created on startup).")
+        return
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute("PRAGMA table_info(agents)")
+    existing_columns = [row[1] for row in cursor.fetchall()]
+    if not existing_columns:
+        print("Table agents not found. It will be created on startup.")
+        conn.close()
+        return
+
+    for col_name, col_type in [("leads_count", "INTEGER"), ("high_intent_count", "INTEGER"), ("last_lead_at", "DATETIME")]:
+        if col_name not in existing_columns:
+            try:
+                cursor.execute(f"ALTER TABLE agents ADD COLUMN {col_name} {col_type}")
+                print(f"Added {col_name} column.")
+            except Exception as e:
+                print(f"Error adding {col_name}: {e}")
+        else:
+            print(f"{col_name} column already exists.")
+
+    cursor.execute("""
+        UPDATE agents SET
+            leads_count = (SELECT COUNT(*) FROM leads WHERE leads.agent_id = agents.id),
+            high_intent_count = (SELECT COUNT(*) FROM leads WHERE leads.agent_id = agents.id AND leads.ranked_score >= 0.7),
+            last_lead_at = (SELECT MAX(created_at) FROM leads WHERE leads.agent_id = agents.id)
+    """)
+    print(f"Backfilled counters for {cursor.rowcount} agents.")
+
+    conn.commit()
+    conn.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,34 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import inspect
+from app.db.database import engine
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def migrate_agent_raw_lead_hash():
+    """
+    Adds agent_raw_leads.content_hash, the raw-capture hash agent runs
+    store and deduplicate raw leads on (new databases get it from
+    create_all). Existing rows keep NULL: their payloads were captured, if
+    at all, before raw leads recorded the hash.
+    """
+    with engine.begin() as conn:
+        insp = inspect(conn)
+        if not insp.has_table("agent_raw_leads"):
+            logger.info("Table agent_raw_leads not found. It will be created on startup.")
+            return
+        if "content_hash" not in {c["name"] for c in insp.get_columns("agent_raw_leads")}:
+            conn.exec_driver_sql("ALTER TABLE agent_raw_leads ADD COLUMN content_hash VARCHAR(32)")
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_agent_raw_leads_agent_hash ON agent_raw_leads (agent_id, content_hash)"
+        )
+    logger.info("agent_raw_leads.content_hash ready.")
+
+if __name__ == "__main__":
+    migrate_agent_raw_lead_hash()
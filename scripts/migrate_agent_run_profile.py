@@ -0,0 +1,37 @@
+import sqlite3
+import os
+
+DB_PATH = "intent_radar_v3.db"
+
+def migrate():
+    """Add stage-timing columns to agent_run_logs (new databases get them from create_all)."""
+    print(f"Applying run profile migration to {DB_PATH}...")
+    if not os.path.exists(DB_PATH):
+        print(f"Database {DB_PATH} not found. Skipping migration (tables will be created on startup).")
+        return
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute("PRAGMA table_info(agent_run_logs)")
+    existing_columns = [row[1] for row in cursor.fetchall()]
+    if not existing_columns:
+        print("Table agent_run_logs not found. It will be created on startup.")
+        conn.close()
+        return
+
+    for col_name, col_type in [("status", "VARCHAR DEFAULT 'success'"), ("profile", "JSON")]:
+        if col_name not in existing_columns:
+            try:
+                cursor.execute(f"ALTER TABLE agent_run_logs ADD COLUMN {col_name} {col_type}")
+                print(f"Added {col_name} column.")
+            except Exception as e:
+                print(f"Error adding {col_name}: {e}")
+        else:
+            print(f"{col_name} column already exists.")
+
+    conn.commit()
+    conn.close()
+
+if __name__ == "__main__":
+    migrate()
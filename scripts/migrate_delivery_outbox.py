@@ -0,0 +1,25 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.database import engine
+from app.db.models import OutboxMessage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def migrate_delivery_outbox():
+    """
+    Creates delivery_outbox, the queue of notifications, emails and webhook
+    calls sent by the deliver_outbox task. Until it exists, in-app
+    notifications are written directly and emails / webhooks are dropped
+    with an error in the log.
+    """
+    OutboxMessage.__table__.create(bind=engine, checkfirst=True)
+    logger.info("delivery_outbox ready.")
+
+if __name__ == "__main__":
+    migrate_delivery_outbox()
\ No newline at end of file
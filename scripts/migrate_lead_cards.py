@@ -0,0 +1,24 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.database import engine
+from app.db.models import LeadCard
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def migrate_lead_cards():
+    """
+    Creates lead_cards, the pre-serialized list JSON behind GET /leads and
+    GET /agents/{id}/leads. Cards fill in on first read; until this runs the
+    endpoints render every lead per request.
+    """
+    LeadCard.__table__.create(bind=engine, checkfirst=True)
+    logger.info("lead_cards ready.")
+
+if __name__ == "__main__":
+    migrate_lead_cards()
@@ -0,0 +1,34 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import inspect
+from app.db.database import engine
+from app.db.models import LeadChange
+from app.db.changefeed import TXID_DEFAULT_DDL
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def migrate_lead_changes():
+    """
+    Creates the lead_changes log behind GET /leads/changes.
+    The feed starts empty: consumers do one full sync, then follow the
+    cursor from since=latest. Until this runs, writes skip the log.
+    Tables created before the txid column get it here (existing rows 0,
+    new rows their writing transaction on Postgres).
+    """
+    LeadChange.__table__.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        if "txid" not in {c["name"] for c in inspect(conn).get_columns("lead_changes")}:
+            conn.exec_driver_sql("ALTER TABLE lead_changes ADD COLUMN txid BIGINT DEFAULT 0")
+            conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_lead_changes_txid_seq ON lead_changes (txid, seq)")
+            if engine.dialect.name == "postgresql":
+                conn.execute(TXID_DEFAULT_DDL)
+    logger.info("lead_changes ready.")
+
+if __name__ == "__main__":
+    migrate_lead_changes()
@@ -0,0 +1,24 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.database import engine
+from app.db.models import RawCapture
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def migrate_raw_captures():
+    """
+    Creates the raw_captures index (content hash -> segment offset) of the
+    raw-capture store. Segments are written either way; until this runs they
+    can only be scanned with RawCaptureStore.replay(), not looked up by hash.
+    """
+    RawCapture.__table__.create(bind=engine, checkfirst=True)
+    logger.info("raw_captures ready.")
+
+if __name__ == "__main__":
+    migrate_raw_captures()
@@ -0,0 +1,89 @@
+import os
+import sys
+import logging
+import argparse
+from datetime import date, datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app.db.database import engine
+from app.db.retention import POLICIES, RETENTION_PARTITIONS_AHEAD, ensure_partitions, is_partitioned
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# leads keeps its single-table layout: Postgres can only enforce a UNIQUE
+# index on a partitioned table if it includes the partition key, and the
+# dedup upsert relies on ON CONFLICT (url) across all days. Retention
+# handles leads with chunked deletes instead.
+UNPARTITIONABLE = {"leads": "ON CONFLICT (url) needs a unique index on url alone"}
+
+
+def partition_table(table_name: str, drop_old: bool = False):
+    """
+    Converts `table_name` (Postgres) into a table partitioned by day on its
+    retention column: renames the table to <name>_unpartitioned, creates the
+    partitioned parent with a DEFAULT partition and one partition per day of
+    existing data (plus RETENTION_PARTITIONS_AHEAD days), copies the rows and
+    restores indexes and foreign keys. One transaction; run it with writers
+    stopped. Afterwards cleanup_old_leads drops whole expired partitions.
+    """
+    if engine.dialect.name != "postgresql":
+        logger.error("Partitioning is Postgres-only; SQLite uses chunked retention deletes.")
+        return
+    if table_name in UNPARTITIONABLE:
+        logger.error(f"{table_name} cannot be partitioned: {UNPARTITIONABLE[table_name]}.")
+        return
+    policy = next((p for p in POLICIES if p.name == table_name), None)
+    if policy is None:
+        logger.error(f"No retention policy for {table_name}.")
+        return
+
+    column, pk, old = policy.column.name, policy.pk.name, f"{table_name}_unpartitioned"
+    with engine.begin() as conn:
+        if is_partitioned(conn, table_name):
+            logger.info(f"{table_name} is already partitioned.")
+            return
+        first = conn.execute(text(f'SELECT min("{column}") FROM "{table_name}"')).scalar()
+        start = (first.date() if isinstance(first, datetime) else date.today())
+        indexes = conn.execute(text(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = :name AND indexname NOT LIKE '%pkey'"
+        ), {"name": table_name}).scalars().all()
+        foreign_keys = conn.execute(text(
+            "SELECT pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"
+        ), {"name": table_name}).scalars().all()
+
+        conn.execute(text(f'ALTER TABLE "{table_name}" RENAME TO "{old}"'))
+        conn.execute(text(
+            f'CREATE TABLE "{table_name}" (LIKE "{old}" INCLUDING DEFAULTS) PARTITION BY RANGE ("{column}")'
+        ))
+        # The primary key of a partitioned table must include the partition key
+        conn.execute(text(f'ALTER TABLE "{table_name}" ADD PRIMARY KEY ("{pk}", "{column}")'))
+        conn.execute(text(f'CREATE TABLE "{table_name}_default" PARTITION OF "{table_name}" DEFAULT'))
+        days = (date.today() - start).days + RETENTION_PARTITIONS_AHEAD + 1
+        created = ensure_partitions(conn, policy, start, days)
+        # Part of the primary key now, so it cannot stay NULL
+        conn.execute(text(f'UPDATE "{old}" SET "{column}" = now() WHERE "{column}" IS NULL'))
+        conn.execute(text(f'INSERT INTO "{table_name}" SELECT * FROM "{old}"'))
+        for indexdef in indexes:
+            # Captured before the rename, so each definition targets the new parent; index names
+            # are schema-wide, so the old table's copy goes first
+            name = indexdef.split(" INDEX ", 1)[1].split(" ON ", 1)[0]
+            conn.execute(text(f"DROP INDEX {name}"))
+            conn.execute(text(indexdef))
+        for definition in foreign_keys:
+            conn.execute(text(f'ALTER TABLE "{table_name}" ADD {definition}'))
+        if drop_old:
+            conn.execute(text(f'DROP TABLE "{old}"'))
+    logger.info(f"{table_name} partitioned by day on {column}: {created} daily partitions"
+                f"{'' if drop_old else f'; previous table kept as {old}'}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partition a retention table by day (Postgres).")
+    parser.add_argument("--table", default="agent_raw_leads")
+    parser.add_argument("--drop-old", action="store_true", help="Drop the unpartitioned copy afterwards")
+    args = parser.parse_args()
+    partition_table(args.table, drop_old=args.drop_old)
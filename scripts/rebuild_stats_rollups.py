@@ -0,0 +1,40 @@
+import os
+import sys
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.database import engine, SessionLocal
+from app.db.models import LeadStatsRollup
+from app.db.rollups import reconcile_rollups
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def rebuild_stats_rollups(hours: int = None):
+    """
+    Creates lead_stats_rollups if missing and recounts it from leads.
+    Run once after upgrading an existing database, or after changing the
+    STRICT_PUBLIC / HIGH_INTENT thresholds the counters are bucketed on.
+    """
+    LeadStatsRollup.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        since = datetime.utcnow() - timedelta(hours=hours) if hours else None
+        result = reconcile_rollups(db, since=since)
+        db.commit()
+        logger.info(f"Stats rollups rebuilt: {result}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rebuilding stats rollups: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild lead_stats_rollups from leads")
+    parser.add_argument("--hours", type=int, default=None, help="Only recount the last N hours (default: everything)")
+    args = parser.parse_args()
+    rebuild_stats_rollups(args.hours)
@@ -0,0 +1,55 @@
+import os
+import sys
+import logging
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import inspect, text
+
+from app.db.database import engine
+from app.models.lead import LeadDetail, COLD_COLUMNS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def split_lead_details(bind=engine, drop_columns: bool = True) -> dict:
+    """
+    Moves the cold lead columns (analysis JSON, enrichment text) out of leads
+    into lead_details, one row per lead that has any of them set.
+    Safe to re-run: leads already copied are skipped. Dropping the old columns
+    is what makes leads narrow; SQLite rewrites the table on DROP COLUMN,
+    Postgres only reclaims the space on the next VACUUM FULL / pg_repack.
+    Keep them (--keep-columns) to be able to roll back to the previous release.
+    """
+    LeadDetail.__table__.create(bind=bind, checkfirst=True)
+    existing = {c["name"] for c in inspect(bind).get_columns("leads")}
+    moved = [c for c in COLD_COLUMNS if c in existing]
+    result = {"columns": moved, "copied": 0, "dropped": []}
+    if not moved:
+        logger.info("leads has no cold columns left; nothing to split.")
+        return result
+
+    column_list = ", ".join(moved)
+    any_set = " OR ".join(f"{c} IS NOT NULL" for c in moved)
+    # One transaction: copy and drop succeed or fail together, and SQLite syncs the
+    # DROP COLUMN rewrites once instead of per column
+    with bind.begin() as conn:
+        result["copied"] = conn.execute(text(f"""
+            INSERT INTO lead_details (lead_id, {column_list})
+            SELECT id, {column_list} FROM leads
+            WHERE ({any_set}) AND id NOT IN (SELECT lead_id FROM lead_details)
+        """)).rowcount
+        if drop_columns:
+            for col in moved:
+                conn.execute(text(f"ALTER TABLE leads DROP COLUMN {col}"))
+            result["dropped"] = moved
+    logger.info(f"Copied cold columns for {result['copied']} leads; dropped {len(result['dropped'])} columns from leads.")
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move cold lead columns into lead_details")
+    parser.add_argument("--keep-columns", action="store_true", help="Copy only; leave the old columns on leads")
+    args = parser.parse_args()
+    split_lead_details(drop_columns=not args.keep_columns)
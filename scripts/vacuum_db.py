@@ -0,0 +1,29 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.database import engine
+from app.db.fulltext import vacuum_sqlite
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def vacuum_db():
+    """
+    Reclaims space in the SQLite database and re-syncs the leads_fts index,
+    whose rows are keyed on leads.rowid (which VACUUM may renumber).
+    Postgres has autovacuum; nothing to do there.
+    """
+    if engine.dialect.name != "sqlite":
+        logger.info(f"Nothing to do on {engine.dialect.name}.")
+        return
+    if vacuum_sqlite(engine):
+        logger.info("VACUUM done, full-text index rebuilt.")
+    else:
+        logger.error("VACUUM done but the full-text index could not be rebuilt (see errors above).")
+
+if __name__ == "__main__":
+    vacuum_db()
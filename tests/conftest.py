@@ -0,0 +1,4 @@
+import os
+
+# No background HEAD probes to the real scraper upstreams from the test suite
+os.environ.setdefault("NETWORK_HEALTH_INTERVAL", "0")
@@ -13,12 +13,21 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 os.environ["DATABASE_URL"] = "sqlite:///intent_radar.db"
 
 from app.db.database import SessionLocal, engine
-from app.db.models import Lead, Agent
-from app.services.deduplication_service import upsert_lead_atomic
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail, LeadChange, LeadCard, ScraperMetric
+from app.models.agent import Agent
+from app.db import sqlite_profile
+from app.db.sqlite_profile import SQLiteWriter, apply_sqlite_profile, sqlite_connect_args
+from app.services.deduplication_service import upsert_lead_atomic, upsert_lead
 from app.services.agent_scheduler import execute_agent
-from sqlalchemy import text
+from sqlalchemy import create_engine, text, select, func
+from sqlalchemy.orm import sessionmaker
+
+STRESS_TABLES = [Lead.__table__, LeadDetail.__table__, LeadChange.__table__, LeadCard.__table__,
+                 Agent.__table__, ScraperMetric.__table__]
 
 def setup_test_data():
+    Base.metadata.create_all(bind=engine, tables=STRESS_TABLES)
     db = SessionLocal()
     # Create a test agent
     agent_id = uuid.uuid4()
@@ -42,9 +51,10 @@ def test_atomic_upsert_concurrency():
     lead_data = {
         "source_url": source_url,
         "buyer_name": "Test Buyer",
-        "product_category": "Test Category",
-        "price": 100.0,
-        "status": "NEW"
+        "title": "Test Category",
+        "source": "stress",
+        "intent_score": 0.5,
+        "price": "100.0"
     }
 
     num_threads = 20
@@ -57,7 +67,7 @@ def test_atomic_upsert_concurrency():
             time.sleep(random.uniform(0.01, 0.05))
             # Modify price slightly to verify updates work
             my_data = lead_data.copy()
-            my_data['price'] = 100.0 + idx 
+            my_data['price'] = str(100.0 + idx)
             result = upsert_lead_atomic(db, my_data)
             return result is not None
         except Exception as e:
@@ -71,8 +81,8 @@ def test_atomic_upsert_concurrency():
 
     # Verify results
     db = SessionLocal()
-    count = db.query(Lead).filter(Lead.source_url == source_url).count()
-    lead = db.query(Lead).filter(Lead.source_url == source_url).first()
+    count = db.query(Lead).filter(Lead.url == source_url).count()
+    lead = db.query(Lead).filter(Lead.url == source_url).first()
     db.close()
 
     print(f"Upsert attempts successful: {sum(results)}/{num_threads}")
@@ -153,10 +163,116 @@ def test_agent_locking_concurrency(agent_id):
     
     print("Agent Locking Test Complete (Check logs for 'Agent already running' messages)")
 
+def run_mixed_write_load(use_profile, threads=16, ops=60, work_ms=20):
+    """
+    The single-box write mix: scraper upserts, metric updates and
+    scheduler-style transactions (write, do some work, then commit) from many
+    threads, with readers alongside. Without the profile every write is its
+    own transaction on a rollback-journal file with pysqlite's 5s default
+    timeout; with it: profile pragmas, the writer gate, and upserts/metrics
+    batched by SQLiteWriter.
+    """
+    path = f"stress_{'profile' if use_profile else 'baseline'}_{uuid.uuid4().hex[:8]}.db"
+    url = f"sqlite:///{path}"
+    sqlite_profile.SQLITE_SINGLE_WRITER = use_profile
+    if use_profile:
+        stress_engine = create_engine(url, connect_args=sqlite_connect_args(), pool_size=threads)
+        apply_sqlite_profile(stress_engine)
+        writer = SQLiteWriter(url)
+    else:
+        stress_engine = create_engine(url, connect_args={"check_same_thread": False}, pool_size=threads)
+        writer = None
+    Base.metadata.create_all(bind=stress_engine, tables=STRESS_TABLES)
+    Session = sessionmaker(bind=stress_engine, autoflush=False)
+    errors = {"locked": 0, "other": 0}
+    writes = [0]
+    counter_lock = threading.Lock()
+
+    def lead(n, i):
+        return {"title": "Generator", "source": "stress", "source_url": f"https://stress/{n}-{i % 40}",
+                "intent_score": random.random(), "price": str(i)}
+
+    def bump_metric(db, name, runs):
+        metric = db.query(ScraperMetric).filter_by(scraper_name=name).first()
+        if not metric:
+            metric = ScraperMetric(scraper_name=name)
+            db.add(metric)
+        metric.runs = runs
+
+    def one_op(n, i):
+        kind = i % 4
+        if kind == 0:  # scraper upsert
+            if writer:
+                writer.submit(upsert_lead, lead(n, i)).result(60)
+            else:
+                with Session() as db:
+                    upsert_lead(db, lead(n, i))
+                    db.commit()
+        elif kind == 1:  # metrics persistence
+            if writer:
+                writer.submit(bump_metric, f"scraper-{n % 4}", i).result(60)
+            else:
+                with Session() as db:
+                    bump_metric(db, f"scraper-{n % 4}", i)
+                    db.commit()
+        elif kind == 2:  # scheduler: write, keep working in the transaction, commit
+            with Session() as db:
+                db.add(Lead(id=uuid.uuid4(), title="Tank", source="stress", url=f"https://sched/{n}-{i}",
+                            intent_score=0.5))
+                db.flush()
+                time.sleep(work_ms / 1000)
+                db.commit()
+        else:  # dashboard read
+            with Session() as db:
+                db.execute(select(func.count(Lead.id))).scalar()
+            return False
+        return True
+
+    def worker(n):
+        for i in range(ops):
+            try:
+                if one_op(n, i):
+                    with counter_lock:
+                        writes[0] += 1
+            except Exception as e:
+                with counter_lock:
+                    errors["locked" if "database is locked" in str(e) else "other"] += 1
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    elapsed = time.time() - started
+
+    with Session() as db:
+        stored = db.execute(select(func.count(Lead.id))).scalar()
+    stress_engine.dispose()
+    sqlite_profile.SQLITE_SINGLE_WRITER = True
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return {
+        "writes": writes[0], "locked_errors": errors["locked"], "other_errors": errors["other"],
+        "seconds": round(elapsed, 2), "writes_per_sec": round(writes[0] / elapsed, 1), "leads_stored": stored,
+        "writer": writer.stats() if writer else None,
+    }
+
+def test_sqlite_write_profile():
+    print("\n--- Comparing SQLite write paths under a mixed concurrent load ---")
+    results = {name: run_mixed_write_load(use_profile) for name, use_profile in (("baseline", False), ("profile", True))}
+    print(f"{'mode':<10}{'writes':>8}{'locked':>8}{'other':>7}{'seconds':>9}{'writes/s':>10}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['writes']:>8}{r['locked_errors']:>8}{r['other_errors']:>7}{r['seconds']:>9}{r['writes_per_sec']:>10}")
+    print(f"Writer batches: {results['profile']['writer']}")
+    if results["profile"]["locked_errors"] == 0:
+        print("✅ SUCCESS: no 'database is locked' errors with the SQLite profile.")
+    else:
+        print(f"❌ FAILURE: {results['profile']['locked_errors']} lock errors with the SQLite profile!")
+
 if __name__ == "__main__":
     try:
         agent_id = setup_test_data()
         test_atomic_upsert_concurrency()
+        test_sqlite_write_profile()
         
         # Note: running async inside threads is complex, but let's try
         # test_agent_locking_concurrency(agent_id) 
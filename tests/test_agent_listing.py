@@ -0,0 +1,82 @@
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead
+from app.models.agent import Agent
+from app.api.routes import agents as agents_routes
+
+
+def make_session(tmp_path, n_agents):
+    engine = create_engine(f"sqlite:///{tmp_path / 'agents.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Agent.__table__, Lead.__table__])
+    db = sessionmaker(bind=engine)()
+    now = datetime.utcnow()
+    for i in range(n_agents):
+        agent = Agent(id=uuid.uuid4(), name=f"agent {i}", query="generator", created_at=now - timedelta(minutes=i))
+        db.add(agent)
+        for j in range(i + 1):
+            db.add(Lead(
+                id=uuid.uuid4(), title="Generator", source="test", url=f"https://x/{uuid.uuid4().hex}",
+                intent_score=0.5, ranked_score=0.9 if j == 0 else 0.1, agent_id=agent.id
+            ))
+    db.commit()
+    return engine, db
+
+
+def count_statements(engine, fn):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, len(statements)
+
+
+def test_listing_cost_is_flat_in_page_size(tmp_path):
+    engine, db = make_session(tmp_path, 12)
+    list_all = lambda limit: agents_routes.list_agents(response=Response(), limit=limit, cursor=None, db=db)
+
+    small, small_queries = count_statements(engine, lambda: list_all(2))
+    large, large_queries = count_statements(engine, lambda: list_all(12))
+    assert small_queries == large_queries
+    assert [a["leads_count"] for a in large] == list(range(1, 13))
+    assert all(a["high_intent_count"] == 1 and a["last_run"] for a in large)
+
+
+def test_keyset_pages_and_cached_counters(tmp_path, monkeypatch):
+    engine, db = make_session(tmp_path, 7)
+    seen, cursor = [], None
+    while True:
+        response = Response()
+        page = agents_routes.list_agents(response=response, limit=3, cursor=cursor, db=db)
+        seen.extend(a["id"] for a in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 7
+
+    # Counters kept on the agents row at write time match the grouped counts
+    monkeypatch.setattr(agents_routes, "AGENT_CACHED_COUNTERS", True)
+    agent = db.query(Agent).order_by(Agent.created_at.desc()).first()
+    db.add(Lead(
+        id=uuid.uuid4(), title="Generator", source="test", url="https://x/new",
+        intent_score=0.5, ranked_score=0.8, agent_id=agent.id
+    ))
+    db.commit()
+    cached = agents_routes.list_agents(response=Response(), limit=None, cursor=None, db=db)
+    monkeypatch.setattr(agents_routes, "AGENT_CACHED_COUNTERS", False)
+    grouped = agents_routes.list_agents(response=Response(), limit=None, cursor=None, db=db)
+    assert cached == grouped
+    assert (cached[0]["leads_count"], cached[0]["high_intent_count"]) == (2, 2)
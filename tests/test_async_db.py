@@ -0,0 +1,84 @@
+import os
+import sys
+import uuid
+import asyncio
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail
+from app.models.notification import Notification
+from app.db.async_database import LaneSession, async_url
+from app.routes.leads import get_success_stats
+from app.api.routes.notifications import count_notifications
+
+
+def test_async_url():
+    assert async_url("sqlite:///./intent_radar_v3.db") == "sqlite+aiosqlite:///./intent_radar_v3.db"
+    assert async_url("postgresql://u:p@db/delta9") == "postgresql+asyncpg://u:p@db/delta9"
+    assert async_url("postgresql+asyncpg://u:p@db/delta9") == "postgresql+asyncpg://u:p@db/delta9"
+
+
+def seed(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__, Notification.__table__])
+    with sessionmaker(bind=engine)() as db:
+        now = datetime.utcnow()
+        for i, (score, age) in enumerate([(0.95, 1), (0.05, 2), (0.95, 30 * 24)]):
+            db.add(Lead(id=uuid.uuid4(), title="Generator", source="test", url=f"https://x/{i}", intent_score=score,
+                        confidence_score=score, created_at=now - timedelta(hours=age)))
+        db.add(Notification(id=uuid.uuid4(), message="2 new leads", lead_count=2))
+        db.add(Notification(id=uuid.uuid4(), message="1 new lead", lead_count=1, read=True))
+        db.commit()
+    return engine
+
+
+async def call_routes(db):
+    return await get_success_stats(db=db), await count_notifications(unread_only=True, db=db)
+
+
+def test_async_session_and_lane_fallback_agree(tmp_path):
+    engine = seed(tmp_path / "async.db")
+
+    lane_db = LaneSession(sessionmaker(bind=engine)())
+    fallback = asyncio.run(call_routes(lane_db))
+    asyncio.run(lane_db.close())
+    assert fallback[0]["active_listings_24h"] == 1 and fallback[1] == {"count": 1}
+
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async def with_async_session():
+        async_engine = create_async_engine(async_url(f"sqlite:///{tmp_path / 'async.db'}"))
+        try:
+            async with async_sessionmaker(async_engine)() as db:
+                return await call_routes(db)
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(with_async_session()) == fallback
+
+
+def test_lane_session_keeps_writes_until_commit(tmp_path):
+    from sqlalchemy import update, select, func
+    engine = seed(tmp_path / "writes.db")
+
+    async def scenario():
+        db = LaneSession(sessionmaker(bind=engine)())
+        try:
+            await db.execute(update(Notification).values(read=True))
+            # Still the same transaction: the write is visible here and not lost between calls
+            assert await db.scalar(select(func.count()).select_from(Notification).where(Notification.read == False)) == 0
+            await db.commit()
+        finally:
+            await db.close()
+
+    asyncio.run(scenario())
+    with sessionmaker(bind=engine)() as db:
+        assert db.query(Notification).filter(Notification.read == False).count() == 0
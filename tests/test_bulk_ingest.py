@@ -0,0 +1,74 @@
+import os
+import sys
+import gzip
+import json
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail, LeadChange
+from app.services import bulk_ingest
+from app.services.bulk_ingest import BulkIngestError, ingest_signals, parse_signals
+
+
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__, LeadChange.__table__])
+    Session = sessionmaker(bind=engine)
+
+    def writer(fn, *args):
+        with Session() as db:
+            result = fn(db, *args)
+            db.commit()
+            return result
+    return Session, writer
+
+
+def ndjson(records):
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in records).encode()
+
+
+def test_parse_reports_invalid_records_by_line(monkeypatch):
+    body = gzip.compress(ndjson([
+        {"url": "https://x/1", "text": "Looking for a generator", "source": "Partner"},
+        "{not json",
+        {"url": "https://x/2"},
+        {"text": "no url"},
+        {"url": "https://x/3", "snippet": "Need cement bags", "unknown_field": 1},
+    ]))
+    signals, invalid = parse_signals(body)
+    assert [s["_line"] for s in signals] == [1, 5]
+    assert [(r["line"], r["status"]) for r in invalid] == [(2, "invalid"), (3, "invalid"), (4, "invalid")]
+    assert "url" in invalid[2]["error"]
+
+    monkeypatch.setattr(bulk_ingest, "BULK_INGEST_MAX_RECORDS", 1)
+    with pytest.raises(BulkIngestError):
+        parse_signals(body)
+
+
+def test_bulk_ingest_upserts_and_reports_each_record(tmp_path, monkeypatch):
+    Session, writer = session_factory(tmp_path)
+    monkeypatch.setattr(bulk_ingest, "BULK_INGEST_PROCESSES", 1)
+    monkeypatch.setattr(bulk_ingest, "BULK_INGEST_BATCH", 4)
+    records = [{"url": f"https://x/{i}", "text": f"Looking for 5kva generator urgently call 0712345{i:03d}"}
+               for i in range(10)]
+    records.insert(3, records[0])  # repeated in the body
+    signals, invalid = parse_signals(ndjson(records))
+
+    result = ingest_signals(signals, invalid, session_factory=Session, writer=writer)
+    assert result["summary"]["created"] == 10 and result["summary"]["total"] == 11
+    assert [r["line"] for r in result["records"]] == list(range(1, 12))
+    with Session() as db:
+        assert db.scalar(select(func.count(Lead.id))) == 10
+        lead = db.scalars(select(Lead).where(Lead.url == "https://x/5")).one()
+        assert lead.contact_phone == "254712345005" and lead.source_platform == "Partner"
+        assert db.scalar(select(func.count(LeadChange.seq))) == 10
+
+    again = ingest_signals(signals[:3], session_factory=Session, writer=writer)
+    assert again["summary"]["updated"] == 3
+    assert [r["id"] for r in again["records"]] == [r["id"] for r in result["records"][:3]]
@@ -0,0 +1,92 @@
+import os
+import sys
+import uuid
+import asyncio
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail, LeadChange
+from app.db.changefeed import read_changes, resolve_since, record_bulk_delete, prune_changes, notifier
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'changes.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__, LeadChange.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def new_lead(i):
+    return Lead(id=uuid.uuid4(), title="Generator", source="test", url=f"https://x/{i}", intent_score=0.5)
+
+
+def test_writes_produce_ordered_events_and_cursor_walks(tmp_path):
+    db = make_session(tmp_path)
+    leads = [new_lead(i) for i in range(5)]
+    db.add_all(leads)
+    db.commit()
+    leads[0].intent_score = 0.9
+    db.delete(leads[1])
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        page = read_changes(db, resolve_since(db, cursor), limit=3)
+        seen.extend(page["changes"])
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            break
+    assert [c["seq"] for c in seen] == list(range(1, 8))
+    assert [c["op"] for c in seen] == ["insert"] * 5 + ["update", "delete"]
+    assert seen[5]["fields"] == ["intent_score"] and seen[5]["lead"]["id"] == str(leads[0].id)
+    assert seen[6]["lead"] is None
+
+    # Caught up: an empty page keeps the cursor; "latest" skips history
+    assert read_changes(db, resolve_since(db, cursor))["changes"] == []
+    assert resolve_since(db, "latest") == 7
+
+
+def test_bulk_delete_and_pruned_cursor_reset(tmp_path):
+    db = make_session(tmp_path)
+    old = datetime.utcnow() - timedelta(days=10)
+    db.add_all([new_lead(i) for i in range(3)])
+    db.commit()
+
+    record_bulk_delete(db, Lead.url != "https://x/0")
+    db.query(Lead).filter(Lead.url != "https://x/0").delete()
+    db.commit()
+    page = read_changes(db, 3)
+    assert [c["op"] for c in page["changes"]] == ["delete", "delete"] and not page["reset"]
+
+    db.query(LeadChange).filter(LeadChange.seq <= 3).update({LeadChange.changed_at: old})
+    prune_changes(db, retention_days=7)
+    db.commit()
+    assert read_changes(db, 1)["reset"] is True
+    assert read_changes(db, 3)["reset"] is False
+
+
+def test_commit_wakes_long_poll(tmp_path):
+    db = make_session(tmp_path)
+
+    async def scenario():
+        waiter = asyncio.create_task(notifier.wait(5))
+        await asyncio.sleep(0.05)
+        await asyncio.get_running_loop().run_in_executor(None, lambda: (db.add(new_lead(0)), db.commit()))
+        return await waiter
+
+    assert asyncio.run(scenario()) is True
+
+
+def test_postgres_reads_stop_at_oldest_running_transaction():
+    from sqlalchemy.dialects import postgresql
+    from app.db.changefeed import changes_query
+
+    sql = str(changes_query("postgresql", (41, 7), limit=10).compile(dialect=postgresql.dialect()))
+    assert "(lead_changes.txid, lead_changes.seq) > (" in sql
+    assert "lead_changes.txid < pg_snapshot_xmin(pg_current_snapshot())" in sql
+    assert "ORDER BY lead_changes.txid, lead_changes.seq" in sql
@@ -0,0 +1,113 @@
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import OutboxMessage
+from app.models.agent import Agent
+from app.models.notification import Notification
+from app.core import delivery
+from app.core.delivery import EMAIL, WEBHOOK, deliver_due, enqueue, enqueue_new_leads, retry_delay
+
+
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}")
+    Base.metadata.create_all(bind=engine, tables=[OutboxMessage.__table__, Agent.__table__, Notification.__table__])
+    return sessionmaker(bind=engine)
+
+
+def test_messages_are_grouped_per_destination(tmp_path, monkeypatch):
+    Session = session_factory(tmp_path)
+    sent = []
+    monkeypatch.setattr(delivery, "NOTIFY_EMAILS", ["ops@example.com"])
+    monkeypatch.setitem(delivery.TRANSPORTS, EMAIL, lambda dest, msgs: sent.append((dest, len(msgs))))
+    agent_id = uuid.uuid4()
+    with Session() as db:
+        for run in range(3):
+            enqueue_new_leads("Generators", [{"title": f"lead {run}", "url": f"https://x/{run}"}] * 2,
+                              agent_id=agent_id, db=db)
+        db.commit()
+
+    # Nothing is due inside the grouping window
+    assert deliver_due(Session)["claimed"] == 0
+    run = deliver_due(Session, now=datetime.utcnow() + timedelta(minutes=5))
+    assert run["claimed"] == 6 and run["deliveries"] == 2 and run["delivered"] == 6
+    assert sent == [("ops@example.com", 3)]
+    with Session() as db:
+        [notification] = db.scalars(select(Notification)).all()
+        assert notification.lead_count == 6 and notification.agent_id == agent_id
+        assert {m.status for m in db.scalars(select(OutboxMessage))} == {"sent"}
+
+
+def test_failures_back_off_then_dead_letter(tmp_path, monkeypatch):
+    Session = session_factory(tmp_path)
+    calls = []
+
+    def failing(dest, msgs):
+        calls.append(dest)
+        raise ConnectionError("endpoint down")
+
+    monkeypatch.setitem(delivery.TRANSPORTS, WEBHOOK, failing)
+    monkeypatch.setattr(delivery, "DELIVERY_MAX_ATTEMPTS", 3)
+    with Session() as db:
+        enqueue(WEBHOOK, "https://hooks.example.com/a", {"event": "leads.new"}, db=db)
+        db.commit()
+
+    now = datetime.utcnow() + timedelta(minutes=1)
+    for attempt in range(1, 4):
+        run = deliver_due(Session, now=now)
+        assert run["failed_deliveries"] == 1
+        # Not retried before its backoff is up
+        assert deliver_due(Session, now=now + retry_delay(attempt) - timedelta(seconds=1))["claimed"] == 0
+        now += retry_delay(attempt)
+    assert run["dead_lettered"] == 1 and len(calls) == 3
+    assert deliver_due(Session, now=now + timedelta(days=1))["claimed"] == 0
+
+    with Session() as db:
+        message = db.scalars(select(OutboxMessage)).one()
+        assert message.status == "dead" and message.attempts == 3 and message.last_error == "endpoint down"
+        assert delivery.requeue(db, message.id).status == "pending"
+    monkeypatch.setitem(delivery.TRANSPORTS, WEBHOOK, lambda dest, msgs: None)
+    assert deliver_due(Session, now=now)["delivered"] == 1
+
+
+def test_a_claimed_row_is_not_claimed_again_until_its_lease_expires(tmp_path):
+    Session = session_factory(tmp_path)
+    with Session() as db:
+        enqueue(WEBHOOK, "https://hooks.example.com/a", {"n": 1}, db=db)
+        db.commit()
+    now = datetime.utcnow() + timedelta(minutes=1)
+    with Session() as db:
+        assert [m["payload"] for m in delivery._claim(db, now, 10)] == [{"n": 1}]
+        # A second message for the same destination arrives while the first is being sent
+        enqueue(WEBHOOK, "https://hooks.example.com/a", {"n": 2}, db=db)
+        db.commit()
+    with Session() as db:
+        # Another worker takes the new message only; the leased one stays with the first worker
+        assert [m["payload"] for m in delivery._claim(db, now + timedelta(minutes=1), 10)] == [{"n": 2}]
+        assert delivery._claim(db, now + timedelta(minutes=2), 10) == []
+        # A worker that died mid-send loses its lease
+        lease = timedelta(seconds=delivery.DELIVERY_LEASE_SECONDS)
+        assert [m["payload"] for m in delivery._claim(db, now + lease, 10)] == [{"n": 1}]
+
+
+def test_notifications_are_written_directly_before_the_outbox_migration(tmp_path, caplog):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Agent.__table__, Notification.__table__])
+    Session = sessionmaker(bind=engine)
+    agent_id = uuid.uuid4()
+    with Session() as db:
+        enqueue_new_leads("Generators", [{"title": "lead", "url": "https://x/1"}], agent_id=agent_id, db=db)
+        enqueue(WEBHOOK, "https://hooks.example.com/a", {"event": "leads.new"}, db=db)
+        db.commit()
+        [notification] = db.scalars(select(Notification)).all()
+        assert notification.lead_count == 1 and notification.agent_id == agent_id
+    assert "migrate_delivery_outbox" in caplog.text
+    assert deliver_due(Session)["status"] == "error"
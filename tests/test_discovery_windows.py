@@ -0,0 +1,88 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import ingestion
+from app.core import lanes
+from app.ingestion import LiveLeadIngestor
+from app.scrapers.base_scraper import BaseScraper
+
+
+def record(source, url, age):
+    return {"source": source, "text": f"Looking for a water tank in Nairobi, call 0701583800 [{age} ago]",
+            "author": None, "contact": {"phone": None, "whatsapp": None, "email": None},
+            "location": "Kenya", "url": url, "timestamp": "2026-10-01T08:00:00+00:00"}
+
+
+class Recorded(BaseScraper):
+    """A source that ignores the window (like DuckDuckGo): the same results whatever is asked."""
+
+    def __init__(self, records):
+        super().__init__()
+        self.records = records
+        self.windows = []
+
+    def scrape(self, query, time_window_hours):
+        self.windows.append(time_window_hours)
+        return [dict(r) for r in self.records]
+
+
+class Windowed(Recorded):
+    """A source whose API takes the window as a parameter (like SerpAPI's tbs=qdr:hN)."""
+
+    def window_param(self, time_window_hours):
+        return f"qdr:h{time_window_hours}"
+
+    def scrape(self, query, time_window_hours):
+        self.windows.append(time_window_hours)
+        return [dict(r) for r in self.records if time_window_hours == 24]
+
+
+def discover(monkeypatch, scrapers):
+    monkeypatch.setattr(ingestion, "get_cached", lambda key: None)
+    monkeypatch.setattr(ingestion, "set_cached", lambda key, value: None)
+    monkeypatch.setattr(ingestion, "record_run", lambda *args, **kwargs: None)
+    monkeypatch.setattr(ingestion.raw_capture, "capture", lambda *args, **kwargs: None)
+    ingestor = LiveLeadIngestor(db_session=None)
+    monkeypatch.setattr(ingestor, "_select_scrapers", lambda *args, **kwargs: list(scrapers))
+    return ingestor.fetch_from_external_sources("water tank", "Nairobi", early_return=False)
+
+
+def test_sparse_query_fetches_once_and_widens_only_window_sensitive_sources(monkeypatch):
+    plain = Recorded([record("DuckDuckGoScraper", "https://r/ddg/1", "5 hours")])
+    windowed = Windowed([record("SerpAPIScraper", "https://r/serp/1", "20 hours")])
+    leads = discover(monkeypatch, [plain, windowed])
+
+    assert leads and {lead["discovery_window"] for lead in leads} == {"6h"}
+    # One fetch (at the widest window) per query variant for the source that ignores it...
+    assert plain.windows and set(plain.windows) == {24}
+    # ...while the sensitive one went 2h -> 6h, stopping at the first non-empty tier
+    variants = len(plain.windows)
+    assert sorted(windowed.windows) == [2] * variants + [6] * variants
+
+
+def test_leads_are_bucketed_by_post_age():
+    within = LiveLeadIngestor._within_window
+    assert within({"_age_minutes": 90}, 2) and not within({"_age_minutes": 300}, 2)
+    assert within({"_age_minutes": 300}, 6) and not within({"_age_minutes": 600}, 6)
+    assert within({"_age_minutes": 200, "geo_score": 0.9}, 2)  # local leads get 4h
+    assert within({"_age_minutes": None}, 2)  # no verified timestamp: fits every window
+
+
+def test_every_query_variant_reaches_a_rate_limited_source(monkeypatch):
+    monkeypatch.setitem(lanes.SOURCE_RATE_LIMITS, "unit-test-source", 1.0)
+    for lane_name in lanes.LANES:
+        # A one-token burst: every variant after the first has to wait for a refill
+        bucket = lanes._TokenBucket(1.0)
+        bucket.rate = 40.0
+        monkeypatch.setitem(lanes._rate_buckets, ("unit-test-source", lane_name), bucket)
+    plain = Recorded([record("DuckDuckGoScraper", "https://r/ddg/1", "5 hours")])
+    limited = Recorded([record("GoogleScraper", "https://r/google/1", "5 hours")])
+    limited.source = "unit-test-source"
+    deferred = lanes.get_lane().scrapes_deferred
+    discover(monkeypatch, [plain, limited])
+
+    assert len(plain.windows) > 1 and len(limited.windows) == len(plain.windows)
+    assert lanes.get_lane().scrapes_deferred > deferred
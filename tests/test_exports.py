@@ -0,0 +1,85 @@
+import io
+import os
+import sys
+import csv
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead
+from app.services import export_service
+from app.services.export_service import stream_export, start_export_job, export_job_status, ExportError
+
+
+def make_factory(tmp_path, n):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__])
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    now = datetime.utcnow()
+    for i in range(n):
+        db.add(Lead(
+            id=uuid.uuid4(), title="Generator", source="test", url=f"https://x/{i}", intent_score=i / n,
+            buyer_request_snippet=f'need "one", line {i}\nasap', created_at=now - timedelta(minutes=i)
+        ))
+    db.commit()
+    db.close()
+    return factory
+
+
+def all_leads(db):
+    return db.query(Lead).order_by(Lead.created_at.desc())
+
+
+def test_csv_and_ndjson_stream_in_batches(tmp_path):
+    factory = make_factory(tmp_path, 25)
+    columns = ["url", "created_at", "buyer_request_snippet", "status"]
+
+    chunks = list(stream_export(all_leads, "csv", columns, batch_size=10, session_factory=factory))
+    assert len(chunks) == 3  # one chunk per batch, header travels with the first
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert rows[0] == columns and len(rows) == 26
+    assert rows[1][0] == "https://x/0" and rows[1][2] == 'need "one", line 0\nasap'
+
+    lines = b"".join(stream_export(all_leads, "ndjson", ["url", "intent_score"], batch_size=10, session_factory=factory)).splitlines()
+    assert len(lines) == 25 and json.loads(lines[-1]) == {"url": "https://x/24", "intent_score": 24 / 25}
+
+    with pytest.raises(ExportError):
+        list(stream_export(all_leads, "csv", ["url", "password"], session_factory=factory))
+
+
+def test_parquet_stream_round_trips(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    factory = make_factory(tmp_path, 25)
+    data = b"".join(stream_export(all_leads, "parquet", ["id", "created_at", "intent_score", "status"],
+                                  batch_size=10, session_factory=factory))
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 25 and pq.ParquetFile(io.BytesIO(data)).num_row_groups == 3
+    assert str(table.schema.field("created_at").type).startswith("timestamp")
+
+
+def test_background_export_job_reports_progress(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_service, "EXPORT_DIR", str(tmp_path / "exports"))
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 10)
+    factory = make_factory(tmp_path, 25)
+
+    job = start_export_job(all_leads, "ndjson", ["url"], session_factory=factory)
+    deadline = time.time() + 10
+    while export_job_status(job["job_id"])["status"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.05)
+
+    status = export_job_status(job["job_id"])
+    assert status["status"] == "done"
+    assert status["rows_written"] == status["total_rows"] == 25
+    with open(export_service.export_job_file(job["job_id"]), "rb") as f:
+        assert len(f.read().splitlines()) == 25
@@ -0,0 +1,77 @@
+import os
+import sys
+import uuid
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail
+from app.db.fulltext import build_match_query, search_leads, apply_fulltext_filter, fulltext_available, vacuum_sqlite
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fts.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def add_lead(db, title, snippet, location):
+    lead = Lead(
+        id=uuid.uuid4(), title=title, source="test", url=f"https://x/{uuid.uuid4().hex}",
+        intent_score=0.5, buyer_request_snippet=snippet, location_raw=location
+    )
+    db.add(lead)
+    db.commit()
+    return lead
+
+
+def test_match_query_is_sanitised_prefix_query():
+    assert build_match_query('gen "OR" tank*') == '"gen"* "or"* "tank"*'
+    assert build_match_query("solar panel", "postgresql") == "solar:* & panel:*"
+    assert build_match_query("  !! ") is None
+
+
+def test_ranked_prefix_search_and_trigger_sync(tmp_path):
+    db = make_session(tmp_path)
+    assert fulltext_available(db)
+
+    in_title = add_lead(db, "Generator", "need one today", "Nairobi")
+    in_snippet = add_lead(db, "Power", "looking for a used generator", "Nakuru")
+    add_lead(db, "Water tank", "10000 litres", "Mombasa")
+
+    hits = search_leads(db, "gen")
+    assert [lead.id for lead, _ in hits] == [in_title.id, in_snippet.id]  # title weighted higher
+    assert hits[0][1] > hits[1][1]
+
+    # Location is indexed too, and every term must match
+    assert [l.id for l, _ in search_leads(db, "generator nakuru")] == [in_snippet.id]
+
+    # Update and delete triggers keep the index in sync
+    in_snippet.buyer_request_snippet = "looking for a solar panel"
+    db.commit()
+    assert [l.id for l, _ in search_leads(db, "generator")] == [in_title.id]
+    db.delete(in_title)
+    db.commit()
+    assert search_leads(db, "generator") == []
+
+    filtered = apply_fulltext_filter(db, db.query(Lead), "solar").all()
+    assert [l.id for l in filtered] == [in_snippet.id]
+
+
+def test_vacuum_resyncs_index_to_renumbered_rowids(tmp_path):
+    db = make_session(tmp_path)
+    lead = add_lead(db, "Generator", "need one today", "Nairobi")
+    add_lead(db, "Water tank", "10000 litres", "Mombasa")
+
+    # What a VACUUM is allowed to do to the implicit rowid (no trigger fires)
+    db.connection().exec_driver_sql("UPDATE leads SET rowid = rowid + 100")
+    db.commit()
+    assert search_leads(db, "generator") == []
+
+    assert vacuum_sqlite(db.get_bind())
+    db.expire_all()
+    assert [l.id for l, _ in search_leads(db, "generator")] == [lead.id]
@@ -0,0 +1,64 @@
+import os
+import sys
+import socket
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core import http_clients
+from app.core.http_clients import USER_AGENTS, afetch, fetch, http_stats
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        body = self.headers.get("User-Agent", "").encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    http_clients.close_clients()
+    http_clients.reset_http_stats()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    http_clients.close_clients()
+
+
+def test_sync_and_async_requests_reuse_connections(server):
+    responses = [fetch("GET", f"{server}/page/{i}") for i in range(5)]
+    assert all(r.status_code == 200 and r.text in USER_AGENTS for r in responses)
+    assert fetch("GET", server, headers={"User-Agent": "custom"}).text == "custom"
+
+    async def run():
+        return [(await afetch("GET", server)).status_code for _ in range(3)]
+    assert asyncio.run(run()) == [200, 200, 200]
+
+    host = http_stats()["hosts"]["127.0.0.1"]
+    assert host["requests"] == 9
+    assert host["connections_opened"] == 2  # one for the sync client, one for the async one
+    assert host["reuse_ratio"] == round(7 / 9, 3)
+
+
+def test_connection_errors_are_retried_and_counted(server, monkeypatch):
+    monkeypatch.setattr(http_clients, "HTTP_RETRY_DELAY", 0.0)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]  # nothing listens here once closed
+    with pytest.raises(http_clients.httpx.ConnectError):
+        fetch("GET", f"http://127.0.0.1:{port}/", retries=2)
+    assert http_stats()["hosts"]["127.0.0.1"]["transport_errors"] == 3
@@ -0,0 +1,97 @@
+import os
+import sys
+import csv
+import json
+import uuid
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, inspect, select, func
+from sqlalchemy.orm import Session
+
+from app.db.base_class import Base
+from app.models.agent import Agent
+from app.models.agent_raw_lead import AgentRawLead
+from app.models.lead import Lead, LeadDetail
+from app.services import import_service
+from app.services.import_service import import_dump
+
+
+def make_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Agent.__table__, Lead.__table__, LeadDetail.__table__,
+                                                  AgentRawLead.__table__])
+    return engine
+
+
+def test_csv_import_resumes_from_checkpoint_and_rebuilds_indexes(tmp_path, monkeypatch):
+    engine = make_engine(tmp_path)
+    agent_id = uuid.uuid4()
+    with Session(engine) as db:
+        db.add(Agent(id=agent_id, name="Generators", query="generator"))
+        db.add(Lead(title="Existing", source="Jiji", url="https://x/0", intent_score=0.5))
+        db.commit()
+
+    path = tmp_path / "leads.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["url", "product_category", "source", "intent_score", "agent_id",
+                                               "status", "created_at", "buyer_request_snippet", "notes", "budget_info"])
+        writer.writeheader()
+        for i in range(10):
+            writer.writerow({"url": f"https://x/{i}", "product_category": "Generator", "source": "Jiji",
+                             "intent_score": "" if i == 9 else "0.9", "agent_id": str(agent_id),
+                             "status": "CONTACTED" if i == 1 else "", "created_at": "2024-03-01T10:00:00",
+                             "buyer_request_snippet": "Need a 5kva generator", "notes": "call after 5" if i == 2 else "",
+                             "budget_info": "KES 80k" if i in (0, 2) else ""})
+
+    # The first run dies after two committed batches
+    real_write = import_service.write_rows
+    calls = []
+
+    def crash_on_third_batch(db, table, rows):
+        if table is Lead.__table__:
+            calls.append(len(rows))
+            if len(calls) == 3:
+                raise RuntimeError("disk full")
+        return real_write(db, table, rows)
+
+    monkeypatch.setattr(import_service, "write_rows", crash_on_third_batch)
+    try:
+        import_dump(engine, "leads", str(path), batch_size=4, skip_scoring=True)
+    except RuntimeError:
+        pass
+    assert json.load(open(f"{path}.leads.checkpoint.json"))["rows_done"] == 8
+    assert "ix_leads_title" in {i["name"] for i in inspect(engine).get_indexes("leads")}
+
+    monkeypatch.setattr(import_service, "write_rows", real_write)
+    report = import_dump(engine, "leads", str(path), batch_size=4, skip_scoring=True)
+    assert report[0]["table"] == "leads" and report[0]["rows_read"] == 2 and report[0]["inserted"] == 2
+    assert import_dump(engine, "leads", str(path), batch_size=4) == []  # already complete
+
+    with Session(engine) as db:
+        assert db.scalar(select(func.count(Lead.id))) == 10
+        assert db.scalars(select(Lead.title).where(Lead.url == "https://x/0")).one() == "Existing"
+        lead = db.scalars(select(Lead).where(Lead.url == "https://x/1")).one()
+        assert lead.status.value == "CONTACTED" and lead.agent_id == agent_id and lead.intent_score == 0.9
+        assert db.scalars(select(Lead.intent_score).where(Lead.url == "https://x/9")).one() == 0.0
+        assert db.scalars(select(Lead.notes).where(Lead.url == "https://x/2")).one() == "call after 5"
+        assert db.scalars(select(LeadDetail.budget_info)).all() == ["KES 80k"]  # not for the skipped lead
+        assert db.scalar(select(Agent.leads_count).where(Agent.id == agent_id)) == 9
+        fts = db.connection().exec_driver_sql("SELECT count(*) FROM leads_fts WHERE leads_fts MATCH 'generator'")
+        assert fts.scalar() == 9  # the pre-existing lead kept its own title
+    assert {"ix_leads_title", "ix_leads_intent_score"} <= {i["name"] for i in inspect(engine).get_indexes("leads")}
+
+
+def test_ndjson_raw_leads_are_scored_unless_skipped(tmp_path):
+    engine = make_engine(tmp_path)
+    path = tmp_path / "raw.ndjson"
+    path.write_text("\n".join(json.dumps({"raw_text": text, "source_url": f"https://r/{i}", "notified": "true"})
+                              for i, text in enumerate(["Looking for a 5kva generator urgently, call me",
+                                                        "Selling used fridges, good price"])))
+    report = import_dump(engine, "agent_raw_leads", str(path))
+    assert report[0]["inserted"] == 2 and report[0]["rows_per_sec"]
+    with Session(engine) as db:
+        scores = dict(db.execute(select(AgentRawLead.source_url, AgentRawLead.intent_score)).all())
+        assert scores["https://r/0"] > scores["https://r/1"]
+        assert all(db.scalars(select(AgentRawLead.notified)))
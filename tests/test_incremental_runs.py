@@ -0,0 +1,101 @@
+import os
+import sys
+import uuid
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import AgentSourceCursor
+from app.services.incremental_service import IncrementalState
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cursors.db'}")
+    Base.metadata.create_all(bind=engine, tables=[AgentSourceCursor.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def test_window_shrinks_to_time_since_mark():
+    now = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+    state = IncrementalState("a", {
+        "serpapi": {"last_run_at": now - timedelta(minutes=50)},
+        "jiji": {"last_run_at": now - timedelta(days=3)},
+    }, now=now)
+
+    assert state.window_hours("serpapi") == 2  # 50m + 15m overlap, rounded up
+    assert state.window_hours("jiji") == 24    # capped at the full window
+    assert state.window_hours("new_source") == 24
+    assert not state.has_mark("new_source")
+
+
+def test_seen_and_stale_results_are_skipped_before_scoring():
+    now = datetime.now(timezone.utc)
+    state = IncrementalState("a", {
+        "serpapi": {"last_post_at": now - timedelta(hours=1), "seen_urls": ["https://x/old"]},
+    })
+    results = [
+        {"_scraper_name": "serpapi", "url": "https://x/old"},
+        {"_scraper_name": "serpapi", "url": "https://x/stale", "posted_at": (now - timedelta(hours=5)).isoformat()},
+        {"_scraper_name": "serpapi", "url": "https://x/new"},
+        {"_scraper_name": "jiji", "url": "https://x/new"},  # same post seen via another source this run
+    ]
+
+    kept = state.filter_new(results)
+
+    assert [r["url"] for r in kept] == ["https://x/new"]
+    assert state.summary()["skipped_seen"] == 2
+    assert state.summary()["skipped_stale"] == 1
+
+
+def test_marks_persist_and_bound_seen_urls(tmp_path, monkeypatch):
+    from app.services import incremental_service
+    monkeypatch.setattr(incremental_service, "AGENT_SEEN_URL_LIMIT", 3)
+
+    db = make_session(tmp_path)
+    agent_id = str(uuid.uuid4())
+
+    first = IncrementalState(agent_id)
+    first.mark_queried("serpapi")
+    first.filter_new([{"_scraper_name": "serpapi", "url": f"https://x/{i}"} for i in range(5)])
+    first.set_cursor("serpapi", {"next": "abc"})
+    first.save(db)
+
+    second = IncrementalState.load(db, agent_id)
+    assert second.has_mark("serpapi")
+    assert second.cursors["serpapi"]["seen_urls"] == ["https://x/2", "https://x/3", "https://x/4"]
+    assert second.get_cursor("serpapi") == {"next": "abc"}
+    assert second.filter_new([{"_scraper_name": "serpapi", "url": "https://x/4"}]) == []
+
+
+def test_run_scrapers_passes_window_only_for_marked_sources(monkeypatch):
+    import app.scrapers as scrapers_pkg
+
+    calls = {}
+
+    class Windowed:
+        async def search(self, query, location, time_window_hours=24):
+            calls["windowed"] = time_window_hours
+            return [{"url": "https://x/w"}]
+
+    class Plain:
+        async def search(self, query, location):
+            calls["plain"] = True
+            return [{"url": "https://x/p"}]
+
+    windowed, plain = Windowed(), Plain()
+    monkeypatch.setattr(scrapers_pkg, "get_active_scrapers", lambda: [windowed, plain])
+    monkeypatch.setattr(scrapers_pkg, "get_scraper_name", lambda s: "windowed" if s is windowed else "plain")
+
+    now = datetime.now(timezone.utc)
+    state = IncrementalState("a", {"windowed": {"last_run_at": now - timedelta(hours=2)}}, now=now)
+    results = asyncio.run(scrapers_pkg.run_scrapers("tyres", "Nairobi", incremental=state))
+
+    assert calls == {"windowed": 3, "plain": True}
+    assert {r["_scraper_name"] for r in results} == {"windowed", "plain"}
+    assert state.summary()["sources_queried"] == ["plain", "windowed"]
@@ -0,0 +1,103 @@
+import os
+import sys
+import asyncio
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core import lanes
+from app.core.lanes import LANES, INTERACTIVE, BACKGROUND, use_lane, current_lane_name, get_lane
+
+
+def test_lane_follows_submitted_work():
+    assert current_lane_name() == INTERACTIVE
+    with use_lane(BACKGROUND):
+        inner = get_lane().submit(current_lane_name).result()
+        # Nested submission from a background thread stays in the background lane
+        nested = get_lane().submit(lambda: get_lane().name).result()
+    assert inner == BACKGROUND
+    assert nested == BACKGROUND
+    assert current_lane_name() == INTERACTIVE
+
+
+def test_async_run_uses_lane_pool():
+    async def go():
+        with use_lane(BACKGROUND):
+            return await LANES[BACKGROUND].run(lambda: __import__("threading").current_thread().name)
+
+    assert asyncio.run(go()).startswith("lane-background")
+
+
+def test_sessions_bind_to_lane_engine():
+    from sqlalchemy import create_engine
+    from app.db.database import SessionLocal, LANE_ENGINES
+
+    db = SessionLocal()
+    try:
+        assert db.get_bind() is LANE_ENGINES[INTERACTIVE]
+        # Pinned once resolved: a transaction never moves to another lane's engine
+        with use_lane(BACKGROUND):
+            assert db.get_bind() is LANE_ENGINES[INTERACTIVE]
+    finally:
+        db.close()
+    with use_lane(BACKGROUND), SessionLocal() as db:
+        assert db.get_bind() is LANE_ENGINES[BACKGROUND]
+
+    explicit = create_engine("sqlite://")
+    with SessionLocal(bind=explicit) as db:
+        assert db.get_bind() is explicit
+
+
+def test_interactive_borrows_background_rate_share(monkeypatch):
+    monkeypatch.setitem(lanes.SOURCE_RATE_LIMITS, "unit-test-source", 2.0)
+    lanes._rate_buckets.clear()
+
+    # Background share is 0.3 * 2/min -> a single token; it cannot borrow.
+    assert lanes.acquire_rate_limit("unit-test-source", BACKGROUND, block=False)
+    assert not lanes.acquire_rate_limit("unit-test-source", BACKGROUND, block=False)
+
+    # Interactive uses its own token, then may borrow from background when idle.
+    lanes._rate_buckets.pop(("unit-test-source", BACKGROUND))
+    assert lanes.acquire_rate_limit("unit-test-source", INTERACTIVE, block=False)
+    assert lanes.acquire_rate_limit("unit-test-source", INTERACTIVE, block=False)
+    assert not lanes.acquire_rate_limit("unit-test-source", INTERACTIVE, block=False)
+
+
+def test_background_admission_yields_to_saturated_interactive(monkeypatch):
+    interactive = LANES[INTERACTIVE]
+    monkeypatch.setattr(interactive, "active", interactive.threads)
+    waited = lanes.admit_background(max_wait=0.3)
+    assert waited >= 0.25
+
+    monkeypatch.setattr(interactive, "active", 0)
+    assert lanes.admit_background(max_wait=0.3) < 0.1
+
+
+def test_discoveries_filling_the_lane_still_get_their_scrapers_run():
+    lane = LANES[BACKGROUND]
+
+    def discovery():
+        # Like _run_parallel_scrapers: fan out and wait on the scraper calls
+        return [f.result(timeout=5) for f in [lane.submit_scrape(lambda: "scraped") for _ in range(3)]]
+
+    jobs = [lane.submit(discovery) for _ in range(lane.threads * 2)]
+    assert all(job.result(timeout=10) == ["scraped"] * 3 for job in jobs)
+
+
+def test_calls_over_the_rate_budget_are_deferred_not_dropped(monkeypatch):
+    monkeypatch.setitem(lanes.SOURCE_RATE_LIMITS, "unit-test-source", 1.0)
+    # One token of burst, refilled every 25ms
+    bucket = lanes._TokenBucket(1.0)
+    bucket.rate = 40.0
+    monkeypatch.setitem(lanes._rate_buckets, ("unit-test-source", BACKGROUND), bucket)
+    lane = LANES[BACKGROUND]
+    deferred = lane.scrapes_deferred
+
+    futures = [lane.submit_rate_limited("unit-test-source", lambda n=n: n) for n in range(5)]
+    assert [f.result(timeout=5) for f in futures] == list(range(5))
+    assert lane.scrapes_deferred > deferred
+
+    # A call still waiting for its token can be dropped
+    bucket.rate = 0.01
+    waiting = lane.submit_rate_limited("unit-test-source", lambda: "late")
+    assert waiting.cancel() and waiting.cancelled()
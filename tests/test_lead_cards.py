@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import uuid
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail, LeadCard
+from app.db import lead_cards as cards_module
+from app.routes import leads as leads_routes
+
+
+def make_session(tmp_path, n):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cards.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__, LeadCard.__table__])
+    db = sessionmaker(bind=engine)()
+    now = datetime.utcnow()
+    for i in range(n):
+        db.add(Lead(
+            id=uuid.uuid4(), title="Generator", source="test", url=f"https://x/{i}", intent_score=0.5,
+            confidence_score=0.9 if i % 2 else 0.1, contact_phone="+254700000000", created_at=now - timedelta(minutes=i)
+        ))
+    db.commit()
+    return db
+
+
+def feed(db):
+    response = leads_routes.get_leads(
+        location=None, query=None, type=None, filter=None, time_range="2h", high_intent=False,
+        has_whatsapp=False, status=None, category=None, sort="recent", cursor=None, limit=50, db=db
+    )
+    return json.loads(response.body)
+
+
+def test_feed_serves_cached_cards_and_drops_them_on_change(tmp_path, monkeypatch):
+    db = make_session(tmp_path, 4)
+    expected = {str(l.id): l.to_dict() for l in db.query(Lead)}
+
+    rendered = []
+    real_render = cards_module.render_card
+    monkeypatch.setattr(cards_module, "render_card", lambda lead: rendered.append(lead.id) or real_render(lead))
+
+    first = feed(db)
+    assert first["count"] == 4 and len(rendered) == 4 and db.query(LeadCard).count() == 4
+    for card in first["leads"]:
+        legacy = expected[card["id"]]
+        assert {k: card[k] for k in legacy if k != "is_hot_lead"} == {k: v for k, v in legacy.items() if k != "is_hot_lead"}
+        assert card["is_hot_lead"] == (legacy["confidence"] >= leads_routes.STRICT_PUBLIC)
+
+    assert feed(db) == first and len(rendered) == 4  # second page view: no rendering at all
+
+    lead = db.query(Lead).order_by(Lead.created_at.desc()).first()
+    lead.tap_count = 3
+    db.commit()
+    assert db.query(LeadCard).count() == 3
+    assert feed(db)["leads"][0]["tap_count"] == 3 and len(rendered) == 5
+
+
+def test_outdated_card_is_rerendered(tmp_path):
+    db = make_session(tmp_path, 1)
+    feed(db)
+    # A Core write that skipped invalidation still moves updated_at
+    db.execute(update(Lead).values(title="Water Tank", updated_at=datetime.utcnow() + timedelta(seconds=5)))
+    db.commit()
+    assert feed(db)["leads"][0]["title"] == "Water Tank"
@@ -0,0 +1,64 @@
+import os
+import sys
+import uuid
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail
+from scripts.split_lead_details import split_lead_details
+
+
+def test_cold_attributes_live_in_lead_details(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'split.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__])
+    db = sessionmaker(bind=engine)()
+    rich = Lead(title="Generator", source="test", url="https://x/1", intent_score=0.5,
+                product_specs={"kva": 20}, talking_points=["fast delivery"])
+    plain = Lead(title="Generator", source="test", url="https://x/2", intent_score=0.5, budget_info=None)
+    db.add_all([rich, plain])
+    db.commit()
+    assert db.query(LeadDetail).count() == 1  # no detail row for leads without cold data
+    db.expire_all()
+
+    # List queries and to_dict never touch lead_details
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    listed = [lead.to_dict() for lead in db.query(Lead).order_by(Lead.url)]
+    assert len(listed) == 2 and not any("lead_details" in s for s in statements)
+
+    rich, plain = db.query(Lead).order_by(Lead.url).all()
+    assert rich.product_specs == {"kva": 20} and plain.product_specs is None
+    plain.supply_status = "low"
+    db.delete(rich)
+    db.commit()
+    assert [d.supply_status for d in db.query(LeadDetail)] == ["low"]
+
+
+def test_migration_moves_cold_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'wide.db'}")
+    Lead.__table__.create(engine)
+    lead_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE leads ADD COLUMN product_specs JSON"))
+        conn.execute(text("ALTER TABLE leads ADD COLUMN pricing_strategy VARCHAR"))
+        conn.execute(text(
+            "INSERT INTO leads (id, title, source, url, intent_score, product_specs, pricing_strategy) "
+            "VALUES (:id, 'Generator', 'test', 'https://x/1', 0.5, '{\"kva\": 20}', 'match market')"
+        ), {"id": lead_id.hex})
+        conn.execute(text(
+            "INSERT INTO leads (id, title, source, url, intent_score) VALUES (:id, 'Tank', 'test', 'https://x/2', 0.5)"
+        ), {"id": str(uuid.uuid4())})
+
+    result = split_lead_details(engine)
+    assert result["copied"] == 1 and set(result["dropped"]) == {"product_specs", "pricing_strategy"}
+    assert "product_specs" not in {c["name"] for c in inspect(engine).get_columns("leads")}
+    assert split_lead_details(engine)["copied"] == 0  # idempotent
+
+    db = sessionmaker(bind=engine)()
+    lead = db.get(Lead, lead_id)
+    assert lead.product_specs == {"kva": 20} and lead.pricing_strategy == "match market"
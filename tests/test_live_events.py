@@ -0,0 +1,109 @@
+import os
+import sys
+import uuid
+import asyncio
+import threading
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail
+from app.models.agent import Agent
+from app.models.notification import Notification
+from app.core.event_hub import EventHub, RESYNC
+from app.db import live_events
+
+
+def make_session(tmp_path, monkeypatch):
+    hub = EventHub()
+    monkeypatch.setattr(hub, "_redis", lambda: None)
+    monkeypatch.setattr(live_events, "hub", hub)
+    engine = create_engine(f"sqlite:///{tmp_path / 'live.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__, Agent.__table__, Notification.__table__])
+    return hub, sessionmaker(bind=engine)
+
+
+async def drain(subscription, timeout=0.2):
+    events = []
+    while (event := await subscription.next(timeout)) is not None:
+        events.append(event)
+    return events
+
+
+def test_commits_publish_and_rollbacks_do_not(tmp_path, monkeypatch):
+    hub, Session = make_session(tmp_path, monkeypatch)
+
+    async def scenario():
+        subscription = hub.subscribe()
+        agent_id = uuid.uuid4()
+
+        def write():
+            # Commits happen on a worker thread, like the lanes/scheduler
+            with Session() as db:
+                db.add(Agent(id=agent_id, name="Generators", query="generator"))
+                db.add(Lead(id=uuid.uuid4(), title="Generator", source="test", url="https://x/1",
+                            intent_score=0.9, created_at=datetime.utcnow()))
+                db.add(Notification(id=uuid.uuid4(), message="1 new lead", lead_count=1))
+                db.commit()
+                db.add(Lead(id=uuid.uuid4(), title="Tank", source="test", url="https://x/2", intent_score=0.1, created_at=datetime.utcnow()))
+                db.flush()
+                db.rollback()
+                # A heartbeat is not a status change
+                db.execute(update(Agent).where(Agent.id == agent_id).values(last_heartbeat=datetime.utcnow()))
+                db.commit()
+
+        await asyncio.to_thread(write)
+        return await drain(subscription)
+
+    published = asyncio.run(scenario())
+    # One event per topic from the first commit; nothing from the rollback or the heartbeat
+    assert sorted(e["topic"] for e in published) == ["agents", "leads", "notifications", "stats"]
+    events = {e["topic"]: e["data"] for e in published}
+    assert len(events["leads"]["inserted"]) == 1 and events["stats"]["new_leads"] == 1
+    assert events["notifications"]["created"] == 1
+    assert hub.subscriber_count == 1
+
+
+def test_topic_filter_and_overflow_resync(tmp_path, monkeypatch):
+    hub, _ = make_session(tmp_path, monkeypatch)
+
+    async def scenario():
+        subscription = hub.subscribe(["notifications"])
+        subscription.queue = asyncio.Queue(2)
+        publisher = threading.Thread(target=lambda: [hub.publish(t, {"n": i}) for i in range(3) for t in ("leads", "notifications")])
+        publisher.start()
+        publisher.join()
+        events = await drain(subscription)
+        hub.unsubscribe(subscription)
+        return events
+
+    events = asyncio.run(scenario())
+    assert [e["topic"] for e in events] == ["notifications", "notifications", RESYNC]
+    assert hub.subscriber_count == 0
+
+
+def test_redis_publish_does_not_block_the_committing_thread(monkeypatch):
+    import time
+
+    sent = []
+
+    class SlowRedis:
+        def publish(self, channel, message):
+            time.sleep(0.2)
+            sent.append(message)
+
+    hub = EventHub()
+    monkeypatch.setattr(hub, "_redis", lambda: SlowRedis())
+    started = time.perf_counter()
+    for i in range(3):
+        hub.publish("leads", {"n": i})
+    assert time.perf_counter() - started < 0.1
+    deadline = time.monotonic() + 5
+    while len(sent) < 3 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(sent) == 3 and '"origin"' in sent[0]
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.local_queue import LocalTaskQueue
+
+
+def make_queue(tmp_path, registry, **kwargs):
+    return LocalTaskQueue(
+        path=str(tmp_path / "queue.db"),
+        resolve_task=registry.get,
+        retry_backoff=0,
+        poll_interval=0.05,
+        **kwargs
+    )
+
+
+def test_priority_then_fifo(tmp_path):
+    calls = []
+    queue = make_queue(tmp_path, {"work": lambda tag: calls.append(tag)})
+
+    queue.enqueue("work", ["low-1"])
+    queue.enqueue("work", ["high"], priority=9)
+    queue.enqueue("work", ["low-2"])
+
+    while queue.run_next():
+        pass
+
+    assert calls == ["high", "low-1", "low-2"]
+    assert queue.stats() == {"done": 3}
+
+
+def test_visibility_timeout_redelivers(tmp_path):
+    queue = make_queue(tmp_path, {}, visibility_timeout=0.1)
+    result = queue.enqueue("work")
+
+    first = queue.claim()
+    assert first["id"] == result.id
+    assert queue.claim() is None  # still invisible
+
+    time.sleep(0.15)
+    again = queue.claim()
+    assert again["id"] == result.id
+    assert again["attempts"] == 2
+
+
+def test_retries_then_dead_letter(tmp_path):
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        raise RuntimeError("boom")
+
+    queue = make_queue(tmp_path, {"flaky": flaky}, max_retries=2)
+    result = queue.enqueue("flaky")
+
+    while queue.run_next():
+        pass
+
+    task = queue.get_task(result.id)
+    assert len(attempts) == 3
+    assert task["status"] == "dead"
+    assert "boom" in task["last_error"]
+    assert result.status == "FAILURE"
+
+
+def test_worker_threads_drain_queue(tmp_path):
+    done = []
+    queue = make_queue(tmp_path, {"work": lambda i: done.append(i)})
+    for i in range(20):
+        queue.enqueue("work", [i])
+
+    queue.start(concurrency=4, beat=False)
+    deadline = time.time() + 10
+    while len(done) < 20 and time.time() < deadline:
+        time.sleep(0.05)
+    queue.stop()
+
+    assert sorted(done) == list(range(20))
+
+
+def test_periodic_entry_fires_once_per_interval(tmp_path):
+    queue = make_queue(tmp_path, {})
+    queue.add_periodic("every-minute", "tick", 60.0)
+
+    assert queue.tick_periodic() == 0  # first sighting starts the clock
+    queue._connect().execute("UPDATE periodic_runs SET last_run = last_run - 61")
+    assert queue.tick_periodic() == 1
+    assert queue.tick_periodic() == 0
+    assert queue.stats() == {"queued": 1}
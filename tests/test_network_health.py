@@ -0,0 +1,102 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core import network_health as health_module
+from app.core.network_health import NetworkHealth
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self.send_response(self.server.status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer:
+    """A local upstream that can be taken down and brought back on the same port."""
+
+    def __init__(self):
+        self.port = None
+        self.status = 200
+        self.httpd = None
+        self.up()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def up(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", self.port or 0), _Handler)
+        self.httpd.status = self.status
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def down(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def test_sources_go_down_and_recover_with_their_upstream():
+    reddit, jiji = StubServer(), StubServer()
+    health = NetworkHealth({"RedditScraper": reddit.url, "ClassifiedsScraper": jiji.url}, interval=0, timeout=1)
+    assert health.reachable("RedditScraper")  # not probed yet
+
+    health.check_all()
+    assert health.status()["RedditScraper"]["latency_ms"] is not None
+
+    reddit.down()
+    health.check_all()
+    assert health.reachable("RedditScraper")  # one failure is tolerated
+    health.check_all()
+    status = health.status()
+    assert not status["RedditScraper"]["reachable"] and status["RedditScraper"]["consecutive_failures"] == 2
+    assert status["RedditScraper"]["success_rate"] == round(1 / 3, 2) and status["RedditScraper"]["error"]
+    assert status["ClassifiedsScraper"]["reachable"] and health.any_reachable()
+
+    jiji.httpd.status = 503  # answering, but broken
+    health.check_all()
+    health.check_all()
+    assert not health.reachable("ClassifiedsScraper") and not health.any_reachable()
+
+    reddit.up()
+    health.check_all()
+    assert health.reachable("RedditScraper") and health.any_reachable()
+    reddit.down()
+    jiji.down()
+
+
+def test_decide_scrapers_skips_unreachable_sources(monkeypatch):
+    from app.scrapers import selector
+    from app.scrapers.registry import SCRAPER_REGISTRY
+
+    health = NetworkHealth({"ClassifiedsScraper": "http://127.0.0.1:9"}, interval=0)
+    monkeypatch.setattr(selector, "network_health", health)
+    before = selector.decide_scrapers("generator", "Kenya")
+    assert "jiji" in before
+
+    for _ in range(health_module.NETWORK_HEALTH_FAILURES):
+        health.record("ClassifiedsScraper", False, 0.0, "ConnectError")
+    after = selector.decide_scrapers("generator", "Kenya")
+    assert "jiji" not in after and set(after) == set(before) - {"jiji"}
+    assert type(SCRAPER_REGISTRY["jiji"]).__name__ == "ClassifiedsScraper"
+
+
+def test_the_monitor_only_starts_when_asked(monkeypatch):
+    assert health_module.NETWORK_HEALTH_INTERVAL == 0  # disabled under tests (conftest)
+    health = NetworkHealth({"RedditScraper": "http://127.0.0.1:9"}, interval=3600)
+    monkeypatch.setattr(health, "_monitor", lambda: None)
+    assert health.reachable("RedditScraper") and health.any_reachable()
+    assert health._monitor_thread is None  # reads never start probing
+    health.start()
+    assert health._monitor_thread is not None
+    disabled = NetworkHealth({"RedditScraper": "http://127.0.0.1:9"}, interval=0)
+    disabled.start()
+    assert disabled._monitor_thread is None
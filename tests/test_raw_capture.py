@@ -0,0 +1,96 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import RawCapture
+from app.core import raw_capture
+from app.core.raw_capture import RawCaptureStore, content_hash, item_hash
+
+
+def items(n, start=0):
+    return [{"url": f"https://x/{i}", "text": f"Looking for a 5kva generator in Nairobi #{i} " + "budget 50k " * 40}
+            for i in range(start, start + n)]
+
+
+def test_segments_rotate_and_replay_in_order(tmp_path):
+    store = RawCaptureStore(directory=str(tmp_path), segment_mb=0.001, frame_kb=4, index=False)
+    store.capture("Reddit", items(100), query="generator")
+    store.capture("Reddit", items(10))  # already captured: not stored twice
+    store.close()
+
+    assert len(store.segments()) > 1
+    replayed = list(store.replay())
+    assert [r["payload"]["url"] for r in replayed] == [f"https://x/{i}" for i in range(100)]
+    assert replayed[0]["query"] == "generator"
+    stats = store.stats()
+    assert stats["records"] == 100 and stats["duplicates"] == 10
+    # Repetitive scraper text compresses well; the footprint is what is on disk
+    assert stats["disk_bytes"] == stats["bytes_written"] < stats["bytes_in"] / 5
+
+
+def test_read_by_content_hash_through_the_index(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'index.db'}")
+    Base.metadata.create_all(bind=engine, tables=[RawCapture.__table__])
+    Session = sessionmaker(bind=engine)
+
+    def write_now(fn, *args):
+        with Session() as db:
+            fn(db, *args)
+            db.commit()
+
+    monkeypatch.setattr(raw_capture, "write_later", write_now)
+    monkeypatch.setattr(raw_capture, "SessionLocal", Session)
+    store = RawCaptureStore(directory=str(tmp_path / "segments"), frame_kb=4)
+    [pending] = store.capture("Jiji", items(1, start=500))
+    assert store.read(pending)["payload"]["url"] == "https://x/500"  # still buffered
+
+    hashes = store.capture("Jiji", items(50))
+    store.flush()
+    record = store.read(hashes[42])
+    assert record["source"] == "Jiji" and record["payload"]["url"] == "https://x/42"
+    assert hashes[42] == content_hash(items(1, start=42)[0]["text"])
+    assert store.read("0" * 32) is None
+
+
+def test_item_hash_is_the_capture_hash_for_any_payload_shape(tmp_path, monkeypatch):
+    store = RawCaptureStore(directory=str(tmp_path), index=False)
+    shapes = [{"snippet": "Need a water tank"}, {"data": {"raw_text": "Need tyres"}}, {"url": "https://x/no-text"}]
+    assert store.capture("Google", shapes) == [item_hash(item) for item in shapes]
+    # Snippet-only items used to be stored under md5("n/a") on agent_raw_leads
+    assert item_hash(shapes[0]) == content_hash("Need a water tank") != content_hash("N/A")
+
+    monkeypatch.setattr(raw_capture, "RAW_CAPTURE", False)
+    assert store.capture("Google", shapes) == []
+
+
+def test_agent_raw_leads_gain_the_capture_hash_column(tmp_path, monkeypatch):
+    import uuid
+    from sqlalchemy import inspect, select, text
+    from app.models.agent import Agent
+    from app.models.agent_raw_lead import AgentRawLead
+    from scripts import migrate_agent_raw_lead_hash
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE agent_raw_leads (id CHAR(32) PRIMARY KEY, agent_id CHAR(32), raw_text TEXT, "
+                          "phone VARCHAR, source VARCHAR, source_url VARCHAR, intent_score FLOAT, geo_score FLOAT, "
+                          "ranked_score FLOAT, notified BOOLEAN, discovered_at DATETIME)"))
+    monkeypatch.setattr(migrate_agent_raw_lead_hash, "engine", engine)
+    migrate_agent_raw_lead_hash.migrate_agent_raw_lead_hash()
+    migrate_agent_raw_lead_hash.migrate_agent_raw_lead_hash()  # idempotent
+    assert "ix_agent_raw_leads_agent_hash" in {i["name"] for i in inspect(engine).get_indexes("agent_raw_leads")}
+
+    Base.metadata.create_all(bind=engine, tables=[Agent.__table__])
+    agent_id, hashed = uuid.uuid4(), item_hash({"snippet": "Need a water tank"})
+    with sessionmaker(bind=engine)() as db:
+        db.add(AgentRawLead(agent_id=agent_id, raw_text="Need a water tank", content_hash=hashed))
+        db.commit()
+        stored = db.scalars(select(AgentRawLead).where(AgentRawLead.agent_id == agent_id,
+                                                       AgentRawLead.content_hash == hashed)).one()
+        assert stored.raw_text == "Need a water tank"
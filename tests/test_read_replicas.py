@@ -0,0 +1,90 @@
+import os
+import sys
+import uuid
+import shutil
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.db import database
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail
+from app.db.database import ReplicaSet, SessionLocal, ReadSessionLocal, read_replica
+from app.core.lanes import LANE_CONFIG
+
+
+def add_lead(db, i):
+    db.add(Lead(id=uuid.uuid4(), title="Generator", source="test", url=f"https://x/{i}",
+                intent_score=0.5, created_at=datetime.utcnow()))
+    db.commit()
+
+
+def setup_pair(tmp_path, monkeypatch):
+    """Primary and replica SQLite files; the replica is one lead behind."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    Base.metadata.create_all(bind=primary, tables=[Lead.__table__, LeadDetail.__table__])
+    with sessionmaker(bind=primary)() as db:
+        add_lead(db, 0)
+    primary.dispose()
+    shutil.copy(tmp_path / "primary.db", tmp_path / "replica.db")
+    with sessionmaker(bind=primary)() as db:
+        add_lead(db, 1)
+
+    monkeypatch.setattr(database, "LANE_ENGINES", {lane: primary for lane in LANE_CONFIG})
+    replicas = ReplicaSet([f"sqlite:///{tmp_path / 'replica.db'}"])
+    monkeypatch.setattr(database, "replicas", replicas)
+    replicas.check_all()
+    return replicas
+
+
+def count(db, **options):
+    return db.execute(select(func.count(Lead.id)).execution_options(**options)).scalar()
+
+
+def test_reads_route_to_replica_until_the_session_writes(tmp_path, monkeypatch):
+    setup_pair(tmp_path, monkeypatch)
+
+    with SessionLocal() as db:
+        assert count(db) == 2
+        assert count(db, replica=True) == 1  # explicitly marked query
+        with read_replica(db):
+            assert count(db) == 1
+        assert count(db) == 2
+
+    with ReadSessionLocal() as db:
+        assert count(db) == 1
+        add_lead(db, 2)  # the write goes to the primary...
+        assert count(db) == 3  # ...and the session now reads its own writes there
+
+
+def test_lagging_or_unreachable_replica_falls_back_to_primary(tmp_path, monkeypatch):
+    replicas = setup_pair(tmp_path, monkeypatch)
+    monkeypatch.setitem(database.LAG_PROBES, "sqlite", lambda connection: 60.0)
+    replicas.check_all()
+    assert replicas.status()[0] == {"replica": 0, "healthy": False, "lag_seconds": 60.0}
+    with ReadSessionLocal() as db:
+        assert count(db) == 2
+
+    down = ReplicaSet([f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"])
+    monkeypatch.setattr(database, "replicas", down)
+    down.check_all()
+    with ReadSessionLocal() as db:
+        assert count(db) == 2
+
+
+def test_each_lane_reads_through_its_own_replica_engine(tmp_path, monkeypatch):
+    from app.core.lanes import INTERACTIVE, BACKGROUND, use_lane
+
+    replicas = setup_pair(tmp_path, monkeypatch)
+    with ReadSessionLocal() as db:
+        interactive = db.get_bind()
+    with use_lane(BACKGROUND), ReadSessionLocal() as db:
+        background = db.get_bind()
+        assert count(db) == 1  # still the replica
+    assert interactive is replicas.engine_for(0, INTERACTIVE)
+    assert background is replicas.engine_for(0, BACKGROUND) and background is not interactive
+    assert background.pool.size() == LANE_CONFIG[BACKGROUND]["db_connections"]
@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.database import get_db, get_read_db
+from app.db.async_database import LaneSession, get_async_read_db
+from app.db.models import Lead, LeadDetail, LeadCard
+from app.models.notification import Notification
+from app.core import response_cache
+from app.routes import leads as leads_routes
+from app.api.routes import notifications as notifications_routes
+
+
+def make_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, "_redis", lambda: None)
+    monkeypatch.setattr(response_cache, "_local", response_cache._LocalStore(64))
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__, LeadCard.__table__, Notification.__table__])
+    factory = sessionmaker(bind=engine)
+
+    def override_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(leads_routes.router)
+    app.include_router(notifications_routes.router, prefix="/notifications")
+    async def override_async_db():
+        db = LaneSession(factory())
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_read_db] = override_db
+    app.dependency_overrides[get_async_read_db] = override_async_db
+    return TestClient(app), engine, factory
+
+
+def add_lead(factory, i):
+    with factory() as db:
+        db.add(Lead(id=uuid.uuid4(), title="Generator", source="test", url=f"https://x/{i}",
+                    intent_score=0.5, created_at=datetime.utcnow()))
+        db.commit()
+
+
+def test_unchanged_feed_is_304_without_touching_the_database(tmp_path, monkeypatch):
+    client, engine, factory = make_client(tmp_path, monkeypatch)
+    add_lead(factory, 0)
+
+    first = client.get("/leads", params={"sort": "recent", "location": ""})
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.json()["count"] == 1 and first.headers["last-modified"]
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    # Same query in a different order: same cache key
+    assert client.get("/leads?location=&sort=recent", headers={"If-None-Match": etag}).status_code == 304
+    again = client.get("/leads", params={"sort": "recent"})
+    assert again.content == first.content and again.headers["etag"] == etag
+    assert statements == []
+
+    add_lead(factory, 1)  # the commit bumps the "leads" version
+    changed = client.get("/leads", params={"sort": "recent"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()["count"] == 2 and changed.headers["etag"] != etag
+
+
+def test_notification_writes_invalidate(tmp_path, monkeypatch):
+    client, engine, factory = make_client(tmp_path, monkeypatch)
+    with factory() as db:
+        db.add(Notification(id=uuid.uuid4(), message="3 new leads", lead_count=3))
+        db.commit()
+
+    listed = client.get("/notifications/")
+    assert listed.status_code == 200 and listed.json()[0]["message"] == "3 new leads"
+    count = client.get("/notifications/count", params={"unread_only": True})
+    assert count.json() == {"count": 1}
+
+    client.post(f"/notifications/{listed.json()[0]['id']}/read")
+    assert client.get("/notifications/count", params={"unread_only": True}).json() == {"count": 0}
+    client.delete("/notifications/")  # bulk DELETE statement, not a flush
+    assert client.get("/notifications/", headers={"If-None-Match": listed.headers["etag"]}).json() == []
+
+
+def test_redis_reconnects_are_probed_off_the_request_path(monkeypatch):
+    from app.core import redis_link
+
+    connects = []
+
+    class SlowRedis:
+        def ping(self):
+            time.sleep(0.3)
+            if len(connects) == 1:
+                raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(redis_link, "HAS_REDIS", True)
+    monkeypatch.setattr(redis_link, "redis", type("redis", (), {"from_url": lambda url, **kw: connects.append(url) or SlowRedis()}))
+    link = redis_link.RedisLink("redis://down:6379/0", "Test", "local only", retry_seconds=0.5)
+
+    started = time.perf_counter()
+    assert link.client() is None and link.client() is None
+    assert time.perf_counter() - started < 0.1  # the slow ping runs on the probe thread
+    wait_for(lambda: not link._probing)
+    assert link.client() is None and len(connects) == 1  # not re-probed before retry_seconds
+
+    time.sleep(0.5)
+    assert link.client() is None
+    wait_for(lambda: link.client() is not None)
+    assert len(connects) == 2
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
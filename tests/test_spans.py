@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import asyncio
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.spans import recording, span, add_span, slowest_stages
+from app.core.lanes import get_lane
+
+
+def test_spans_follow_lane_threads_and_tasks():
+    async def scrape(name):
+        with span(f"scraper.{name}") as sp:
+            await asyncio.sleep(0.01)
+            sp.items = 3
+
+    def score():
+        with span("scoring", items=5):
+            time.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(scrape("a"), scrape("b"))
+        await get_lane().run(score)
+
+    with recording() as recorder:
+        asyncio.run(run())
+
+    profile = recorder.to_dict()
+    assert set(profile["stages"]) == {"scraper.a", "scraper.b", "scoring"}
+    assert profile["stages"]["scraper.a"]["items"] == 3
+    assert profile["stages"]["scoring"]["calls"] == 1
+    assert profile["stages"]["scoring"]["ms"] >= 10
+
+
+def test_failed_stage_is_counted_and_no_recorder_is_noop():
+    with span("unrecorded"):
+        pass
+    add_span("unrecorded", 5.0)
+
+    with recording() as recorder:
+        try:
+            with span("pipeline"):
+                raise TimeoutError()
+        except TimeoutError:
+            pass
+
+    assert recorder.to_dict()["stages"]["pipeline"]["errors"] == 1
+
+
+def test_slowest_stages_aggregates_runs():
+    profiles = [
+        {"stages": {"scraper.jiji": {"ms": 900.0, "max_ms": 900.0, "calls": 1}, "db.upsert": {"ms": 50.0, "max_ms": 50.0, "calls": 1}}},
+        {"stages": {"scraper.jiji": {"ms": 300.0, "max_ms": 300.0, "calls": 1}}},
+        None,
+    ]
+    rows = slowest_stages(profiles)
+    assert [r["stage"] for r in rows] == ["scraper.jiji", "db.upsert"]
+    assert rows[0]["runs"] == 2
+    assert rows[0]["avg_ms_per_run"] == 600.0
+    assert rows[0]["max_ms"] == 900.0
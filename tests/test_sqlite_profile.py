@@ -0,0 +1,99 @@
+import os
+import sys
+import uuid
+import threading
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail, LeadChange, LeadCard
+from app.db.sqlite_profile import SQLiteWriter, apply_sqlite_profile, sqlite_connect_args, writer_gate
+from app.services.deduplication_service import upsert_leads
+
+
+def make_db(tmp_path):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    engine = create_engine(url, connect_args=sqlite_connect_args())
+    apply_sqlite_profile(engine)
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__, LeadChange.__table__,
+                                                  LeadCard.__table__])
+    return url, engine
+
+
+def lead(i, price="100"):
+    return {"title": "Generator", "source": "test", "source_url": f"https://x/{i}", "intent_score": 0.5, "price": price}
+
+
+def test_connections_get_the_profile_pragmas(tmp_path):
+    _, engine = make_db(tmp_path)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 30000
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA temp_store").scalar() == 2  # MEMORY
+
+
+def test_writer_batches_jobs_and_isolates_failures(tmp_path):
+    url, engine = make_db(tmp_path)
+    writer = SQLiteWriter(url, linger_ms=50)
+    release = threading.Event()
+    # Hold the writer on a first job so the rest queue up into one batch
+    blocker = writer.submit(lambda db: release.wait(5))
+
+    def broken(db):
+        upsert_leads(db, [lead(99)])
+        raise ValueError("bad job")
+
+    futures = [writer.submit(upsert_leads, [lead(i), lead(i + 1, price="200")]) for i in range(0, 20, 2)]
+    failed = writer.submit(broken)
+    duplicate = writer.submit(upsert_leads, [lead(0, price="300")])
+    release.set()
+    blocker.result(5)
+
+    assert all(len(f.result(5)) == 2 for f in futures)
+    with pytest.raises(ValueError):
+        failed.result(5)
+    assert len(duplicate.result(5)) == 1
+    assert writer.stats()["batches"] <= 3
+
+    with sessionmaker(bind=engine)() as db:
+        # The failed job's lead was rolled back to its savepoint; the duplicate url updated in place
+        assert db.scalar(select(func.count(Lead.id))) == 20
+        assert db.scalar(select(Lead.price).where(Lead.url == "https://x/0")) == "300"
+
+
+def test_concurrent_writers_do_not_hit_lock_errors(tmp_path):
+    url, engine = make_db(tmp_path)
+    writer = SQLiteWriter(url)
+    Session = sessionmaker(bind=engine)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(20):
+                if i % 2:
+                    writer.submit(upsert_leads, [lead(f"{n}-{i}")]).result(30)
+                else:
+                    # A direct session write (scheduler-style) interleaved with the writer's batches
+                    with Session() as db:
+                        db.add(Lead(id=uuid.uuid4(), title="Tank", source="test", url=f"https://y/{n}-{i}",
+                                    intent_score=0.5))
+                        db.commit()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert writer_gate._holders == 0
+    with Session() as db:
+        assert db.scalar(select(func.count(Lead.id))) == 160
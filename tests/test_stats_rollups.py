@@ -0,0 +1,132 @@
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.models import Lead, LeadDetail, LeadStatsRollup, CRMStatus
+from app.db import rollups
+from app.db.rollups import stats_totals, reconcile_rollups, prune_rollups, rollups_ready, _lead_totals, agent_counters_ready
+from app.services.deduplication_service import upsert_lead_atomic, bulk_upsert_leads
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__, LeadStatsRollup.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def add_lead(db, title, age_hours, **fields):
+    lead = Lead(
+        id=uuid.uuid4(), title=title, source="test", url=f"https://x/{uuid.uuid4().hex}",
+        intent_score=fields.pop("intent_score", 0.5),
+        created_at=datetime.utcnow() - timedelta(hours=age_hours), **fields
+    )
+    db.add(lead)
+    return lead
+
+
+def rollup_rows(db):
+    return sorted(
+        (r.grain, r.bucket, r.category, r.leads, r.strict_public, r.urgent, r.taps, r.contacted)
+        for r in db.query(LeadStatsRollup).filter(LeadStatsRollup.leads != 0)
+    )
+
+
+def test_rollups_track_inserts_updates_and_deletes(tmp_path):
+    db = make_session(tmp_path)
+    hot = add_lead(db, "Generator", 1, confidence_score=0.95, urgency_level="high", intent_score=0.9)
+    add_lead(db, "Generator", 30, confidence_score=0.7, whatsapp_link="https://wa.me/1")
+    old = add_lead(db, "Water Tank", 50, urgency_score=0.9)
+    db.commit()
+
+    since = datetime.utcnow() - timedelta(hours=24, minutes=30)
+    for window in (None, since):
+        assert stats_totals(db, since=window) == _lead_totals(db, since=window)
+
+    # Tap + status change on an expired (post-commit) instance
+    hot.tap_count = 2
+    hot.status = CRMStatus.CONTACTED
+    db.commit()
+    db.delete(old)
+    db.commit()
+
+    totals = stats_totals(db)
+    assert totals == _lead_totals(db)
+    assert (totals["leads"], totals["taps"], totals["contacted"], totals["urgent_any"]) == (2, 2, 1, 1)
+    assert stats_totals(db, category="Generator")["leads"] == 2
+
+
+def test_reconcile_and_prune_match_live_counters(tmp_path):
+    db = make_session(tmp_path)
+    for age in (2, 3, 26, 27, 100, 101):
+        add_lead(db, "Solar Panel", age, confidence_score=0.9)
+    db.commit()
+    live = rollup_rows(db)
+
+    reconcile_rollups(db)
+    db.commit()
+    assert rollup_rows(db) == live
+
+    # Bulk deletes bypass the flush hook; prune_rollups recounts the edge
+    cutoff = datetime.utcnow() - timedelta(hours=50)
+    db.query(Lead).filter(Lead.created_at < cutoff).delete()
+    prune_rollups(db, cutoff)
+    db.commit()
+    assert stats_totals(db)["leads"] == 4
+    assert stats_totals(db, since=cutoff) == _lead_totals(db, since=cutoff)
+
+
+def test_core_upserts_apply_rollup_deltas(tmp_path):
+    db = make_session(tmp_path)
+    url = "https://x/upserted"
+    upsert_lead_atomic(db, {"title": "Generator", "source": "test", "source_url": url, "intent_score": 0.5})
+    assert stats_totals(db) == _lead_totals(db) and stats_totals(db)["leads"] == 1
+
+    # Same url: an update of the existing row, not a second lead
+    upsert_lead_atomic(db, {"title": "Generator", "source": "test", "source_url": url, "intent_score": 0.95,
+                            "status": CRMStatus.CONTACTED})
+    assert stats_totals(db) == _lead_totals(db)
+    assert (stats_totals(db)["leads"], stats_totals(db)["intent_high"], stats_totals(db)["contacted"]) == (1, 1, 1)
+
+    bulk_upsert_leads(db, [{"title": "Water Tank", "source": "test", "url": f"https://x/bulk/{i}", "intent_score": 0.9}
+                           for i in range(3)])
+    db.commit()
+    assert stats_totals(db) == _lead_totals(db) and stats_totals(db)["leads"] == 4
+    live = rollup_rows(db)
+    reconcile_rollups(db)
+    assert rollup_rows(db) == live
+
+
+def test_missing_rollup_table_is_not_reprobed_on_every_read(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bare.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Lead.__table__, LeadDetail.__table__])
+    probes = []
+    real_inspect = rollups.inspect
+    monkeypatch.setattr(rollups, "inspect", lambda target: probes.append(target) or real_inspect(target))
+    with engine.connect() as connection:
+        assert not rollups_ready(connection) and not rollups_ready(connection)
+        assert len(probes) == 1
+        LeadStatsRollup.__table__.create(bind=connection)
+        assert rollups_ready(connection)  # creating the table drops the cached miss
+
+
+def test_missing_agent_counter_columns_are_not_reprobed_on_every_flush(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy_agents.db'}")
+    probes = []
+    real_inspect = rollups.inspect
+    monkeypatch.setattr(rollups, "inspect", lambda target: probes.append(target) or real_inspect(target))
+    with engine.connect() as connection:
+        connection.execute(text("CREATE TABLE agents (id VARCHAR PRIMARY KEY, name VARCHAR)"))
+        assert not agent_counters_ready(connection) and not agent_counters_ready(connection)
+        assert len(probes) == 1
+        # scripts/migrate_agent_counters.py ran: picked up once the cached miss expires
+        connection.execute(text("ALTER TABLE agents ADD COLUMN leads_count INTEGER"))
+        monkeypatch.setattr(rollups, "ROLLUPS_PROBE_SECONDS", 0)
+        assert agent_counters_ready(connection) and len(probes) == 2